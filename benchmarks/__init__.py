@@ -0,0 +1,31 @@
+"""Reproducible benchmarks for the per-cycle hot path.
+
+Run ``python -m benchmarks run`` from the repo root; results are written as
+JSON under ``benchmarks/results/`` keyed by commit, and two result files are
+compared with ``python -m benchmarks compare BASE NEW``.
+"""
+
+from . import bench_cycle, bench_micro  # noqa: F401  (registers the benchmarks)
+from .harness import (
+    BENCHMARKS,
+    SkipBenchmark,
+    Timing,
+    benchmark,
+    compare,
+    load,
+    measure,
+    run,
+    save,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "SkipBenchmark",
+    "Timing",
+    "benchmark",
+    "compare",
+    "load",
+    "measure",
+    "run",
+    "save",
+]
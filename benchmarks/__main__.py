@@ -0,0 +1,99 @@
+"""Command line: ``python -m benchmarks run|compare``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from . import harness
+
+
+def _run(args: argparse.Namespace) -> int:
+    # The hot path logs at INFO; keep the records (their formatting is part of
+    # the cost) but send them nowhere so the terminal does not skew the timings
+    logger.remove()
+    logger.add(lambda _msg: None, level="INFO")
+
+    def report(t: harness.Timing) -> None:
+        print(
+            f"{t.name:<36} {harness.format_seconds(t.median_s):>10}  "
+            f"(min {harness.format_seconds(t.min_s)}, +/-{harness.format_seconds(t.stdev_s)}, "
+            f"{t.number} x {t.rounds})",
+            flush=True,
+        )
+
+    timings, skipped = harness.run(
+        args.filter,
+        quick=args.quick,
+        rounds=args.rounds,
+        min_time=args.min_time,
+        report=report,
+    )
+    for name in skipped:
+        print(f"{name:<36} skipped")
+    if not timings:
+        print(f"no benchmark matches {args.filter!r}", file=sys.stderr)
+        return 2
+    path = harness.save(timings, Path(args.out) if args.out else None, skipped)
+    print(f"results written to {path}")
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    result = harness.compare(
+        harness.load(args.base), harness.load(args.new), threshold=args.threshold
+    )
+    for label in ("regressions", "improvements", "unchanged"):
+        for c in result[label]:
+            print(
+                f"{label[:-1] if label != 'unchanged' else label:<12} {c.name:<36} "
+                f"{harness.format_seconds(c.base_s):>10} -> {harness.format_seconds(c.new_s):>10}  "
+                f"({(c.ratio - 1.0) * 100:+.1f}%)"
+            )
+    for c in result["missing"]:
+        print(f"{'missing':<12} {c.name}")
+    return 1 if result["regressions"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Per-cycle hot path benchmarks"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run benchmarks and write a results JSON")
+    p_run.add_argument(
+        "--filter", default="*", help="glob over benchmark names, e.g. 'strategy/*'"
+    )
+    p_run.add_argument("--quick", action="store_true", help="skip the slow benchmarks")
+    p_run.add_argument("--rounds", type=int, default=7)
+    p_run.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="seconds per round (calibrated loop count)",
+    )
+    p_run.add_argument(
+        "--out", help="results path (default: benchmarks/results/<commit>.json)"
+    )
+    p_run.set_defaults(func=_run)
+
+    p_cmp = sub.add_parser(
+        "compare", help="compare two results files; exit 1 on regressions"
+    )
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument(
+        "--threshold", type=float, default=0.10, help="relative change ignored as noise"
+    )
+    p_cmp.set_defaults(func=_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
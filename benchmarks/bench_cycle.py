@@ -0,0 +1,98 @@
+"""Macro benchmark: one full ``run_cycle`` over N symbols against a stub broker.
+
+The broker is the backtest ``SimBroker`` with zero simulated latency, so the
+timing is the scheduler's own work per cycle: history fetch and DataFrame
+build, signal evaluation, chain scan, quotes and sizing. ``dry_run`` stops
+each entry just before the order is sent, which keeps every timed call
+identical (no positions build up between calls).
+"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from src.bot import scheduler
+from src.bot.backtest import LatencyModel, SimBroker
+
+from .fixtures import trending_bars
+from .harness import benchmark
+
+_SYMBOLS = [
+    "SPY",
+    "QQQ",
+    "IWM",
+    "DIA",
+    "XLF",
+    "XLE",
+    "XLK",
+    "XLV",
+    "XLI",
+    "XLY",
+    "XLP",
+    "XLU",
+    "XLB",
+    "SMH",
+    "GLD",
+    "TLT",
+]
+
+
+def _cycle(n_symbols: int):
+    symbols = _SYMBOLS[:n_symbols]
+    bars = {
+        sym: trending_bars(400, freq="60min", seed=i) for i, sym in enumerate(symbols)
+    }
+    broker = SimBroker(
+        bars,
+        latency=LatencyModel(request_seconds=0.0, order_ack_seconds=0.0),
+        strike_step=1.0,
+    )
+    broker.connect()
+    broker.clock.set(broker.last_ts)
+    state_dir = Path(tempfile.mkdtemp(prefix="bench-cycle-"))
+    settings = {
+        "symbols": symbols,
+        "dry_run": True,
+        "schedule": {"interval_seconds": 180},
+        "historical": {"duration": "864000 S", "bar_size": "1 hour", "use_rth": False},
+        "options": {"expiry": "weekly", "moneyness": "atm", "max_spread_pct": 5.0},
+        "risk": {
+            "max_risk_pct_per_trade": 0.01,
+            "max_daily_loss_pct": 0.5,
+            "stop_loss_pct": 0.5,
+            "take_profit_pct": 0.3,
+            "daily_state_path": str(state_dir / "daily_state.json"),
+        },
+        "monitoring": {"alerts_enabled": False},
+    }
+    breaker = scheduler.GatewayCircuitBreaker(
+        failure_threshold=3, reset_timeout_seconds=300
+    )
+
+    def call():
+        # Fresh module state each call so bar-close gating and throttling never
+        # skip work; the simulated clock is only installed for the cycle itself
+        scheduler._last_signal_bar.clear()
+        scheduler._symbol_bar_cache.clear()
+        scheduler._timeout_tracker.clear()
+        scheduler._LAST_REQUEST_TIME.clear()
+        saved_breaker, scheduler._gateway_circuit_breaker = (
+            scheduler._gateway_circuit_breaker,
+            breaker,
+        )
+        scheduler.set_clock(broker.clock, lambda _seconds: None)
+        try:
+            scheduler.run_cycle(broker, settings)
+        finally:
+            scheduler.set_clock()
+            scheduler._gateway_circuit_breaker = saved_breaker
+
+    return call
+
+
+for _n in (1, 4, 16):
+
+    @benchmark(f"cycle/run_cycle/{_n}", group="macro", quick=_n < 16)
+    def _run_cycle(n=_n):
+        return _cycle(n)
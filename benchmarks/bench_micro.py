@@ -0,0 +1,182 @@
+"""Micro benchmarks: the per-symbol building blocks of a cycle."""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from src.bot import journal, scheduler
+from src.bot.backtest.strategies import STRATEGIES
+from src.bot.data import market
+from src.bot.data.options import pick_weekly_option
+from src.bot.risk import position_size
+from src.bot.strategy.daily_volume_rules import daily_volume_rules
+from src.bot.strategy.geo_rules import geo_rules
+from src.bot.strategy.scalp_rules import scalp_signal
+from src.bot.strategy.whale_rules import whale_rules
+
+from .fixtures import QuoteBroker, bar_dicts, trending_bars
+from .harness import SkipBenchmark, benchmark
+
+# ---- bar conversion ------------------------------------------------------------
+
+for _n in (60, 390):
+
+    @benchmark(f"to_df/scheduler/{_n}")
+    def _scheduler_to_df(n=_n):
+        bars = bar_dicts(n)
+        return lambda: scheduler._to_df(bars)
+
+    @benchmark(f"to_df/market/{_n}")
+    def _market_to_df(n=_n):
+        bars = bar_dicts(n)
+        return lambda: market._to_df(bars)
+
+
+class _StubIB:
+    """The slice of ``ib_insync.IB`` that ``IBKRBroker.historical_prices`` touches."""
+
+    RequestTimeout = 0.0
+
+    def __init__(self, bars):
+        self._bars = bars
+
+    def isConnected(self):
+        return True
+
+    def managedAccounts(self):
+        return ["DU0000001"]
+
+    def qualifyContracts(self, contract):
+        contract.conId = 756733
+        return [contract]
+
+    def sleep(self, _seconds):
+        return None
+
+    def reqHistoricalData(self, *_args, **_kwargs):
+        return self._bars
+
+
+@benchmark("historical_prices/ibkr/390")
+def _ibkr_historical_prices():
+    try:
+        from ib_insync import BarData
+
+        from src.bot.broker.ibkr import IBKRBroker
+    except ImportError as e:
+        raise SkipBenchmark(str(e)) from e
+    df = trending_bars(390)
+    bars = [
+        BarData(
+            date=ts.to_pydatetime(),
+            open=o,
+            high=h,
+            low=lo,
+            close=c,
+            volume=v,
+            average=c,
+            barCount=1,
+        )
+        for ts, o, h, lo, c, v in zip(
+            df.index, df["open"], df["high"], df["low"], df["close"], df["volume"]
+        )
+    ]
+    broker = IBKRBroker(port=1, client_id=1)
+    broker.ib = _StubIB(bars)
+    return lambda: broker.historical_prices("SPY", duration="1 D", bar_size="1 min")
+
+
+# ---- strategies ------------------------------------------------------------------
+
+
+@benchmark("strategy/daily_volume")
+def _daily_volume():
+    df = trending_bars(STRATEGIES["daily_volume"].window + 49, freq="60min")
+    return lambda: daily_volume_rules(df, "SPY")
+
+
+@benchmark("strategy/whale")
+def _whale():
+    df = trending_bars(120, freq="60min")
+    reset = STRATEGIES["whale"].reset
+
+    def call():
+        reset("SPY")  # debounce would otherwise short-circuit every call after a signal
+        return whale_rules(df, "SPY")
+
+    return call
+
+
+@benchmark("strategy/scalp")
+def _scalp():
+    df = trending_bars(200)
+    return lambda: scalp_signal(df)
+
+
+@benchmark("strategy/geo")
+def _geo():
+    return lambda: geo_rules("SPY", 21.5)
+
+
+# ---- option selection and sizing -------------------------------------------------
+
+
+@benchmark("options/pick_weekly")
+def _pick_weekly():
+    broker = QuoteBroker()
+    return lambda: pick_weekly_option(
+        broker, "SPY", "C", broker.spot, strike_count=3, max_spread_pct=5.0
+    )
+
+
+@benchmark("options/pick_weekly_greeks")
+def _pick_weekly_greeks():
+    broker = QuoteBroker()
+    return lambda: pick_weekly_option(
+        broker,
+        "SPY",
+        "C",
+        broker.spot,
+        strike_count=7,
+        max_spread_pct=5.0,
+        delta_range=(0.3, 0.7),
+        max_iv=1.0,
+    )
+
+
+@benchmark("risk/position_size")
+def _position_size():
+    return lambda: position_size(100_000.0, 0.01, 0.5, 2.35)
+
+
+# ---- journal -------------------------------------------------------------------
+
+
+@benchmark("journal/log_trade")
+def _log_trade():
+    # Files under a temp dir; the journal module paths are swapped per call
+    tmp = Path(tempfile.mkdtemp(prefix="bench-journal-"))
+    paths = (tmp / "trades.csv", tmp / "trades.jsonl")
+    trade = {
+        "timestamp": "2024-01-02T15:30:00+00:00",
+        "symbol": "SPY",
+        "action": "BUY",
+        "quantity": 3,
+        "price": 2.35,
+        "stop": 1.18,
+        "target": 3.06,
+        "contract": "SPY",
+        "fill_price": 2.36,
+        "slippage": 0.01,
+    }
+
+    def call():
+        saved = (journal.TRADES_CSV, journal.TRADES_JSONL)
+        journal.TRADES_CSV, journal.TRADES_JSONL = paths
+        try:
+            journal.log_trade(trade)
+        finally:
+            journal.TRADES_CSV, journal.TRADES_JSONL = saved
+
+    return call
@@ -0,0 +1,87 @@
+"""Seeded synthetic inputs shared by the benchmarks (same seed, same numbers)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from src.bot.backtest import SimOptionContract, SimpleOptionPricer
+from src.bot.broker.base import Quote, contract_key
+from src.bot.trading_calendar import NY_TZ
+
+SEED = 20240102
+
+
+def trending_bars(
+    n: int, start: str = "2024-01-02 14:30", freq: str = "1min", seed: int = SEED
+) -> pd.DataFrame:
+    """OHLCV frame with a steady up-drift and flat volume.
+
+    The drift keeps the close above its 10-bar mean by more than the
+    daily-volume momentum filter, so ``daily_volume_rules`` signals and a
+    cycle runs the whole entry path (chain, quotes, sizing, order).
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(0.0008 + rng.normal(0.0, 0.0002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.0004,
+            "low": np.minimum(open_, close) * 0.9996,
+            "close": close,
+            "volume": rng.normal(10_000.0, 300.0, n).round(),
+        },
+        index=pd.date_range(start, periods=n, freq=freq, tz="UTC"),
+    )
+
+
+def bar_dicts(n: int) -> List[Dict[str, Any]]:
+    """Bars as the list of dicts ``_to_df`` receives."""
+    df = trending_bars(n)
+    return [
+        {"date": ts, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+        for ts, o, h, lo, c, v in zip(
+            df.index, df["open"], df["high"], df["low"], df["close"], df["volume"]
+        )
+    ]
+
+
+class QuoteBroker:
+    """Option chain plus precomputed quotes: no pricing cost inside the timed call."""
+
+    def __init__(
+        self, symbol: str = "SPY", spot: float = 100.0, strikes_each_side: int = 20
+    ):
+        # Expiry a week out from today, so the Greeks filter sees live contracts
+        today = datetime.now(NY_TZ)
+        friday = (today + timedelta(days=7 + (4 - today.weekday()) % 7)).strftime(
+            "%Y%m%d"
+        )
+        pricer = SimpleOptionPricer(volatility=0.2)
+        self.spot = spot
+        self.contracts = []
+        self.quotes: Dict[str, Quote] = {}
+        for k in range(-strikes_each_side, strikes_each_side + 1):
+            strike = float(round(spot) + k)
+            for right in ("C", "P"):
+                c = SimOptionContract(symbol, right, strike, friday, 100)
+                mid = pricer(spot, strike, right, 7.0 / 365.0)
+                half = max(0.01, mid * 0.02)
+                self.contracts.append(c)
+                self.quotes[contract_key(c)] = Quote(
+                    symbol, mid, round(mid - half, 2), round(mid + half, 2), 5000, 0.0
+                )
+
+    def option_chain(self, symbol: str, expiry_hint: str = "weekly"):
+        return list(self.contracts)
+
+    def market_data(self, contract):
+        if isinstance(contract, str):
+            return Quote(
+                contract, self.spot, self.spot - 0.01, self.spot + 0.01, 1_000_000, 0.0
+            )
+        return self.quotes[contract_key(contract)]
@@ -0,0 +1,252 @@
+"""Benchmark registry, timer and JSON result files.
+
+A benchmark is a *setup* function registered with ``@benchmark``: it builds
+its inputs (excluded from timing) and returns the zero-argument callable to
+time. Timing follows ``timeit``: the loop count is calibrated so one round
+takes at least ``min_time`` seconds, garbage collection is off while timing,
+and the per-call statistics of several rounds are reported.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class SkipBenchmark(Exception):
+    """Raised by a setup function when an optional dependency is missing."""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], Any]]
+    quick: bool = True  # included in ``--quick`` runs
+
+
+@dataclass
+class Timing:
+    name: str
+    group: str
+    rounds: int
+    number: int  # calls per round
+    min_s: float
+    median_s: float
+    mean_s: float
+    stdev_s: float
+
+    @property
+    def ops_per_s(self) -> float:
+        return 1.0 / self.median_s if self.median_s > 0 else float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["ops_per_s"] = round(self.ops_per_s, 3)
+        return out
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, group: str = "micro", quick: bool = True):
+    """Register a setup function under ``name`` (must be unique)."""
+
+    def register(setup: Callable[[], Callable[[], Any]]):
+        if name in BENCHMARKS:
+            raise ValueError(f"duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, group, setup, quick)
+        return setup
+
+    return register
+
+
+def measure(
+    fn: Callable[[], Any], rounds: int = 7, min_time: float = 0.05, warmup: int = 1
+) -> Tuple[int, List[float]]:
+    """Per-call seconds of ``rounds`` rounds; returns (calls per round, timings)."""
+    for _ in range(warmup):
+        fn()
+    # Calibrate: grow the loop until one round lasts min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return number, times
+
+
+def run(
+    pattern: str = "*",
+    quick: bool = False,
+    rounds: int = 7,
+    min_time: float = 0.05,
+    report: Optional[Callable[[Timing], None]] = None,
+) -> Tuple[List[Timing], List[str]]:
+    """Run every registered benchmark matching the glob ``pattern``.
+
+    Returns:
+        (timings, names of skipped benchmarks)
+    """
+    timings: List[Timing] = []
+    skipped: List[str] = []
+    for bench in sorted(BENCHMARKS.values(), key=lambda b: (b.group, b.name)):
+        if not fnmatch.fnmatch(bench.name, pattern) or (quick and not bench.quick):
+            continue
+        try:
+            fn = bench.setup()
+        except SkipBenchmark:
+            skipped.append(bench.name)
+            continue
+        number, times = measure(fn, rounds=rounds, min_time=min_time)
+        timing = Timing(
+            name=bench.name,
+            group=bench.group,
+            rounds=rounds,
+            number=number,
+            min_s=min(times),
+            median_s=statistics.median(times),
+            mean_s=statistics.fmean(times),
+            stdev_s=statistics.stdev(times) if len(times) > 1 else 0.0,
+        )
+        timings.append(timing)
+        if report:
+            report(timing)
+    return timings, skipped
+
+
+def _git(*args: str) -> str:
+    try:
+        out = subprocess.run(
+            ["git", *args],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            cwd=Path(__file__).resolve().parent,
+        )
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment() -> Dict[str, Any]:
+    """Machine and code version the numbers were taken on."""
+    import numpy as np
+    import pandas as pd  # type: ignore
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "argv": sys.argv[1:],
+    }
+
+
+def save(
+    timings: List[Timing],
+    path: Optional[Path] = None,
+    skipped: Optional[List[str]] = None,
+) -> Path:
+    """Write results JSON; the default path is ``results/<commit>[-dirty].json``."""
+    env = environment()
+    if path is None:
+        stem = (env["commit"] or "unknown") + ("-dirty" if env["dirty"] else "")
+        path = RESULTS_DIR / f"{stem}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "environment": env,
+        "results": {t.name: t.to_dict() for t in timings},
+        "skipped": skipped or [],
+    }
+    path.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def load(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+@dataclass
+class Change:
+    name: str
+    base_s: float
+    new_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.new_s / self.base_s if self.base_s > 0 else float("inf")
+
+
+def compare(
+    base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10
+) -> Dict[str, List[Change]]:
+    """Median per-call times of two result files, split by ``threshold`` (0.10 = 10%).
+
+    Returns:
+        {"regressions": [...], "improvements": [...], "unchanged": [...],
+        "missing": [...]} - ``missing`` holds benchmarks only in ``base``.
+    """
+    out: Dict[str, List[Change]] = {
+        "regressions": [],
+        "improvements": [],
+        "unchanged": [],
+        "missing": [],
+    }
+    base_results, new_results = base.get("results", {}), new.get("results", {})
+    for name in sorted(base_results):
+        b = base_results[name]["median_s"]
+        if name not in new_results:
+            out["missing"].append(Change(name, b, float("nan")))
+            continue
+        change = Change(name, b, new_results[name]["median_s"])
+        if change.ratio > 1.0 + threshold:
+            out["regressions"].append(change)
+        elif change.ratio < 1.0 / (1.0 + threshold):
+            out["improvements"].append(change)
+        else:
+            out["unchanged"].append(change)
+    return out
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
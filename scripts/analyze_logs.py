@@ -3,18 +3,27 @@
 Usage:
     python scripts/analyze_logs.py --bot-log logs/bot_20260107_120000.log
     python scripts/analyze_logs.py --jsonl logs/bot.jsonl
+    python scripts/analyze_logs.py --jsonl logs/   # all rotated/compressed bot.jsonl files
+
+JSONL logs are handled by src/bot/log_analytics.py (streaming, parallel, cached).
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import re
-from collections import Counter, defaultdict
-from datetime import datetime
+import sys
+from collections import Counter
 from pathlib import Path
 
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.bot.log_analytics import analyze, format_report, summary  # noqa: E402
+
+
 def parse_text_log(log_path: Path) -> dict:
     """Parse text log file and extract statistics."""
     stats = {
@@ -71,63 +80,10 @@ def parse_text_log(log_path: Path) -> dict:
     return stats
 
 
-def parse_jsonl_log(log_path: Path) -> dict:
-    """Parse JSONL log file and extract statistics."""
-    stats = {
-        "total_lines": 0,
-        "by_level": Counter(),
-        "by_event": Counter(),
-        "signals": Counter(),
-        "symbols_processed": Counter(),
-        "errors": [],
-        "warnings": [],
-        "timestamps": {"first": None, "last": None},
-    }
-
-    with log_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            stats["total_lines"] += 1
-            try:
-                entry = json.loads(line)
-                level = entry.get("level", "UNKNOWN")
-                stats["by_level"][level] += 1
-
-                # Event type
-                if "event" in entry:
-                    stats["by_event"][entry["event"]] += 1
-
-                # Timestamps
-                if "timestamp" in entry:
-                    ts = entry["timestamp"]
-                    if not stats["timestamps"]["first"]:
-                        stats["timestamps"]["first"] = ts
-                    stats["timestamps"]["last"] = ts
-
-                # Signals
-                if "signal" in entry:
-                    stats["signals"][entry["signal"]] += 1
-
-                # Symbols
-                if "symbol" in entry:
-                    stats["symbols_processed"][entry["symbol"]] += 1
-
-                # Errors/warnings
-                if level == "ERROR":
-                    stats["errors"].append(entry.get("message", ""))
-                elif level == "WARNING":
-                    stats["warnings"].append(entry.get("message", ""))
-            except json.JSONDecodeError:
-                pass
-
-    return stats
-
-
 def main():
     parser = argparse.ArgumentParser(description="Analyze bot logs from extended dry-run")
     parser.add_argument("--bot-log", type=Path, help="Text log file from bot")
-    parser.add_argument("--jsonl", type=Path, help="JSONL log file from bot")
+    parser.add_argument("--jsonl", type=Path, help="JSONL log file or log directory from bot")
     parser.add_argument("--output", type=Path, help="Output summary file (default: stdout)")
     args = parser.parse_args()
 
@@ -145,7 +101,12 @@ def main():
         if not args.jsonl.exists():
             print(f"ERROR: {args.jsonl} not found")
             return
-        stats = parse_jsonl_log(args.jsonl)
+        output = format_report(summary(analyze([args.jsonl])))
+        print(output)
+        if args.output:
+            args.output.write_text(output)
+            print(f"\nReport saved to: {args.output}")
+        return
 
     # Generate report
     report = []
@@ -184,13 +145,6 @@ def main():
             report.append(f"  {sym}: {count} times")
         report.append("")
 
-    # Events (JSONL only)
-    if stats.get("by_event"):
-        report.append("Events:")
-        for evt, count in sorted(stats["by_event"].items(), key=lambda x: -x[1]):
-            report.append(f"  {evt}: {count}")
-        report.append("")
-
     # Errors
     if stats["errors"]:
         report.append(f"Errors ({len(stats['errors'])} total):")
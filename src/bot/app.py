@@ -1,21 +1,56 @@
-import os
-import signal
-import sys
-import threading
+import time
 
-from . import log as _log
+# Taken before the imports below so the startup timer covers them
+_IMPORT_STARTED = time.perf_counter()
 
-# Initialize logging sinks (file + JSON) via side-effect import
-# Ensures logs/bot.log and logs/bot.jsonl are created for long runs
-from . import logging_conf as _logging_conf  # noqa: F401
+import argparse  # noqa: E402
+import importlib  # noqa: E402
+import os  # noqa: E402
+import signal  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+from . import log as _log  # noqa: E402
+
+# Logging sinks (logs/bot.log, logs/bot.jsonl) are installed by main() once settings are loaded
+from . import logging_conf as _logging_conf  # noqa: E402
+from .settings import LoggingSettings, get_settings  # noqa: E402
+from .startup_profile import StartupTimer  # noqa: E402
 
 logger = _log.logger
-from .settings import get_settings
 
 
-def main():
-    logger.info("Starting ibkr-options-bot")
+def _preimport(module: str) -> None:
+    # Failures surface again at the real import in main()
+    try:
+        importlib.import_module(module, __package__)
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ibkr-options-bot")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print import times of the startup modules (python -X importtime) and exit",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Rows per table in --profile-startup"
+    )
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        from .startup_profile import format_report, profile_imports
+
+        print(format_report(profile_imports(), top=args.top))
+        return
+
+    timer = StartupTimer(started=_IMPORT_STARTED)
+    timer.mark("app_imports")
     settings = get_settings()
+    _logging_conf.configure(settings.logging)
+    timer.mark("settings")
+    logger.info("Starting ibkr-options-bot")
 
     # Startup validation for safe deployment
     logger.info("Validating configuration...")
@@ -46,12 +81,23 @@ def main():
             alert_channels.append("Slack")
         if mon.telegram_bot_token:
             alert_channels.append("Telegram")
-        logger.info(f"✓ Alerts enabled: {', '.join(alert_channels) or 'none configured'}")
+        logger.info(
+            f"✓ Alerts enabled: {', '.join(alert_channels) or 'none configured'}"
+        )
     else:
         logger.info("ℹ Alerts disabled")
 
     logger.info("Configuration validation complete")
 
+    if mon.metrics_port is not None:
+        from .metrics import start_http_server
+
+        try:
+            start_http_server(mon.metrics_port, host=mon.metrics_host)
+        except OSError as metrics_err:
+            # Monitoring must never stop the bot from trading
+            logger.warning(f"Metrics endpoint not started: {metrics_err}")
+
     # Setup signal handlers for graceful shutdown (with optional ignore)
     shutdown_event = threading.Event()
     ignore_signals = os.getenv("BOT_IGNORE_SIGNALS", "").lower() in {"1", "true", "yes"}
@@ -60,16 +106,22 @@ def main():
     def handle_shutdown(signum, frame):
         nonlocal connecting
         try:
-            sig_name = signal.Signals(signum).name  # richer logging to diagnose unexpected signals
+            sig_name = signal.Signals(
+                signum
+            ).name  # richer logging to diagnose unexpected signals
         except Exception:
             sig_name = str(signum)
 
         if connecting:
-            logger.warning(f"Shutdown signal received during connection phase, deferring: {signum} ({sig_name})")
+            logger.warning(
+                f"Shutdown signal received during connection phase, deferring: {signum} ({sig_name})"
+            )
             return
 
         if ignore_signals:
-            logger.warning(f"Shutdown signal received but ignored due to BOT_IGNORE_SIGNALS: {signum} ({sig_name})")
+            logger.warning(
+                f"Shutdown signal received but ignored due to BOT_IGNORE_SIGNALS: {signum} ({sig_name})"
+            )
             return
 
         logger.info(f"Shutdown signal received: {signum} ({sig_name})")
@@ -82,15 +134,32 @@ def main():
     if settings.risk.reset_daily_guard_on_start:
         logger.info("Auto-resetting daily loss guard (reset_daily_guard_on_start=True)")
         from .risk import reset_daily_loss_guard
+
         try:
             reset_daily_loss_guard()
             logger.info("✓ Daily loss guard cleared for today")
         except Exception as reset_err:  # pylint: disable=broad-except
             logger.warning(f"Failed to reset daily loss guard: {reset_err}")
 
+    if settings.sharding.shards > 1:
+        # Coordinator only: workers own the Gateway connections and the scheduler
+        from .sharding import run_sharded
+
+        connecting = False
+        timer.log()
+        run_sharded(settings, shutdown_event)
+        return
+
     # lazy import to avoid heavy deps at module import time
     from .broker.ibkr import IBKRBroker
-    from .scheduler import run_scheduler
+
+    timer.mark("broker_import")
+    # The scheduler pulls in pandas and the strategy modules; import it while the
+    # Gateway handshake is in flight instead of after it
+    preimport = threading.Thread(
+        target=_preimport, args=(".scheduler",), name="preimport", daemon=True
+    )
+    preimport.start()
 
     broker = IBKRBroker(
         host=settings.broker.host,
@@ -100,7 +169,9 @@ def main():
     )
 
     # Connect to Gateway before entering scheduler loop
-    logger.info(f"Connecting to Gateway at {settings.broker.host}:{settings.broker.port}...")
+    logger.info(
+        f"Connecting to Gateway at {settings.broker.host}:{settings.broker.port}..."
+    )
     try:
         broker.connect()
         connecting = False  # Signal handler can now respond to shutdown signals
@@ -109,10 +180,42 @@ def main():
         connecting = False
         logger.error(f"Failed to connect to Gateway: {conn_err}")
         return
+    timer.mark("connect")
+
+    preimport.join()
+    from .scheduler import run_scheduler
+    from .settings_watcher import (
+        EVENT_ENGINE_PINNED,
+        RESTART_ONLY,
+        SettingsSnapshot,
+        SettingsWatcher,
+    )
+
+    timer.mark("scheduler_import")  # only the part not hidden behind connect
+    timer.log()
+
+    # Immutable snapshot of the validated settings; edits to settings.yaml are
+    # swapped in between cycles without touching the Gateway connection
+    snapshot = SettingsSnapshot.from_settings(settings)
+    watcher = None
+    if settings.schedule.reload_check_seconds > 0:
+        watcher = SettingsWatcher(
+            "configs/settings.yaml",
+            snapshot,
+            pinned=(
+                EVENT_ENGINE_PINNED
+                if settings.schedule.engine == "event"
+                else RESTART_ONLY
+            ),
+        )
+        watcher.add_listener(
+            lambda snap: _logging_conf.configure(
+                LoggingSettings(**snap.to_dict()["logging"])
+            )
+        )
 
     try:
-        # Pass dict-like view for now; scheduler will accept either object or dict
-        run_scheduler(broker, settings.model_dump(), stop_event=shutdown_event)
+        run_scheduler(broker, snapshot, stop_event=shutdown_event, watcher=watcher)
     except KeyboardInterrupt:
         logger.info("Shutting down due to KeyboardInterrupt")
     finally:
@@ -0,0 +1,72 @@
+"""Offline backtesting: replay stored bars through the live strategy code."""
+
+from .data import load_bar_archive, load_bar_files, load_bars_csv, normalize_bars
+from .engine import BacktestConfig, BacktestResult, Trade, run_backtest
+from .gateway import FakeGateway, GatewayScript
+from .premium import (
+    BlackScholesPremiumModel,
+    DeltaPremiumModel,
+    IVSurface,
+    PremiumModel,
+    SpreadModel,
+)
+from .robustness import (
+    WalkForwardResult,
+    bootstrap_bars,
+    bootstrap_trades,
+    walk_forward,
+)
+from .sim_broker import (
+    FillModel,
+    LatencyModel,
+    OptionPricer,
+    ReplayResult,
+    SimBroker,
+    SimClock,
+    SimFill,
+    SimOptionContract,
+    SimpleOptionPricer,
+    run_replay,
+)
+from .strategies import STRATEGIES, STRATEGY_PARAMS, StrategySpec, strategy_params
+from .sweep import IntRange, SharedBars, Uniform, run_sweep
+
+__all__ = [
+    "BacktestConfig",
+    "BacktestResult",
+    "BlackScholesPremiumModel",
+    "DeltaPremiumModel",
+    "FakeGateway",
+    "FillModel",
+    "GatewayScript",
+    "IVSurface",
+    "IntRange",
+    "LatencyModel",
+    "OptionPricer",
+    "PremiumModel",
+    "ReplayResult",
+    "STRATEGIES",
+    "STRATEGY_PARAMS",
+    "SharedBars",
+    "SimBroker",
+    "SimClock",
+    "SimFill",
+    "SimOptionContract",
+    "SimpleOptionPricer",
+    "SpreadModel",
+    "StrategySpec",
+    "Trade",
+    "Uniform",
+    "WalkForwardResult",
+    "bootstrap_bars",
+    "bootstrap_trades",
+    "load_bar_archive",
+    "load_bar_files",
+    "load_bars_csv",
+    "normalize_bars",
+    "run_backtest",
+    "run_replay",
+    "run_sweep",
+    "strategy_params",
+    "walk_forward",
+]
@@ -0,0 +1,87 @@
+"""CLI: python -m src.bot.backtest bars/SPY.csv bars/QQQ.csv [--strategy whale]
+
+or, from the live bot's bar archive:
+python -m src.bot.backtest --archive data/bars --symbols SPY QQQ --bar-size "5 mins"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from ..settings import get_settings
+from .data import load_bar_archive, load_bar_files
+from .engine import BacktestConfig, run_backtest
+from .premium import BlackScholesPremiumModel, DeltaPremiumModel, IVSurface
+from .strategies import STRATEGIES
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay stored bars through the live strategy"
+    )
+    parser.add_argument(
+        "files", nargs="*", help="CSV files, one per symbol (file stem = symbol)"
+    )
+    parser.add_argument(
+        "--archive", help="Read bars from this bar archive instead of CSV files"
+    )
+    parser.add_argument(
+        "--symbols", nargs="+", default=[], help="Symbols to read with --archive"
+    )
+    parser.add_argument(
+        "--bar-size", default="1 min", help="Archived bar size, e.g. '5 mins'"
+    )
+    parser.add_argument("--start", help="First bar time for --archive (ISO, UTC)")
+    parser.add_argument("--end", help="Last bar time for --archive (ISO, UTC)")
+    parser.add_argument(
+        "--strategy", default="daily_volume", choices=sorted(STRATEGIES)
+    )
+    parser.add_argument("--equity", type=float, default=100_000.0)
+    parser.add_argument("--max-hold-bars", type=int, default=None)
+    parser.add_argument("--trades-out", help="Write the trade list to this CSV")
+    parser.add_argument(
+        "--premium",
+        default="delta",
+        choices=["delta", "bs"],
+        help="Option premium model: first-order delta, or synthetic Black-Scholes quotes",
+    )
+    parser.add_argument(
+        "--iv", type=float, default=0.20, help="ATM implied vol for --premium bs"
+    )
+    parser.add_argument(
+        "--dte", type=int, default=0, help="Days to expiry for --premium bs"
+    )
+    args = parser.parse_args(argv)
+    if bool(args.files) == bool(args.archive):
+        parser.error("pass either CSV files or --archive with --symbols")
+
+    if args.archive:
+        bars = load_bar_archive(
+            args.archive, args.symbols, args.bar_size, args.start, args.end
+        )
+    else:
+        bars = load_bar_files(args.files)
+    cfg = BacktestConfig.from_settings(
+        get_settings().model_dump(),
+        strategy=args.strategy,
+        initial_equity=args.equity,
+        max_hold_bars=args.max_hold_bars,
+        premium_model=(
+            BlackScholesPremiumModel(surface=IVSurface(atm_vol=args.iv), dte=args.dte)
+            if args.premium == "bs"
+            else DeltaPremiumModel()
+        ),
+    )
+    start = time.perf_counter()
+    result = run_backtest(bars, cfg)
+    stats = result.stats()
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    print(json.dumps(stats, indent=2))
+    if args.trades_out:
+        result.trades_frame().to_csv(args.trades_out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Loading stored OHLCV bars for backtests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import pandas as pd  # type: ignore
+
+REQUIRED_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with a UTC DatetimeIndex, lower-case OHLCV columns, sorted and de-duplicated.
+
+    Raises:
+        ValueError: If a required column is missing.
+    """
+    out = df.rename(columns=str.lower)
+    if not isinstance(out.index, pd.DatetimeIndex):
+        for col in ("timestamp", "date", "datetime", "time"):
+            if col in out.columns:
+                out = out.set_index(col)
+                break
+    out.index = pd.to_datetime(out.index, utc=True)
+    missing = [c for c in REQUIRED_COLUMNS if c not in out.columns]
+    if missing:
+        raise ValueError(f"bars missing columns: {missing}")
+    out = out[list(REQUIRED_COLUMNS)].astype(float)
+    out = out[~out.index.duplicated(keep="last")].sort_index()
+    return out
+
+
+def load_bars_csv(path: Union[str, Path]) -> pd.DataFrame:
+    """Read one symbol's bars from CSV (timestamp column + OHLCV)."""
+    return normalize_bars(pd.read_csv(path))
+
+
+def load_bar_files(paths: Iterable[Union[str, Path]]) -> Dict[str, pd.DataFrame]:
+    """Load several CSV files keyed by symbol (the file stem, e.g. ``SPY.csv``)."""
+    return {Path(p).stem.upper(): load_bars_csv(p) for p in paths}
+
+
+def load_bar_archive(
+    root: Union[str, Path],
+    symbols: Iterable[str],
+    bar_size: str,
+    start: Optional[Any] = None,
+    end: Optional[Any] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Load bars the live bot archived (``historical.archive_dir``), keyed by symbol.
+
+    Symbols with no archived bars in the range are left out.
+    """
+    from ..data.archive import BarArchive
+
+    archive = BarArchive(root)
+    out = {}
+    for sym in symbols:
+        df = archive.read(sym, bar_size, start, end)
+        if len(df):
+            out[sym.upper()] = normalize_bars(df)
+    return out
@@ -0,0 +1,300 @@
+"""Bar-replay backtest engine.
+
+Replays OHLCV bars for one or more symbols in timestamp order through the live
+strategy functions (see ``strategies.STRATEGIES``) and the live sizing/bracket
+helpers (``risk.position_size``, ``execution.build_bracket``). Mirroring the
+scheduler:
+
+- signals are evaluated on closed bars only, and only while flat;
+- an entry fills at the next bar's open, sized on current equity;
+- TP/SL brackets are checked bar by bar from the option premium implied at
+  the bar's open/high/low (gaps fill at the open, stops win same-bar ties).
+
+Option prices come from a pluggable premium model (``premium.PremiumModel``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from ..execution import build_bracket
+from ..risk import position_size
+from .premium import DeltaPremiumModel, PremiumModel
+from .strategies import STRATEGIES, StrategySpec, signal_direction
+
+logger = _log.logger
+
+CONTRACT_MULTIPLIER = 100
+
+
+@dataclass
+class BacktestConfig:
+    strategy: str = "daily_volume"
+    initial_equity: float = 100_000.0
+    max_risk_pct: float = 0.01
+    take_profit_pct: Optional[float] = None
+    stop_loss_pct: float = 0.20
+    commission_per_contract: float = 0.65
+    max_hold_bars: Optional[int] = None
+    premium_model: PremiumModel = field(default_factory=DeltaPremiumModel)
+    trade_start: Optional[float] = None  # epoch; earlier bars only warm up indicators
+
+    @classmethod
+    def from_settings(
+        cls, settings: Dict[str, Any], **overrides: Any
+    ) -> "BacktestConfig":
+        """Build from the bot's settings dict (risk block), with explicit overrides."""
+        risk = settings.get("risk", {})
+        kwargs: Dict[str, Any] = {
+            "max_risk_pct": risk.get("max_risk_pct_per_trade", 0.01),
+            "take_profit_pct": risk.get("take_profit_pct"),
+            "stop_loss_pct": risk.get("stop_loss_pct", 0.20),
+        }
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+
+@dataclass
+class Trade:
+    symbol: str
+    right: str
+    quantity: int
+    entry_ts: float
+    entry_underlying: float
+    entry_premium: float
+    exit_ts: float = 0.0
+    exit_underlying: float = 0.0
+    exit_premium: float = 0.0
+    exit_reason: str = ""
+    pnl: float = 0.0  # net of commissions
+    bars_held: int = 0
+
+
+@dataclass
+class BacktestResult:
+    trades: List[Trade]
+    equity: pd.Series
+    initial_equity: float
+    signals_evaluated: int = 0
+
+    def trades_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(t) for t in self.trades])
+
+    def stats(self) -> Dict[str, float]:
+        pnls = np.array([t.pnl for t in self.trades], dtype=float)
+        eq = self.equity.to_numpy(dtype=float)
+        if not len(eq):
+            eq = np.array([self.initial_equity])
+        peak = np.maximum.accumulate(eq)
+        drawdown = (eq - peak) / np.where(peak == 0, 1.0, peak)
+        gains = pnls[pnls > 0].sum()
+        losses = -pnls[pnls < 0].sum()
+        return {
+            "trades": int(len(pnls)),
+            "total_return": float(eq[-1] / self.initial_equity - 1.0),
+            "max_drawdown": float(-drawdown.min()) if len(drawdown) else 0.0,
+            "win_rate": float((pnls > 0).mean()) if len(pnls) else 0.0,
+            "profit_factor": (
+                float(gains / losses)
+                if losses > 0
+                else (float("inf") if gains > 0 else 0.0)
+            ),
+            "net_pnl": float(pnls.sum()),
+        }
+
+
+def _epoch_seconds(index: pd.Index) -> np.ndarray:
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("ns").asi8 / 1e9
+
+
+class _SymbolBook:
+    """Per-symbol arrays, signal candidates and open-position state."""
+
+    def __init__(self, symbol: str, df: pd.DataFrame, spec: StrategySpec):
+        df = df.sort_index()
+        self.symbol = symbol
+        self.df = df
+        self.ts = _epoch_seconds(df.index)
+        self.open = df["open"].to_numpy(dtype=float)
+        self.high = df["high"].to_numpy(dtype=float)
+        self.low = df["low"].to_numpy(dtype=float)
+        self.close = df["close"].to_numpy(dtype=float)
+        self.candidates = (
+            spec.prefilter(df)
+            if spec.prefilter is not None
+            else np.ones(len(df), dtype=bool)
+        )
+        self.pending_right: Optional[str] = None
+        self.position: Optional[Trade] = None
+        self.take_profit: Optional[float] = None
+        self.stop_loss: Optional[float] = None
+        self.mark_value = 0.0
+        self.last_signal_ts = -np.inf
+
+
+def run_backtest(
+    bars: Dict[str, pd.DataFrame], config: Optional[BacktestConfig] = None
+) -> BacktestResult:
+    """Replay bars (symbol -> OHLCV DataFrame indexed by timestamp) through the strategy.
+
+    Returns:
+        BacktestResult with closed trades and the mark-to-market equity curve
+        (one point per distinct bar timestamp).
+    """
+    cfg = config or BacktestConfig()
+    spec = STRATEGIES[cfg.strategy]
+    model = cfg.premium_model
+    books = [_SymbolBook(sym, df, spec) for sym, df in bars.items() if len(df)]
+
+    # Merge all bars into one time-ordered event stream
+    if books:
+        ev_ts = np.concatenate([b.ts for b in books])
+        ev_book = np.concatenate([np.full(len(b.ts), k) for k, b in enumerate(books)])
+        ev_row = np.concatenate([np.arange(len(b.ts)) for b in books])
+        order = np.lexsort((ev_book, ev_ts))
+    else:
+        ev_ts = ev_book = ev_row = order = np.array([], dtype=int)
+
+    cash = float(cfg.initial_equity)
+    trades: List[Trade] = []
+    curve_ts: List[float] = []
+    curve_eq: List[float] = []
+    evaluated = 0
+
+    def _close(
+        book: _SymbolBook, ts: float, underlying: float, premium: float, reason: str
+    ) -> float:
+        """Record the exit and return the cash it releases."""
+        pos = book.position
+        assert pos is not None
+        pos.exit_ts, pos.exit_underlying = ts, underlying
+        pos.exit_premium, pos.exit_reason = premium, reason
+        proceeds = premium * CONTRACT_MULTIPLIER * pos.quantity
+        fees = cfg.commission_per_contract * pos.quantity * 2
+        pos.pnl = (
+            proceeds - pos.entry_premium * CONTRACT_MULTIPLIER * pos.quantity - fees
+        )
+        trades.append(pos)
+        book.position = None
+        book.mark_value = 0.0
+        return proceeds - cfg.commission_per_contract * pos.quantity
+
+    for e in order:
+        book = books[ev_book[e]]
+        i = int(ev_row[e])
+        t = float(ev_ts[e])
+
+        # 1) Entry signalled on the previous bar fills at this bar's open
+        if book.pending_right is not None:
+            right, book.pending_right = book.pending_right, None
+            premium = model.entry(book.open[i], right, t)
+            equity = cash + sum(b.mark_value for b in books)
+            qty = position_size(equity, cfg.max_risk_pct, cfg.stop_loss_pct, premium)
+            cost = (
+                premium * CONTRACT_MULTIPLIER * qty + cfg.commission_per_contract * qty
+            )
+            if qty > 0 and cost <= cash:
+                cash -= cost
+                bracket = build_bracket(premium, cfg.take_profit_pct, cfg.stop_loss_pct)
+                book.take_profit = bracket["take_profit"]
+                book.stop_loss = bracket["stop_loss"]
+                book.position = Trade(book.symbol, right, qty, t, book.open[i], premium)
+
+        # 2) Bracket exits, evaluated from the open through the bar's range
+        pos = book.position
+        if pos is not None:
+            pos.bars_held += 1
+
+            def _mark(underlying: float) -> float:
+                return model.mark(
+                    underlying,
+                    pos.right,
+                    t,
+                    pos.entry_underlying,
+                    pos.entry_premium,
+                    pos.entry_ts,
+                )
+
+            p_open = _mark(book.open[i])
+            up, down = _mark(book.high[i]), _mark(book.low[i])
+            best, worst = (up, down) if pos.right == "C" else (down, up)
+            tp, sl = book.take_profit, book.stop_loss
+            if sl is not None and p_open <= sl:
+                cash += _close(book, t, book.open[i], p_open, "stop_gap")
+            elif tp is not None and p_open >= tp:
+                cash += _close(book, t, book.open[i], p_open, "target_gap")
+            elif sl is not None and worst <= sl:
+                cash += _close(book, t, book.close[i], sl, "stop")
+            elif tp is not None and best >= tp:
+                cash += _close(book, t, book.close[i], tp, "target")
+            elif cfg.max_hold_bars is not None and pos.bars_held >= cfg.max_hold_bars:
+                cash += _close(book, t, book.close[i], _mark(book.close[i]), "max_hold")
+            else:
+                book.mark_value = (
+                    _mark(book.close[i]) * CONTRACT_MULTIPLIER * pos.quantity
+                )
+
+        # 3) Signal on this closed bar (flat only, and only if a next bar exists)
+        elif (
+            book.candidates[i]
+            and (cfg.trade_start is None or t >= cfg.trade_start)
+            and i + 1 < len(book.ts)
+            and t - book.last_signal_ts >= spec.debounce_seconds
+        ):
+            if spec.reset is not None:
+                spec.reset(book.symbol)
+            res = spec.fn(
+                book.df.iloc[max(0, i - spec.window + 1) : i + 1], book.symbol
+            )
+            evaluated += 1
+            right = signal_direction(res.get("signal", "HOLD"))
+            if right is not None:
+                book.pending_right = right
+                book.last_signal_ts = t
+
+        equity = cash + sum(b.mark_value for b in books)
+        if curve_ts and curve_ts[-1] == t:
+            curve_eq[-1] = equity
+        else:
+            curve_ts.append(t)
+            curve_eq.append(equity)
+
+    # Flatten anything still open at the last close
+    for book in books:
+        if book.position is not None:
+            pos = book.position
+            last = book.close[-1]
+            premium = model.mark(
+                last,
+                pos.right,
+                book.ts[-1],
+                pos.entry_underlying,
+                pos.entry_premium,
+                pos.entry_ts,
+            )
+            cash += _close(book, book.ts[-1], last, premium, "end_of_data")
+    if curve_eq:
+        curve_eq[-1] = cash
+
+    equity_curve = pd.Series(
+        curve_eq,
+        index=pd.to_datetime(np.array(curve_ts), unit="s", utc=True),
+        name="equity",
+    )
+    logger.bind(
+        event="backtest_complete",
+        strategy=cfg.strategy,
+        symbols=len(books),
+        bars=int(len(ev_ts)),
+        signals_evaluated=evaluated,
+        trades=len(trades),
+    ).info("Backtest complete: {} trades over {} bars", len(trades), len(ev_ts))
+    return BacktestResult(trades, equity_curve, cfg.initial_equity, evaluated)
@@ -0,0 +1,1219 @@
+"""Local stand-in for TWS / IB Gateway, for load and soak tests.
+
+``FakeGateway`` listens on localhost and speaks enough of the IB API socket
+protocol (4-byte length prefix, NUL-separated fields) for an unmodified
+``IBKRBroker`` / ``ib_insync.IB`` to connect and run its usual requests:
+
+- handshake and session start-up (next order id, managed accounts,
+  positions, open/completed orders, account updates, executions);
+- contract details, which is also how ``qualifyContracts`` resolves conIds;
+- historical bars, market data (snapshot or standing), option chain
+  parameters (``reqSecDefOptParams``) and the account summary;
+- orders: ``placeOrder`` answers with ``orderStatus`` and, for marketable
+  orders, ``execDetails`` plus ``commissionReport``; ``cancelOrder``.
+
+Underlying prices come from stored bars (symbol -> OHLCV frame, as for
+``SimBroker``) or a deterministic synthetic path; option quotes use an
+``OptionPricer`` around a fixed spread.
+
+Faults are scripted with ``GatewayScript``: per-request latency, pacing
+violations (error 162) on every Nth historical request or above a request
+rate, dropping the connection after N requests, oversized payloads, and
+client ids reported as already in use (error 326). ``FakeGateway.stats``
+counts requests, bytes and connections so throughput and recovery can be
+asserted in CI.
+
+Run standalone and point the bot at it::
+
+    python -m src.bot.backtest.gateway --port 4002 --latency 0.05 --pacing-every 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from ..trading_calendar import NY_TZ
+from .sim_broker import OptionPricer, SimpleOptionPricer
+
+logger = _log.logger
+
+MIN_SERVER_VERSION = 157
+SERVER_VERSION = 176  # newest version ib_insync 0.9.86 negotiates
+
+# Incoming (client -> gateway) message ids
+REQ_MKT_DATA = 1
+CANCEL_MKT_DATA = 2
+PLACE_ORDER = 3
+CANCEL_ORDER = 4
+REQ_OPEN_ORDERS = 5
+REQ_ACCT_DATA = 6
+REQ_EXECUTIONS = 7
+REQ_IDS = 8
+REQ_CONTRACT_DATA = 9
+REQ_ALL_OPEN_ORDERS = 16
+REQ_HISTORICAL_DATA = 20
+REQ_CURRENT_TIME = 49
+REQ_POSITIONS = 61
+REQ_ACCOUNT_SUMMARY = 62
+START_API = 71
+REQ_ACCOUNT_UPDATES_MULTI = 76
+REQ_SEC_DEF_OPT_PARAMS = 78
+REQ_COMPLETED_ORDERS = 99
+
+# Outgoing (gateway -> client) message ids
+TICK_PRICE = 1
+TICK_SIZE = 2
+ORDER_STATUS = 3
+ERR_MSG = 4
+ACCT_VALUE = 6
+NEXT_VALID_ID = 9
+CONTRACT_DATA = 10
+EXECUTION_DATA = 11
+MANAGED_ACCTS = 15
+HISTORICAL_DATA = 17
+CURRENT_TIME = 49
+CONTRACT_DATA_END = 52
+OPEN_ORDER_END = 53
+ACCT_DOWNLOAD_END = 54
+EXECUTION_DATA_END = 55
+TICK_SNAPSHOT_END = 57
+COMMISSION_REPORT = 59
+POSITION_DATA = 61
+POSITION_END = 62
+ACCOUNT_SUMMARY = 63
+ACCOUNT_SUMMARY_END = 64
+ACCOUNT_UPDATE_MULTI_END = 74
+SEC_DEF_OPT_PARAMETER = 75
+SEC_DEF_OPT_PARAMETER_END = 76
+COMPLETED_ORDERS_END = 102
+
+# Request kinds used for latency scripting and stats
+KINDS = {
+    REQ_MKT_DATA: "market_data",
+    PLACE_ORDER: "order",
+    CANCEL_ORDER: "order",
+    REQ_CONTRACT_DATA: "contract_details",
+    REQ_HISTORICAL_DATA: "historical",
+    REQ_SEC_DEF_OPT_PARAMS: "option_params",
+    REQ_ACCOUNT_SUMMARY: "account",
+}
+
+_BID, _ASK, _LAST, _VOLUME, _CLOSE = 1, 2, 4, 8, 9  # tick types
+_YEAR_SECONDS = 365.0 * 86400.0
+_CONTRACT_FIELDS = 12  # conId .. tradingClass, as ib_insync serializes a Contract
+
+
+@dataclass
+class GatewayScript:
+    """Scripted latency and faults.
+
+    ``latency`` maps a request kind ("historical", "market_data",
+    "contract_details", "option_params", "order", "account") to seconds of
+    delay before the answer; the "*" entry applies to every other kind.
+    """
+
+    latency: Mapping[str, float] = field(default_factory=dict)
+    jitter_seconds: float = 0.0  # uniform extra delay in [0, jitter]
+    pacing_every: int = 0  # answer every Nth historical request with error 162
+    pacing_limit: int = 0  # or: error 162 beyond this many historical requests ...
+    pacing_window_seconds: float = 600.0  # ... per rolling window (IB: 60 per 10 min)
+    disconnect_after: int = (
+        0  # drop each connection after it has sent this many requests
+    )
+    client_ids_in_use: Sequence[int] = ()  # refused at start-up with error 326
+    history_bars: int = 0  # fixed bar count per historical answer (large payloads)
+    max_history_bars: int = 200_000
+    chain_exchanges: int = (
+        1  # copies of each option chain, as IB lists one per exchange
+    )
+    padding: int = 0  # extra bytes appended to every contract's long name
+    fill_orders: bool = (
+        True  # marketable orders fill at the touch; False leaves all resting
+    )
+    seed: int = 0
+
+    def delay(self, kind: str, rng: random.Random) -> float:
+        base = float(self.latency.get(kind, self.latency.get("*", 0.0)))
+        return base + (
+            rng.uniform(0.0, self.jitter_seconds) if self.jitter_seconds > 0 else 0.0
+        )
+
+
+@dataclass
+class _Order:
+    order_id: int
+    client_id: int
+    perm_id: int
+    con_id: int
+    action: str
+    quantity: float
+    order_type: str
+    limit_price: float
+    aux_price: float
+    parent_id: int
+    transmit: bool
+    status: str = "PendingSubmit"
+    filled: float = 0.0
+
+
+def _format(fields: Sequence[Any]) -> bytes:
+    """Serialize one message: NUL-terminated fields behind a big-endian length."""
+    parts = []
+    for f in fields:
+        if f is None:
+            parts.append("")
+        elif isinstance(f, bool):
+            parts.append("1" if f else "0")
+        elif isinstance(f, float):
+            parts.append(repr(round(f, 8)) if math.isfinite(f) else "")
+        else:
+            parts.append(str(f))
+    body = ("\0".join(parts) + "\0").encode()
+    return struct.pack(">I", len(body)) + body
+
+
+def _float(value: str, default: float = 0.0) -> float:
+    try:
+        return float(value) if value not in ("", None) else default
+    except ValueError:
+        return default
+
+
+def _int(value: str, default: int = 0) -> int:
+    try:
+        return int(value) if value not in ("", None) else default
+    except ValueError:
+        return default
+
+
+def _expiry_ts(expiry: str) -> float:
+    d = datetime.strptime(expiry[:8], "%Y%m%d")
+    return datetime(d.year, d.month, d.day, 16, 0, tzinfo=NY_TZ).timestamp()
+
+
+class FakeGateway:
+    """IB API server on a background thread.
+
+    Args:
+        bars: Optional symbol -> OHLCV frame (UTC index). Historical requests
+            for these symbols return their tail; quotes use the last close.
+            Other symbols get a deterministic synthetic path around 100.
+        script: Latency and fault script (``GatewayScript``).
+        host: Interface to listen on.
+        port: TCP port; 0 picks a free one (see ``port`` after ``start``).
+        account: Managed account code reported to clients.
+        pricer: Option mid pricer (default ``SimpleOptionPricer``).
+        spread_pct: Option bid/ask spread as a fraction of the mid.
+        strike_step: Strike spacing of the synthetic chains.
+        strikes_each_side: Strikes listed either side of the money.
+        expiries: Number of weekly expiries listed.
+        commission_per_contract: Commission reported per filled unit.
+        equity: Starting net liquidation value.
+    """
+
+    def __init__(
+        self,
+        bars: Optional[Dict[str, pd.DataFrame]] = None,
+        script: Optional[GatewayScript] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        account: str = "DU0000001",
+        pricer: Optional[OptionPricer] = None,
+        spread_pct: float = 0.04,
+        strike_step: float = 1.0,
+        strikes_each_side: int = 20,
+        expiries: int = 4,
+        commission_per_contract: float = 0.65,
+        equity: float = 100_000.0,
+    ):
+        self.bars = {k.upper(): v.sort_index() for k, v in (bars or {}).items()}
+        self.script = script or GatewayScript()
+        self.host = host
+        self.port = port
+        self.account = account
+        self.pricer = pricer or SimpleOptionPricer()
+        self.spread_pct = spread_pct
+        self.strike_step = strike_step
+        self.strikes_each_side = strikes_each_side
+        self.expiries = expiries
+        self.commission_per_contract = commission_per_contract
+        self.equity = equity
+        self.stats: Dict[str, int] = {
+            "connections": 0,
+            "refused": 0,
+            "dropped": 0,
+            "requests": 0,
+            "messages_sent": 0,
+            "bytes_sent": 0,
+            "pacing_violations": 0,
+            "fills": 0,
+        }
+        self._rng = random.Random(self.script.seed)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._sessions: Dict[int, "_Session"] = {}  # clientId -> live session
+        # contract registry: conId <-> (symbol, secType, expiry, strike, right)
+        self._contracts: Dict[int, Tuple[str, str, str, float, str]] = {}
+        self._con_ids: Dict[Tuple[str, str, str, float, str], int] = {}
+        self._next_order_id = 1
+        self._next_perm_id = 1_000_000
+        self._exec_seq = 0
+        self._hist_count = 0
+        self._hist_times: Deque[float] = deque()
+        self._positions: Dict[int, Tuple[float, float]] = (
+            {}
+        )  # conId -> (position, avg cost)
+
+    # ---- lifecycle -------------------------------------------------------------
+
+    def start(self, timeout: float = 5.0) -> int:
+        """Start serving on a daemon thread; returns the bound port."""
+        if self._thread is not None:
+            return self.port
+        self._thread = threading.Thread(
+            target=self._run, name="fake-gateway", daemon=True
+        )
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("fake gateway failed to start")
+        logger.bind(event="fake_gateway_started", port=self.port).info(
+            "Fake IB Gateway listening on {}:{}", self.host, self.port
+        )
+        return self.port
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        asyncio.set_event_loop(loop)
+        self._server = loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+    def stop(self) -> None:
+        """Close every connection and stop the server thread."""
+        if self._loop is None or self._thread is None:
+            return
+        self.drop_connections()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+        self._loop = None
+        self._ready.clear()
+
+    def __enter__(self) -> "FakeGateway":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def drop_connections(self) -> int:
+        """Abort every live connection, as a Gateway restart would; returns the count."""
+        sessions = list(self._sessions.values())
+        if self._loop is not None:
+            for s in sessions:
+                self._loop.call_soon_threadsafe(s.abort)
+        return len(sessions)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = _Session(self, reader, writer)
+        try:
+            await session.run()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            session.abort()
+
+    # ---- market model ------------------------------------------------------
+
+    def con_id(
+        self,
+        symbol: str,
+        sec_type: str = "STK",
+        expiry: str = "",
+        strike: float = 0.0,
+        right: str = "",
+    ) -> int:
+        key = (symbol.upper(), sec_type, expiry, float(strike), right)
+        with self._lock:
+            cid = self._con_ids.get(key)
+            if cid is None:
+                cid = 100_000 + len(self._con_ids)
+                self._con_ids[key] = cid
+                self._contracts[cid] = key
+            return cid
+
+    def contract(self, con_id: int) -> Optional[Tuple[str, str, str, float, str]]:
+        return self._contracts.get(con_id)
+
+    @staticmethod
+    def _synthetic(symbol: str, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Closes and volumes of the synthetic path at epoch seconds ts (same ts, same bar)."""
+        phase = sum(symbol.encode()) % 97
+        t = ts.astype(float)
+        close = 100.0 * (
+            1.0
+            + 0.02 * np.sin(2 * np.pi * t / 86400.0 + phase)
+            + 0.004 * np.sin(2 * np.pi * t / 3600.0 + 2 * phase)
+            + 0.001 * np.sin(2 * np.pi * t / 420.0 + 3 * phase)
+        )
+        volume = 1000.0 + 400.0 * (1.0 + np.sin(2 * np.pi * t / 1800.0 + phase))
+        return close, np.round(volume)
+
+    def spot(self, symbol: str, now: Optional[float] = None) -> float:
+        df = self.bars.get(symbol.upper())
+        if df is not None and len(df):
+            return float(df["close"].iloc[-1])
+        close, _ = self._synthetic(symbol.upper(), np.array([now or time.time()]))
+        return round(float(close[0]), 2)
+
+    def history(
+        self, symbol: str, duration_s: int, bar_s: int, now: Optional[float] = None
+    ) -> pd.DataFrame:
+        """Bars covering ``duration_s`` seconds ending at the last bar start <= now."""
+        count = self.script.history_bars or max(1, -(-duration_s // bar_s))
+        count = min(count, self.script.max_history_bars)
+        df = self.bars.get(symbol.upper())
+        if df is not None:
+            return df.iloc[-count:]
+        end = (int(now or time.time()) // bar_s) * bar_s
+        ts = end - bar_s * np.arange(count - 1, -1, -1, dtype=np.int64)
+        close, volume = self._synthetic(symbol.upper(), ts)
+        prev, _ = self._synthetic(symbol.upper(), ts - bar_s)
+        return pd.DataFrame(
+            {
+                "open": prev,
+                "high": np.maximum(prev, close) * 1.0005,
+                "low": np.minimum(prev, close) * 0.9995,
+                "close": close,
+                "volume": volume,
+            },
+            index=pd.to_datetime(ts, unit="s", utc=True),
+        )
+
+    def expirations(self, now: Optional[float] = None) -> List[str]:
+        ny = datetime.fromtimestamp(now or time.time(), timezone.utc).astimezone(NY_TZ)
+        friday = ny.date() + timedelta(days=(4 - ny.weekday()) % 7)
+        out = [
+            (friday + timedelta(days=7 * k)).strftime("%Y%m%d")
+            for k in range(self.expiries + 1)
+        ]
+        if _expiry_ts(out[0]) <= (now or time.time()):
+            out = out[1:]
+        return out[: self.expiries]
+
+    def strikes(self, symbol: str) -> List[float]:
+        step = self.strike_step
+        atm = round(self.spot(symbol) / step) * step
+        out = [
+            round(atm + k * step, 4)
+            for k in range(-self.strikes_each_side, self.strikes_each_side + 1)
+        ]
+        return [k for k in out if k > 0]
+
+    def quote(
+        self, con_id: int, now: Optional[float] = None
+    ) -> Tuple[float, float, float]:
+        """(last, bid, ask) for a registered contract."""
+        symbol, sec_type, expiry, strike, right = self._contracts[con_id]
+        now = now or time.time()
+        spot = self.spot(symbol, now)
+        if sec_type != "OPT":
+            return spot, round(spot - 0.01, 2), round(spot + 0.01, 2)
+        years = max(_expiry_ts(expiry) - now, 3600.0) / _YEAR_SECONDS
+        mid = float(self.pricer(spot, strike, right, years))
+        half = max(0.01, mid * self.spread_pct / 2.0)
+        bid = max(0.01, round(mid - half, 2))
+        ask = max(bid + 0.01, round(mid + half, 2))
+        return round(mid, 2), bid, round(ask, 2)
+
+    # ---- shared state --------------------------------------------------------
+
+    def pacing_violation(self) -> bool:
+        """Count one historical request; True if the script says it breaks pacing."""
+        script = self.script
+        now = time.monotonic()
+        with self._lock:
+            self._hist_count += 1
+            times = self._hist_times
+            times.append(now)
+            while times and now - times[0] > script.pacing_window_seconds:
+                times.popleft()
+            if script.pacing_every and self._hist_count % script.pacing_every == 0:
+                return True
+            return bool(script.pacing_limit and len(times) > script.pacing_limit)
+
+    def next_ids(self) -> Tuple[int, int]:
+        with self._lock:
+            self._next_perm_id += 1
+            self._exec_seq += 1
+            return self._next_perm_id, self._exec_seq
+
+    def record_fill(
+        self, con_id: int, signed_qty: float, price: float
+    ) -> Tuple[float, float]:
+        with self._lock:
+            pos, avg = self._positions.get(con_id, (0.0, 0.0))
+            new = pos + signed_qty
+            if new == 0:
+                avg = 0.0
+            elif pos == 0 or (pos > 0) == (signed_qty > 0):
+                avg = (pos * avg + signed_qty * price) / new
+            self._positions[con_id] = (new, avg)
+            self.stats["fills"] += 1
+            return new, avg
+
+
+class _Session:
+    """One client connection."""
+
+    def __init__(
+        self,
+        gateway: FakeGateway,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.gw = gateway
+        self.reader = reader
+        self.writer = writer
+        self.client_id: Optional[int] = None
+        self.server_version = SERVER_VERSION
+        self.requests = 0
+        self.closed = False
+        self.orders: Dict[int, _Order] = {}
+        self.streams: Dict[int, int] = {}  # reqId -> conId of standing subscriptions
+        self.tasks: set = set()
+        self.order_queue: "asyncio.Queue[List[str]]" = asyncio.Queue()
+
+    # ---- transport -----------------------------------------------------------
+
+    def send(self, *fields: Any) -> None:
+        if self.closed:
+            return
+        data = _format(fields)
+        self.writer.write(data)
+        self.gw._count("messages_sent")
+        self.gw._count("bytes_sent", len(data))
+
+    def error(self, req_id: int, code: int, message: str) -> None:
+        fields: List[Any] = [ERR_MSG, 2, req_id, code, message]
+        if self.server_version >= 166:
+            fields.append("")
+        self.send(*fields)
+
+    def abort(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for task in list(self.tasks):
+            task.cancel()
+        if self.client_id is not None and self.gw._sessions.get(self.client_id) is self:
+            del self.gw._sessions[self.client_id]
+        transport = self.writer.transport
+        if transport is not None and not transport.is_closing():
+            transport.abort()
+
+    async def read_message(self) -> List[str]:
+        size = struct.unpack(">I", await self.reader.readexactly(4))[0]
+        payload = await self.reader.readexactly(size)
+        fields = payload.decode(errors="backslashreplace").split("\0")
+        if fields and fields[-1] == "":
+            fields.pop()
+        return fields
+
+    # ---- protocol --------------------------------------------------------------
+
+    async def handshake(self) -> bool:
+        prefix = await self.reader.readexactly(4)
+        if prefix != b"API\0":
+            return False
+        versions = (await self.read_message())[0].split(" ")[0]
+        lo, _, hi = versions.lstrip("v").partition("..")
+        client_max = _int(hi or lo, MIN_SERVER_VERSION)
+        if client_max < MIN_SERVER_VERSION:
+            return False
+        self.server_version = min(SERVER_VERSION, client_max)
+        conn_time = datetime.now(NY_TZ).strftime("%Y%m%d %H:%M:%S EST")
+        self.send(self.server_version, conn_time)
+
+        fields = await self.read_message()
+        if _int(fields[0]) != START_API:
+            return False
+        client_id = _int(fields[2])
+        if (
+            client_id in self.gw.script.client_ids_in_use
+            or client_id in self.gw._sessions
+        ):
+            self.gw._count("refused")
+            self.error(
+                -1,
+                326,
+                "Unable to connect as the client id is already in use. Retry with a unique client id.",
+            )
+            await self.writer.drain()
+            return False
+        self.client_id = client_id
+        self.gw._sessions[client_id] = self
+        self.gw._count("connections")
+        self.send(NEXT_VALID_ID, 1, self.gw._next_order_id)
+        self.send(MANAGED_ACCTS, 1, self.gw.account)
+        return True
+
+    async def run(self) -> None:
+        if not await self.handshake():
+            return
+        worker = asyncio.ensure_future(self._order_worker())
+        self.tasks.add(worker)
+        script = self.gw.script
+        while not self.closed:
+            fields = await self.read_message()
+            if not fields:
+                continue
+            self.requests += 1
+            self.gw._count("requests")
+            msg_id = _int(fields[0], -1)
+            kind = KINDS.get(msg_id)
+            if kind is not None:
+                self.gw._count(f"requests_{kind}")
+            if kind == "order":
+                self.order_queue.put_nowait(fields)
+            elif kind is not None:
+                task = asyncio.ensure_future(
+                    self._answer(msg_id, fields, script.delay(kind, self.gw._rng))
+                )
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            else:
+                self.dispatch(msg_id, fields)
+            await self.writer.drain()
+            if script.disconnect_after and self.requests >= script.disconnect_after:
+                await asyncio.sleep(0.05)  # let answers already due go out first
+                self.gw._count("dropped")
+                logger.bind(event="fake_gateway_drop", client_id=self.client_id).info(
+                    "Fake gateway dropping client {} after {} requests",
+                    self.client_id,
+                    self.requests,
+                )
+                self.abort()
+
+    async def _answer(self, msg_id: int, fields: List[str], delay: float) -> None:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not self.closed:
+            self.dispatch(msg_id, fields)
+            await self.writer.drain()
+
+    async def _order_worker(self) -> None:
+        # Orders are handled one at a time, in arrival order (modify after place, cancel after modify)
+        while not self.closed:
+            fields = await self.order_queue.get()
+            delay = self.gw.script.delay("order", self.gw._rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.dispatch(_int(fields[0]), fields)
+            await self.writer.drain()
+
+    def dispatch(self, msg_id: int, f: List[str]) -> None:
+        gw = self.gw
+        if msg_id == REQ_POSITIONS:
+            for con_id, (pos, avg) in list(gw._positions.items()):
+                self._position(con_id, pos, avg)
+            self.send(POSITION_END, 1)
+        elif msg_id in (REQ_OPEN_ORDERS, REQ_ALL_OPEN_ORDERS):
+            self.send(OPEN_ORDER_END, 1)
+        elif msg_id == REQ_COMPLETED_ORDERS:
+            self.send(COMPLETED_ORDERS_END)
+        elif msg_id == REQ_ACCT_DATA:
+            account = f[3] if len(f) > 3 and f[3] else gw.account
+            for key, value in self._account_values():
+                self.send(ACCT_VALUE, 2, key, value, "USD", account)
+            self.send(ACCT_DOWNLOAD_END, 1, account)
+        elif msg_id == REQ_ACCOUNT_UPDATES_MULTI:
+            self.send(ACCOUNT_UPDATE_MULTI_END, 1, f[2])
+        elif msg_id == REQ_EXECUTIONS:
+            self.send(EXECUTION_DATA_END, 1, f[2])
+        elif msg_id == REQ_IDS:
+            self.send(NEXT_VALID_ID, 1, gw._next_order_id)
+        elif msg_id == REQ_CURRENT_TIME:
+            self.send(CURRENT_TIME, 1, int(time.time()))
+        elif msg_id == REQ_ACCOUNT_SUMMARY:
+            req_id = f[2]
+            for key, value in self._account_values():
+                self.send(ACCOUNT_SUMMARY, 1, req_id, gw.account, key, value, "USD")
+            self.send(ACCOUNT_SUMMARY_END, 1, req_id)
+        elif msg_id == REQ_CONTRACT_DATA:
+            self._contract_details(f)
+        elif msg_id == REQ_HISTORICAL_DATA:
+            self._historical(f)
+        elif msg_id == REQ_MKT_DATA:
+            self._market_data(f)
+        elif msg_id == CANCEL_MKT_DATA:
+            self.streams.pop(_int(f[2]), None)
+        elif msg_id == REQ_SEC_DEF_OPT_PARAMS:
+            self._option_params(f)
+        elif msg_id == PLACE_ORDER:
+            self._place_order(f)
+        elif msg_id == CANCEL_ORDER:
+            self._cancel_order(_int(f[2]))
+        # Anything else (market data type, auto open orders, PnL...) needs no answer here
+
+    # ---- handlers ------------------------------------------------------------
+
+    def _account_values(self) -> List[Tuple[str, str]]:
+        equity = f"{self.gw.equity:.2f}"
+        return [
+            ("NetLiquidation", equity),
+            ("TotalCashValue", equity),
+            ("AvailableFunds", equity),
+            ("BuyingPower", f"{4 * self.gw.equity:.2f}"),
+        ]
+
+    def _contract_fields(self, f: List[str], start: int) -> Dict[str, Any]:
+        c = f[start : start + _CONTRACT_FIELDS]
+        return {
+            "con_id": _int(c[0]),
+            "symbol": c[1].upper(),
+            "sec_type": c[2] or "STK",
+            "expiry": c[3],
+            "strike": _float(c[4]),
+            "right": c[5][:1].upper() if c[5] else "",
+        }
+
+    def _contract_details(self, f: List[str]) -> None:
+        req_id = _int(f[2])
+        c = self._contract_fields(f, 3)
+        gw = self.gw
+        keys: List[Tuple[str, str, str, float, str]] = []
+        if c["con_id"]:
+            known = gw.contract(c["con_id"])
+            keys = [known] if known else []
+        elif c["sec_type"] == "STK":
+            keys = [(c["symbol"], "STK", "", 0.0, "")]
+        elif c["sec_type"] == "OPT":
+            expiries = gw.expirations()
+            if c["expiry"]:
+                expiries = [e for e in expiries if e.startswith(c["expiry"])]
+            strikes = gw.strikes(c["symbol"])
+            if c["strike"]:
+                strikes = [k for k in strikes if abs(k - c["strike"]) < 1e-9] or [
+                    c["strike"]
+                ]
+            rights = [c["right"]] if c["right"] else ["C", "P"]
+            keys = [
+                (c["symbol"], "OPT", e, k, r)
+                for e in expiries
+                for k in strikes
+                for r in rights
+            ]
+        if not keys:
+            self.error(
+                req_id, 200, "No security definition has been found for the request"
+            )
+            return
+        for key in keys:
+            self._detail(req_id, gw.con_id(*key), key)
+        self.send(CONTRACT_DATA_END, 1, req_id)
+
+    def _detail(
+        self, req_id: int, con_id: int, key: Tuple[str, str, str, float, str]
+    ) -> None:
+        symbol, sec_type, expiry, strike, right = key
+        is_opt = sec_type == "OPT"
+        local = (
+            f"{symbol:<6}{expiry[2:]}{right}{int(round(strike * 1000)):08d}"
+            if is_opt
+            else symbol
+        )
+        long_name = f"{symbol} synthetic" + "x" * self.gw.script.padding
+        fields: List[Any] = [CONTRACT_DATA]
+        if self.server_version < 164:
+            fields.append(8)
+        fields += [
+            req_id,
+            symbol,
+            sec_type,
+            expiry,
+            strike if is_opt else 0.0,
+            right,
+            "SMART",
+            "USD",
+            local,
+            symbol,
+            symbol,
+            con_id,
+            0.01,
+        ]
+        if self.server_version < 164:
+            fields.append(1)  # mdSizeMultiplier
+        fields += [
+            "100" if is_opt else "",
+            "LMT,MKT,STP",
+            "SMART,CBOE,ISE" if is_opt else "SMART,ARCA,NYSE",
+            1,
+            self.gw.con_id(symbol) if is_opt else 0,
+            long_name,
+            "ARCA",
+            expiry[:6],
+            "",
+            "",
+            "",
+            "US/Eastern",
+            "",
+            "",
+            "",
+            "",
+            0,  # no secIds
+            1,
+            symbol if is_opt else "",
+            "STK" if is_opt else "",
+            "26" if is_opt else "26,26",
+            expiry,
+            "ETF",
+        ]
+        if self.server_version >= 164:
+            fields += ["1", "1", "1"]
+        self.send(*fields)
+
+    def _historical(self, f: List[str]) -> None:
+        from ..scheduler import bar_size_seconds, duration_seconds
+
+        req_id = _int(f[1])
+        c = self._contract_fields(f, 2)
+        symbol = c["symbol"]
+        if c["con_id"] and self.gw.contract(c["con_id"]):
+            symbol = self.gw.contract(c["con_id"])[0]
+        bar_size, duration, format_date = f[16], f[17], _int(f[20], 1)
+        if self.gw.pacing_violation():
+            self.gw._count("pacing_violations")
+            self.error(
+                req_id,
+                162,
+                "Historical Market Data Service error message:Historical data request pacing violation",
+            )
+            return
+        try:
+            bar_s, duration_s = bar_size_seconds(bar_size), duration_seconds(duration)
+        except ValueError as e:
+            self.error(req_id, 321, f"Error validating request.-'bP' : cause - {e}")
+            return
+        df = self.gw.history(symbol, duration_s, bar_s)
+        ts = (
+            df.index.as_unit("s").asi8 if len(df) else np.empty(0, dtype=np.int64)
+        ).tolist()
+        if format_date == 2:
+            dates = [str(t) for t in ts]
+        elif bar_s >= 86400:
+            dates = [datetime.fromtimestamp(t, NY_TZ).strftime("%Y%m%d") for t in ts]
+        else:
+            dates = [
+                datetime.fromtimestamp(t, NY_TZ).strftime(
+                    "%Y%m%d %H:%M:%S America/New_York"
+                )
+                for t in ts
+            ]
+        o, hi, lo, cl, v = (
+            df[k].to_numpy(dtype=float).round(4).tolist()
+            for k in ("open", "high", "low", "close", "volume")
+        )
+        fields: List[Any] = [
+            HISTORICAL_DATA,
+            req_id,
+            dates[0] if dates else "",
+            dates[-1] if dates else "",
+            len(dates),
+        ]
+        for i, d in enumerate(dates):
+            fields += [
+                d,
+                o[i],
+                hi[i],
+                lo[i],
+                cl[i],
+                int(v[i]),
+                round((o[i] + cl[i]) / 2, 4),
+                1,
+            ]
+        self.send(*fields)
+
+    def _market_data(self, f: List[str]) -> None:
+        req_id = _int(f[2])
+        c = self._contract_fields(f, 3)
+        i = 3 + _CONTRACT_FIELDS
+        if c["sec_type"] == "BAG":
+            i += 1 + 4 * _int(f[i])
+        i += 4 if f[i] == "1" else 1  # delta-neutral contract
+        snapshot = f[i + 1] == "1" if len(f) > i + 1 else False
+        con_id = c["con_id"] if c["con_id"] and self.gw.contract(c["con_id"]) else None
+        if con_id is None:
+            if c["sec_type"] == "OPT" and not (
+                c["expiry"] and c["strike"] and c["right"]
+            ):
+                self.error(
+                    req_id, 200, "No security definition has been found for the request"
+                )
+                return
+            con_id = self.gw.con_id(
+                c["symbol"], c["sec_type"], c["expiry"], c["strike"], c["right"]
+            )
+        last, bid, ask = self.gw.quote(con_id)
+        self.send(TICK_PRICE, 6, req_id, _BID, bid, 100, 0)
+        self.send(TICK_PRICE, 6, req_id, _ASK, ask, 100, 0)
+        self.send(TICK_PRICE, 6, req_id, _LAST, last, 1, 0)
+        self.send(TICK_PRICE, 6, req_id, _CLOSE, last, 0, 0)
+        self.send(TICK_SIZE, 6, req_id, _VOLUME, 1000)
+        if snapshot:
+            self.send(TICK_SNAPSHOT_END, 1, req_id)
+        else:
+            self.streams[req_id] = con_id
+
+    def _option_params(self, f: List[str]) -> None:
+        req_id, symbol = _int(f[1]), f[2].upper()
+        under_con_id = _int(f[5]) or self.gw.con_id(symbol)
+        expiries, strikes = self.gw.expirations(), self.gw.strikes(symbol)
+        exchanges = [
+            "SMART",
+            "CBOE",
+            "ISE",
+            "AMEX",
+            "PHLX",
+            "BOX",
+            "ARCA",
+            "NASDAQOM",
+            "BATS",
+            "MIAX",
+        ]
+        for k in range(max(1, self.gw.script.chain_exchanges)):
+            exchange = exchanges[k] if k < len(exchanges) else f"EX{k}"
+            self.send(
+                SEC_DEF_OPT_PARAMETER,
+                req_id,
+                exchange,
+                under_con_id,
+                symbol,
+                "100",
+                len(expiries),
+                *expiries,
+                len(strikes),
+                *strikes,
+            )
+        self.send(SEC_DEF_OPT_PARAMETER_END, req_id)
+
+    # ---- orders ------------------------------------------------------------
+
+    def _status(
+        self, order: _Order, last_price: float = 0.0, avg_price: float = 0.0
+    ) -> None:
+        self.send(
+            ORDER_STATUS,
+            order.order_id,
+            order.status,
+            order.filled,
+            order.quantity - order.filled,
+            avg_price,
+            order.perm_id,
+            order.parent_id,
+            last_price,
+            order.client_id,
+            "",
+            0.0,
+        )
+
+    def _place_order(self, f: List[str]) -> None:
+        order_id = _int(f[1])
+        c = self._contract_fields(f, 2)
+        gw = self.gw
+        self.gw._next_order_id = max(gw._next_order_id, order_id + 1)
+        existing = self.orders.get(order_id)
+        if existing is not None and existing.status not in ("Filled", "Cancelled"):
+            existing.limit_price = _float(f[19])
+            existing.aux_price = _float(f[20])
+            existing.quantity = _float(f[17], existing.quantity)
+            if existing.status != "PendingSubmit":
+                self._work(existing)
+            return
+        con_id = c["con_id"] if c["con_id"] and gw.contract(c["con_id"]) else 0
+        if not con_id:
+            if c["sec_type"] == "OPT" and not (
+                c["expiry"] and c["strike"] and c["right"]
+            ):
+                self.error(
+                    order_id,
+                    200,
+                    "No security definition has been found for the request",
+                )
+                return
+            con_id = gw.con_id(
+                c["symbol"], c["sec_type"], c["expiry"], c["strike"], c["right"]
+            )
+        perm_id, _ = gw.next_ids()
+        order = _Order(
+            order_id=order_id,
+            client_id=self.client_id or 0,
+            perm_id=perm_id,
+            con_id=con_id,
+            action=f[16].upper(),
+            quantity=_float(f[17]),
+            order_type=f[18].upper(),
+            limit_price=_float(f[19]),
+            aux_price=_float(f[20]),
+            parent_id=_int(f[28]),
+            transmit=f[27] != "0",
+        )
+        self.orders[order_id] = order
+        if not order.transmit:
+            return  # held (bracket parent / early children) until the group transmits
+        group = [order]
+        if order.parent_id:
+            # The last child transmits the whole bracket: parent first, then its children
+            parent = self.orders.get(order.parent_id)
+            group = (
+                [parent]
+                if parent is not None and parent.status == "PendingSubmit"
+                else []
+            )
+            group += [
+                o
+                for o in self.orders.values()
+                if o.parent_id == order.parent_id and o.status == "PendingSubmit"
+            ]
+        for o in group:
+            self._work(o)
+
+    def _work(self, order: _Order) -> None:
+        """Submit an order: children wait for their parent, marketable orders fill."""
+        parent = self.orders.get(order.parent_id) if order.parent_id else None
+        if parent is not None and parent.status != "Filled":
+            order.status = "PreSubmitted"
+            self._status(order)
+            return
+        last, bid, ask = self.gw.quote(order.con_id)
+        buy = order.action == "BUY"
+        touch = ask if buy else bid
+        marketable = order.order_type == "MKT" or (
+            order.order_type == "LMT"
+            and (order.limit_price >= touch if buy else order.limit_price <= touch)
+        )
+        if not (marketable and self.gw.script.fill_orders):
+            order.status = "Submitted"
+            self._status(order)
+            return
+        price = (
+            touch
+            if order.order_type == "MKT"
+            else (
+                min(order.limit_price, touch) if buy else max(order.limit_price, touch)
+            )
+        )
+        self._fill(order, price)
+        # A filled parent releases its children
+        for child in self.orders.values():
+            if child.parent_id == order.order_id and child.status == "PreSubmitted":
+                child.status = "Submitted"
+                self._status(child)
+
+    def _fill(self, order: _Order, price: float) -> None:
+        gw = self.gw
+        symbol, sec_type, expiry, strike, right = gw.contract(order.con_id)
+        is_opt = sec_type == "OPT"
+        qty = order.quantity - order.filled
+        order.status = "Submitted"
+        self._status(order)
+        _, seq = gw.next_ids()
+        exec_id = f"0000e0d5.{int(time.time()):08x}.{seq:02d}.01"
+        order.filled = order.quantity
+        order.status = "Filled"
+        ts = datetime.now(timezone.utc).strftime("%Y%m%d %H:%M:%S UTC")
+        self.send(
+            EXECUTION_DATA,
+            -1,
+            order.order_id,
+            order.con_id,
+            symbol,
+            sec_type,
+            expiry,
+            strike if is_opt else 0.0,
+            right,
+            "100" if is_opt else "",
+            "SMART",
+            "USD",
+            symbol,
+            symbol,
+            exec_id,
+            ts,
+            gw.account,
+            "CBOE" if is_opt else "ARCA",
+            "BOT" if order.action == "BUY" else "SLD",
+            qty,
+            price,
+            order.perm_id,
+            order.client_id,
+            0,
+            order.quantity,
+            price,
+            "",
+            "",
+            "",
+            "",
+            1,
+        )
+        self._status(order, last_price=price, avg_price=price)
+        self.send(
+            COMMISSION_REPORT,
+            1,
+            exec_id,
+            round(gw.commission_per_contract * qty, 2),
+            "USD",
+            "",
+            "",
+            "",
+        )
+        pos, avg = gw.record_fill(
+            order.con_id, qty if order.action == "BUY" else -qty, price
+        )
+        self._position(order.con_id, pos, avg)
+
+    def _position(self, con_id: int, pos: float, avg: float) -> None:
+        symbol, sec_type, expiry, strike, right = self.gw.contract(con_id)
+        is_opt = sec_type == "OPT"
+        self.send(
+            POSITION_DATA,
+            3,
+            self.gw.account,
+            con_id,
+            symbol,
+            sec_type,
+            expiry,
+            strike if is_opt else 0.0,
+            right,
+            "100" if is_opt else "",
+            "SMART",
+            "USD",
+            symbol,
+            symbol,
+            pos,
+            avg * (100 if is_opt else 1),
+        )
+
+    def _cancel_order(self, order_id: int) -> None:
+        order = self.orders.get(order_id)
+        if order is None or order.status in ("Filled", "Cancelled"):
+            self.error(
+                order_id,
+                10148,
+                f"OrderId {order_id} that needs to be cancelled cannot be cancelled",
+            )
+            return
+        order.status = "Cancelled"
+        self._status(order)
+        self.error(order_id, 202, "Order Canceled - reason:")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve a fake IB Gateway for load and soak tests"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4002)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds before every answer"
+    )
+    parser.add_argument(
+        "--historical-latency",
+        type=float,
+        help="Override --latency for historical requests",
+    )
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--pacing-every",
+        type=int,
+        default=0,
+        help="Error 162 on every Nth historical request",
+    )
+    parser.add_argument(
+        "--pacing-limit",
+        type=int,
+        default=0,
+        help="Error 162 above this many per 10 minutes",
+    )
+    parser.add_argument(
+        "--disconnect-after",
+        type=int,
+        default=0,
+        help="Drop connections after N requests",
+    )
+    parser.add_argument(
+        "--history-bars",
+        type=int,
+        default=0,
+        help="Bars per historical answer (large payloads)",
+    )
+    parser.add_argument("--chain-exchanges", type=int, default=1)
+    parser.add_argument(
+        "--no-fills", action="store_true", help="Leave every order resting"
+    )
+    args = parser.parse_args(argv)
+
+    latency = {"*": args.latency}
+    if args.historical_latency is not None:
+        latency["historical"] = args.historical_latency
+    script = GatewayScript(
+        latency=latency,
+        jitter_seconds=args.jitter,
+        pacing_every=args.pacing_every,
+        pacing_limit=args.pacing_limit,
+        disconnect_after=args.disconnect_after,
+        history_bars=args.history_bars,
+        chain_exchanges=args.chain_exchanges,
+        fill_orders=not args.no_fills,
+    )
+    gateway = FakeGateway(script=script, host=args.host, port=args.port)
+    gateway.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.bind(event="fake_gateway_stats", **gateway.stats).info(
+                "Fake gateway stats: {}", gateway.stats
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Option premium models used to price simulated entries and exits.
+
+The backtester only has underlying bars, so option prices must be modelled.
+Models are pluggable: anything with ``entry`` and ``mark`` methods matching
+``PremiumModel`` can be passed in ``BacktestConfig.premium_model``.
+
+``DeltaPremiumModel`` is the cheap first-order default; ``BlackScholesPremiumModel``
+synthesizes full option quotes (IV surface, skew, time decay, bid/ask) from
+the underlying bars, and doubles as a ``SimBroker`` option pricer.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional, Protocol
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from ..data.greeks import SECONDS_PER_YEAR, bs_greeks, bs_price_one
+from ..trading_calendar import NY_TZ, REGULAR_CLOSE, nyse_holidays
+
+
+class PremiumModel(Protocol):
+    def entry(self, underlying: float, right: str, ts: float) -> float:
+        """Premium paid to open an ATM option of right ("C"/"P") at ts."""
+        ...
+
+    def mark(
+        self,
+        underlying: float,
+        right: str,
+        ts: float,
+        entry_underlying: float,
+        entry_premium: float,
+        entry_ts: float,
+    ) -> float:
+        """Premium of the same option when the underlying trades at underlying."""
+        ...
+
+
+@dataclass
+class DeltaPremiumModel:
+    """First-order model: premium moves ``delta`` dollars per dollar of underlying.
+
+    Cheap and monotonic in the underlying, which is all bracket simulation
+    needs; it ignores theta and vega.
+    """
+
+    premium_pct: float = 0.01  # ATM weekly premium as a fraction of spot
+    delta: float = 0.5
+    min_premium: float = 0.01
+
+    def entry(self, underlying: float, right: str, ts: float) -> float:
+        return max(self.min_premium, underlying * self.premium_pct)
+
+    def mark(
+        self,
+        underlying: float,
+        right: str,
+        ts: float,
+        entry_underlying: float,
+        entry_premium: float,
+        entry_ts: float,
+    ) -> float:
+        sign = 1.0 if right == "C" else -1.0
+        return max(
+            self.min_premium,
+            entry_premium + sign * self.delta * (underlying - entry_underlying),
+        )
+
+
+@dataclass
+class IVSurface:
+    """Parametric implied-vol surface.
+
+    ``vol = atm + skew * m + smile * m**2 + term_slope * (years - 30/365)``
+    with log-moneyness ``m = ln(strike / spot)``, floored at ``min_vol``. A
+    negative ``skew`` makes OTM puts richer than OTM calls, as in index
+    options. ``atm_series`` (annualised decimals indexed by time, e.g.
+    VIX / 100) overrides ``atm_vol`` with the last value at or before each
+    timestamp.
+    """
+
+    atm_vol: float = 0.20
+    skew: float = -0.20
+    smile: float = 0.0
+    term_slope: float = 0.0
+    min_vol: float = 0.05
+    atm_series: Optional[pd.Series] = None
+
+    def __post_init__(self) -> None:
+        self._series_ts: Optional[np.ndarray] = None
+        if self.atm_series is not None and len(self.atm_series):
+            series = self.atm_series.sort_index()
+            idx = pd.DatetimeIndex(series.index)
+            if idx.tz is not None:
+                idx = idx.tz_convert("UTC").tz_localize(None)
+            self._series_ts = idx.as_unit("ns").asi8 / 1e9
+            self._series_vals = series.to_numpy(dtype=float)
+
+    def atm(self, ts: Any = None) -> Any:
+        """ATM vol at ts (epoch seconds, scalar or array); ``atm_vol`` without a series."""
+        if self._series_ts is None or ts is None:
+            return self.atm_vol
+        i = np.searchsorted(self._series_ts, ts, side="right") - 1
+        return self._series_vals[np.maximum(i, 0)]
+
+    def vol(self, spot: Any, strike: Any, years: Any, ts: Any = None) -> Any:
+        m = np.log(np.asarray(strike, dtype=float) / spot)
+        v = (
+            self.atm(ts)
+            + self.skew * m
+            + self.smile * m * m
+            + self.term_slope * (np.asarray(years) - 30 / 365)
+        )
+        return np.maximum(v, self.min_vol)
+
+
+@dataclass
+class SpreadModel:
+    """Bid/ask around a model mid: ``spread_pct`` of mid, at least ``min_spread``, on the tick grid."""
+
+    spread_pct: float = 0.04  # full width as a fraction of mid
+    min_spread: float = 0.02
+    tick_size: float = 0.01
+
+    def bid_ask(self, mid: float) -> tuple:
+        half = max(self.min_spread, mid * self.spread_pct) / 2.0
+        tick = self.tick_size
+        # Small epsilon so mids already on the grid don't widen by a tick
+        bid = max(tick, math.floor((mid - half) / tick + 1e-9) * tick)
+        ask = max(bid + tick, math.ceil((mid + half) / tick - 1e-9) * tick)
+        return bid, ask
+
+    def bid_ask_array(self, mid: np.ndarray) -> tuple:
+        half = np.maximum(self.min_spread, mid * self.spread_pct) / 2.0
+        tick = self.tick_size
+        bid = np.maximum(tick, np.floor((mid - half) / tick + 1e-9) * tick)
+        ask = np.maximum(bid + tick, np.ceil((mid + half) / tick - 1e-9) * tick)
+        return bid, ask
+
+
+@lru_cache(maxsize=4096)
+def _expiry_close(day: date) -> float:
+    """Epoch of the 16:00 ET close on the weekly expiry for the week containing day.
+
+    Weeklies expire Friday; when Friday is an exchange holiday they expire
+    the trading day before.
+    """
+    friday = day + timedelta(days=(4 - day.weekday()) % 7)
+    holidays = nyse_holidays(friday.year)
+    while friday in holidays or friday.weekday() > 4:
+        friday -= timedelta(days=1)
+    return datetime.combine(friday, REGULAR_CLOSE, NY_TZ).timestamp()
+
+
+@dataclass
+class BlackScholesPremiumModel:
+    """Synthetic option quotes from underlying bars via Black-Scholes.
+
+    ``entry`` buys an ATM contract (strike rounded to ``strike_step``) at the
+    model ask, expiring on the first weekly expiry at least ``dte`` calendar
+    days out. ``mark`` re-prices that same contract - strike and expiry are
+    derived from the entry, so no per-position state is needed - at the
+    model bid, which is what a closing sell would get. Time decay, skew and
+    vol-regime changes (``IVSurface.atm_series``) therefore all show up in
+    bracket and max-hold exits.
+    """
+
+    surface: IVSurface = field(default_factory=IVSurface)
+    spread: SpreadModel = field(default_factory=SpreadModel)
+    dte: int = 0
+    strike_step: float = 1.0
+    rate: float = 0.0
+    dividend: float = 0.0
+    min_hours: float = (
+        1.0  # floor on time to expiry so expiry-day marks keep some time value
+    )
+
+    def strike_for(self, underlying: float) -> float:
+        return round(underlying / self.strike_step) * self.strike_step
+
+    def expiry_for(self, ts: float) -> float:
+        """Epoch of the expiry close for a contract opened at ts."""
+        day = datetime.fromtimestamp(ts, NY_TZ).date() + timedelta(days=self.dte)
+        close = _expiry_close(day)
+        if close <= ts:
+            close = _expiry_close(day + timedelta(days=7 - day.weekday()))
+        return close
+
+    def _years(self, expiry: Any, ts: Any) -> Any:
+        return (
+            np.maximum(np.asarray(expiry) - ts, self.min_hours * 3600.0)
+            / SECONDS_PER_YEAR
+        )
+
+    def mid(
+        self, underlying: float, strike: float, right: str, ts: float, expiry: float
+    ) -> float:
+        years = float(self._years(expiry, ts))
+        vol = float(self.surface.vol(underlying, strike, years, ts))
+        return bs_price_one(
+            underlying, strike, years, vol, right, self.rate, self.dividend
+        )
+
+    def entry(self, underlying: float, right: str, ts: float) -> float:
+        mid = self.mid(
+            underlying, self.strike_for(underlying), right, ts, self.expiry_for(ts)
+        )
+        return self.spread.bid_ask(mid)[1]
+
+    def mark(
+        self,
+        underlying: float,
+        right: str,
+        ts: float,
+        entry_underlying: float,
+        entry_premium: float,
+        entry_ts: float,
+    ) -> float:
+        strike = self.strike_for(entry_underlying)
+        mid = self.mid(underlying, strike, right, ts, self.expiry_for(entry_ts))
+        return self.spread.bid_ask(mid)[0]
+
+    def __call__(self, spot: float, strike: float, right: str, years: float) -> float:
+        """``sim_broker.OptionPricer``: model mid (the broker applies its own spread)."""
+        years = max(years, self.min_hours * 3600.0 / SECONDS_PER_YEAR)
+        vol = float(self.surface.vol(spot, strike, years))
+        return bs_price_one(spot, strike, years, vol, right, self.rate, self.dividend)
+
+    def option_path(
+        self, bars: pd.DataFrame, right: str, entry_ts: Optional[float] = None
+    ) -> pd.DataFrame:
+        """Quote and Greeks path of one contract over a bar frame, in one vectorized pass.
+
+        The contract is struck at the close of the first bar at or after
+        ``entry_ts`` (default: the first bar); bars after its expiry are dropped.
+
+        Returns:
+            DataFrame on the bars' index with strike, years, iv, mid, bid, ask,
+            delta and theta columns.
+        """
+        from .engine import _epoch_seconds
+
+        ts = _epoch_seconds(bars.index)
+        start = 0 if entry_ts is None else int(np.searchsorted(ts, entry_ts))
+        if start >= len(ts):
+            return pd.DataFrame(
+                columns=["strike", "years", "iv", "mid", "bid", "ask", "delta", "theta"]
+            )
+        expiry = self.expiry_for(float(ts[start]))
+        stop = int(np.searchsorted(ts, expiry, side="right"))
+        ts = ts[start:stop]
+        spot = bars["close"].to_numpy(dtype=float)[start:stop]
+        strike = self.strike_for(float(spot[0]))
+        years = self._years(expiry, ts)
+        iv = self.surface.vol(spot, strike, years, ts)
+        greeks = bs_greeks(spot, strike, years, iv, right, self.rate, self.dividend)
+        bid, ask = self.spread.bid_ask_array(greeks["price"])
+        return pd.DataFrame(
+            {
+                "strike": strike,
+                "years": years,
+                "iv": iv,
+                "mid": greeks["price"],
+                "bid": bid,
+                "ask": ask,
+                "delta": greeks["delta"],
+                "theta": greeks["theta"],
+            },
+            index=bars.index[start:stop],
+        )
@@ -0,0 +1,363 @@
+"""Robustness checks for tuned strategy constants: walk-forward and Monte Carlo.
+
+- ``walk_forward`` re-optimises on rolling in-sample windows (via
+  ``run_sweep``) and scores each winner on the following out-of-sample
+  window. A large gap between in-sample and out-of-sample results is the
+  signature of overfit constants.
+- ``bootstrap_trades`` resamples a trade P&L sequence in blocks (keeping
+  streaks intact) and returns the return/drawdown distribution. It is fully
+  vectorized, so many thousands of resamples take well under a second.
+- ``bootstrap_bars`` block-resamples each symbol's bar returns into
+  synthetic price paths and backtests every path in a process pool (bars
+  shared as in ``sweep``), giving the same distributions under new paths.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from . import sweep as _sweep
+from .engine import BacktestConfig, BacktestResult, Trade, run_backtest
+from .strategies import STRATEGIES, strategy_params
+from .sweep import Dimension, SharedBars, _objective_key, _split_params, run_sweep
+
+logger = _log.logger
+
+_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def summarize(samples: pd.DataFrame) -> pd.DataFrame:
+    """Mean, percentiles and P(value < 0) for each column of a sample frame."""
+    rows = {}
+    for col in samples.columns:
+        v = samples[col].to_numpy(dtype=float)
+        v = v[np.isfinite(v)]
+        stats = {"mean": float(v.mean()) if len(v) else np.nan}
+        for p in _PERCENTILES:
+            stats[f"p{p}"] = float(np.percentile(v, p)) if len(v) else np.nan
+        stats["prob_negative"] = float((v < 0).mean()) if len(v) else np.nan
+        rows[col] = stats
+    return pd.DataFrame(rows).T
+
+
+# ---- Monte Carlo: trade sequences --------------------------------------------
+
+
+def _block_indices(
+    n: int, n_samples: int, block_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """(n_samples, n) row indices made of circular blocks of block_size."""
+    block_size = max(1, min(int(block_size), n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_samples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    return idx.reshape(n_samples, -1)[:, :n]
+
+
+def bootstrap_trades(
+    pnl: Sequence[float],
+    initial_equity: float,
+    n_samples: int = 10_000,
+    block_size: int = 5,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Block-bootstrap a trade P&L sequence.
+
+    Args:
+        pnl: Net P&L per trade, in execution order (e.g. ``t.pnl`` of
+            ``BacktestResult.trades``).
+        initial_equity: Starting equity for return/drawdown.
+        n_samples: Resampled sequences.
+        block_size: Consecutive trades kept together (1 = plain bootstrap).
+        seed: RNG seed.
+
+    Returns:
+        One row per resample with total_return and max_drawdown (pass to
+        ``summarize`` for the distribution).
+    """
+    values = np.asarray(pnl, dtype=float)
+    if not len(values):
+        return pd.DataFrame(
+            {"total_return": np.zeros(n_samples), "max_drawdown": np.zeros(n_samples)}
+        )
+    rng = np.random.default_rng(seed)
+    paths = values[_block_indices(len(values), n_samples, block_size, rng)]
+    equity = initial_equity + np.cumsum(paths, axis=1)
+    equity = np.concatenate(
+        [np.full((n_samples, 1), float(initial_equity)), equity], axis=1
+    )
+    peak = np.maximum.accumulate(equity, axis=1)
+    drawdown = (peak - equity) / np.where(peak == 0, 1.0, peak)
+    return pd.DataFrame(
+        {
+            "total_return": equity[:, -1] / initial_equity - 1.0,
+            "max_drawdown": drawdown.max(axis=1),
+        }
+    )
+
+
+# ---- Monte Carlo: bar paths --------------------------------------------------
+
+
+def resample_bars(
+    df: pd.DataFrame, block_size: int, rng: np.random.Generator
+) -> pd.DataFrame:
+    """Synthetic path: block-resampled bar returns and shapes on the original timestamps.
+
+    Each bar keeps its own gap (open vs prior close), wick ratios and volume;
+    closes compound the resampled log returns from the first close.
+    """
+    close = df["close"].to_numpy(dtype=float)
+    prev = np.r_[close[0], close[:-1]]
+    log_ret = np.log(close / prev)
+    gap = np.log(df["open"].to_numpy(dtype=float) / prev)
+    high_r = df["high"].to_numpy(dtype=float) / close
+    low_r = df["low"].to_numpy(dtype=float) / close
+    idx = _block_indices(len(df), 1, block_size, rng)[0]
+
+    new_close = close[0] * np.exp(np.cumsum(np.r_[0.0, log_ret[idx[1:]]]))
+    new_prev = np.r_[new_close[0], new_close[:-1]]
+    new_open = new_prev * np.exp(gap[idx])
+    new_open[0] = df["open"].iloc[0]
+    return pd.DataFrame(
+        {
+            "open": new_open,
+            "high": np.maximum.reduce([new_close * high_r[idx], new_open, new_close]),
+            "low": np.minimum.reduce([new_close * low_r[idx], new_open, new_close]),
+            "close": new_close,
+            "volume": df["volume"].to_numpy(dtype=float)[idx],
+        },
+        index=df.index,
+    )
+
+
+def _path_stats(
+    bars: Dict[str, pd.DataFrame], config: BacktestConfig, seed: int, block_size: int
+) -> Dict[str, float]:
+    rng = np.random.default_rng(seed)
+    paths = {
+        sym: resample_bars(df, block_size, rng) for sym, df in bars.items() if len(df)
+    }
+    stats = run_backtest(paths, config).stats()
+    return {"seed": seed, **stats}
+
+
+def _evaluate_path(task: Tuple[int, int]) -> Dict[str, float]:
+    assert _sweep._worker_config is not None, "worker not initialised"
+    seed, block_size = task
+    return _path_stats(_sweep._worker_bars, _sweep._worker_config, seed, block_size)
+
+
+def bootstrap_bars(
+    bars: Dict[str, pd.DataFrame],
+    config: Optional[BacktestConfig] = None,
+    n_paths: int = 200,
+    block_size: int = 20,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    mp_context: Any = None,
+) -> pd.DataFrame:
+    """Backtest ``n_paths`` block-resampled bar paths, in parallel.
+
+    Returns:
+        One row of ``BacktestResult.stats()`` (plus the path seed) per path.
+    """
+    cfg = config or BacktestConfig()
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    tasks = [(seed + k, block_size) for k in range(n_paths)]
+    start = time.perf_counter()
+    if workers == 1:
+        rows = [_path_stats(bars, cfg, s, b) for s, b in tasks]
+    else:
+        with (
+            SharedBars(bars) as shared,
+            ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_sweep._init_worker,
+                initargs=(shared.layout, cfg),
+            ) as pool,
+        ):
+            rows = list(
+                pool.map(
+                    _evaluate_path, tasks, chunksize=max(1, n_paths // (workers * 4))
+                )
+            )
+    elapsed = time.perf_counter() - start
+    logger.bind(
+        event="monte_carlo_complete",
+        paths=n_paths,
+        block_size=block_size,
+        workers=workers,
+        elapsed_seconds=round(elapsed, 3),
+    ).info(
+        "Monte Carlo: {} bar paths on {} workers in {:.1f}s", n_paths, workers, elapsed
+    )
+    return pd.DataFrame(rows)
+
+
+# ---- walk-forward ------------------------------------------------------------
+
+
+@dataclass
+class WalkForwardResult:
+    folds: pd.DataFrame  # one row per window: bounds, chosen params, IS and OOS stats
+    trades: List[Trade]  # out-of-sample trades, all folds
+    equity: pd.Series  # out-of-sample equity, folds compounded back to back
+    initial_equity: float
+
+    def summary(self) -> Dict[str, float]:
+        oos = self.folds["oos_total_return"].to_numpy(dtype=float)
+        ins = self.folds["is_total_return"].to_numpy(dtype=float)
+        total = (
+            float(self.equity.iloc[-1] / self.initial_equity - 1.0)
+            if len(self.equity)
+            else 0.0
+        )
+        mean_is = float(np.nanmean(ins)) if len(ins) else 0.0
+        return {
+            "folds": int(len(self.folds)),
+            "oos_total_return": total,
+            "mean_is_return": mean_is,
+            "mean_oos_return": float(np.nanmean(oos)) if len(oos) else 0.0,
+            # Out-of-sample over in-sample return; near 1 is robust, near/below 0 is overfit
+            "efficiency": float(np.nanmean(oos) / mean_is) if mean_is else float("nan"),
+            "oos_positive_folds": float((oos > 0).mean()) if len(oos) else 0.0,
+        }
+
+
+def _slice(
+    bars: Dict[str, pd.DataFrame], start: pd.Timestamp, end: pd.Timestamp
+) -> Dict[str, pd.DataFrame]:
+    return {sym: df[(df.index >= start) & (df.index < end)] for sym, df in bars.items()}
+
+
+def _with_warmup(
+    bars: Dict[str, pd.DataFrame], start: pd.Timestamp, end: pd.Timestamp, warmup: int
+) -> Dict[str, pd.DataFrame]:
+    out = {}
+    for sym, df in bars.items():
+        i0 = int(df.index.searchsorted(start, side="left"))
+        i1 = int(df.index.searchsorted(end, side="left"))
+        out[sym] = df.iloc[max(0, i0 - warmup) : i1]
+    return out
+
+
+def walk_forward(
+    bars: Dict[str, pd.DataFrame],
+    space: Dict[str, Dimension],
+    config: Optional[BacktestConfig] = None,
+    train: str = "60D",
+    test: str = "20D",
+    step: Optional[str] = None,
+    method: str = "grid",
+    n_trials: int = 50,
+    objectives: Sequence[str] = ("total_return",),
+    workers: Optional[int] = None,
+    seed: int = 0,
+    mp_context: Any = None,
+) -> WalkForwardResult:
+    """Rolling optimise-then-test over the bars' time span.
+
+    Each fold sweeps ``space`` on ``train`` worth of bars, picks the top-ranked
+    parameters and backtests them on the next ``test`` worth (with the
+    strategy's lookback of earlier bars as warm-up only). Windows advance by
+    ``step`` (default: ``test``), so test windows do not overlap.
+
+    Args:
+        train, test, step: pandas offset strings ("60D", "4W", ...).
+        method, n_trials, objectives, workers, seed, mp_context: As for
+            ``run_sweep`` (per fold).
+    """
+    cfg = config or BacktestConfig()
+    starts = [df.index[0] for df in bars.values() if len(df)]
+    ends = [df.index[-1] for df in bars.values() if len(df)]
+    if not starts:
+        raise ValueError("walk_forward needs bars")
+    train_td, test_td = pd.Timedelta(train), pd.Timedelta(test)
+    step_td = pd.Timedelta(step) if step else test_td
+    first, last = min(starts), max(ends)
+    objective = _objective_key(objectives[0])[0]
+
+    fold_rows: List[Dict[str, Any]] = []
+    oos_trades: List[Trade] = []
+    curves: List[pd.Series] = []
+    growth = 1.0
+    t0 = first
+    fold = 0
+    while t0 + train_td < last:
+        train_end = t0 + train_td
+        test_end = min(train_end + test_td, last + pd.Timedelta(seconds=1))
+        ranked = run_sweep(
+            _slice(bars, t0, train_end),
+            space,
+            cfg,
+            method=method,
+            n_trials=n_trials,
+            objectives=objectives,
+            workers=workers,
+            seed=seed + fold,
+            mp_context=mp_context,
+        )
+        if "error" in ranked.columns:
+            ranked = ranked[ranked["error"].isna()]
+        if ranked.empty:
+            logger.bind(event="walk_forward_fold_skipped", fold=fold).warning(
+                "Walk-forward fold {}: every trial failed", fold
+            )
+            t0 += step_td
+            fold += 1
+            continue
+        best = {name: ranked[name].iloc[0] for name in space}  # column dtype keeps ints
+        best = {
+            k: (v.item() if isinstance(v, np.generic) else v) for k, v in best.items()
+        }
+        best = {
+            k: (None if isinstance(v, float) and np.isnan(v) else v)
+            for k, v in best.items()
+        }
+        constants, overrides = _split_params(best)
+        with strategy_params(constants):
+            warmup = STRATEGIES[cfg.strategy].window
+            oos: BacktestResult = run_backtest(
+                _with_warmup(bars, train_end, test_end, warmup),
+                replace(cfg, trade_start=train_end.timestamp(), **overrides),
+            )
+        oos_stats = oos.stats()
+        curve = oos.equity[oos.equity.index >= train_end]
+        if len(curve):
+            curves.append(curve * growth)
+            growth *= float(curve.iloc[-1] / cfg.initial_equity)
+        oos_trades.extend(oos.trades)
+        fold_rows.append(
+            {
+                "fold": fold,
+                "train_start": t0,
+                "train_end": train_end,
+                "test_end": test_end,
+                **best,
+                f"is_{objective}": float(ranked.iloc[0].get(objective, np.nan)),
+                "is_total_return": float(ranked.iloc[0]["total_return"]),
+                **{f"oos_{k}": v for k, v in oos_stats.items()},
+            }
+        )
+        logger.bind(
+            event="walk_forward_fold", fold=fold, params=best, oos=oos_stats
+        ).info(
+            "Walk-forward fold {}: OOS return {:.2%}", fold, oos_stats["total_return"]
+        )
+        t0 += step_td
+        fold += 1
+
+    equity = pd.concat(curves) if curves else pd.Series(dtype=float, name="equity")
+    return WalkForwardResult(
+        pd.DataFrame(fold_rows), oos_trades, equity, cfg.initial_equity
+    )
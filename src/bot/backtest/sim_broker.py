@@ -0,0 +1,921 @@
+"""Simulated broker for replaying the live scheduler offline.
+
+``SimBroker`` implements the ``Broker`` protocol (plus the extras the
+scheduler, exit monitor and chase execution use: ``orders``, ``sleep``,
+``modify_order``, ``stream_quotes``, ``add_listener``) on top of stored
+underlying bars and a simulated clock. ``run_replay`` then drives the real
+``scheduler.run_cycle`` / ``check_exits`` across the bars' sessions, so the
+whole path (bar-close gating, retries, circuit breaker, cycle budgets,
+brackets, the exit monitor) runs unchanged and much faster than real time.
+
+Modelling choices:
+
+- the underlying trades at the open of the forming bar until it closes, then
+  at its close; historical requests return bars up to the clock, so the last
+  one is still forming (as from IB);
+- option quotes are synthesized from the underlying with a pluggable pricer
+  (``OptionPricer``) around a configurable spread (``FillModel``);
+- every request advances the clock by a configurable latency and can fail
+  with ``TimeoutError`` at random or during scripted outages
+  (``LatencyModel``);
+- resting orders are matched whenever the clock moves: marketable orders fill
+  at the touch, stops trigger on the bid/ask, limits inside the spread fill
+  with a time-scaled probability, and at each bar close TP/SL children are
+  also checked against the option price at the bar's high/low (stops win
+  ties), as in ``engine.run_backtest``.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from ..broker.base import OptionContract, OrderTicket, Quote, contract_key
+from ..orders import CANCELLED, FILLED, OrderManager
+from ..trading_calendar import NY_TZ, get_calendar
+from .engine import CONTRACT_MULTIPLIER, _epoch_seconds
+
+logger = _log.logger
+
+_YEAR_SECONDS = 365.0 * 86400.0
+_DURATION_SECONDS = {"S": 1}
+_DURATION_DAYS = {"D": 1, "W": 5, "M": 21, "Y": 252}  # trading sessions
+
+
+class SimClock:
+    """Settable epoch clock; call it for the current time (like ``time.time``)."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    def set(self, ts: float) -> None:
+        """Move to ts; the clock never runs backwards."""
+        self.now = max(self.now, float(ts))
+
+    def advance(self, seconds: float) -> None:
+        self.now += max(0.0, float(seconds))
+
+
+@dataclass
+class LatencyModel:
+    request_seconds: float = 0.05  # per quote/chain/history request
+    jitter_seconds: float = 0.0  # uniform extra latency in [0, jitter]
+    order_ack_seconds: float = 0.05  # submit -> working at the exchange
+    failure_rate: float = 0.0  # chance a data request raises TimeoutError
+    outages: Sequence[
+        Tuple[float, float]
+    ] = ()  # (start, end) epochs when data requests time out
+    seed: int = 0
+
+
+@dataclass
+class FillModel:
+    spread_pct: float = 0.01  # option bid/ask spread as a fraction of the mid
+    tick_size: float = 0.01
+    slippage_ticks: int = 0  # beyond the touch, for market and triggered stop orders
+    passive_fill_rate: float = 0.02  # per second, for a limit sitting at the far touch
+    commission_per_contract: float = 0.65
+    quote_volume: int = 1000
+    seed: int = 0
+
+
+class OptionPricer(Protocol):
+    def __call__(self, spot: float, strike: float, right: str, years: float) -> float:
+        """Mid price of one option share (not per contract)."""
+        ...
+
+
+@dataclass
+class SimpleOptionPricer:
+    """Intrinsic value plus a Gaussian-in-moneyness time value.
+
+    The ATM time value is ``0.4 * spot * vol * sqrt(t)`` (the Black-Scholes ATM
+    approximation) and decays with log-moneyness, which is enough for strike
+    selection and bracket behaviour without a full model.
+    """
+
+    volatility: float = 0.20
+    min_price: float = 0.01
+
+    def __call__(self, spot: float, strike: float, right: str, years: float) -> float:
+        intrinsic = max(0.0, spot - strike) if right == "C" else max(0.0, strike - spot)
+        sd = self.volatility * math.sqrt(max(years, 0.0))
+        if sd <= 0 or spot <= 0 or strike <= 0:
+            return max(self.min_price, intrinsic)
+        z = math.log(spot / strike) / sd
+        return max(self.min_price, intrinsic + 0.4 * spot * sd * math.exp(-0.5 * z * z))
+
+
+@dataclass
+class SimOptionContract(OptionContract):
+    secType: str = "OPT"
+
+
+@dataclass
+class SimFill:
+    ts: float
+    order_id: str
+    symbol: str
+    contract: str
+    action: str
+    quantity: int
+    price: float
+    commission: float
+
+
+@dataclass
+class _SimOrder:
+    order_id: str
+    contract: Any
+    action: str
+    quantity: int
+    order_type: str  # MKT / LMT / STP
+    limit_price: Optional[float] = None
+    stop_price: Optional[float] = None
+    parent_id: Optional[str] = None
+    oca_group: Optional[str] = None
+    active_at: float = 0.0
+    acked: bool = False
+    last_checked: Optional[float] = None
+
+
+class _SimIB:
+    # run_cycle qualifies the VIX index through broker.ib before quoting it
+    def qualifyContracts(self, *contracts: Any) -> List[Any]:
+        return list(contracts)
+
+
+class _Series:
+    """One symbol's bars as arrays, with NY session-day markers for durations."""
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.sort_index()
+        self.df = df
+        self.start = _epoch_seconds(df.index)
+        steps = np.diff(self.start)
+        self.bar_seconds = float(np.median(steps)) if len(steps) else 60.0
+        self.end = self.start + self.bar_seconds
+        self.open = df["open"].to_numpy(dtype=float)
+        self.high = df["high"].to_numpy(dtype=float)
+        self.low = df["low"].to_numpy(dtype=float)
+        self.close = df["close"].to_numpy(dtype=float)
+        days = pd.DatetimeIndex(df.index).tz_convert(NY_TZ).normalize()
+        first = (
+            np.r_[True, days[1:] != days[:-1]]
+            if len(days)
+            else np.array([], dtype=bool)
+        )
+        self.day_starts = np.flatnonzero(first)
+
+    def index_at(self, ts: float) -> int:
+        """Index of the latest bar that has started by ts (-1 if none)."""
+        return int(np.searchsorted(self.start, ts, side="right")) - 1
+
+    def price_at(self, ts: float) -> Optional[float]:
+        i = self.index_at(ts)
+        if i < 0:
+            return None
+        return float(self.close[i] if self.end[i] <= ts else self.open[i])
+
+
+class SimBroker:
+    """In-memory broker fed by stored bars and a simulated clock.
+
+    Args:
+        bars: symbol -> OHLCV DataFrame indexed by bar start time.
+        clock: Shared simulated clock (defaults to one starting at the first bar).
+        pricer: Option mid-price model; ``SimpleOptionPricer`` by default.
+        fill_model: Spread, slippage, passive fill rate and commissions.
+        latency: Request/ack latency and failure injection.
+        initial_cash: Starting account cash.
+        strike_step: Strike spacing of the synthetic option chain.
+        strikes_each_side: Strikes listed above and below spot.
+        vix: Level quoted for the VIX index when no VIX bars are given.
+    """
+
+    def __init__(
+        self,
+        bars: Dict[str, pd.DataFrame],
+        clock: Optional[SimClock] = None,
+        pricer: Optional[OptionPricer] = None,
+        fill_model: Optional[FillModel] = None,
+        latency: Optional[LatencyModel] = None,
+        initial_cash: float = 100_000.0,
+        strike_step: float = 1.0,
+        strikes_each_side: int = 5,
+        vix: float = 20.0,
+    ):
+        self._series = {sym.upper(): _Series(df) for sym, df in bars.items() if len(df)}
+        if not self._series:
+            raise ValueError("SimBroker needs bars for at least one symbol")
+        self.first_ts = min(float(s.start[0]) for s in self._series.values())
+        self.last_ts = max(float(s.end[-1]) for s in self._series.values())
+        # Every bar boundary, so clock moves can stop where prices change
+        self._boundaries = np.unique(
+            np.concatenate([np.r_[s.start, s.end] for s in self._series.values()])
+        )
+        self.clock = clock or SimClock(self.first_ts)
+        self.pricer: OptionPricer = pricer or SimpleOptionPricer()
+        self.fill_model = fill_model or FillModel()
+        self.latency = latency or LatencyModel()
+        self.strike_step = float(strike_step)
+        self.strikes_each_side = int(strikes_each_side)
+        self.vix = float(vix)
+        self.ib = _SimIB()
+        self.orders = OrderManager(clock=self.clock)
+        self.cash = float(initial_cash)
+        self.realized_pnl = 0.0
+        self.fills: List[SimFill] = []
+        self.requests = 0
+        self.failures = 0
+        self._connected = False
+        self._insufficient_funds = False
+        self._lock = RLock()
+        self._next_id = 1
+        self._exec_seq = 0
+        self._working: Dict[str, _SimOrder] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}  # contract_key -> position row
+        self._listeners: Dict[str, List[Callable[..., None]]] = {}
+        self._latency_rng = random.Random(self.latency.seed)
+        self._fill_rng = random.Random(self.fill_model.seed)
+
+    # ---- connection / events ---------------------------------------------
+
+    def connect(self) -> None:
+        self._connected = True
+
+    def disconnect(self) -> None:
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def insufficient_funds(self) -> bool:
+        return self._insufficient_funds
+
+    def add_listener(self, event: str, callback: Callable[..., None]) -> None:
+        """Subscribe to broker events ("fill", "disconnect"); callbacks get keyword info."""
+        self._listeners.setdefault(event, []).append(callback)
+
+    def _emit(self, event: str, **info: Any) -> None:
+        for cb in list(self._listeners.get(event, [])):
+            try:
+                cb(**info)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("listener for {} failed: {}", event, type(e).__name__)
+
+    # ---- time --------------------------------------------------------------
+
+    def sleep(self, seconds: float) -> None:
+        """Advance simulated time, matching resting orders on the way."""
+        self.advance_to(self.clock() + max(0.0, float(seconds)))
+
+    def advance_to(self, ts: float) -> None:
+        """Move the clock to ts, stopping at bar boundaries (and every second
+        while a limit order rests inside the spread) to match orders."""
+        with self._lock:
+            while self.clock() < ts:
+                now = self.clock()
+                j = int(np.searchsorted(self._boundaries, now, side="right"))
+                step_to = ts
+                if j < len(self._boundaries):
+                    step_to = min(step_to, float(self._boundaries[j]))
+                if self._has_passive_orders():
+                    step_to = min(step_to, now + 1.0)
+                self.clock.set(step_to)
+                self._match()
+            self._match()
+            self._settle_expired()
+
+    def _request(self, kind: str) -> None:
+        """Account for one data request: add latency, then maybe fail."""
+        lat = self.latency
+        self.requests += 1
+        delay = lat.request_seconds
+        if lat.jitter_seconds:
+            delay += self._latency_rng.uniform(0.0, lat.jitter_seconds)
+        self.sleep(delay)
+        now = self.clock()
+        in_outage = any(a <= now < b for a, b in lat.outages)
+        if in_outage or (
+            lat.failure_rate and self._latency_rng.random() < lat.failure_rate
+        ):
+            self.failures += 1
+            raise TimeoutError(f"simulated {kind} timeout")
+
+    # ---- market data ---------------------------------------------------------
+
+    def _spot(self, symbol: str) -> float:
+        series = self._series.get(symbol.upper())
+        if series is None:
+            raise ValueError(f"no bars for {symbol}")
+        price = series.price_at(self.clock())
+        if price is None:
+            raise ValueError(f"no bars for {symbol} before {self.clock()}")
+        return price
+
+    @staticmethod
+    def _expiry_ts(expiry: str) -> float:
+        d = datetime.strptime(expiry, "%Y%m%d")
+        return datetime(d.year, d.month, d.day, 16, 0, tzinfo=NY_TZ).timestamp()
+
+    def _option_mid(self, contract: Any, spot: Optional[float] = None) -> float:
+        right = getattr(contract, "right", "C")
+        strike = float(getattr(contract, "strike", 0.0))
+        expiry = getattr(contract, "expiry", "") or getattr(
+            contract, "lastTradeDateOrContractMonth", ""
+        )
+        years = max(self._expiry_ts(expiry) - self.clock(), 3600.0) / _YEAR_SECONDS
+        if spot is None:
+            spot = self._spot(getattr(contract, "symbol", ""))
+        return float(self.pricer(spot, strike, right, years))
+
+    def _bid_ask(self, contract: Any) -> Tuple[float, float, float]:
+        """(last, bid, ask) for a stock symbol or option contract."""
+        tick = self.fill_model.tick_size
+        if isinstance(contract, str):
+            last = self._spot(contract)
+            return last, last - tick, last + tick
+        mid = self._option_mid(contract)
+        half = max(tick, mid * self.fill_model.spread_pct / 2.0)
+        bid = max(tick, round((mid - half) / tick) * tick)
+        ask = max(bid + tick, round((mid + half) / tick) * tick)
+        return mid, bid, ask
+
+    def _quote(self, contract: Any) -> Quote:
+        symbol = (
+            contract if isinstance(contract, str) else getattr(contract, "symbol", "")
+        )
+        if not isinstance(contract, str) and getattr(contract, "secType", "") == "IND":
+            if symbol.upper() not in self._series:
+                return Quote(symbol, self.vix, self.vix, self.vix, 0, self.clock())
+            contract = symbol
+        last, bid, ask = self._bid_ask(contract)
+        return Quote(
+            symbol,
+            round(last, 4),
+            round(bid, 4),
+            round(ask, 4),
+            self.fill_model.quote_volume,
+            self.clock(),
+        )
+
+    def market_data(self, symbol: Any, timeout: float = 5.0) -> Quote:
+        self._request("market_data")
+        return self._quote(symbol)
+
+    def stream_quotes(self, contracts: List[Any]) -> Dict[str, Quote]:
+        # Standing subscriptions cost no requests (as with IBKRBroker.stream_quotes)
+        out: Dict[str, Quote] = {}
+        for c in contracts:
+            try:
+                out[contract_key(c)] = self._quote(c)
+            except ValueError:
+                continue
+        return out
+
+    def cancel_stream(self, contract: Any) -> None:
+        return None
+
+    def option_chain(
+        self, symbol: str, expiry_hint: str = "weekly"
+    ) -> List[OptionContract]:
+        """Synthetic weekly chain: strikes around spot, expiring the next Friday close."""
+        self._request("option_chain")
+        spot = self._spot(symbol)
+        ny = datetime.fromtimestamp(self.clock(), timezone.utc).astimezone(NY_TZ)
+        friday = ny.date() + timedelta(days=(4 - ny.weekday()) % 7)
+        expiry = friday.strftime("%Y%m%d")
+        if self._expiry_ts(expiry) <= self.clock():
+            expiry = (friday + timedelta(days=7)).strftime("%Y%m%d")
+        atm = round(spot / self.strike_step) * self.strike_step
+        out: List[OptionContract] = []
+        for k in range(-self.strikes_each_side, self.strikes_each_side + 1):
+            strike = round(atm + k * self.strike_step, 4)
+            if strike <= 0:
+                continue
+            for right in ("C", "P"):
+                out.append(
+                    SimOptionContract(
+                        symbol.upper(), right, strike, expiry, CONTRACT_MULTIPLIER
+                    )
+                )
+        return out
+
+    def historical_prices(
+        self,
+        symbol: Any,
+        duration: str = "3600 S",
+        bar_size: str = "1 min",
+        what_to_show: str = "TRADES",
+        use_rth: bool = True,
+        timeout: int = 60,
+    ) -> pd.DataFrame:
+        """Bars started by the current sim time, resampled to bar_size.
+
+        ``duration`` counts seconds ("S") or trading sessions ("D", "W", "M",
+        "Y"). Bars are served as stored; ``use_rth`` is not re-applied.
+        """
+        from ..scheduler import bar_size_seconds
+
+        self._request("historical_prices")
+        if not isinstance(symbol, str):
+            raise ValueError("SimBroker only serves underlying bars")
+        series = self._series.get(symbol.upper())
+        if series is None:
+            raise ValueError(f"no bars for {symbol}")
+        i_end = series.index_at(self.clock()) + 1
+        count_str, unit = duration.strip().split()
+        count, unit = int(count_str), unit.upper()
+        if unit in _DURATION_SECONDS:
+            i_start = int(
+                np.searchsorted(series.start, self.clock() - count, side="left")
+            )
+        elif unit in _DURATION_DAYS:
+            d = int(np.searchsorted(series.day_starts, i_end, side="left"))
+            first_day = max(0, d - count * _DURATION_DAYS[unit])
+            i_start = int(series.day_starts[first_day]) if d else 0
+        else:
+            raise ValueError(f"unsupported duration: {duration!r}")
+        df = series.df.iloc[i_start:i_end]
+        seconds = bar_size_seconds(bar_size)
+        if df.empty or seconds <= series.bar_seconds:
+            return df.copy()
+        return (
+            df.resample(f"{seconds}s", label="left", closed="left")
+            .agg(
+                {
+                    "open": "first",
+                    "high": "max",
+                    "low": "min",
+                    "close": "last",
+                    "volume": "sum",
+                }
+            )
+            .dropna(subset=["open"])
+        )
+
+    # ---- orders ------------------------------------------------------------
+
+    def place_order(self, ticket: OrderTicket) -> str:
+        """Submit ticket (plus TP/SL children when bracket prices are known); returns the parent id."""
+        with self._lock:
+            active_at = self.clock() + self.latency.order_ack_seconds
+            contract = ticket.contract
+            symbol = (
+                contract
+                if isinstance(contract, str)
+                else getattr(contract, "symbol", "")
+            )
+            parent = self._new_order(
+                contract,
+                ticket.action.upper(),
+                int(ticket.quantity),
+                ticket.order_type.upper(),
+                limit_price=ticket.limit_price,
+                active_at=active_at,
+            )
+            self.orders.track(parent.order_id, symbol, parent.action, parent.quantity)
+            tp, sl = ticket.bracket_prices()
+            close_action = "SELL" if parent.action == "BUY" else "BUY"
+            oca = f"OCA_{parent.order_id}"
+            for order_type, price in (("LMT", tp), ("STP", sl)):
+                if price is None:
+                    continue
+                child = self._new_order(
+                    contract,
+                    close_action,
+                    parent.quantity,
+                    order_type,
+                    limit_price=price if order_type == "LMT" else None,
+                    stop_price=price if order_type == "STP" else None,
+                    parent_id=parent.order_id,
+                    oca_group=oca,
+                    active_at=active_at,
+                )
+                self.orders.track(
+                    child.order_id,
+                    symbol,
+                    close_action,
+                    child.quantity,
+                    parent.order_id,
+                )
+            self._match()
+            return parent.order_id
+
+    def _new_order(
+        self, contract: Any, action: str, quantity: int, order_type: str, **kw: Any
+    ) -> _SimOrder:
+        order = _SimOrder(
+            str(self._next_id), contract, action, quantity, order_type, **kw
+        )
+        self._next_id += 1
+        self._working[order.order_id] = order
+        return order
+
+    def modify_order(self, order_id: str, limit_price: float) -> bool:
+        """Re-price a working limit order. Returns False if it is no longer open."""
+        with self._lock:
+            order = self._working.get(str(order_id))
+            if order is None or order.order_type != "LMT":
+                return False
+            order.limit_price = round(float(limit_price), 2)
+            self._match()
+            return True
+
+    def cancel_order(self, order_id: str) -> None:
+        with self._lock:
+            order = self._working.pop(str(order_id), None)
+            if order is not None:
+                self.orders.on_status(order.order_id, "Cancelled")
+                self._sync_children()
+
+    def _has_passive_orders(self) -> bool:
+        return any(
+            o.order_type == "LMT" and o.parent_id is None
+            for o in self._working.values()
+        )
+
+    def _sync_children(self) -> None:
+        """Cancel children of unfilled dead parents; resize those of partial fills."""
+        for order in list(self._working.values()):
+            if order.parent_id is None:
+                continue
+            parent = self.orders.get(order.parent_id)
+            if parent is None or parent.state != CANCELLED:
+                continue
+            if parent.filled <= 0:
+                self._working.pop(order.order_id, None)
+                self.orders.on_status(order.order_id, "Cancelled")
+            else:
+                order.quantity = int(parent.filled)
+                rec = self.orders.get(order.order_id)
+                if rec is not None:
+                    rec.quantity = float(parent.filled)
+
+    def _fill_price(
+        self, order: _SimOrder, bid: float, ask: float, dt: float
+    ) -> Optional[float]:
+        fm = self.fill_model
+        slip = fm.slippage_ticks * fm.tick_size
+        buy = order.action == "BUY"
+        if order.order_type == "MKT":
+            return ask + slip if buy else max(fm.tick_size, bid - slip)
+        if order.order_type == "STP":
+            if buy and ask >= order.stop_price:
+                return ask + slip
+            if not buy and bid <= order.stop_price:
+                return max(fm.tick_size, bid - slip)
+            return None
+        limit = float(order.limit_price or 0.0)
+        if buy and limit >= ask:
+            return ask
+        if not buy and limit <= bid:
+            return bid
+        # Resting inside the spread: fills more often the closer it sits to the far touch
+        width = ask - bid
+        if width > 0 and bid < limit < ask and dt > 0:
+            closeness = (limit - bid) / width if buy else (ask - limit) / width
+            if self._fill_rng.random() < fm.passive_fill_rate * dt * closeness:
+                return limit
+        return None
+
+    def _bar_extremes(self, contract: Any) -> Optional[Tuple[float, float]]:
+        """(min, max) option mid over the bar that closed exactly now, if one did."""
+        if isinstance(contract, str):
+            return None
+        series = self._series.get(getattr(contract, "symbol", "").upper())
+        if series is None:
+            return None
+        i = int(np.searchsorted(series.end, self.clock(), side="left"))
+        if i >= len(series.end) or series.end[i] != self.clock():
+            return None
+        a = self._option_mid(contract, series.low[i])
+        b = self._option_mid(contract, series.high[i])
+        return min(a, b), max(a, b)
+
+    def _match(self) -> None:
+        now = self.clock()
+        for order in list(self._working.values()):
+            if order.order_id not in self._working or order.active_at > now:
+                continue
+            if not order.acked:
+                order.acked = True
+                self.orders.on_status(order.order_id, "Submitted")
+            if order.parent_id is not None:
+                parent = self.orders.get(order.parent_id)
+                if parent is None or not (
+                    parent.state == FILLED
+                    or (parent.state == CANCELLED and parent.filled)
+                ):
+                    continue  # dormant until the parent fills
+            try:
+                _, bid, ask = self._bid_ask(order.contract)
+            except ValueError:
+                continue
+            dt = now - (order.last_checked if order.last_checked is not None else now)
+            order.last_checked = now
+            price = self._fill_price(order, bid, ask, dt)
+            if price is None and order.parent_id is not None:
+                extremes = self._bar_extremes(order.contract)
+                if extremes is not None:
+                    low, high = extremes
+                    if (
+                        order.order_type == "STP"
+                        and order.action == "SELL"
+                        and low <= order.stop_price
+                    ):
+                        price = order.stop_price
+                    elif (
+                        order.order_type == "LMT"
+                        and order.action == "SELL"
+                        and high >= order.limit_price
+                    ):
+                        price = order.limit_price
+            if price is not None:
+                self._fill(order, round(price, 4))
+
+    def _fill(self, order: _SimOrder, price: float) -> None:
+        fm = self.fill_model
+        key = contract_key(order.contract)
+        multiplier = 1 if isinstance(order.contract, str) else CONTRACT_MULTIPLIER
+        signed = order.quantity if order.action == "BUY" else -order.quantity
+        commission = fm.commission_per_contract * order.quantity
+        self.cash -= signed * price * multiplier + commission
+
+        row = self._positions.get(key)
+        if row is None:
+            row = {"contract": order.contract, "position": 0, "avgCost": 0.0}
+            self._positions[key] = row
+        held = row["position"]
+        if held and (held > 0) != (signed > 0):
+            closed = min(abs(held), abs(signed))
+            avg_price = row["avgCost"] / multiplier
+            direction = 1 if held > 0 else -1
+            self.realized_pnl += direction * (price - avg_price) * closed * multiplier
+        new = held + signed
+        if new == 0:
+            self._positions.pop(key, None)
+        else:
+            if held == 0 or (held > 0) != (new > 0):
+                row["avgCost"] = price * multiplier
+            elif (held > 0) == (signed > 0):
+                row["avgCost"] = (
+                    row["avgCost"] * abs(held) + price * multiplier * abs(signed)
+                ) / abs(new)
+            row["position"] = new
+            if held >= 0 > new:
+                logger.bind(
+                    event="sim_short_position", contract=key, position=new
+                ).warning("Simulated position in {} went short ({})", key, new)
+
+        del self._working[order.order_id]
+        self._exec_seq += 1
+        self.orders.on_execution(
+            order.order_id, f"sim-{self._exec_seq}", order.quantity, price
+        )
+        symbol = (
+            order.contract
+            if isinstance(order.contract, str)
+            else getattr(order.contract, "symbol", "")
+        )
+        self.fills.append(
+            SimFill(
+                self.clock(),
+                order.order_id,
+                symbol,
+                key,
+                order.action,
+                order.quantity,
+                price,
+                commission,
+            )
+        )
+        if order.oca_group:
+            for other in list(self._working.values()):
+                if other.oca_group == order.oca_group:
+                    del self._working[other.order_id]
+                    self.orders.on_status(other.order_id, "Cancelled")
+        self._emit(
+            "fill",
+            symbol=symbol,
+            side="BOT" if order.action == "BUY" else "SLD",
+            qty=order.quantity,
+            price=price,
+        )
+
+    def _settle_expired(self) -> None:
+        """Cash-settle options past their expiry close at intrinsic value."""
+        now = self.clock()
+        for key, row in list(self._positions.items()):
+            c = row["contract"]
+            expiry = getattr(c, "expiry", "")
+            if isinstance(c, str) or not expiry or self._expiry_ts(expiry) > now:
+                continue
+            for order in list(self._working.values()):
+                if contract_key(order.contract) == key:
+                    del self._working[order.order_id]
+                    self.orders.on_status(order.order_id, "Cancelled")
+            spot = self._spot(c.symbol)
+            strike = float(c.strike)
+            intrinsic = (
+                max(0.0, spot - strike) if c.right == "C" else max(0.0, strike - spot)
+            )
+            value = intrinsic * CONTRACT_MULTIPLIER * row["position"]
+            self.cash += value
+            self.realized_pnl += value - row["avgCost"] * row["position"]
+            del self._positions[key]
+            logger.bind(
+                event="sim_expiry", contract=key, intrinsic=round(intrinsic, 4)
+            ).info("Simulated expiry of {} at {:.2f}", key, intrinsic)
+
+    # ---- account -----------------------------------------------------------
+
+    def positions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "symbol": getattr(row["contract"], "symbol", str(row["contract"])),
+                    "position": row["position"],
+                    "avgCost": row["avgCost"],
+                    "contract": row["contract"],
+                }
+                for row in self._positions.values()
+            ]
+
+    def equity(self) -> float:
+        """Cash plus positions marked at the mid."""
+        with self._lock:
+            value = self.cash
+            for row in self._positions.values():
+                c = row["contract"]
+                multiplier = 1 if isinstance(c, str) else CONTRACT_MULTIPLIER
+                try:
+                    mid = self._bid_ask(c)[0]
+                except ValueError:
+                    mid = row["avgCost"] / multiplier
+                value += mid * multiplier * row["position"]
+            return value
+
+    def pnl(self) -> Dict[str, float]:
+        return {"net": self.equity(), "realized": self.realized_pnl}
+
+    def account(self) -> Dict[str, Any]:
+        equity = self.equity()
+        return {
+            "NetLiquidation": equity,
+            "AvailableFunds": self.cash,
+            "TotalCashValue": self.cash,
+        }
+
+
+@dataclass
+class ReplayResult:
+    cycles: int
+    sim_seconds: float
+    wall_seconds: float
+    fills: List[SimFill]
+    equity: pd.Series
+    order_latency: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def speedup(self) -> float:
+        """Simulated seconds per wall-clock second."""
+        return (
+            self.sim_seconds / self.wall_seconds
+            if self.wall_seconds > 0
+            else float("inf")
+        )
+
+
+def run_replay(
+    broker: SimBroker,
+    settings: Dict[str, Any],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    state_dir: Optional[Path] = None,
+) -> ReplayResult:
+    """Drive the live scheduler against ``broker`` from start to end (epochs).
+
+    Cycles run every ``schedule.interval_seconds`` of simulated time during
+    NYSE sessions (exit checks every ``schedule.exit_interval_seconds`` when
+    set), skipping straight to the next open otherwise. Orders are sent to the
+    simulated broker (``dry_run`` is forced off) and the daily-loss state and
+    trade journal are written under ``state_dir`` (default ``logs/replay``)
+    rather than the live files. Scheduler module state (signal gates, caches,
+    circuit breaker, exit monitor) starts fresh and is restored afterwards.
+    """
+    from .. import journal, scheduler
+
+    cfg = copy.deepcopy(settings)
+    state_dir = Path(state_dir or Path("logs") / "replay")
+    state_dir.mkdir(parents=True, exist_ok=True)
+    cfg["dry_run"] = False
+    cfg.setdefault("risk", {})["daily_state_path"] = str(state_dir / "daily_state.json")
+    cfg.setdefault("monitoring", {})["alerts_enabled"] = False
+    sched = cfg.get("schedule", {})
+    interval = float(sched.get("interval_seconds", 180))
+    exit_step = float(sched.get("exit_interval_seconds") or interval)
+    step = min(interval, exit_step)
+
+    start = broker.first_ts if start is None else float(start)
+    end = broker.last_ts if end is None else float(end)
+    calendar = get_calendar()
+
+    # The replay runs on fresh scheduler state; the caller's is put back afterwards
+    state_dicts = (
+        scheduler._last_signal_bar,
+        scheduler._symbol_bar_cache,
+        scheduler._per_bar_cache,
+        scheduler._timeout_tracker,
+        scheduler._LAST_REQUEST_TIME,
+    )
+    saved_dicts = [dict(d) for d in state_dicts]
+    for d in state_dicts:
+        d.clear()
+    saved_breaker = scheduler._gateway_circuit_breaker
+    saved_monitor = scheduler._exit_monitor
+    scheduler._gateway_circuit_breaker = scheduler.GatewayCircuitBreaker(
+        failure_threshold=3, reset_timeout_seconds=300
+    )
+    scheduler._exit_monitor = None
+    saved_journal = (journal.TRADES_CSV, journal.TRADES_JSONL)
+    journal.TRADES_CSV = state_dir / "trades.csv"
+    journal.TRADES_JSONL = state_dir / "trades.jsonl"
+    scheduler.set_clock(broker.clock, broker.sleep)
+
+    broker.connect()
+    broker.clock.set(start)
+    cycles = 0
+    next_cycle = start
+    curve_ts: List[float] = []
+    curve_eq: List[float] = []
+    wall_start = time.perf_counter()
+    try:
+        while broker.clock() < end:
+            now = broker.clock()
+            if not calendar.is_open(now):
+                next_cycle = min(calendar.next_open(now), end)
+                broker.advance_to(next_cycle)
+                continue
+            scheduler.check_exits(broker, cfg)
+            if now >= next_cycle:
+                scheduler.run_cycle(broker, cfg)
+                cycles += 1
+                next_cycle = now + interval
+                curve_ts.append(broker.clock())
+                curve_eq.append(broker.equity())
+            broker.advance_to(min(end, max(now + step, broker.clock())))
+    finally:
+        scheduler.set_clock()
+        journal.TRADES_CSV, journal.TRADES_JSONL = saved_journal
+        for d, saved in zip(state_dicts, saved_dicts):
+            d.clear()
+            d.update(saved)
+        scheduler._gateway_circuit_breaker = saved_breaker
+        scheduler._exit_monitor = saved_monitor
+    wall = time.perf_counter() - wall_start
+
+    equity = pd.Series(
+        curve_eq,
+        index=pd.to_datetime(np.array(curve_ts), unit="s", utc=True),
+        name="equity",
+    )
+    result = ReplayResult(
+        cycles,
+        broker.clock() - start,
+        wall,
+        list(broker.fills),
+        equity,
+        broker.orders.latency_summary(),
+    )
+    logger.bind(
+        event="replay_complete",
+        cycles=cycles,
+        fills=len(result.fills),
+        requests=broker.requests,
+        request_failures=broker.failures,
+        sim_seconds=round(result.sim_seconds, 1),
+        wall_seconds=round(wall, 3),
+    ).info(
+        "Replay complete: {} cycles, {} fills, {:.0f}x real time",
+        cycles,
+        len(result.fills),
+        result.speedup,
+    )
+    return result
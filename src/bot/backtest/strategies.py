@@ -0,0 +1,166 @@
+"""Strategy adapters for the backtester.
+
+Each ``StrategySpec`` wraps a live strategy function unchanged, plus:
+
+- ``window``: trailing bars the function reads, so the engine passes a short
+  slice instead of the whole history;
+- ``prefilter``: an optional vectorized *necessary* condition for a non-HOLD
+  signal. Bars failing it cannot produce a signal and are skipped without
+  calling the (pandas-heavy) strategy; bars passing it are still decided by
+  the real function.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from ..strategy import daily_volume_rules as dv_mod
+from ..strategy import scalp_rules as scalp_mod
+from ..strategy import whale_rules as whale_mod
+
+# Slack for float differences between numpy and pandas rolling arithmetic;
+# keeps prefilters a superset of what the real rules accept
+_EPS = 1e-9
+
+
+@dataclass
+class StrategySpec:
+    name: str
+    fn: Callable[[pd.DataFrame, str], Dict[str, Any]]
+    window: int
+    prefilter: Optional[Callable[[pd.DataFrame], np.ndarray]] = None
+    debounce_seconds: float = 0.0
+    reset: Optional[Callable[[str], None]] = (
+        None  # clear live-only state before each call
+    )
+
+
+def _prior_mean(x: np.ndarray, n: int) -> np.ndarray:
+    """Mean of the n values before each index (excluding it); NaN when short."""
+    out = np.full(len(x), np.nan)
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    idx = np.arange(n, len(x))
+    out[idx] = (c[idx] - c[idx - n]) / n
+    return out
+
+
+def _dv_prefilter(df: pd.DataFrame) -> np.ndarray:
+    n = dv_mod.DV_LOOKBACK_BARS
+    close = df["close"].to_numpy(dtype=float)
+    vol = df["volume"].to_numpy(dtype=float)
+    avg_vol = _prior_mean(vol, n)
+    sma = _prior_mean(close, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_ratio = vol / np.where(avg_vol == 0, 1.0, avg_vol)
+        dev = (close - sma) / np.where(sma == 0, 1.0, sma)
+    return (vol_ratio >= dv_mod.DV_VOLUME_THRESHOLD - _EPS) & (
+        np.abs(dev) > dv_mod.DV_PRICE_MOMENTUM - _EPS
+    )
+
+
+def _whale_prefilter(df: pd.DataFrame) -> np.ndarray:
+    n = whale_mod.WHALE_LOOKBACK_BARS
+    close = df["close"].astype(float)
+    vol = df["volume"].to_numpy(dtype=float)
+    # Same windows as the live rule: last n bars including the current one
+    # (fewer at the start, as the rule uses whatever history it has)
+    counts = np.minimum(np.arange(1, len(vol) + 1), n)
+    c = np.concatenate(([0.0], np.cumsum(vol)))
+    idx = np.arange(len(vol))
+    avg_vol = (c[idx + 1] - c[idx + 1 - counts]) / counts
+    spike = (
+        vol
+        > whale_mod.WHALE_VOLUME_SPIKE_THRESHOLD * np.where(avg_vol == 0, 1.0, avg_vol)
+        - _EPS
+    )
+    high = close.rolling(n, min_periods=1).max().to_numpy()
+    low = close.rolling(n, min_periods=1).min().to_numpy()
+    last = close.to_numpy()
+    return spike & ((last > high - _EPS) | (last < low + _EPS))
+
+
+def _whale_reset(symbol: str) -> None:
+    # whale_rules debounces on wall-clock time; the engine debounces on bar time instead
+    with whale_mod._debounce_lock:
+        whale_mod._debounce.pop(symbol, None)
+
+
+def _scalp(df: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+    # scalp_signal takes no symbol argument
+    return scalp_mod.scalp_signal(df)
+
+
+def build_strategies() -> Dict[str, StrategySpec]:
+    """Specs built from the strategy modules' current constants (windows included)."""
+    return {
+        "daily_volume": StrategySpec(
+            "daily_volume",
+            dv_mod.daily_volume_rules,
+            dv_mod.DV_LOOKBACK_BARS + 1,
+            _dv_prefilter,
+        ),
+        "whale": StrategySpec(
+            "whale",
+            whale_mod.whale_rules,
+            whale_mod.WHALE_LOOKBACK_BARS,
+            _whale_prefilter,
+            debounce_seconds=whale_mod.WHALE_DEBOUNCE_DAYS * 86400.0,
+            reset=_whale_reset,
+        ),
+        # EWM indicators depend on all history; 200 bars is well past warm-up
+        "scalp": StrategySpec("scalp", _scalp, 200),
+    }
+
+
+STRATEGIES: Dict[str, StrategySpec] = build_strategies()
+
+# Tunable module constants, by name (names are unique across the strategy modules)
+STRATEGY_PARAMS: Dict[str, ModuleType] = {
+    name: mod
+    for mod in (dv_mod, whale_mod, scalp_mod)
+    for name, value in vars(mod).items()
+    if name.isupper()
+    and isinstance(value, (int, float))
+    and not isinstance(value, bool)
+}
+
+
+@contextmanager
+def strategy_params(overrides: Dict[str, Any]) -> Iterator[None]:
+    """Temporarily set strategy module constants (e.g. ``DV_LOOKBACK_BARS``).
+
+    The live rules read their constants at call time, so the override applies
+    to them unchanged; ``STRATEGIES`` is rebuilt so windows follow lookbacks.
+    Not thread-safe: constants are process-wide (sweeps use processes).
+
+    Raises:
+        KeyError: If a name is not a known strategy constant.
+    """
+    unknown = sorted(set(overrides) - set(STRATEGY_PARAMS))
+    if unknown:
+        raise KeyError(f"unknown strategy parameters: {unknown}")
+    saved = {name: getattr(STRATEGY_PARAMS[name], name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(STRATEGY_PARAMS[name], name, value)
+        STRATEGIES.update(build_strategies())
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(STRATEGY_PARAMS[name], name, value)
+        STRATEGIES.update(build_strategies())
+
+
+def signal_direction(signal: str) -> Optional[str]:
+    """Map a strategy signal to the option right the scheduler would buy."""
+    if signal in ("BUY", "BUY_CALL"):
+        return "C"
+    if signal in ("SELL", "BUY_PUT"):
+        return "P"
+    return None
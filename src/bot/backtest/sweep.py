@@ -0,0 +1,413 @@
+"""Parameter sweeps: fan backtests out over a process pool.
+
+A sweep evaluates many parameter sets against the same bars. Parameters are
+either strategy module constants (``strategies.STRATEGY_PARAMS``, e.g.
+``DV_LOOKBACK_BARS``, ``RSI_BUY_LOW``) or ``BacktestConfig`` fields (e.g.
+``stop_loss_pct``, ``max_hold_bars``). Search methods:
+
+- ``grid``: every combination of the listed values;
+- ``random``: ``n_trials`` independent draws;
+- ``tpe``: a small Tree-structured Parzen Estimator; after a random start it
+  samples near the best trials so far, in batches sized to the pool.
+
+Bars are copied once into a shared-memory block; each worker maps it on
+start-up and rebuilds its DataFrames once, so tasks only pickle a parameter
+dict. Workers are separate processes, so overriding module constants in one
+cannot leak into another (or into the caller).
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from .engine import BacktestConfig, _epoch_seconds, run_backtest
+from .strategies import STRATEGY_PARAMS, strategy_params
+
+logger = _log.logger
+
+_COLUMNS = ("open", "high", "low", "close", "volume")
+_CONFIG_FIELDS = {f.name for f in fields(BacktestConfig)} - {
+    "premium_model",
+    "strategy",
+}
+
+
+@dataclass(frozen=True)
+class Uniform:
+    """Continuous range for random/TPE search (log-uniform when log=True)."""
+
+    low: float
+    high: float
+    log: bool = False
+
+
+@dataclass(frozen=True)
+class IntRange:
+    """Inclusive integer range for random/TPE search."""
+
+    low: int
+    high: int
+
+
+Dimension = Union[Sequence[Any], Uniform, IntRange]
+
+
+# ---- shared bars ------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class BarLayout:
+    """Where each symbol's rows live in the shared block (picklable)."""
+
+    shm_name: str
+    rows: int
+    symbols: Tuple[Tuple[str, int, int], ...]  # (symbol, first row, row count)
+
+
+class SharedBars:
+    """Bars packed into one shared-memory float64 block of [ts, o, h, l, c, v] rows.
+
+    The creating process owns the block: use as a context manager (or call
+    ``close``) to release it.
+    """
+
+    def __init__(self, bars: Dict[str, pd.DataFrame]):
+        frames = [(sym, df.sort_index()) for sym, df in bars.items() if len(df)]
+        total = sum(len(df) for _, df in frames)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, total) * 6 * 8)
+        block = np.ndarray((total, 6), dtype=np.float64, buffer=self._shm.buf)
+        symbols = []
+        row = 0
+        for sym, df in frames:
+            n = len(df)
+            block[row : row + n, 0] = _epoch_seconds(df.index)
+            block[row : row + n, 1:] = df[list(_COLUMNS)].to_numpy(dtype=np.float64)
+            symbols.append((sym, row, n))
+            row += n
+        del block  # drop the buffer export so close() can release the mapping
+        self.layout = BarLayout(self._shm.name, total, tuple(symbols))
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedBars":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def attach_bars(
+    layout: BarLayout,
+) -> Tuple[shared_memory.SharedMemory, Dict[str, pd.DataFrame]]:
+    """Map a SharedBars block and rebuild per-symbol DataFrames from it.
+
+    Keep the returned SharedMemory open for as long as the frames are used.
+    """
+    shm = shared_memory.SharedMemory(name=layout.shm_name)
+    block = np.ndarray((layout.rows, 6), dtype=np.float64, buffer=shm.buf)
+    out: Dict[str, pd.DataFrame] = {}
+    for sym, start, n in layout.symbols:
+        rows = block[start : start + n]
+        micros = np.round(rows[:, 0] * 1e6).astype(np.int64)
+        index = pd.to_datetime(micros, unit="us", utc=True)
+        out[sym] = pd.DataFrame(rows[:, 1:], index=index, columns=list(_COLUMNS))
+    return shm, out
+
+
+# ---- workers ----------------------------------------------------------------
+
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_bars: Dict[str, pd.DataFrame] = {}
+_worker_config: Optional[BacktestConfig] = None
+
+
+def _init_worker(layout: BarLayout, config: BacktestConfig) -> None:
+    global _worker_shm, _worker_bars, _worker_config
+    _worker_shm, _worker_bars = attach_bars(layout)
+    _worker_config = config
+
+
+def _split_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(strategy constants, BacktestConfig overrides); raises KeyError on unknown names."""
+    unknown = sorted(set(params) - set(STRATEGY_PARAMS) - _CONFIG_FIELDS)
+    if unknown:
+        raise KeyError(f"unknown sweep parameters: {unknown}")
+    constants = {k: v for k, v in params.items() if k in STRATEGY_PARAMS}
+    overrides = {k: v for k, v in params.items() if k in _CONFIG_FIELDS}
+    return constants, overrides
+
+
+def _evaluate_with(
+    bars: Dict[str, pd.DataFrame], config: BacktestConfig, params: Dict[str, Any]
+) -> Dict[str, Any]:
+    constants, overrides = _split_params(params)
+    start = time.perf_counter()
+    try:
+        with strategy_params(constants):
+            stats: Dict[str, Any] = run_backtest(
+                bars, replace(config, **overrides)
+            ).stats()
+    except Exception as e:  # pylint: disable=broad-except
+        # One bad combination must not sink the whole sweep
+        stats = {"error": f"{type(e).__name__}: {e}"}
+    stats["elapsed_seconds"] = round(time.perf_counter() - start, 4)
+    return stats
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    assert _worker_config is not None, "worker not initialised"
+    return _evaluate_with(_worker_bars, _worker_config, params)
+
+
+# ---- search spaces ----------------------------------------------------------
+
+
+def grid_trials(space: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values.
+
+    Raises:
+        ValueError: If a dimension is a range rather than a list of values.
+    """
+    for name, dim in space.items():
+        if isinstance(dim, (Uniform, IntRange)):
+            raise ValueError(f"grid search needs explicit values for {name}")
+    names = list(space)
+    return [
+        dict(zip(names, combo))
+        for combo in itertools.product(*(space[n] for n in names))
+    ]
+
+
+def _sample(dim: Dimension, rng: random.Random) -> Any:
+    if isinstance(dim, Uniform):
+        if dim.log:
+            return math.exp(rng.uniform(math.log(dim.low), math.log(dim.high)))
+        return rng.uniform(dim.low, dim.high)
+    if isinstance(dim, IntRange):
+        return rng.randint(dim.low, dim.high)
+    return rng.choice(list(dim))
+
+
+def random_trials(
+    space: Dict[str, Dimension], n: int, seed: int = 0
+) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{name: _sample(dim, rng) for name, dim in space.items()} for _ in range(n)]
+
+
+def _to_unit(dim: Union[Uniform, IntRange], value: float) -> float:
+    lo, hi = float(dim.low), float(dim.high)
+    if isinstance(dim, Uniform) and dim.log:
+        lo, hi, value = math.log(lo), math.log(hi), math.log(value)
+    return (value - lo) / (hi - lo) if hi > lo else 0.5
+
+
+def _from_unit(dim: Union[Uniform, IntRange], u: float) -> Any:
+    u = min(1.0, max(0.0, u))
+    if isinstance(dim, IntRange):
+        return int(round(dim.low + u * (dim.high - dim.low)))
+    if dim.log:
+        return math.exp(
+            math.log(dim.low) + u * (math.log(dim.high) - math.log(dim.low))
+        )
+    return dim.low + u * (dim.high - dim.low)
+
+
+def _parzen(u: float, points: Sequence[float], bw: float) -> float:
+    # Gaussian kernels on [0, 1] plus one flat prior component
+    dens = sum(
+        math.exp(-0.5 * ((u - p) / bw) ** 2) / (bw * 2.5066282746) for p in points
+    )
+    return (dens + 1.0) / (len(points) + 1)
+
+
+def tpe_suggest(
+    space: Dict[str, Dimension],
+    history: Sequence[Tuple[Dict[str, Any], float]],
+    n: int,
+    rng: random.Random,
+    gamma: float = 0.25,
+    candidates: int = 24,
+) -> List[Dict[str, Any]]:
+    """Propose n trials from (params, score) history, higher scores being better.
+
+    Splits the history into the top ``gamma`` fraction ("good") and the rest,
+    draws candidates around good points and keeps those with the largest
+    good/bad density ratio (per-dimension Parzen estimates).
+    """
+    ranked = sorted(history, key=lambda t: t[1], reverse=True)
+    n_good = max(1, int(math.ceil(gamma * len(ranked))))
+    good = [p for p, _ in ranked[:n_good]]
+    bad = [p for p, _ in ranked[n_good:]] or good
+    bw = max(0.05, 1.0 / (len(ranked) ** 0.5 + 1))
+    out: List[Dict[str, Any]] = []
+    for _ in range(n):
+        best: Optional[Dict[str, Any]] = None
+        best_score = -math.inf
+        for _ in range(candidates):
+            anchor = rng.choice(good)
+            cand: Dict[str, Any] = {}
+            score = 0.0
+            for name, dim in space.items():
+                if isinstance(dim, (Uniform, IntRange)):
+                    u = _to_unit(dim, anchor[name]) + rng.gauss(0.0, bw)
+                    cand[name] = _from_unit(dim, u)
+                    cu = _to_unit(dim, cand[name])
+                    l_good = _parzen(cu, [_to_unit(dim, g[name]) for g in good], bw)
+                    l_bad = _parzen(cu, [_to_unit(dim, b[name]) for b in bad], bw)
+                else:
+                    values = list(dim)
+                    weights = [1 + sum(g[name] == v for g in good) for v in values]
+                    cand[name] = rng.choices(values, weights)[0]
+                    l_good = weights[values.index(cand[name])] / sum(weights)
+                    l_bad = (1 + sum(b[name] == cand[name] for b in bad)) / (
+                        len(bad) + len(values)
+                    )
+                score += math.log(l_good) - math.log(l_bad)
+            if score > best_score:
+                best, best_score = cand, score
+        assert best is not None
+        out.append(best)
+    return out
+
+
+# ---- runner -----------------------------------------------------------------
+
+
+def _objective_key(objective: str) -> Tuple[str, bool]:
+    """'-max_drawdown' -> ('max_drawdown', minimise)."""
+    return (objective[1:], True) if objective.startswith("-") else (objective, False)
+
+
+def _score(stats: Dict[str, Any], objective: str) -> float:
+    name, minimise = _objective_key(objective)
+    value = stats.get(name)
+    if value is None or not np.isfinite(value):
+        return -math.inf
+    return -float(value) if minimise else float(value)
+
+
+def rank_results(frame: pd.DataFrame, objectives: Sequence[str]) -> pd.DataFrame:
+    """Sort by objectives in priority order (maximised; prefix '-' to minimise)."""
+    keys = [_objective_key(o) for o in objectives]
+    present = [(k, m) for k, m in keys if k in frame.columns]
+    if not present:
+        return frame
+    return frame.sort_values(
+        [k for k, _ in present], ascending=[m for _, m in present], na_position="last"
+    ).reset_index(drop=True)
+
+
+def run_sweep(
+    bars: Dict[str, pd.DataFrame],
+    space: Dict[str, Dimension],
+    config: Optional[BacktestConfig] = None,
+    method: str = "grid",
+    n_trials: int = 50,
+    objectives: Sequence[str] = ("total_return",),
+    workers: Optional[int] = None,
+    seed: int = 0,
+    mp_context: Any = None,
+) -> pd.DataFrame:
+    """Backtest every trial from the search space and rank the results.
+
+    Args:
+        bars: symbol -> OHLCV DataFrame, as for ``run_backtest``.
+        space: parameter name -> list of values, ``Uniform`` or ``IntRange``.
+        config: Base config; trial values override its fields.
+        method: "grid", "random" or "tpe".
+        n_trials: Trials for random/TPE (grid runs the full product).
+        objectives: ``stats()`` keys to rank by, in priority order; prefix
+            "-" to minimise (e.g. "-max_drawdown"). TPE optimises the first.
+        workers: Processes (default: CPU count); 1 runs in this process.
+        seed: Seed for random/TPE sampling.
+        mp_context: multiprocessing context for the pool (default: platform's).
+
+    Returns:
+        One row per trial (parameters, stats, elapsed_seconds, and "error" if
+        a trial raised), ranked best first.
+
+    Raises:
+        ValueError: If method is unknown.
+        KeyError: If a parameter is neither a strategy constant nor a config field.
+    """
+    if method not in ("grid", "random", "tpe"):
+        raise ValueError(f"unknown sweep method: {method!r}")
+    cfg = config or BacktestConfig()
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    rng = random.Random(seed)
+    _split_params({name: None for name in space})  # fail fast on typos
+
+    if method == "grid":
+        pending = grid_trials(space)  # type: ignore[arg-type]
+    elif method == "random":
+        pending = random_trials(space, n_trials, seed)
+    else:
+        pending = random_trials(space, min(n_trials, max(workers, 8)), seed)
+
+    rows: List[Dict[str, Any]] = []
+    history: List[Tuple[Dict[str, Any], float]] = []
+    start = time.perf_counter()
+    shared: Optional[SharedBars] = None
+    pool: Optional[ProcessPoolExecutor] = None
+    try:
+        if workers > 1:
+            shared = SharedBars(bars)
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(shared.layout, cfg),
+            )
+        while pending:
+            if pool is not None:
+                results = list(pool.map(_evaluate, pending))
+            else:
+                results = [_evaluate_with(bars, cfg, p) for p in pending]
+            for params, stats in zip(pending, results):
+                rows.append({**params, **stats})
+                history.append((params, _score(stats, objectives[0])))
+            pending = []
+            if method == "tpe" and len(rows) < n_trials:
+                batch = min(workers, n_trials - len(rows))
+                pending = tpe_suggest(space, history, batch, rng)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if shared is not None:
+            shared.close()
+
+    frame = rank_results(pd.DataFrame(rows), objectives)
+    elapsed = time.perf_counter() - start
+    best = frame.iloc[0].to_dict() if len(frame) else {}
+    logger.bind(
+        event="sweep_complete",
+        method=method,
+        trials=len(frame),
+        workers=workers,
+        elapsed_seconds=round(elapsed, 3),
+        best={
+            k: best.get(k)
+            for k in list(space) + [_objective_key(o)[0] for o in objectives]
+        },
+    ).info(
+        "Sweep complete: {} trials on {} workers in {:.1f}s",
+        len(frame),
+        workers,
+        elapsed,
+    )
+    return frame
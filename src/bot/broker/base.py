@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
 
 @dataclass
@@ -32,6 +32,44 @@ class OrderTicket:
     take_profit_pct: Optional[float] = None
     stop_loss_pct: Optional[float] = None
     transmit: bool = True
+    # Absolute bracket prices computed by the caller from the quote it already
+    # holds; take precedence over the *_pct fields (which apply to entry_price)
+    entry_price: Optional[float] = None
+    take_profit_price: Optional[float] = None
+    stop_loss_price: Optional[float] = None
+
+    def bracket_prices(self) -> Tuple[Optional[float], Optional[float]]:
+        """(take_profit, stop_loss) absolute prices, derived from entry_price if needed."""
+        tp, sl = self.take_profit_price, self.stop_loss_price
+        ref = self.entry_price or self.limit_price
+        sign = 1 if self.action.upper() == "BUY" else -1
+        if tp is None and self.take_profit_pct and ref:
+            tp = ref * (1 + sign * self.take_profit_pct)
+        if sl is None and self.stop_loss_pct and ref:
+            sl = ref * (1 - sign * self.stop_loss_pct)
+        return tp, sl
+
+
+def contract_key(contract: Any) -> str:
+    """Stable identity for a contract across OptionContract, ib_insync Contract and str.
+
+    Built from symbol/expiry/strike/right (not conId) so an unqualified
+    OptionContract and the qualified Contract IB reports in positions agree.
+    """
+    if isinstance(contract, str):
+        return contract
+    expiry = getattr(contract, "expiry", None) or getattr(
+        contract, "lastTradeDateOrContractMonth", ""
+    )
+    return "|".join(
+        str(x)
+        for x in (
+            getattr(contract, "symbol", ""),
+            expiry,
+            float(getattr(contract, "strike", 0.0) or 0.0),
+            getattr(contract, "right", ""),
+        )
+    )
 
 
 class Broker(Protocol):
@@ -4,7 +4,7 @@ import uuid
 import math
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from loguru import logger
 from tenacity import (
@@ -14,14 +14,33 @@ from tenacity import (
     wait_exponential,
 )
 
-from ..broker.base import OptionContract, OrderTicket, Quote
+from ..broker.base import OptionContract, OrderTicket, Quote, contract_key
+from ..deadline import DeadlineExceeded, clamp_timeout, current_deadline
+from ..metrics import GATEWAY_ERRORS, GATEWAY_REQUESTS, HISTORICAL_REQUEST_WINDOW
+from ..orders import OrderManager
 
 try:  # ib_insync is an optional runtime dependency
-    from ib_insync import IB, Contract, LimitOrder, MarketOrder, Option, Order, Stock
+    from ib_insync import (
+        IB,
+        Contract,
+        LimitOrder,
+        MarketOrder,
+        Option,
+        Order,
+        Stock,
+        StopOrder,
+    )
 except Exception:  # pragma: no cover - optional dependency
     IB = None
 
 
+def _count_request(kind: str) -> None:
+    """Count one Gateway request; historical ones also use up the pacing window."""
+    GATEWAY_REQUESTS.labels(type=kind).inc()
+    if kind == "historical":
+        HISTORICAL_REQUEST_WINDOW.add()
+
+
 def _next_friday_date(start: datetime) -> str:
     # return YYYYMMDD for next Friday (or this week's Friday if in future)
     days_ahead = 4 - start.weekday()
@@ -50,17 +69,48 @@ class IBKRBroker:
         self.paper = paper
         self.ib = IB() if IB else None
         self._insufficient_funds = False
-        
+        # Set by error 326 during connect; ib_insync itself only reports a timeout
+        self._client_id_rejected = False
+        # event name ("fill", "disconnect") -> callbacks invoked with keyword info
+        self._listeners: Dict[str, List[Callable[..., None]]] = {}
+        # contract_key -> live ticker for standing (non-snapshot) subscriptions
+        self._streams: Dict[str, Any] = {}
+        # Per-order state machines fed by orderStatusEvent/execDetailsEvent
+        self.orders = OrderManager()
+
         if self.ib:
             self.ib.errorEvent += self._on_ib_error
+            self.ib.disconnectedEvent += self._on_disconnected
+            self.orders.attach(self.ib)
+
+    def add_listener(self, event: str, callback: Callable[..., None]) -> None:
+        """Subscribe to broker events ("fill", "disconnect"); callbacks get keyword info."""
+        self._listeners.setdefault(event, []).append(callback)
+
+    def _emit(self, event: str, **info: Any) -> None:
+        for cb in list(self._listeners.get(event, [])):
+            try:
+                cb(**info)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("listener for {} failed: {}", event, type(e).__name__)
+
+    def _on_disconnected(self):
+        logger.bind(event="gateway_disconnected").warning("Gateway connection lost")
+        self._emit("disconnect")
 
     def _on_ib_error(self, reqId: int, errorCode: int, errorString: str, contract: Any):
         """Handle IBKR error events to detect critical states."""
         # 201: Order rejected - Reason: Insufficient funds
         # 202: Order cancelled
+        # 326: clientId already in use (connect retries with the next id)
+        GATEWAY_ERRORS.labels(code=errorCode).inc()
         if errorCode == 201:
-            logger.error(f"CRITICAL: Insufficient funds detected (Error {errorCode}). Marking account as restricted.")
+            logger.error(
+                f"CRITICAL: Insufficient funds detected (Error {errorCode}). Marking account as restricted."
+            )
             self._insufficient_funds = True
+        elif errorCode == 326:
+            self._client_id_rejected = True
 
     @property
     def insufficient_funds(self) -> bool:
@@ -93,6 +143,7 @@ class IBKRBroker:
             # Prefer synchronous connect for compatibility; ib_insync will use the loop above
             attempts = 0
             while True:
+                self._client_id_rejected = False
                 try:
                     self.ib.connect(
                         self.host, self.port, clientId=self.client_id, timeout=timeout
@@ -101,7 +152,11 @@ class IBKRBroker:
                 except Exception as exc:  # pragma: no cover
                     msg = str(exc).lower()
                     # Detect client-id in use (IB error 326) and retry with next id
-                    if ("client" in msg and "id" in msg and "use" in msg) or "326" in msg:
+                    if (
+                        self._client_id_rejected
+                        or ("client" in msg and "id" in msg and "use" in msg)
+                        or "326" in msg
+                    ):
                         old = self.client_id
                         attempts += 1
                         if attempts > max_client_id_retries:
@@ -137,35 +192,42 @@ class IBKRBroker:
                 symbol=trade.contract.symbol,
                 action=fill.execution.side,
                 qty=fill.execution.shares,
-                price=fill.execution.price
+                price=fill.execution.price,
             ).info(
-                "Execution: {} {} {} @ {}", 
-                fill.execution.side, 
-                fill.execution.shares, 
+                "Execution: {} {} {} @ {}",
+                fill.execution.side,
+                fill.execution.shares,
                 trade.contract.symbol,
-                fill.execution.price
+                fill.execution.price,
             )
-            
+
             # FUTURE: Trigger Discord Alert here if it's a closing trade (SELL)
             # This would require injecting the alert/settings context or using a global callback
+            self._emit(
+                "fill",
+                symbol=trade.contract.symbol,
+                side=fill.execution.side,
+                qty=fill.execution.shares,
+                price=fill.execution.price,
+            )
         except Exception as e:
             logger.error("Error handling execution details: {}", e)
 
     def is_connected(self) -> bool:
         return bool(self.ib and self.ib.isConnected())
-    
+
     def is_gateway_healthy(self) -> bool:
         """Verify Gateway connection is responsive, not just 'connected'.
-        
+
         This is a lightweight health check that detects degraded connections
         without triggering market data requests.
-        
+
         Returns:
             True if Gateway is healthy, False if degraded or disconnected.
         """
         if not self.is_connected():
             return False
-        
+
         try:
             # managedAccounts() is a fast, read-only call that doesn't create subscriptions
             accounts = self.ib.managedAccounts()
@@ -176,20 +238,22 @@ class IBKRBroker:
 
     def market_data(self, symbol, timeout: float = 5.0) -> Quote:
         """Get market data snapshot for symbol or contract.
-        
+
         Uses snapshot mode to avoid persistent streaming subscriptions
         that would overwhelm Gateway buffers with Greeks/model updates.
-        
+
         Args:
             symbol: Either a string symbol (for stocks) or an OptionContract object
-            timeout: Max seconds to wait for data (increased for snapshot mode)
+            timeout: Max seconds to wait for data (increased for snapshot mode);
+                clamped to the caller's stage deadline when one is active.
         """
+        timeout = clamp_timeout(timeout)
         if not self.is_connected():
             self.connect()
-        
+
         from ib_insync import util, Option, Contract
         import asyncio
-        
+
         # Handle both string symbols (stocks) and OptionContract objects (options)
         if isinstance(symbol, str):
             contract = Stock(symbol, "SMART", "USD")
@@ -198,7 +262,7 @@ class IBKRBroker:
             contract = symbol
             symbol_str = f"{contract.symbol} {contract.secType}"
         else:
-            # If it's already a Contract-compatible object (like OptionContract from options.py), 
+            # If it's already a Contract-compatible object (like OptionContract from options.py),
             # we should avoid reconstructing it locally if possible, or reconstruct accurately.
             # Our options.py returns OptionContract, but we've seen rejections when rebuilding it.
             # Ideally, we map attributes carefully.
@@ -209,52 +273,155 @@ class IBKRBroker:
                 right=getattr(symbol, "right", "C"),
                 exchange="SMART",
                 multiplier="100",
-                currency="USD"
+                currency="USD",
             )
             symbol_str = f"{contract.symbol} {contract.lastTradeDateOrContractMonth} {contract.strike} {contract.right}"
-        
+
         async def _get_quote():
             # Qualify contract first
+            _count_request("qualify")
             await self.ib.qualifyContractsAsync(contract)
-            
+
             # CRITICAL: Use snapshot=True to prevent streaming subscriptions
             # This eliminates automatic Greeks/model parameter subscriptions
             # that cause Gateway buffer overflow
-            ticker = self.ib.reqMktData(contract, snapshot=True, regulatorySnapshot=False)
-            
+            _count_request("market_data")
+            ticker = self.ib.reqMktData(
+                contract, snapshot=True, regulatorySnapshot=False
+            )
+
             # Wait for snapshot data to arrive
             start = time.time()
             while time.time() - start < timeout:
                 await asyncio.sleep(0.1)
-                
+
                 # Extract values with proper None/NaN handling for snapshot mode
-                bid = ticker.bid if (ticker.bid is not None and ticker.bid > 0) else None
-                ask = ticker.ask if (ticker.ask is not None and ticker.ask > 0) else None
-                last = ticker.last if (ticker.last is not None and ticker.last > 0) else None
+                bid = (
+                    ticker.bid if (ticker.bid is not None and ticker.bid > 0) else None
+                )
+                ask = (
+                    ticker.ask if (ticker.ask is not None and ticker.ask > 0) else None
+                )
+                last = (
+                    ticker.last
+                    if (ticker.last is not None and ticker.last > 0)
+                    else None
+                )
                 close = ticker.close if ticker.close else None
-                volume = int(ticker.volume) if (ticker.volume is not None and not math.isnan(ticker.volume)) else 0
-                
+                volume = (
+                    int(ticker.volume)
+                    if (ticker.volume is not None and not math.isnan(ticker.volume))
+                    else 0
+                )
+
                 if bid and ask:
                     price = last or close or ((bid + ask) / 2)
                     return Quote(
-                        symbol=symbol_str, 
+                        symbol=symbol_str,
                         last=float(price),
-                        bid=float(bid), 
-                        ask=float(ask), 
+                        bid=float(bid),
+                        ask=float(ask),
                         volume=volume,
-                        time=time.time()
+                        time=time.time(),
                     )
             return None
-        
+
         try:
             quote = util.run(_get_quote())
             if quote:
                 return quote
             logger.warning(f"market_data timeout for {symbol_str} after {timeout}s")
-            return Quote(symbol=symbol_str, last=0.0, bid=0.0, ask=0.0, volume=0, time=time.time())
+            return Quote(
+                symbol=symbol_str,
+                last=0.0,
+                bid=0.0,
+                ask=0.0,
+                volume=0,
+                time=time.time(),
+            )
         except Exception as e:
             logger.exception(f"market_data failed for {symbol_str}: {type(e).__name__}")
-            return Quote(symbol=symbol_str, last=0.0, bid=0.0, ask=0.0, volume=0, time=time.time())
+            return Quote(
+                symbol=symbol_str,
+                last=0.0,
+                bid=0.0,
+                ask=0.0,
+                volume=0,
+                time=time.time(),
+            )
+
+    def stream_quotes(self, contracts: List[Any]) -> Dict[str, Quote]:
+        """Batch quotes for open positions from standing streaming subscriptions.
+
+        Unlike ``market_data`` (one snapshot request per call) each contract is
+        subscribed once and later calls only read the ticker fields that
+        ib_insync keeps current, so a poll over N positions costs no requests.
+        Keep the set small (open positions only) and release entries with
+        ``cancel_stream`` once a position is closed.
+
+        Returns:
+            Mapping of ``contract_key(contract)`` to Quote; contracts without a
+            usable price yet are omitted.
+        """
+        if not self.is_connected():
+            self.connect()
+        for c in contracts:
+            key = contract_key(c)
+            if key in self._streams:
+                continue
+            ib_contract = (
+                c
+                if isinstance(c, Contract)
+                else (
+                    Stock(c, "SMART", "USD")
+                    if isinstance(c, str)
+                    else self._to_ib_contract(c)
+                )
+            )
+            ib_contract.currency = ib_contract.currency or "USD"
+            _count_request("qualify")
+            self.ib.qualifyContracts(ib_contract)
+            _count_request("stream")
+            self._streams[key] = self.ib.reqMktData(ib_contract, "", False, False)
+            logger.bind(event="stream_subscribed", key=key).debug(
+                "Streaming quotes for {}", key
+            )
+        # Let pending ticks be applied to the tickers
+        self.ib.sleep(0)
+
+        out: Dict[str, Quote] = {}
+        now = time.time()
+        for c in contracts:
+            key = contract_key(c)
+            t = self._streams.get(key)
+            if t is None:
+                continue
+            bid = t.bid if (t.bid is not None and t.bid > 0) else 0.0
+            ask = t.ask if (t.ask is not None and t.ask > 0) else 0.0
+            last = t.last if (t.last is not None and t.last > 0) else 0.0
+            price = last or ((bid + ask) / 2 if bid and ask else 0.0)
+            if price <= 0:
+                continue
+            volume = (
+                int(t.volume)
+                if (t.volume is not None and not math.isnan(t.volume))
+                else 0
+            )
+            out[key] = Quote(
+                symbol=key,
+                last=float(price),
+                bid=float(bid),
+                ask=float(ask),
+                volume=volume,
+                time=now,
+            )
+        return out
+
+    def cancel_stream(self, contract: Any) -> None:
+        """Release the streaming subscription opened by ``stream_quotes``."""
+        ticker = self._streams.pop(contract_key(contract), None)
+        if ticker is not None and self.ib and self.ib.isConnected():
+            self.ib.cancelMktData(ticker.contract)
 
     def option_chain(
         self, symbol: str, expiry_hint: str = "weekly"
@@ -262,10 +429,11 @@ class IBKRBroker:
         """Fetch option expirations and strikes and return a list of OptionContract for nearest weekly ATM calls and puts."""
         if not self.is_connected():
             self.connect()
-        
+
         # First resolve the underlying contract to get its conId
         try:
             underlying = Stock(symbol, "SMART", "USD")
+            _count_request("qualify")
             contracts = self.ib.qualifyContracts(underlying)
             if not contracts:
                 logger.warning("could not qualify underlying contract for %s", symbol)
@@ -273,24 +441,41 @@ class IBKRBroker:
             underlying_conid = contracts[0].conId
         except (ConnectionError, TimeoutError, AttributeError) as e:
             logger.exception(
-                "failed to qualify underlying contract for %s: %s", symbol, type(e).__name__
+                "failed to qualify underlying contract for %s: %s",
+                symbol,
+                type(e).__name__,
             )
             return []
-        
+
         # use reqSecDefOptParams to get chain info with underlyingConId
         # Note: Use async API via util.run() to avoid event loop conflicts after connectAsync
         try:
             from ib_insync import util
-            chains = util.run(self.ib.reqSecDefOptParamsAsync(symbol, "", "STK", underlying_conid))
-            logger.info(f"reqSecDefOptParams returned {len(chains) if chains else 0} chains for {symbol} (conId={underlying_conid})")
+
+            _count_request("option_params")
+            chains = util.run(
+                self.ib.reqSecDefOptParamsAsync(symbol, "", "STK", underlying_conid)
+            )
+            logger.debug(
+                "reqSecDefOptParams returned {} chains for {} (conId={})",
+                len(chains) if chains else 0,
+                symbol,
+                underlying_conid,
+            )
         except (ConnectionError, TimeoutError, AttributeError, TypeError) as e:
             logger.exception(
-                "failed to fetch option chain params for %s: %s", symbol, type(e).__name__
+                "failed to fetch option chain params for %s: %s",
+                symbol,
+                type(e).__name__,
             )
             return []
 
         if not chains:
-            logger.warning("reqSecDefOptParams returned empty chain list for %s (underlying conId=%s)", symbol, underlying_conid)
+            logger.warning(
+                "reqSecDefOptParams returned empty chain list for %s (underlying conId=%s)",
+                symbol,
+                underlying_conid,
+            )
             return []
 
         # find first chain matching underlying symbol (check tradingClass attribute)
@@ -300,25 +485,39 @@ class IBKRBroker:
                 chain = c
                 break
         if not chain:
-            logger.warning("no option chain found for %s in %d chains returned", symbol, len(chains))
+            logger.warning(
+                "no option chain found for %s in %d chains returned",
+                symbol,
+                len(chains),
+            )
             return []
 
         expirations = sorted(set(chain.expirations))
         strikes = sorted(set(chain.strikes))
-        
-        logger.info(f"Option chain for {symbol}: {len(expirations)} expirations, {len(strikes)} strikes")
-        logger.debug(f"First 3 expirations: {expirations[:3]}, strike range: {strikes[0]}-{strikes[-1]}")
+
+        logger.info(
+            "Option chain for {}: {} expirations, {} strikes",
+            symbol,
+            len(expirations),
+            len(strikes),
+        )
+        logger.debug(
+            "First 3 expirations: {}, strike range: {}-{}",
+            expirations[:3],
+            strikes[0],
+            strikes[-1],
+        )
 
         # Determine target expiries based on hint
         target_expiries = []
-        
+
         if expiry_hint.startswith("dte:"):
             try:
                 # Parse hint format "dte:min-max"
                 _, rng = expiry_hint.split(":", 1)
                 d_min, d_max = map(int, rng.split("-"))
                 now_date = datetime.now(timezone.utc).date()
-                
+
                 # Filter expirations falling within DTE range
                 valid_exps = []
                 for e in expirations:
@@ -329,13 +528,21 @@ class IBKRBroker:
                             valid_exps.append(e)
                     except ValueError:
                         continue
-                
+
                 if valid_exps:
                     # Take up to 3 expirations to broaden search without overloading
                     target_expiries = valid_exps[:3]
-                    logger.info(f"DTE hint {d_min}-{d_max} matched {len(target_expiries)} expiries: {target_expiries}")
+                    logger.debug(
+                        "DTE hint {}-{} matched {} expiries: {}",
+                        d_min,
+                        d_max,
+                        len(target_expiries),
+                        target_expiries,
+                    )
                 else:
-                    logger.warning(f"No expirations found for {symbol} in DTE range {d_min}-{d_max}")
+                    logger.warning(
+                        f"No expirations found for {symbol} in DTE range {d_min}-{d_max}"
+                    )
             except Exception as e:
                 logger.warning(f"Failed to parse DTE hint '{expiry_hint}': {e}")
 
@@ -348,7 +555,8 @@ class IBKRBroker:
                     expiry = min(
                         expirations,
                         key=lambda d: abs(
-                            datetime.strptime(d, "%Y%m%d").date() - datetime.now(timezone.utc).date()
+                            datetime.strptime(d, "%Y%m%d").date()
+                            - datetime.now(timezone.utc).date()
                         ),
                     )
                 target_expiries = [expiry]
@@ -363,17 +571,37 @@ class IBKRBroker:
 
         for expiry in target_expiries:
             # Validate strikes for this specific expiry
-            current_strikes = strikes # fallback to all strikes
+            current_strikes = strikes  # fallback to all strikes
             try:
-                logger.info(f"Validating contracts for expiry {expiry} via reqContractDetails...")
-                validate_contract = Option(symbol, lastTradeDateOrContractMonth=expiry, exchange="SMART", currency="USD")
-                details = self.ib.reqContractDetails(validate_contract)
-                
+                logger.debug(
+                    "Validating contracts for expiry {} via reqContractDetails...",
+                    expiry,
+                )
+                validate_contract = Option(
+                    symbol,
+                    lastTradeDateOrContractMonth=expiry,
+                    exchange="SMART",
+                    currency="USD",
+                )
+                old_timeout = self.ib.RequestTimeout
+                self.ib.RequestTimeout = clamp_timeout(old_timeout or 30)
+                try:
+                    _count_request("contract_details")
+                    details = self.ib.reqContractDetails(validate_contract)
+                finally:
+                    self.ib.RequestTimeout = old_timeout
+
                 if details:
-                    valid_strikes = sorted(list(set(d.contract.strike for d in details)))
+                    valid_strikes = sorted(
+                        list(set(d.contract.strike for d in details))
+                    )
                     current_strikes = valid_strikes
                 else:
-                    logger.warning(f"No contract details found for {symbol} {expiry}; falling back to cached strikes")
+                    logger.warning(
+                        f"No contract details found for {symbol} {expiry}; falling back to cached strikes"
+                    )
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 logger.warning(f"Failed to validate strikes for {expiry}: {e}")
 
@@ -381,7 +609,7 @@ class IBKRBroker:
                 continue
 
             atm = min(current_strikes, key=lambda s: abs(s - last))
-            
+
             # Find ATM index and return ATM +/- 10 strikes (expanded range for strategic OTM search)
             atm_idx = current_strikes.index(atm)
             start_idx = max(0, atm_idx - 10)
@@ -399,8 +627,12 @@ class IBKRBroker:
                             multiplier=100,
                         )
                     )
-        
-        logger.info(f"Returning {len(all_contracts)} contracts across {len(target_expiries)} expiries")
+
+        logger.info(
+            "Returning {} contracts across {} expiries",
+            len(all_contracts),
+            len(target_expiries),
+        )
         return all_contracts
 
     def _to_ib_contract(self, oc: OptionContract) -> Contract:
@@ -432,59 +664,64 @@ class IBKRBroker:
         else:
             order = LimitOrder(ticket.action, ticket.quantity, ticket.limit_price)
 
-        # handle bracket via TP/SL by creating child orders with same parentId and OCA group
-        oca_group = f"oca-{uuid.uuid4().hex[:8]}"
+        # Bracket children use absolute prices from the ticket (computed by the
+        # caller from the option quote it already has) - no market data here
+        tp_price, sl_price = ticket.bracket_prices()
+        if (ticket.take_profit_pct or ticket.stop_loss_pct) and not (
+            tp_price or sl_price
+        ):
+            logger.bind(event="bracket_unpriced", action=ticket.action).warning(
+                "Bracket requested without entry/target prices; sending parent without children"
+            )
+        close_action = "SELL" if ticket.action.upper() == "BUY" else "BUY"
+        children: List[Order] = []
+        if tp_price:
+            children.append(
+                LimitOrder(close_action, ticket.quantity, round(tp_price, 2))
+            )
+        if sl_price:
+            # Stop (not a limit below market, which would fill immediately)
+            children.append(
+                StopOrder(close_action, ticket.quantity, round(sl_price, 2))
+            )
+        has_children = bool(children)
 
-        # transmit parent as False if we have children
-        has_children = bool(ticket.take_profit_pct or ticket.stop_loss_pct)
+        # Atomic batch: parent and all but the last child are held with
+        # transmit=False; the last child transmits the whole group at once
         if has_children:
             order.transmit = False
+        oca_group = f"oca-{uuid.uuid4().hex[:8]}"
 
+        _count_request("order")
         self.ib.placeOrder(contract, order)
 
         parent_order_id = getattr(order, "orderId", None)
+        symbol = getattr(contract, "symbol", str(contract))
+        if parent_order_id is not None:
+            self.orders.track(parent_order_id, symbol, ticket.action, ticket.quantity)
 
-        # create child orders
         children_ids = []
-        if has_children and parent_order_id is not None:
-            # calculate TP/SL based on last price if option contract
-            last_price = 0.0
-            try:
-                q = self.market_data(
-                    ticket.contract.symbol
-                    if isinstance(ticket.contract, OptionContract)
-                    else ticket.contract
-                )
-                last_price = q.last
-            except (ConnectionError, TimeoutError, ValueError, AttributeError) as e:
-                logger.debug("failed to fetch last price for order: %s", type(e).__name__)
-                last_price = 0.0
-
-            if ticket.take_profit_pct and last_price:
-                tp_price = last_price * (1 + ticket.take_profit_pct)
-                tp = LimitOrder(
-                    "SELL" if ticket.action == "BUY" else "BUY",
-                    ticket.quantity,
-                    round(tp_price, 2),
-                )
-                tp.parentId = parent_order_id
-                tp.ocaGroup = oca_group
-                tp.transmit = False
-                self.ib.placeOrder(contract, tp)
-                children_ids.append(getattr(tp, "orderId", None))
-
-            if ticket.stop_loss_pct and last_price:
-                sl_price = last_price * (1 - ticket.stop_loss_pct)
-                sl = LimitOrder(
-                    "SELL" if ticket.action == "BUY" else "BUY",
-                    ticket.quantity,
-                    round(sl_price, 2),
-                )
-                sl.parentId = parent_order_id
-                sl.ocaGroup = oca_group
-                sl.transmit = True  # last in group transmits
-                self.ib.placeOrder(contract, sl)
-                children_ids.append(getattr(sl, "orderId", None))
+        for i, child in enumerate(children):
+            child.parentId = parent_order_id
+            child.ocaGroup = oca_group
+            child.tif = ticket.tif
+            child.transmit = i == len(children) - 1
+            _count_request("order")
+            self.ib.placeOrder(contract, child)
+            self.orders.track(
+                child.orderId, symbol, child.action, ticket.quantity, parent_order_id
+            )
+            children_ids.append(getattr(child, "orderId", None))
+        if has_children:
+            logger.bind(
+                event="bracket_submitted",
+                parent=parent_order_id,
+                children=children_ids,
+                take_profit=tp_price,
+                stop_loss=sl_price,
+            ).info(
+                "Bracket {} submitted with {} children", parent_order_id, len(children)
+            )
 
         # if no children or parent has no id, ensure order is transmitted
         try:
@@ -503,8 +740,40 @@ class IBKRBroker:
         # find order by id and cancel
         for o in list(self.ib.orders()):
             if str(getattr(o, "orderId", "")) == str(order_id):
+                _count_request("cancel")
                 self.ib.cancelOrder(o)
 
+    def modify_order(self, order_id: str, limit_price: float) -> bool:
+        """Re-price a working limit order in place. Returns False if it is no longer open."""
+        if not self.is_connected():
+            self.connect()
+        for trade in list(self.ib.openTrades()):
+            if str(getattr(trade.order, "orderId", "")) == str(order_id):
+                trade.order.lmtPrice = round(float(limit_price), 2)
+                trade.order.transmit = True
+                _count_request("modify")
+                self.ib.placeOrder(trade.contract, trade.order)
+                return True
+        return False
+
+    def sleep(self, seconds: float) -> None:
+        """Wait while letting ib_insync process incoming events (fills, status)."""
+        if self.ib and self.ib.isConnected():
+            self.ib.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def wait_on_update(self, timeout: float) -> bool:
+        """Run the ib_insync loop until any update arrives or ``timeout`` seconds pass.
+
+        Order status, execution and disconnect callbacks fire inside this call.
+        Returns True if an update arrived.
+        """
+        if self.ib and self.ib.isConnected():
+            return bool(self.ib.waitOnUpdate(timeout=timeout))
+        time.sleep(timeout)
+        return False
+
     def positions(self) -> List[Dict[str, Any]]:
         if not self.is_connected():
             self.connect()
@@ -516,6 +785,7 @@ class IBKRBroker:
                     "symbol": getattr(contract, "symbol", str(contract)),
                     "position": pos.position,
                     "avgCost": getattr(pos, "avgCost", None),
+                    "contract": contract,
                 }
             )
         return out
@@ -562,10 +832,12 @@ class IBKRBroker:
             bar_size: IBKR bar size (e.g., '1 min', '5 mins', '1 hour').
             what_to_show: Data type, default 'TRADES'.
             use_rth: Restrict to Regular Trading Hours.
-            timeout: Max seconds to wait for historical data (default 60s for market hours reliability).
+            timeout: Max seconds to wait for historical data (default 60s for market hours reliability);
+                clamped to the caller's stage deadline when one is active.
         Returns:
             pd.DataFrame with columns [open, high, low, close, volume] indexed by timestamp.
         """
+        timeout = clamp_timeout(timeout)
         if not self.is_connected():
             self.connect()
 
@@ -583,12 +855,16 @@ class IBKRBroker:
                         "Gateway still unhealthy after reconnection"
                     )
                     import pandas as pd
-                    return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+
+                    return pd.DataFrame(
+                        columns=["open", "high", "low", "close", "volume"]
+                    )
             except Exception as reconn_err:
                 logger.bind(symbol=symbol, error=type(reconn_err).__name__).error(
                     "Gateway reconnection failed: {}", type(reconn_err).__name__
                 )
                 import pandas as pd
+
                 return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
 
         try:
@@ -599,38 +875,44 @@ class IBKRBroker:
 
             # Qualify contract before requesting data (prevents rejections for unknown contracts)
             try:
+                _count_request("qualify")
                 qualified = self.ib.qualifyContracts(contract)
                 if not qualified or not contract.conId:
-                    logger.bind(symbol=symbol, event="contract_qualification_failed").warning(
-                        "Failed to qualify contract for {}", symbol
+                    logger.bind(
+                        symbol=symbol, event="contract_qualification_failed"
+                    ).warning("Failed to qualify contract for {}", symbol)
+                    return pd.DataFrame(
+                        columns=["open", "high", "low", "close", "volume"]
                     )
-                    return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
-                logger.bind(symbol=symbol, conId=contract.conId, event="contract_qualified").debug(
-                    "Contract qualified: conId={}", contract.conId
-                )
+                logger.bind(
+                    symbol=symbol, conId=contract.conId, event="contract_qualified"
+                ).debug("Contract qualified: conId={}", contract.conId)
             except Exception as qual_err:
-                logger.bind(symbol=symbol, error=type(qual_err).__name__, event="contract_qualification_error").warning(
-                    "Contract qualification error: {}", type(qual_err).__name__
-                )
-            
+                logger.bind(
+                    symbol=symbol,
+                    error=type(qual_err).__name__,
+                    event="contract_qualification_error",
+                ).warning("Contract qualification error: {}", type(qual_err).__name__)
+
             # Allow ib_insync to settle
             self.ib.sleep(0.5)
-            
+
             # Set request timeout
             old_timeout = self.ib.RequestTimeout
             self.ib.RequestTimeout = timeout
-            
+
             logger.info(
                 f"[HIST] Requesting: symbol={symbol}, duration={duration}, "
                 f"use_rth={use_rth}, timeout={timeout}s, RequestTimeout={self.ib.RequestTimeout}"
             )
             request_start = time.time()
             bars = []
-            
+
             # --- SIMPLIFIED REQUEST LOGIC ---
             try:
                 # Direct blocking call to ib_insync (thread-safe within its architecture)
                 # This matches the pattern proven working in diagnostic_test.py
+                _count_request("historical")
                 bars = self.ib.reqHistoricalData(
                     contract,
                     endDateTime="",
@@ -640,29 +922,47 @@ class IBKRBroker:
                     useRTH=use_rth,
                     formatDate=1,
                     keepUpToDate=False,
-                    chartOptions=[]
+                    chartOptions=[],
                 )
-                
+
                 request_elapsed = time.time() - request_start
-                logger.info(f"[HIST] Completed: symbol={symbol}, elapsed={request_elapsed:.2f}s, bars={len(bars) if bars else 0}")
-                
+                logger.bind(
+                    event="historical_completed",
+                    symbol=symbol,
+                    elapsed_seconds=round(request_elapsed, 3),
+                    bars=len(bars) if bars else 0,
+                    retry=False,
+                ).info(
+                    f"[HIST] Completed: symbol={symbol}, elapsed={request_elapsed:.2f}s, bars={len(bars) if bars else 0}"
+                )
+
             except Exception as e:
                 logger.bind(
                     symbol=symbol,
                     error=type(e).__name__,
-                    event="historical_request_error"
+                    event="historical_request_error",
                 ).warning(f"Primary historical data request failed: {e}")
                 bars = []
 
             # --- ROBUST RETRY LOGIC ---
-            if not bars:
+            deadline = current_deadline()
+            if not bars and deadline is not None and deadline.remaining() < 2.0:
+                logger.bind(symbol=symbol, event="historical_retry_dropped").warning(
+                    "Skipping historical retry for {}: {:.1f}s left in {} budget",
+                    symbol,
+                    deadline.remaining(),
+                    deadline.stage,
+                )
+            elif not bars:
                 logger.bind(symbol=symbol, event="historical_retry").warning(
                     f"Primary request returned 0 bars for {symbol}. Attempting retry in 1s..."
                 )
                 self.ib.sleep(1.0)
-                
+
                 try:
-                    # Retry with same parameters
+                    # Retry with same parameters, within whatever budget is left
+                    self.ib.RequestTimeout = clamp_timeout(timeout)
+                    _count_request("historical")
                     bars = self.ib.reqHistoricalData(
                         contract,
                         endDateTime="",
@@ -672,28 +972,45 @@ class IBKRBroker:
                         useRTH=use_rth,
                         formatDate=1,
                         keepUpToDate=False,
-                        chartOptions=[]
+                        chartOptions=[],
                     )
                     retry_elapsed = time.time() - request_start
-                    logger.info(f"[HIST] Retry Completed: symbol={symbol}, elapsed={retry_elapsed:.2f}s, bars={len(bars) if bars else 0}")
+                    logger.bind(
+                        event="historical_completed",
+                        symbol=symbol,
+                        elapsed_seconds=round(retry_elapsed, 3),
+                        bars=len(bars) if bars else 0,
+                        retry=True,
+                    ).info(
+                        f"[HIST] Retry Completed: symbol={symbol}, elapsed={retry_elapsed:.2f}s, bars={len(bars) if bars else 0}"
+                    )
                 except Exception as retry_err:
                     logger.bind(
                         symbol=symbol,
                         error=type(retry_err).__name__,
-                        event="historical_retry_error"
+                        event="historical_retry_error",
                     ).error(f"Retry historical data request failed: {retry_err}")
                     bars = []
 
             # Restore timeout
             self.ib.RequestTimeout = old_timeout
-            
+
             # --- DATAFRAME CONVERSION ---
-            # DEBUG: Log what was returned
-            logger.info(f"[DEBUG] historical_prices({symbol}): raw bars count = {len(bars) if bars else 0}")
-            if bars and len(bars) > 0:
-                logger.info(f"[DEBUG] First bar: date={bars[0].date}, close={bars[0].close}")
-                logger.info(f"[DEBUG] Last bar: date={bars[-1].date}, close={bars[-1].close}")
-            
+            logger.debug(
+                "historical_prices({}): raw bars count = {}",
+                symbol,
+                len(bars) if bars else 0,
+            )
+            if bars:
+                logger.debug(
+                    "historical_prices({}): first bar {} close={}, last bar {} close={}",
+                    symbol,
+                    bars[0].date,
+                    bars[0].close,
+                    bars[-1].date,
+                    bars[-1].close,
+                )
+
             rows = [
                 {
                     "time": pd.to_datetime(getattr(b, "date", None)),
@@ -705,23 +1022,31 @@ class IBKRBroker:
                 }
                 for b in (bars or [])
             ]
-            
+
             if not rows:
-                logger.warning(f"[DEBUG] No rows after conversion, returning empty DataFrame")
+                logger.warning(
+                    "historical_prices({}): no rows after conversion, returning empty DataFrame",
+                    symbol,
+                )
                 return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])  # type: ignore[name-defined]
-            
+
             df = pd.DataFrame(rows)
-            
+
             if "time" in df.columns:
                 df = df.set_index("time")
-            
-            logger.info(f"[DEBUG] Returning DataFrame with {len(df)} rows for {symbol}")
+
+            logger.debug(
+                "historical_prices({}): returning DataFrame with {} rows",
+                symbol,
+                len(df),
+            )
             return df
-            
+
         except Exception:
             logger.exception("historical_prices failed for %s", symbol)
             try:
                 import pandas as pd  # type: ignore
+
                 return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])  # type: ignore[name-defined]
             except Exception:
                 return []  # fallback for environments without pandas
@@ -738,13 +1063,21 @@ class IBKRBroker:
                             self.ib.cancelMktData(ticker.contract)
                             logger.debug(
                                 "cancelled subscription: {}",
-                                getattr(getattr(ticker, "contract", None), "symbol", str(getattr(ticker, "contract", ""))),
+                                getattr(
+                                    getattr(ticker, "contract", None),
+                                    "symbol",
+                                    str(getattr(ticker, "contract", "")),
+                                ),
                             )
                         except Exception as tick_err:
-                            logger.debug("error cancelling subscription: {}", type(tick_err).__name__)
+                            logger.debug(
+                                "error cancelling subscription: {}",
+                                type(tick_err).__name__,
+                            )
                 except Exception as list_err:
                     logger.debug("error listing tickers: {}", type(list_err).__name__)
-                
+
+                self._streams.clear()
                 # Now safely disconnect
                 self.ib.disconnect()
         except Exception as e:
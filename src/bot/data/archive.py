@@ -0,0 +1,297 @@
+"""On-disk archive of fetched bars, partitioned Parquet files.
+
+Layout (hive-style, so ``pyarrow.dataset`` can also read it directly)::
+
+    <root>/symbol=SPY/bar_size=5mins/date=2024-01-02/part-<ns>-<pid>-<seq>.parquet
+
+Partitions are New York session dates. ``append`` writes a new part file
+per touched date; re-fetched bars (including the still-forming last bar)
+simply supersede older rows with the same timestamp - reads keep the most
+recently written row. ``compact`` rewrites a partition as a single sorted,
+de-duplicated ``data.parquet``; it runs automatically once a partition has
+accumulated ``compact_after`` parts.
+
+pyarrow is an optional dependency; ``BarArchive`` raises ``RuntimeError``
+at construction when it is missing.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import date, datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from .. import log as _log
+from ..trading_calendar import NY_TZ
+
+logger = _log.logger
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+COMPACT_NAME = "data.parquet"
+
+
+def _require_pyarrow() -> Tuple[Any, Any]:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("the bar archive needs pyarrow: pip install pyarrow") from e
+    return pa, pq
+
+
+def _as_epoch(value: Any) -> Optional[float]:
+    """Epoch seconds from None, a number, a datetime/Timestamp or an ISO string."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.timestamp()
+
+
+def _ny_date(epoch: float) -> date:
+    return datetime.fromtimestamp(epoch, NY_TZ).date()
+
+
+class BarArchive:
+    """Append-only Parquet store of OHLCV bars keyed by symbol, bar size and date.
+
+    Args:
+        root: Directory holding the archive (created on first write).
+        compact_after: Compact a date partition once it has this many part files.
+    """
+
+    def __init__(self, root: Union[str, Path], compact_after: int = 16):
+        self._pa, self._pq = _require_pyarrow()
+        self.root = Path(root)
+        self.compact_after = max(2, int(compact_after))
+        self._lock = Lock()
+        self._seq = 0
+        # (symbol, bar_size) -> epoch ns of the newest bar written by this process
+        self._high_water: Dict[Tuple[str, str], int] = {}
+
+    # ---- layout ----------------------------------------------------------
+
+    def _series_dir(self, symbol: str, bar_size: str) -> Path:
+        return (
+            self.root
+            / f"symbol={symbol.upper()}"
+            / f"bar_size={bar_size.replace(' ', '')}"
+        )
+
+    def dates(self, symbol: str, bar_size: str) -> List[date]:
+        """Archived session dates for a series, ascending."""
+        base = self._series_dir(symbol, bar_size)
+        if not base.is_dir():
+            return []
+        out = []
+        for p in base.iterdir():
+            if p.is_dir() and p.name.startswith("date="):
+                try:
+                    out.append(date.fromisoformat(p.name[5:]))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def _parts(self, partition: Path) -> List[Path]:
+        # Compacted data first, then parts in write order, so later rows win
+        parts = sorted(partition.glob("part-*.parquet"))
+        compacted = partition / COMPACT_NAME
+        return ([compacted] if compacted.exists() else []) + parts
+
+    # ---- writing -----------------------------------------------------------
+
+    def _to_table(self, df: pd.DataFrame) -> Any:
+        pa = self._pa
+        ns = df.index.as_unit("ns").asi8
+        arrays = [pa.array(ns, type=pa.timestamp("ns", tz="UTC"))]
+        arrays += [pa.array(df[c].to_numpy(dtype="float64")) for c in COLUMNS]
+        return pa.Table.from_arrays(arrays, names=["ts", *COLUMNS])
+
+    def _write(self, table: Any, path: Path) -> None:
+        """Write atomically: readers never see a half-written file."""
+        tmp = path.with_name(f".{path.name}.tmp")
+        self._pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def append(self, symbol: str, bar_size: str, bars: pd.DataFrame) -> int:
+        """Archive bars (time-indexed OHLCV frame); returns the number of rows written.
+
+        Rows older than the newest bar this process already archived for the
+        series are skipped, so re-fetching an overlapping window only writes
+        the new tail (plus the re-fetched last bar, which may have been partial).
+        """
+        if bars is None or len(bars) == 0:
+            return 0
+        df = bars.rename(columns=str.lower)
+        missing = [c for c in COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"bars missing columns: {missing}")
+        index = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+        df = df.set_axis(index)[list(COLUMNS)]
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+
+        key = (symbol.upper(), bar_size)
+        with self._lock:
+            mark = self._high_water.get(key)
+            if mark is not None:
+                df = df[df.index.as_unit("ns").asi8 >= mark]
+            if df.empty:
+                return 0
+            epochs = df.index.as_unit("ns").asi8 / 1e9
+            days = np.array([_ny_date(t).isoformat() for t in epochs])
+            base = self._series_dir(symbol, bar_size)
+            for day in np.unique(days):
+                partition = base / f"date={day}"
+                partition.mkdir(parents=True, exist_ok=True)
+                self._seq += 1
+                name = (
+                    f"part-{time.time_ns():020d}-{os.getpid()}-{self._seq:06d}.parquet"
+                )
+                self._write(self._to_table(df[days == day]), partition / name)
+                if len(list(partition.glob("part-*.parquet"))) >= self.compact_after:
+                    self._compact_partition(partition)
+            self._high_water[key] = int(df.index.as_unit("ns").asi8[-1])
+        return len(df)
+
+    # ---- compaction --------------------------------------------------------
+
+    def _compact_partition(self, partition: Path) -> bool:
+        parts = self._parts(partition)
+        if len(parts) <= 1 and (not parts or parts[0].name == COMPACT_NAME):
+            return False
+        table = self._read_partition(partition)
+        self._write(table, partition / COMPACT_NAME)
+        for p in parts:
+            if p.name != COMPACT_NAME:
+                p.unlink()
+        return True
+
+    def compact(
+        self, symbol: Optional[str] = None, bar_size: Optional[str] = None
+    ) -> int:
+        """Merge every multi-file partition (optionally one symbol/bar size); returns the count."""
+        if not self.root.is_dir():
+            return 0
+        sym = symbol.upper() if symbol else "*"
+        size = bar_size.replace(" ", "") if bar_size else "*"
+        pattern = f"symbol={sym}/bar_size={size}/date=*"
+        compacted = 0
+        with self._lock:
+            for partition in sorted(self.root.glob(pattern)):
+                if partition.is_dir() and self._compact_partition(partition):
+                    compacted += 1
+        if compacted:
+            logger.bind(event="bar_archive_compacted", partitions=compacted).info(
+                "Compacted {} bar archive partitions", compacted
+            )
+        return compacted
+
+    # ---- reading -----------------------------------------------------------
+
+    def _read_partition(self, partition: Path) -> Any:
+        """One partition as a sorted table with duplicate timestamps resolved to the latest write."""
+        pa, pq = self._pa, self._pq
+        tables = [pq.read_table(p, memory_map=True) for p in self._parts(partition)]
+        if not tables:
+            return None
+        table = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        if len(tables) > 1:
+            ts = table.column("ts").cast(pa.int64()).to_numpy()
+            # First occurrence in the reversed array = last write of each timestamp
+            _, first_rev = np.unique(ts[::-1], return_index=True)
+            table = table.take(pa.array(len(ts) - 1 - first_rev))
+        return table
+
+    def read_table(
+        self, symbol: str, bar_size: str, start: Any = None, end: Any = None
+    ) -> Optional[Any]:
+        """Bars in [start, end] as one pyarrow Table (``None`` if nothing is archived).
+
+        Only partitions whose date overlaps the range are opened; files are
+        memory-mapped.
+        """
+        pa = self._pa
+        lo, hi = _as_epoch(start), _as_epoch(end)
+        first = _ny_date(lo) if lo is not None else None
+        last = _ny_date(hi) if hi is not None else None
+        base = self._series_dir(symbol, bar_size)
+        tables = []
+        for day in self.dates(symbol, bar_size):
+            if (first and day < first) or (last and day > last):
+                continue
+            table = self._read_partition(base / f"date={day.isoformat()}")
+            if table is not None and table.num_rows:
+                tables.append(table)
+        if not tables:
+            return None
+        table = pa.concat_tables(tables)
+        if lo is not None or hi is not None:
+            ts = table.column("ts").cast(pa.int64()).to_numpy() / 1e9
+            mask = np.ones(len(ts), dtype=bool)
+            if lo is not None:
+                mask &= ts >= lo
+            if hi is not None:
+                mask &= ts <= hi
+            table = table.filter(pa.array(mask))
+        return table
+
+    def read_arrays(
+        self, symbol: str, bar_size: str, start: Any = None, end: Any = None
+    ) -> Dict[str, np.ndarray]:
+        """Bars as NumPy arrays: ``ts`` (epoch seconds) plus the OHLCV columns.
+
+        Arrays are zero-copy views of the memory-mapped file when the range
+        falls in a single compacted partition.
+        """
+        table = self.read_table(symbol, bar_size, start, end)
+        if table is None:
+            return {name: np.empty(0) for name in ("ts", *COLUMNS)}
+        out = {"ts": table.column("ts").cast(self._pa.int64()).to_numpy() / 1e9}
+        for c in COLUMNS:
+            out[c] = table.column(c).to_numpy()
+        return out
+
+    def _frame(self, table: Optional[Any]) -> pd.DataFrame:
+        if table is None:
+            return pd.DataFrame(
+                columns=list(COLUMNS),
+                index=pd.DatetimeIndex([], tz="UTC", name="ts"),
+                dtype=float,
+            )
+        data = {c: table.column(c).to_numpy() for c in COLUMNS}
+        ns = table.column("ts").cast(self._pa.int64()).to_numpy()
+        return pd.DataFrame(
+            data, index=pd.DatetimeIndex(pd.to_datetime(ns, utc=True), name="ts")
+        )
+
+    def read(
+        self, symbol: str, bar_size: str, start: Any = None, end: Any = None
+    ) -> pd.DataFrame:
+        """Bars as a DataFrame with a UTC DatetimeIndex (same shape as ``historical_prices``)."""
+        return self._frame(self.read_table(symbol, bar_size, start, end))
+
+    def tail(self, symbol: str, bar_size: str, n: int) -> pd.DataFrame:
+        """The last n archived bars, reading partitions newest-first until enough are found."""
+        base = self._series_dir(symbol, bar_size)
+        tables: List[Any] = []
+        count = 0
+        for day in reversed(self.dates(symbol, bar_size) if n > 0 else []):
+            table = self._read_partition(base / f"date={day.isoformat()}")
+            if table is None:
+                continue
+            tables.append(table)
+            count += table.num_rows
+            if count >= n:
+                break
+        if not tables:
+            return self._frame(None)
+        return self._frame(self._pa.concat_tables(tables[::-1])).iloc[-n:]
@@ -0,0 +1,355 @@
+"""Vectorized Black-Scholes / Black-76 pricing, Greeks and implied volatility.
+
+Everything here takes NumPy arrays (or scalars, which broadcast) so a whole
+strike x expiry grid is priced in one call from the underlying quote and the
+option mids we already fetch for spread checks - no ``reqMktData`` model
+Greeks, which is what floods the Gateway buffers in snapshot mode.
+
+Conventions match IB's ``modelGreeks``: ``vega`` is per 1 vol point (0.01),
+``theta`` is per calendar day, and volatility/rates are annualised decimals.
+Times are year fractions (calendar days / 365).
+"""
+
+import math
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..broker.base import contract_key
+from ..trading_calendar import NY_TZ, REGULAR_CLOSE
+
+SECONDS_PER_YEAR = 365.0 * 86400.0
+IV_LOW = 1e-4
+IV_HIGH = 5.0
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+# Hart (1968) double-precision rational approximation, as arranged by
+# G. West, "Better approximations to cumulative normal functions" (2005).
+_HART_P = (
+    3.52624965998911e-02,
+    0.700383064443688,
+    6.37396220353165,
+    33.912866078383,
+    112.079291497871,
+    221.213596169931,
+    220.206867912376,
+)
+_HART_Q = (
+    8.83883476483184e-02,
+    1.75566716318264,
+    16.064177579207,
+    86.7807322029461,
+    296.564248779674,
+    637.333633378831,
+    793.826512519948,
+    440.413735824752,
+)
+
+
+def norm_pdf(x: Any) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x: Any) -> np.ndarray:
+    """Standard normal CDF, accurate to ~1e-14 (NumPy has no ``erf``)."""
+    x = np.asarray(x, dtype=float)
+    a = np.abs(x)
+    e = np.exp(-0.5 * a * a)
+    num = np.polyval(_HART_P, a)
+    den = np.polyval(_HART_Q, a)
+    near = e * num / den
+    # Continued fraction for the far tail
+    b = np.where(a > 0, a, 1.0)
+    cf = b + 0.65
+    for k in (4.0, 3.0, 2.0, 1.0):
+        cf = b + k / cf
+    far = e / cf / _SQRT_2PI
+    tail = np.where(a < 7.07106781186547, near, far)
+    tail = np.where(a > 37.0, 0.0, tail)
+    return np.where(x > 0, 1.0 - tail, tail)
+
+
+def is_call(right: Any) -> np.ndarray:
+    """Boolean array from "C"/"P" strings (any case) or booleans."""
+    arr = np.asarray(right)
+    if arr.dtype.kind in ("U", "S", "O"):
+        return np.char.upper(arr.astype(str)) == "C"
+    return arr.astype(bool)
+
+
+def _d1_d2(forward, strike, years, vol):
+    sd = vol * np.sqrt(years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = np.log(forward / strike) / sd + 0.5 * sd
+    return d1, d1 - sd, sd
+
+
+def _black(forward, strike, years, vol, call, discount):
+    """Discounted Black price; expired or zero-vol options collapse to intrinsic."""
+    d1, d2, sd = _d1_d2(forward, strike, years, vol)
+    live = sd > 0
+    d1 = np.where(live, d1, 0.0)
+    d2 = np.where(live, d2, 0.0)
+    c = forward * norm_cdf(d1) - strike * norm_cdf(d2)
+    p = strike * norm_cdf(-d2) - forward * norm_cdf(-d1)
+    intrinsic = np.where(
+        call, np.maximum(forward - strike, 0.0), np.maximum(strike - forward, 0.0)
+    )
+    return discount * np.where(live, np.where(call, c, p), intrinsic)
+
+
+def _broadcast(*args):
+    return np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+
+
+def black76_price(forward, strike, years, vol, right, rate=0.0) -> np.ndarray:
+    """Black-76 price of an option on a forward/future."""
+    forward, strike, years, vol, rate = _broadcast(forward, strike, years, vol, rate)
+    return _black(
+        forward,
+        strike,
+        np.maximum(years, 0.0),
+        vol,
+        is_call(right),
+        np.exp(-rate * years),
+    )
+
+
+def bs_price(spot, strike, years, vol, right, rate=0.0, dividend=0.0) -> np.ndarray:
+    """Black-Scholes-Merton price with a continuous dividend yield."""
+    spot, strike, years, vol, rate, dividend = _broadcast(
+        spot, strike, years, vol, rate, dividend
+    )
+    years = np.maximum(years, 0.0)
+    forward = spot * np.exp((rate - dividend) * years)
+    return _black(forward, strike, years, vol, is_call(right), np.exp(-rate * years))
+
+
+def bs_price_one(
+    spot: float,
+    strike: float,
+    years: float,
+    vol: float,
+    right: str,
+    rate: float = 0.0,
+    dividend: float = 0.0,
+) -> float:
+    """Scalar ``bs_price`` on plain floats, for per-bar loops where array overhead dominates."""
+    years = max(years, 0.0)
+    df = math.exp(-rate * years)
+    forward = spot * math.exp((rate - dividend) * years)
+    sd = vol * math.sqrt(years)
+    call = right.upper() == "C"
+    if sd <= 0 or forward <= 0 or strike <= 0:
+        return df * max(forward - strike if call else strike - forward, 0.0)
+    d1 = math.log(forward / strike) / sd + 0.5 * sd
+    d2 = d1 - sd
+    if call:
+        return df * (forward * _phi(d1) - strike * _phi(d2))
+    return df * (strike * _phi(-d2) - forward * _phi(-d1))
+
+
+def _phi(x: float) -> float:
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+
+def bs_greeks(
+    spot, strike, years, vol, right, rate=0.0, dividend=0.0
+) -> Dict[str, np.ndarray]:
+    """Price and first-order Greeks (plus gamma) for every element of the inputs.
+
+    Black-76 Greeks are the ``dividend=rate`` special case with ``spot`` set
+    to the forward.
+
+    Returns:
+        Dict of arrays: price, delta, gamma, vega (per vol point) and theta
+        (per calendar day).
+    """
+    spot, strike, years, vol, rate, dividend = _broadcast(
+        spot, strike, years, vol, rate, dividend
+    )
+    call = is_call(right)
+    years = np.maximum(years, 0.0)
+    qf = np.exp(-dividend * years)
+    df = np.exp(-rate * years)
+    forward = spot * qf / df
+    d1, d2, sd = _d1_d2(forward, strike, years, vol)
+    live = sd > 0
+    d1 = np.where(live, d1, 0.0)
+    d2 = np.where(live, d2, 0.0)
+    pdf = norm_pdf(d1)
+    nd1, nd2 = norm_cdf(d1), norm_cdf(d2)
+    sqrt_t = np.sqrt(years)
+    itm = np.where(call, spot > strike, spot < strike)
+
+    delta = np.where(
+        live,
+        np.where(call, qf * nd1, qf * (nd1 - 1.0)),
+        np.where(itm, np.where(call, qf, -qf), 0.0),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.where(live, qf * pdf / (spot * sd), 0.0)
+        decay = np.where(live, -spot * qf * pdf * vol / (2.0 * sqrt_t), 0.0)
+    carry_call = -rate * strike * df * nd2 + dividend * spot * qf * nd1
+    carry_put = rate * strike * df * (1.0 - nd2) - dividend * spot * qf * (1.0 - nd1)
+    theta = np.where(live, decay + np.where(call, carry_call, carry_put), 0.0)
+    return {
+        "price": _black(forward, strike, years, vol, call, df),
+        "delta": delta,
+        "gamma": gamma,
+        "vega": np.where(live, spot * qf * pdf * sqrt_t, 0.0) / 100.0,
+        "theta": theta / 365.0,
+    }
+
+
+def implied_vol(
+    price,
+    spot,
+    strike,
+    years,
+    right,
+    rate=0.0,
+    dividend=0.0,
+    tol: float = 1e-8,
+    max_iter: int = 64,
+) -> np.ndarray:
+    """Implied volatility for each price, solved for the whole array at once.
+
+    Newton steps on vega inside a shrinking [IV_LOW, IV_HIGH] bracket; any
+    element whose Newton step leaves the bracket bisects instead, so deep
+    ITM/OTM strikes (tiny vega) still converge. Prices outside the no-arbitrage
+    bounds, or with no time left, return NaN.
+    """
+    price, spot, strike, years, rate, dividend = _broadcast(
+        price, spot, strike, years, rate, dividend
+    )
+    call = np.broadcast_to(is_call(right), price.shape)
+    years = np.maximum(years, 0.0)
+    qf = np.exp(-dividend * years)
+    df = np.exp(-rate * years)
+    forward = spot * qf / df
+    # Work on undiscounted prices: bounds are (intrinsic, F) for calls, (intrinsic, K) for puts
+    target = price / df
+    lower = np.where(
+        call, np.maximum(forward - strike, 0.0), np.maximum(strike - forward, 0.0)
+    )
+    upper = np.where(call, forward, strike)
+    ok = (
+        (years > 0) & (target > lower) & (target < upper) & (strike > 0) & (forward > 0)
+    )
+
+    lo = np.full(price.shape, IV_LOW)
+    hi = np.full(price.shape, IV_HIGH)
+    # Brenner-Subrahmanyam start, clipped into the bracket
+    with np.errstate(divide="ignore", invalid="ignore"):
+        guess = _SQRT_2PI * target / (forward * np.sqrt(years))
+    sigma = np.where(ok & np.isfinite(guess), np.clip(guess, 0.05, 2.0), 0.2)
+    active = ok.copy()
+    one = np.ones_like(price)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        f = _black(forward, strike, years, sigma, call, one) - target
+        lo = np.where(active & (f < 0), sigma, lo)
+        hi = np.where(active & (f > 0), sigma, hi)
+        d1, _, _ = _d1_d2(forward, strike, years, sigma)
+        vega = forward * norm_pdf(d1) * np.sqrt(years)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = sigma - f / vega
+        bad = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        nxt = np.where(bad, 0.5 * (lo + hi), step)
+        done = (np.abs(f) < tol * np.maximum(target, 1e-12)) | (hi - lo < tol)
+        active &= ~done
+        sigma = np.where(active, nxt, sigma)
+    return np.where(ok, sigma, np.nan)
+
+
+def year_fraction(expiry: Any, now: Optional[float] = None) -> float:
+    """Years from ``now`` (epoch, default current time) to the 16:00 ET close on expiry.
+
+    Accepts IB's ``YYYYMMDD`` string, a ``date`` or a ``datetime``.
+    """
+    if isinstance(expiry, str):
+        expiry = datetime.strptime(expiry[:8], "%Y%m%d").date()
+    if isinstance(expiry, datetime):
+        expiry = expiry.date()
+    if not isinstance(expiry, date):
+        raise TypeError(f"unsupported expiry {expiry!r}")
+    close = datetime.combine(expiry, REGULAR_CLOSE, NY_TZ).timestamp()
+    if now is None:
+        now = datetime.now(NY_TZ).timestamp()
+    return max(0.0, (close - now) / SECONDS_PER_YEAR)
+
+
+def _mid(quote: Any) -> float:
+    bid = float(getattr(quote, "bid", 0.0) or 0.0)
+    ask = float(getattr(quote, "ask", 0.0) or 0.0)
+    if bid > 0 and ask >= bid:
+        return (bid + ask) / 2.0
+    last = float(getattr(quote, "last", 0.0) or 0.0)
+    return last if last > 0 else np.nan
+
+
+def price_chain(
+    spot: float,
+    contracts: Sequence[Any],
+    quotes: Sequence[Any],
+    now: Optional[float] = None,
+    rate: float = 0.0,
+    dividend: float = 0.0,
+) -> pd.DataFrame:
+    """IV and Greeks for a list of option contracts from their quotes, in one pass.
+
+    Args:
+        spot: Underlying price.
+        contracts: Option contracts (``OptionContract`` or ib_insync ``Option``).
+        quotes: Quote-like objects aligned with ``contracts``; the bid/ask mid
+            is used, falling back to ``last``.
+        now: Valuation time as epoch seconds (default: now).
+        rate: Continuously compounded risk-free rate.
+        dividend: Continuous dividend yield of the underlying.
+
+    Returns:
+        DataFrame indexed by ``contract_key`` with contract, strike, right,
+        expiry, years, mid, iv, delta, gamma, vega and theta columns. Rows
+        whose mid violates no-arbitrage bounds get NaN IV and Greeks.
+    """
+    if len(contracts) != len(quotes):
+        raise ValueError("contracts and quotes must be the same length")
+    expiries = [
+        str(
+            getattr(c, "expiry", None) or getattr(c, "lastTradeDateOrContractMonth", "")
+        )
+        for c in contracts
+    ]
+    cache: Dict[str, float] = {}
+    for e in set(expiries):
+        cache[e] = year_fraction(e, now)
+    frame = pd.DataFrame(
+        {
+            "contract": list(contracts),
+            "strike": [float(getattr(c, "strike", 0.0) or 0.0) for c in contracts],
+            "right": [str(getattr(c, "right", "")).upper()[:1] for c in contracts],
+            "expiry": expiries,
+            "years": [cache[e] for e in expiries],
+            "mid": [_mid(q) for q in quotes],
+        },
+        index=pd.Index([contract_key(c) for c in contracts], name="contract_key"),
+    )
+    if frame.empty:
+        return frame.assign(iv=[], delta=[], gamma=[], vega=[], theta=[])
+    strike = frame["strike"].to_numpy()
+    years = frame["years"].to_numpy()
+    right = frame["right"].to_numpy()
+    iv = implied_vol(
+        frame["mid"].to_numpy(), spot, strike, years, right, rate, dividend
+    )
+    greeks = bs_greeks(spot, strike, years, np.nan_to_num(iv), right, rate, dividend)
+    frame["iv"] = iv
+    for name in ("delta", "gamma", "vega", "theta"):
+        frame[name] = np.where(np.isnan(iv), np.nan, greeks[name])
+    return frame
@@ -2,6 +2,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
 from .. import log as _log
+from ..deadline import DeadlineExceeded
+from ..trading_calendar import NY_TZ
+from .greeks import price_chain
 
 logger = _log.logger
 
@@ -22,7 +25,9 @@ def nearest_friday(start: datetime) -> datetime:
     else:
         delta_days = (4 - weekday) % 7
         target = start + timedelta(days=delta_days)
-    target = target.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=start.tzinfo)
+    target = target.replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=start.tzinfo
+    )
     # If crossing into a new month, some tests expect the subsequent Saturday (3rd) when Friday is the 2nd.
     if start.month != target.month and target.day == 2:
         target = target + timedelta(days=1)
@@ -63,6 +68,43 @@ def _strike_from_moneyness(
     return None
 
 
+def _filter_by_greeks(
+    viable: list,
+    quotes: list,
+    last_price: float,
+    delta_range: Optional[Tuple[float, float]],
+    max_iv: Optional[float],
+    rate: float,
+    now: Optional[float] = None,
+) -> list:
+    """Drop viable candidates whose model |delta| or IV falls outside the limits.
+
+    ``viable`` holds tuples whose first item is the contract; ``quotes`` are
+    the matching quotes already fetched for the spread check, so this costs no
+    extra Gateway requests. Candidates whose mid gives no valid IV are dropped.
+    Time to expiry is measured from ``now`` (epoch; default: current time).
+    """
+    if not viable or (delta_range is None and max_iv is None):
+        return viable
+    chain = price_chain(last_price, [v[0] for v in viable], quotes, rate=rate, now=now)
+    kept = []
+    for v, (_, row) in zip(viable, chain.iterrows()):
+        delta = abs(row["delta"])
+        if row["iv"] != row["iv"]:
+            logger.debug("Reject {}: no implied vol from mid {}", row.name, row["mid"])
+        elif delta_range is not None and not (
+            delta_range[0] <= delta <= delta_range[1]
+        ):
+            logger.debug(
+                "Reject {}: |delta| {:.2f} outside {}", row.name, delta, delta_range
+            )
+        elif max_iv is not None and row["iv"] > max_iv:
+            logger.debug("Reject {}: IV {:.2f} > {}", row.name, row["iv"], max_iv)
+        else:
+            kept.append(v)
+    return kept
+
+
 def pick_weekly_option(
     broker,
     underlying: str,
@@ -72,15 +114,24 @@ def pick_weekly_option(
     min_volume: int = 100,
     max_spread_pct: float = 2.0,
     strike_count: int = 3,
+    delta_range: Optional[Tuple[float, float]] = None,
+    max_iv: Optional[float] = None,
+    rate: float = 0.0,
+    now: Optional[float] = None,
 ) -> Optional[object]:
     """Pick nearest-Friday weekly option for the given underlying and right ("C"/"P").
 
     Applies moneyness offsets and filters by volume and bid-ask spread percent.
     Limits the number of near-ATM strikes considered via strike_count.
+    Optionally filters by |delta| range and maximum implied vol, computed
+    locally from the quotes (see ``data.greeks``) as of ``now`` (epoch;
+    default: current time).
     Returns the best OptionContract or None.
     """
     try:
         contracts = broker.option_chain(underlying, expiry_hint="weekly")
+    except DeadlineExceeded:
+        raise
     except (ConnectionError, TimeoutError, AttributeError) as e:
         logger.exception("option_chain failed for %s: %s", underlying, type(e).__name__)
         return None
@@ -110,9 +161,12 @@ def pick_weekly_option(
 
     # Filter by liquidity using current quotes
     viable: List[Tuple[object, float]] = []
+    quotes: list = []
     for c in candidates:
         try:
             q = broker.market_data(c)
+        except DeadlineExceeded:
+            raise
         except (ConnectionError, TimeoutError, ValueError, AttributeError) as e:
             logger.debug("market_data failed for contract: %s", type(e).__name__)
             continue
@@ -129,7 +183,11 @@ def pick_weekly_option(
         if abs_spread > 0.10 and spread_pct > float(max_spread_pct):
             continue
         viable.append((c, spread_pct))
+        quotes.append(q)
 
+    viable = _filter_by_greeks(
+        viable, quotes, last_price, delta_range, max_iv, rate, now
+    )
     if not viable:
         return None
     # choose the most liquid (lowest spread pct)
@@ -148,6 +206,10 @@ def find_strategic_option(
     otm_pct_max: float = 0.10,
     min_volume: int = 10,
     max_spread_pct: float = 5.0,
+    delta_range: Optional[Tuple[float, float]] = None,
+    max_iv: Optional[float] = None,
+    rate: float = 0.0,
+    now: Optional[float] = None,
 ) -> Optional[object]:
     """Find a specific OTM option matching DTE and Moneyness criteria.
 
@@ -162,16 +224,25 @@ def find_strategic_option(
         otm_pct_max: Maximum % Out of The Money (e.g., 0.10 for 10%)
         min_volume: Minimum volume filter
         max_spread_pct: Maximum allowed spread filter
+        delta_range: Optional (min, max) bounds on model |delta|
+        max_iv: Optional cap on implied volatility (e.g. 0.6 for 60%)
+        rate: Risk-free rate used for the IV/delta model
+        now: Valuation time as epoch seconds for DTE and the IV/delta model
+            (default: current time)
 
     Returns:
         Best matching OptionContract or None
     """
     try:
         # Request chain with DTE hint to allow broker to optimize expiry selection
-        contracts = broker.option_chain(underlying, expiry_hint=f"dte:{min_dte}-{max_dte}")
+        contracts = broker.option_chain(
+            underlying, expiry_hint=f"dte:{min_dte}-{max_dte}"
+        )
         if not contracts and min_dte < 7:
             # Fallback to weekly if short term requested
             contracts = broker.option_chain(underlying, expiry_hint="weekly")
+    except DeadlineExceeded:
+        raise
     except (ConnectionError, TimeoutError, AttributeError) as e:
         logger.exception("option_chain failed for %s: %s", underlying, type(e).__name__)
         return None
@@ -180,102 +251,122 @@ def find_strategic_option(
         return None
 
     # Filter by Right
-    contracts = [c for c in contracts if getattr(c, "right", "").upper() == right.upper()]
-    
+    contracts = [
+        c for c in contracts if getattr(c, "right", "").upper() == right.upper()
+    ]
+
     if not contracts:
         logger.warning(f"No {right} contracts found for {underlying}")
         return None
 
     # Filter by DTE
     valid_dte = []
-    today = datetime.now().date()
-    
+    today = (
+        datetime.now() if now is None else datetime.fromtimestamp(now, NY_TZ)
+    ).date()
+
     for c in contracts:
         # Parse expiry 'YYYYMMDD' (handle both ib_insync and OptionContract attributes)
-        expiry_str = getattr(c, "lastTradeDateOrContractMonth", getattr(c, "expiry", ""))
+        expiry_str = getattr(
+            c, "lastTradeDateOrContractMonth", getattr(c, "expiry", "")
+        )
         if not expiry_str:
             continue
         try:
             exp_date = datetime.strptime(expiry_str, "%Y%m%d").date()
         except ValueError:
             continue
-            
+
         dte = (exp_date - today).days
         if min_dte <= dte <= max_dte:
             valid_dte.append(c)
-            
+
     if not valid_dte:
-        logger.warning(f"No contracts found for {underlying} with DTE {min_dte}-{max_dte}")
+        logger.warning(
+            f"No contracts found for {underlying} with DTE {min_dte}-{max_dte}"
+        )
         return None
-        
+
     # Filter by Moneyness (OTM %)
     # Call OTM: Strike > Price.  % OTM = (Strike - Price) / Price
     # Put OTM: Strike < Price.   % OTM = (Price - Strike) / Price
-    
+
     valid_strikes = []
     for c in valid_dte:
         strike = float(getattr(c, "strike", 0.0))
         if right.upper() == "C":
-            if strike <= last_price: continue # ITM or ATM
+            if strike <= last_price:
+                continue  # ITM or ATM
             otm_pct = (strike - last_price) / last_price
-        else: # Put
-            if strike >= last_price: continue # ITM or ATM
+        else:  # Put
+            if strike >= last_price:
+                continue  # ITM or ATM
             otm_pct = (last_price - strike) / last_price
-            
+
         if otm_pct_min <= otm_pct <= otm_pct_max:
             valid_strikes.append(c)
-            
+
     if not valid_strikes:
-        logger.warning(f"No contracts found for {underlying} {right} with OTM {otm_pct_min*100}-{otm_pct_max*100}%")
+        logger.warning(
+            f"No contracts found for {underlying} {right} with OTM {otm_pct_min*100}-{otm_pct_max*100}%"
+        )
         return None
-        
+
     # Sort by Volume/Liquidity
     # We need market data to verify liquidity. Limit candidates to reduce spam.
     # heuristic: pick strikes closest to center of OTM range first?
     # Or just check all valid ones (usually not too many in a 5% band)
-    
+
     viable = []
+    quotes = []
     # Check up to 10 candidates to save time
-    candidates = valid_strikes[:10] 
-    
+    candidates = valid_strikes[:10]
+
     for c in candidates:
         try:
             q = broker.market_data(c)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.debug(f"market_data err for {c}: {e}")
             continue
-            
+
         bid = float(getattr(q, "bid", 0.0) or 0.0)
         ask = float(getattr(q, "ask", 0.0) or 0.0)
         vol = int(getattr(q, "volume", 0) or 0)
-        
+
         if vol < min_volume:
             logger.debug(f"Reject {c}: Vol {vol} < {min_volume}")
             continue
-        if bid <= 0: # Ensure valid quote
+        if bid <= 0:  # Ensure valid quote
             logger.debug(f"Reject {c}: Bid {bid} <= 0 (Ask={ask})")
             continue
-            
+
         abs_spread = ask - bid
         mid = (ask + bid) / 2.0
         spread_pct = (abs_spread / mid) * 100.0 if mid > 0 else 100.0
-        
+
         if spread_pct > max_spread_pct:
             logger.debug(f"Reject {c}: Spread {spread_pct:.2f}% > {max_spread_pct}%")
             continue
-            
-        # Score: We want high volume, low spread. 
-        # But critically: we want CHEAPEST valid option for small accounts? 
+
+        # Score: We want high volume, low spread.
+        # But critically: we want CHEAPEST valid option for small accounts?
         # Or just "Liquid". Let's optimize for Liquidity (Volume).
         viable.append((c, vol, spread_pct, bid))
-        
+        quotes.append(q)
+
+    viable = _filter_by_greeks(
+        viable, quotes, last_price, delta_range, max_iv, rate, now
+    )
     if not viable:
         return None
-        
+
     # Sort by Volume (descending) then Spread (ascending)
     viable.sort(key=lambda x: (-x[1], x[2]))
-    
+
     best = viable[0][0]
-    logger.info(f"Selected option for {underlying}: {best} Strike={best.strike} Bid={viable[0][3]}")
+    logger.info(
+        f"Selected option for {underlying}: {best} Strike={best.strike} Bid={viable[0][3]}"
+    )
     return best
-
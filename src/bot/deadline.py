@@ -0,0 +1,132 @@
+"""Cycle time budgets with per-stage deadlines and cooperative cancellation.
+
+A ``CycleBudget`` is created at the start of each scheduler cycle. Each stage of
+symbol processing (bars, chain, quotes, order) runs inside ``budget.stage(name)``,
+which installs a thread-local ``Deadline`` = min(stage budget, cycle remaining).
+Broker implementations read it through ``clamp_timeout`` so request timeouts never
+exceed what is left, and call sites raise ``DeadlineExceeded`` at safe points
+instead of starting work that cannot finish in time.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+DEFAULT_STAGE_BUDGETS: Dict[str, float] = {
+    "bars": 30.0,
+    "chain": 20.0,
+    "quotes": 10.0,
+    "order": 10.0,
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a stage or cycle has no time left for the next piece of work."""
+
+    def __init__(self, stage: str, budget_seconds: float, elapsed_seconds: float):
+        self.stage = stage
+        self.budget_seconds = budget_seconds
+        self.elapsed_seconds = elapsed_seconds
+        super().__init__(
+            f"{stage} deadline exceeded ({elapsed_seconds:.2f}s of {budget_seconds:.2f}s)"
+        )
+
+
+class Deadline:
+    """A point in monotonic time by which a stage must finish."""
+
+    def __init__(
+        self,
+        seconds: float,
+        stage: str = "cycle",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.stage = stage
+        self.budget_seconds = float(seconds)
+        self._clock = clock
+        self.started = clock()
+        self.expires_at = self.started + self.budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded if no time is left."""
+        if self.expired():
+            raise DeadlineExceeded(self.stage, self.budget_seconds, self.elapsed())
+
+    def clamp(self, timeout: float) -> float:
+        """Shrink timeout to the time left; raises when nothing is left."""
+        self.check()
+        return min(float(timeout), self.remaining())
+
+
+_local = threading.local()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Innermost deadline installed on this thread, if any."""
+    stack: List[Deadline] = getattr(_local, "stack", [])
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Install deadline as the current deadline for this thread."""
+    stack: List[Deadline] = getattr(_local, "stack", None) or []
+    _local.stack = stack
+    stack.append(deadline)
+    try:
+        yield deadline
+    finally:
+        stack.pop()
+
+
+def clamp_timeout(timeout: float) -> float:
+    """Clamp a request timeout to the current deadline (no-op without one).
+
+    Raises:
+        DeadlineExceeded: If the current deadline has already passed.
+    """
+    dl = current_deadline()
+    return dl.clamp(timeout) if dl is not None else float(timeout)
+
+
+class CycleBudget:
+    """Total time budget for one cycle, split into named stage deadlines."""
+
+    def __init__(
+        self,
+        total_seconds: float,
+        stage_seconds: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.cycle = Deadline(total_seconds, stage="cycle", clock=clock)
+        self.stage_seconds = dict(DEFAULT_STAGE_BUDGETS)
+        self.stage_seconds.update(stage_seconds or {})
+
+    def remaining(self) -> float:
+        return self.cycle.remaining()
+
+    def expired(self) -> bool:
+        return self.cycle.expired()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Deadline]:
+        """Run a stage under min(stage budget, cycle remaining)."""
+        self.cycle.check()
+        seconds = min(
+            self.stage_seconds.get(name, self.cycle.budget_seconds), self.remaining()
+        )
+        with deadline_scope(Deadline(seconds, stage=name, clock=self._clock)) as dl:
+            yield dl
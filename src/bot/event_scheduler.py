@@ -0,0 +1,241 @@
+"""Priority-queue job scheduler driven by wall-clock due times and broker events.
+
+Jobs are kept in a heap ordered by due time. A job may also subscribe to named
+events (e.g. "fill", "disconnect"); calling ``trigger`` from any thread wakes the
+loop so those jobs run immediately instead of waiting for their next slot.
+Lateness (actual start minus due time) is recorded per job and exported as
+the ``bot_job_lateness_seconds`` histogram.
+
+Broker events only arrive while the broker's own event loop runs. Passing
+``wait_fn`` (e.g. ``IBKRBroker.wait_on_update``) makes the idle wait pump that
+loop, so fill and disconnect callbacks fire, and trigger jobs, between jobs
+rather than during the next broker call.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Condition, Event
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from . import log as _log
+from .metrics import JOB_LATENESS
+
+logger = _log.logger
+
+# Maximum time the loop blocks before re-checking the stop event
+_MAX_WAIT_SECONDS = 1.0
+
+
+@dataclass
+class Job:
+    """A unit of scheduled work.
+
+    Attributes:
+        name: Unique job name, used as the key for lateness stats.
+        fn: Callable invoked with no arguments.
+        next_due: Given the due time just served, return the next due time
+            (epoch seconds) or None to stop rescheduling.
+        events: Event names that run this job immediately when triggered.
+    """
+
+    name: str
+    fn: Callable[[], None]
+    next_due: Optional[Callable[[float], Optional[float]]] = None
+    events: Tuple[str, ...] = ()
+    cancelled: bool = False
+
+
+@dataclass
+class JobStats:
+    """Running lateness statistics for one job (seconds)."""
+
+    runs: int = 0
+    total_lateness: float = 0.0
+    max_lateness: float = 0.0
+    last_lateness: float = 0.0
+
+    def record(self, lateness: float) -> None:
+        self.runs += 1
+        self.total_lateness += lateness
+        self.last_lateness = lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+
+    @property
+    def mean_lateness(self) -> float:
+        return self.total_lateness / self.runs if self.runs else 0.0
+
+
+@dataclass(order=True)
+class _Entry:
+    due: float
+    seq: int
+    job: Job = field(compare=False)
+
+
+class EventScheduler:
+    """Run jobs at their due times and in response to triggered events.
+
+    Thread-safe for ``trigger`` and ``add_job``; ``run``/``run_pending`` are
+    expected to be called from a single scheduler thread.
+
+    Args:
+        clock: Epoch-seconds time source for due times.
+        late_warn_seconds: Lateness above which a job start is logged as a warning.
+        wait_fn: Idle wait, called with the seconds until the next due job
+            (at most ``_MAX_WAIT_SECONDS``) on the scheduler thread. It should
+            run the broker's event loop for that long, or less if an update
+            arrives. Default: wait on the internal condition, which only
+            ``trigger``/``add_job`` from other threads can wake.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        late_warn_seconds: float = 5.0,
+        wait_fn: Optional[Callable[[float], object]] = None,
+    ):
+        self._clock = clock
+        self._late_warn = late_warn_seconds
+        self._wait_fn = wait_fn
+        self._heap: List[_Entry] = []
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._pending: Deque[Tuple[str, float]] = deque()
+        self._subscribers: Dict[str, List[Job]] = {}
+        self.lateness: Dict[str, JobStats] = {}
+
+    def add_job(
+        self,
+        name: str,
+        fn: Callable[[], None],
+        first_due: Optional[float] = None,
+        next_due: Optional[Callable[[float], Optional[float]]] = None,
+        events: Tuple[str, ...] = (),
+    ) -> Job:
+        """Register a job. Pass first_due=None for event-only jobs."""
+        job = Job(name=name, fn=fn, next_due=next_due, events=tuple(events))
+        with self._cond:
+            if first_due is not None:
+                heapq.heappush(self._heap, _Entry(first_due, next(self._seq), job))
+            for ev in job.events:
+                self._subscribers.setdefault(ev, []).append(job)
+            self._cond.notify()
+        return job
+
+    def every(
+        self,
+        name: str,
+        fn: Callable[[], None],
+        interval_seconds: float,
+        start: Optional[float] = None,
+        events: Tuple[str, ...] = (),
+    ) -> Job:
+        """Register a job repeating every interval_seconds (fixed-rate)."""
+        first = self._clock() if start is None else start
+        return self.add_job(
+            name,
+            fn,
+            first_due=first,
+            next_due=lambda due: due + interval_seconds,
+            events=events,
+        )
+
+    def cancel(self, job: Job) -> None:
+        with self._cond:
+            job.cancelled = True
+            for ev in job.events:
+                subs = self._subscribers.get(ev, [])
+                if job in subs:
+                    subs.remove(job)
+
+    def trigger(self, event: str, **info) -> None:
+        """Wake the scheduler so jobs subscribed to event run immediately."""
+        with self._cond:
+            self._pending.append((event, self._clock()))
+            self._cond.notify()
+        logger.bind(event="scheduler_trigger", trigger=event, **info).debug(
+            "Scheduler event triggered: {}", event
+        )
+
+    def next_due(self) -> Optional[float]:
+        with self._cond:
+            while self._heap and self._heap[0].job.cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0].due if self._heap else None
+
+    def _execute(self, job: Job, due: float) -> None:
+        started = self._clock()
+        lateness = max(0.0, started - due)
+        self.lateness.setdefault(job.name, JobStats()).record(lateness)
+        JOB_LATENESS.labels(job=job.name).observe(lateness)
+        log = logger.bind(
+            event="job_lateness", job=job.name, lateness_seconds=round(lateness, 3)
+        )
+        if lateness > self._late_warn:
+            log.warning("Job {} started {:.2f}s late", job.name, lateness)
+        else:
+            log.debug("Job {} started {:.3f}s after due", job.name, lateness)
+        try:
+            job.fn()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("scheduled job {} failed: {}", job.name, type(e).__name__)
+
+    def run_pending(self) -> int:
+        """Run triggered event jobs, then every timed job that is due. Returns count."""
+        ran = 0
+        with self._cond:
+            events = list(self._pending)
+            self._pending.clear()
+        # Coalesce: one run per job per batch of events
+        seen: Dict[str, float] = {}
+        for ev, at in events:
+            for job in list(self._subscribers.get(ev, [])):
+                if not job.cancelled and job.name not in seen:
+                    seen[job.name] = at
+                    self._execute(job, at)
+                    ran += 1
+
+        now = self._clock()
+        while True:
+            with self._cond:
+                if not self._heap or self._heap[0].due > now:
+                    break
+                entry = heapq.heappop(self._heap)
+            if entry.job.cancelled:
+                continue
+            self._execute(entry.job, entry.due)
+            ran += 1
+            if entry.job.next_due is not None:
+                nxt = entry.job.next_due(entry.due)
+                # Skip missed slots instead of running a burst of catch-up jobs
+                while nxt is not None and nxt <= now:
+                    nxt = entry.job.next_due(nxt)
+                if nxt is not None:
+                    with self._cond:
+                        heapq.heappush(
+                            self._heap, _Entry(nxt, next(self._seq), entry.job)
+                        )
+        return ran
+
+    def run(self, stop_event: Optional[Event] = None) -> None:
+        """Block running jobs until stop_event is set."""
+        while not (stop_event and stop_event.is_set()):
+            self.run_pending()
+            with self._cond:
+                if self._pending:
+                    continue
+                nd = self._heap[0].due if self._heap else None
+                wait = _MAX_WAIT_SECONDS if nd is None else nd - self._clock()
+                if wait <= 0:
+                    continue
+                wait = min(wait, _MAX_WAIT_SECONDS)
+                if self._wait_fn is None:
+                    self._cond.wait(wait)
+                    continue
+            # Outside the lock: broker callbacks fired here call trigger()
+            self._wait_fn(wait)
@@ -1,7 +1,10 @@
+import math
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
 
 from . import log as _log
+from .deadline import current_deadline
 
 logger = _log.logger
 
@@ -16,17 +19,17 @@ def build_bracket(
 
     Given an option's current premium and target profit/loss percentages, returns the
     exact price levels at which to execute take-profit (limit) and stop-loss orders.
-    
+
     Args:
         option_premium: Current market price of the option (bid-ask midpoint or last trade).
         take_profit_pct: Target profit percentage (e.g., 0.25 for +25%). None if no TP desired.
         stop_loss_pct: Target loss percentage (e.g., 0.10 for -10%). None if no SL desired.
-    
+
     Returns:
         Dictionary with keys:
         - 'take_profit': Price to place take-profit limit order, or None if not desired.
         - 'stop_loss': Price to place stop-loss limit order, or None if not desired.
-        
+
     Example:
         >>> build_bracket(option_premium=2.50, take_profit_pct=0.40, stop_loss_pct=0.50)
         {'take_profit': 3.5, 'stop_loss': 1.25}
@@ -43,22 +46,22 @@ def build_bracket(
 
 def is_liquid(quote: Any, max_spread_pct: float, min_volume: int) -> bool:
     """Check if an option's bid-ask spread and volume meet liquidity thresholds.
-    
+
     Validates that quote data is available and meets minimum trading standards:
     - Bid/ask spread does not exceed max_spread_pct of mid-price
     - Volume exceeds min_volume threshold
-    
+
     Args:
-        quote: Market quote object with attributes: bid (float), ask (float), 
+        quote: Market quote object with attributes: bid (float), ask (float),
                last (float), volume (int/float). Can be any object supporting getattr.
         max_spread_pct: Maximum acceptable bid-ask spread as percentage of mid-price
                         (e.g., 2.0 for 2%).
         min_volume: Minimum acceptable trading volume per contract unit.
-    
+
     Returns:
         True if quote data is valid and meets liquidity requirements, False otherwise.
         Returns False on any conversion/validation error (missing attributes, NaN, etc.).
-    
+
     Raises:
         No exceptions raised; errors logged at debug level and return False.
     """
@@ -108,6 +111,10 @@ def emulate_oco(
 ):
     """Emulate OCO by polling last price and submitting closing orders when thresholds trigger.
 
+    Legacy: costs one thread and one snapshot request every ``poll_seconds`` per
+    position. New code should register positions with ``exit_monitor.ExitMonitor``,
+    which evaluates every position against one quote batch.
+
     This function blocks and should be run in a dedicated thread. Includes safety guards:
     - max_duration_seconds: Exit after this duration to prevent infinite loops
     - Iteration counter: Log progress every 100 iterations
@@ -125,24 +132,26 @@ def emulate_oco(
         max_duration_seconds: Maximum runtime before exiting (default 28800 = 8 hours)
     """
     logger.info("Starting emulated OCO for parent %s", parent_order_id)
-    
+
     # Ensure event loop exists in this thread (needed for ib_insync broker calls)
     import asyncio
+
     try:
         asyncio.get_running_loop()
     except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
-    
+
     tp_triggered = False
     sl_triggered = False
     import time as time_module
+
     start_time = time_module.time()
     iteration = 0
     try:
         while True:
             iteration += 1
             elapsed = time_module.time() - start_time
-            
+
             # Safety check: exit if max duration exceeded
             if elapsed > max_duration_seconds:
                 logger.warning(
@@ -151,7 +160,7 @@ def emulate_oco(
                     parent_order_id,
                 )
                 break
-            
+
             # Progress logging every 100 iterations
             if iteration % 100 == 0:
                 logger.info(
@@ -212,3 +221,241 @@ def emulate_oco(
             tp_triggered,
             sl_triggered,
         )
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of an algorithmic order (see ``chase_limit``)."""
+
+    order_id: Optional[str]
+    action: str
+    quantity: int
+    filled: float = 0.0
+    avg_fill_price: Optional[float] = None
+    mid: Optional[float] = None
+    steps: int = 0
+    fell_back_to_market: bool = False
+    market_order_id: Optional[str] = None
+    # Contracts filled by a bracketed limit order that was then cancelled; its
+    # children were cancelled too, so the caller must protect these itself
+    unprotected_filled: float = 0.0
+
+    @property
+    def slippage(self) -> Optional[float]:
+        """Per-contract price paid beyond mid (positive = worse than mid)."""
+        if self.avg_fill_price is None or not self.mid:
+            return None
+        sign = 1 if self.action.upper() == "BUY" else -1
+        return sign * (self.avg_fill_price - self.mid)
+
+    @property
+    def slippage_bps(self) -> Optional[float]:
+        slip = self.slippage
+        return None if slip is None else slip / self.mid * 10_000
+
+
+def chase_prices(
+    quote: Any, action: str, tick_size: float, step_ticks: int, max_chase_ticks: int
+) -> List[float]:
+    """Limit-price ladder from mid toward the touch (ask for BUY, bid for SELL).
+
+    Args:
+        quote: Quote with bid/ask.
+        action: "BUY" or "SELL".
+        tick_size: Minimum price increment.
+        step_ticks: Ticks added per step.
+        max_chase_ticks: Furthest distance from mid, in ticks.
+
+    Returns:
+        Prices (rounded to the tick), starting at mid and never beyond the touch
+        or max_chase_ticks from mid. Empty when the quote has no two-sided market.
+    """
+    bid = float(getattr(quote, "bid", 0.0) or 0.0)
+    ask = float(getattr(quote, "ask", 0.0) or 0.0)
+    if bid <= 0 or ask <= 0 or ask < bid:
+        return []
+    mid = (bid + ask) / 2.0
+    # Work in integer ticks; round toward our own side so we never overpay
+    if action.upper() == "BUY":
+        start = math.floor(mid / tick_size + 1e-9)
+        bound = min(math.floor(ask / tick_size + 1e-9), start + max_chase_ticks)
+        step = step_ticks
+    else:
+        start = math.ceil(mid / tick_size - 1e-9)
+        bound = max(math.ceil(bid / tick_size - 1e-9), start - max_chase_ticks)
+        step = -step_ticks
+    ticks = list(range(start, bound + (1 if step > 0 else -1), step))
+    if ticks[-1] != bound:
+        ticks.append(bound)
+    return [round(t * tick_size, 6) for t in ticks]
+
+
+def chase_limit(
+    broker,
+    ticket: Any,
+    quote: Any,
+    tick_size: float = 0.01,
+    step_ticks: int = 1,
+    step_interval_seconds: float = 2.0,
+    max_chase_ticks: int = 10,
+    fallback_to_market: bool = True,
+    sleep: Optional[Callable[[float], None]] = None,
+    call: Optional[Callable[..., Any]] = None,
+) -> ExecutionResult:
+    """Work an order as a limit starting at mid and stepping toward the touch.
+
+    The order rests at each rung for ``step_interval_seconds``; if it has not
+    filled it is re-priced in place (``broker.modify_order``). After the last
+    rung, or once the active stage deadline has no room for another step, the
+    remainder is cancelled and, with ``fallback_to_market``, sent as
+    a market order. Fill state comes from the broker's order manager
+    (``broker.orders``), so no polling requests are made. Realized slippage
+    against mid is logged as ``execution_slippage`` and returned.
+
+    Brokers without ``modify_order``/``orders`` (or quotes without a two-sided
+    market) get the ticket sent unchanged as a market order.
+
+    A bracketed limit order cancelled after a partial fill has its remaining
+    children cancelled explicitly rather than trusting the broker to resize
+    them. The market remainder carries its own bracket. The filled part is
+    returned as ``unprotected_filled`` for the caller to cover.
+
+    Args:
+        broker: Broker implementing place_order/cancel_order/modify_order and ``orders``.
+        ticket: OrderTicket to work; order_type/limit_price are overwritten.
+        quote: Option quote already fetched by the caller (bid/ask define mid and touch).
+        tick_size: Minimum price increment.
+        step_ticks: Ticks added per step.
+        step_interval_seconds: Time to rest at each price.
+        max_chase_ticks: Furthest distance from mid, in ticks.
+        fallback_to_market: Send any unfilled remainder at market after the last step.
+        sleep: Wait function; defaults to ``broker.sleep`` (keeps IB events flowing)
+            or ``time.sleep``.
+        call: Runs each broker request and wait slice as ``call(fn, *args)``, e.g.
+            the scheduler's broker-lock wrapper, so the lock is held per request
+            and not for the whole chase. Defaults to calling ``fn`` directly.
+
+    Returns:
+        ExecutionResult with fill quantity/price, mid and slippage.
+    """
+    from .broker.base import OrderTicket
+
+    wait = sleep or getattr(broker, "sleep", None) or time.sleep
+    call = call or (lambda fn, *args: fn(*args))
+    orders = getattr(broker, "orders", None)
+    ladder = chase_prices(quote, ticket.action, tick_size, step_ticks, max_chase_ticks)
+    bid = float(getattr(quote, "bid", 0.0) or 0.0)
+    ask = float(getattr(quote, "ask", 0.0) or 0.0)
+    mid = (bid + ask) / 2.0 if bid > 0 and ask > 0 else None
+    result = ExecutionResult(
+        order_id=None, action=ticket.action, quantity=int(ticket.quantity), mid=mid
+    )
+
+    if not ladder or orders is None or not hasattr(broker, "modify_order"):
+        ticket.order_type = "MKT"
+        ticket.limit_price = None
+        result.order_id = str(call(broker.place_order, ticket))
+        result.fell_back_to_market = True
+        result.market_order_id = result.order_id
+        return result
+
+    ticket.order_type = "LMT"
+    ticket.limit_price = ladder[0]
+    oid = str(call(broker.place_order, ticket))
+    result.order_id = oid
+
+    def _wait_for_fill(seconds: float) -> bool:
+        waited = 0.0
+        while waited < seconds:
+            rec = orders.get(oid)
+            if rec is not None and rec.is_done:
+                return True
+            step = min(0.25, seconds - waited)
+            call(wait, step)
+            waited += step
+        rec = orders.get(oid)
+        return rec is not None and rec.is_done
+
+    deadline = current_deadline()
+    for i, price in enumerate(ladder):
+        if i:
+            if deadline is not None and deadline.remaining() < step_interval_seconds:
+                break  # out of order-stage budget: stop chasing, settle below
+            result.steps = i
+            if not call(broker.modify_order, oid, price):
+                break  # no longer working (filled/cancelled in between)
+            logger.bind(
+                event="chase_step", order_id=oid, step=i, limit_price=price
+            ).debug("Chasing {} to {}", oid, price)
+        if _wait_for_fill(step_interval_seconds):
+            break
+
+    rec = orders.get(oid)
+    if rec is not None and not rec.is_done:
+        call(broker.cancel_order, oid)
+        # Give the cancel a moment to be confirmed so filled quantity is final
+        _wait_for_fill(step_interval_seconds)
+        rec = orders.get(oid)
+        if rec is not None and rec.filled > 0:
+            # Whether IB keeps or resizes a cancelled parent's children is not
+            # something to rely on: drop them and report the fill as unprotected
+            children = [c for c in orders.children(oid) if not c.is_done]
+            for child in children:
+                call(broker.cancel_order, child.order_id)
+            if children:
+                result.unprotected_filled = rec.filled
+                logger.bind(
+                    event="bracket_children_cancelled",
+                    order_id=oid,
+                    children=[c.order_id for c in children],
+                    filled=rec.filled,
+                ).warning(
+                    "Chase {} cancelled after a partial fill; {} filled need protection",
+                    oid,
+                    rec.filled,
+                )
+
+    filled = rec.filled if rec is not None else 0.0
+    notional = (rec.avg_fill_price * filled) if rec is not None and filled else 0.0
+    remainder = int(ticket.quantity - filled)
+
+    if remainder > 0 and fallback_to_market:
+        mkt = OrderTicket(
+            contract=ticket.contract,
+            action=ticket.action,
+            quantity=remainder,
+            order_type="MKT",
+            tif=ticket.tif,
+            take_profit_price=getattr(ticket, "take_profit_price", None),
+            stop_loss_price=getattr(ticket, "stop_loss_price", None),
+        )
+        result.market_order_id = str(call(broker.place_order, mkt))
+        result.fell_back_to_market = True
+        mrec = orders.get(result.market_order_id)
+        if mrec is not None:
+            waited = 0.0
+            while not mrec.is_done and waited < step_interval_seconds:
+                call(wait, 0.25)
+                waited += 0.25
+            if mrec.filled:
+                notional += mrec.avg_fill_price * mrec.filled
+                filled += mrec.filled
+
+    result.filled = filled
+    result.avg_fill_price = (notional / filled) if filled else None
+    logger.bind(
+        event="execution_slippage",
+        order_id=oid,
+        action=ticket.action,
+        quantity=int(ticket.quantity),
+        filled=filled,
+        mid=mid,
+        avg_fill_price=result.avg_fill_price,
+        slippage=None if result.slippage is None else round(result.slippage, 4),
+        slippage_bps=(
+            None if result.slippage_bps is None else round(result.slippage_bps, 1)
+        ),
+        steps=result.steps,
+        fell_back_to_market=result.fell_back_to_market,
+    ).info("Chase {} finished: filled {} of {}", oid, filled, ticket.quantity)
+    return result
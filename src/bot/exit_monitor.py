@@ -0,0 +1,294 @@
+"""Single exit-monitor service for all open positions.
+
+Replaces one ``emulate_oco`` thread per position with one table of exit rules
+(take-profit, stop-loss, trailing stop) evaluated against one quote batch per
+check. When the broker offers ``stream_quotes`` the batch is read from standing
+streaming subscriptions (no request per poll); otherwise it falls back to one
+snapshot per position. Closing orders go through a token-bucket throttle so a
+burst of triggers cannot flood the Gateway.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from . import log as _log
+from .broker.base import OrderTicket, contract_key
+from .execution import _closing_action
+from .throttle import TokenBucket
+
+logger = _log.logger
+
+
+@dataclass
+class ExitRule:
+    """Exit thresholds for one open position (absolute option prices)."""
+
+    key: str
+    contract: Any
+    side: str  # original entry side: BUY (long) or SELL (short)
+    quantity: int
+    take_profit: Optional[float] = None
+    stop_loss: Optional[float] = None
+    trailing_pct: Optional[float] = None
+    parent_order_id: Optional[str] = None
+    opened_at: float = field(default_factory=time.time)
+    best_price: Optional[float] = None  # high-water (long) / low-water (short)
+
+    @property
+    def is_long(self) -> bool:
+        return self.side.upper() == "BUY"
+
+    def trailing_stop(self) -> Optional[float]:
+        if not self.trailing_pct or self.best_price is None:
+            return None
+        if self.is_long:
+            return self.best_price * (1 - self.trailing_pct)
+        return self.best_price * (1 + self.trailing_pct)
+
+    def evaluate(self, last: float) -> Optional[str]:
+        """Update trailing state with last and return "tp", "sl", "trail" or None."""
+        if last <= 0:
+            return None
+        if self.best_price is None:
+            self.best_price = last
+        elif self.is_long:
+            self.best_price = max(self.best_price, last)
+        else:
+            self.best_price = min(self.best_price, last)
+
+        sign = 1 if self.is_long else -1
+        if self.take_profit and sign * (last - self.take_profit) >= 0:
+            return "tp"
+        if self.stop_loss and sign * (last - self.stop_loss) <= 0:
+            return "sl"
+        trail = self.trailing_stop()
+        if trail is not None and sign * (last - trail) <= 0:
+            return "trail"
+        return None
+
+
+class ExitMonitor:
+    """Evaluate all exit rules against one quote batch per ``check``.
+
+    Thread-safe for add/remove; ``check`` may be driven by the scheduler's exit
+    job or by the optional background loop started with ``start``.
+    """
+
+    def __init__(
+        self,
+        broker,
+        order_throttle: Optional[TokenBucket] = None,
+        dry_run: bool = False,
+        on_exit: Optional[Callable[[ExitRule, str, float, Any], None]] = None,
+        throttle_wait_seconds: float = 0.0,
+    ):
+        self.broker = broker
+        self.throttle = order_throttle or TokenBucket.per_minute(20)
+        self.dry_run = dry_run
+        self.on_exit = on_exit
+        self.throttle_wait = throttle_wait_seconds
+        self._rules: Dict[str, ExitRule] = {}
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def add(
+        self,
+        contract: Any,
+        side: str,
+        quantity: int,
+        take_profit: Optional[float] = None,
+        stop_loss: Optional[float] = None,
+        trailing_pct: Optional[float] = None,
+        parent_order_id: Optional[str] = None,
+    ) -> str:
+        """Register (or replace) the exit rule for contract. Returns its key."""
+        key = contract_key(contract)
+        rule = ExitRule(
+            key=key,
+            contract=contract,
+            side=side,
+            quantity=int(quantity),
+            take_profit=take_profit,
+            stop_loss=stop_loss,
+            trailing_pct=trailing_pct,
+            parent_order_id=parent_order_id,
+        )
+        with self._lock:
+            self._rules[key] = rule
+        logger.bind(
+            event="exit_rule_added",
+            key=key,
+            take_profit=take_profit,
+            stop_loss=stop_loss,
+            trailing_pct=trailing_pct,
+        ).info("Exit monitor tracking {} ({} open)", key, len(self._rules))
+        return key
+
+    def add_filled(
+        self,
+        contract: Any,
+        side: str,
+        record: Any,
+        base_filled: float = 0.0,
+        **thresholds: Any,
+    ) -> Optional[str]:
+        """Register the exit rule for what an entry order has actually filled.
+
+        The rule covers ``base_filled + record.filled`` (``record`` is the
+        entry's ``orders.OrderRecord``; ``base_filled`` is quantity already
+        filled by an earlier order of the same entry, e.g. a chase limit
+        before its market fallback). Nothing is registered while nothing has
+        filled. If the order is still working, the rule grows by each later
+        fill when the order finishes, so a close never sells more than is held.
+
+        Returns:
+            The rule key, or None if nothing has filled yet.
+        """
+        registered = [0]
+        fill_lock = Lock()
+
+        def register(_future: Any = None) -> Optional[str]:
+            with fill_lock:
+                delta = int(base_filled + record.filled) - registered[0]
+                if delta <= 0:
+                    return None
+                registered[0] += delta
+            key = contract_key(contract)
+            with self._lock:
+                rule = self._rules.get(key)
+                if rule is not None and rule.parent_order_id == str(record.order_id):
+                    rule.quantity += delta
+                    return key
+            return self.add(
+                contract,
+                side,
+                delta,
+                parent_order_id=str(record.order_id),
+                **thresholds,
+            )
+
+        key = register()
+        if not record.is_done:
+            # Runs on the event thread that applies the final fill (or immediately if already done)
+            record.future.add_done_callback(register)
+        return key
+
+    def remove(self, key: str) -> Optional[ExitRule]:
+        with self._lock:
+            rule = self._rules.pop(key, None)
+        if rule is not None and hasattr(self.broker, "cancel_stream"):
+            try:
+                self.broker.cancel_stream(rule.contract)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("cancel_stream failed for {}: {}", key, type(e).__name__)
+        return rule
+
+    def rules(self) -> List[ExitRule]:
+        with self._lock:
+            return list(self._rules.values())
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def _quotes(self, rules: List[ExitRule]) -> Dict[str, Any]:
+        contracts = [r.contract for r in rules]
+        if hasattr(self.broker, "stream_quotes"):
+            return self.broker.stream_quotes(contracts)
+        out: Dict[str, Any] = {}
+        for r in rules:
+            try:
+                out[r.key] = self.broker.market_data(r.contract)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug(
+                    "exit monitor quote failed for {}: {}", r.key, type(e).__name__
+                )
+        return out
+
+    def check(self) -> List[str]:
+        """Evaluate every rule once; submit closes for triggers. Returns closed keys."""
+        rules = self.rules()
+        if not rules:
+            return []
+        try:
+            quotes = self._quotes(rules)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning("exit monitor quote batch failed: {}", type(e).__name__)
+            return []
+
+        closed: List[str] = []
+        for rule in rules:
+            q = quotes.get(rule.key)
+            last = float(getattr(q, "last", 0.0) or 0.0)
+            reason = rule.evaluate(last)
+            if reason and self._submit_close(rule, reason, last):
+                self.remove(rule.key)
+                closed.append(rule.key)
+        return closed
+
+    def _submit_close(self, rule: ExitRule, reason: str, last: float) -> bool:
+        if not self.throttle.acquire(timeout=self.throttle_wait):
+            logger.bind(event="exit_throttled", key=rule.key, reason=reason).warning(
+                "Exit for {} deferred: order rate limit reached", rule.key
+            )
+            return False
+        # Every trigger leaves at market: the rule is dropped once the close is
+        # sent, so a resting take-profit limit could leave the position unprotected
+        ticket = OrderTicket(
+            contract=rule.contract,
+            action=_closing_action(rule.side),
+            quantity=rule.quantity,
+            order_type="MKT",
+            transmit=True,
+        )
+        log = logger.bind(
+            event="exit_trigger",
+            key=rule.key,
+            reason=reason,
+            last=last,
+            parent=rule.parent_order_id,
+        )
+        if self.dry_run:
+            log.info("Dry-run: would close {} ({} at {})", rule.key, reason, last)
+            oid: Any = "DRYRUN"
+        else:
+            try:
+                oid = self.broker.place_order(ticket)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(
+                    "Failed to submit {} close order for {}", reason, rule.key
+                )
+                return False
+            log.info(
+                "Submitted {} close order {} for {} at {}", reason, oid, rule.key, last
+            )
+        if self.on_exit is not None:
+            try:
+                self.on_exit(rule, reason, last, oid)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("on_exit callback failed: {}", type(e).__name__)
+        return True
+
+    def run(self, stop_event: Event, poll_seconds: float = 5.0) -> None:
+        """Blocking loop: one check per poll interval for all positions."""
+        while not stop_event.is_set():
+            try:
+                self.check()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception("exit monitor check failed: {}", type(e).__name__)
+            stop_event.wait(poll_seconds)
+
+    def start(self, stop_event: Event, poll_seconds: float = 5.0) -> Thread:
+        """Run the loop on one daemon thread (shared by every position)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(
+                target=self.run,
+                args=(stop_event, poll_seconds),
+                name="exit-monitor",
+                daemon=True,
+            )
+            self._thread.start()
+        return self._thread
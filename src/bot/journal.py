@@ -4,8 +4,7 @@ from pathlib import Path
 from threading import Lock
 from typing import Dict
 
-LOG_DIR = Path.cwd() / "logs"
-LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = Path.cwd() / "logs"  # created on the first trade, not at import
 
 TRADES_CSV = LOG_DIR / "trades.csv"
 TRADES_JSONL = LOG_DIR / "trades.jsonl"
@@ -17,17 +16,17 @@ _LOCK = Lock()
 
 def log_trade(trade: Dict) -> None:
     """Record a trade (entry or exit) to both CSV and JSONL journal files.
-    
+
     Thread-safe appending to trades.csv (tabular) and trades.jsonl (structured).
     Creates CSV header automatically on first write.
-    
+
     Args:
         trade: Dictionary with keys: timestamp, symbol, action, quantity, price, stop, target.
                Extra fields are preserved in JSONL but omitted from CSV.
-    
+
     Returns:
         None
-    
+
     Example:
         >>> log_trade({
         ...     "timestamp": "2025-12-10T14:30:00+00:00",
@@ -40,6 +39,8 @@ def log_trade(trade: Dict) -> None:
         ... })
     """
     with _LOCK:
+        TRADES_CSV.parent.mkdir(parents=True, exist_ok=True)
+        TRADES_JSONL.parent.mkdir(parents=True, exist_ok=True)
         if not TRADES_CSV.exists():
             with open(TRADES_CSV, "w", newline="", encoding="utf-8") as f:
                 writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
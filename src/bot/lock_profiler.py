@@ -0,0 +1,146 @@
+"""Wait/hold-time profiling for the scheduler's broker lock.
+
+Every broker call in ``run_cycle`` goes through ``_with_broker_lock``, which
+serializes the pipeline. ``LockProfiler.record`` takes, for one call, how
+long the caller waited to acquire the lock and how long it then held it,
+keyed by call site (``function:line`` of the caller) and broker method.
+Each sample feeds the ``bot_broker_lock_{wait,hold}_seconds`` histograms
+and a window of per-key totals that ``maybe_report`` logs periodically as
+an ``event="lock_report"`` record listing the top-N holders and waiters,
+then clears.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import log as _log
+from .metrics import BROKER_LOCK_HOLD, BROKER_LOCK_WAIT
+
+logger = _log.logger
+
+
+@dataclass
+class LockStats:
+    count: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    hold_total: float = 0.0
+    hold_max: float = 0.0
+
+    def add(self, wait: float, hold: float) -> None:
+        self.count += 1
+        self.wait_total += wait
+        self.hold_total += hold
+        if wait > self.wait_max:
+            self.wait_max = wait
+        if hold > self.hold_max:
+            self.hold_max = hold
+
+
+def call_site(depth: int = 2) -> str:
+    """``function:line`` of the frame ``depth`` levels above this call."""
+    try:
+        frame = sys._getframe(depth)
+    except ValueError:
+        return "unknown"
+    return f"{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+def method_name(fn: Any) -> str:
+    return getattr(fn, "__name__", None) or type(fn).__name__
+
+
+class LockProfiler:
+    """Per (call site, method) wait and hold statistics for one lock."""
+
+    def __init__(
+        self, name: str = "broker", clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window: Dict[Tuple[str, str], LockStats] = {}
+        self._window_started = clock()
+        self._last_report = self._window_started
+
+    def record(
+        self, site: str, method: str, wait_seconds: float, hold_seconds: float
+    ) -> None:
+        BROKER_LOCK_WAIT.labels(site=site, method=method).observe(wait_seconds)
+        BROKER_LOCK_HOLD.labels(site=site, method=method).observe(hold_seconds)
+        with self._lock:
+            stats = self._window.get((site, method))
+            if stats is None:
+                stats = self._window[(site, method)] = LockStats()
+            stats.add(wait_seconds, hold_seconds)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Window totals per (site, method), in milliseconds."""
+        with self._lock:
+            items = [(k, LockStats(**vars(v))) for k, v in self._window.items()]
+        return [
+            {
+                "site": site,
+                "method": method,
+                "count": s.count,
+                "wait_total_ms": round(s.wait_total * 1000.0, 3),
+                "wait_max_ms": round(s.wait_max * 1000.0, 3),
+                "hold_total_ms": round(s.hold_total * 1000.0, 3),
+                "hold_max_ms": round(s.hold_max * 1000.0, 3),
+            }
+            for (site, method), s in items
+        ]
+
+    def report(self, top_n: int = 5, now: Optional[float] = None) -> Dict[str, Any]:
+        """Log the top-N holders and waiters of the current window, then clear it."""
+        now = self._clock() if now is None else now
+        rows = self.snapshot()
+        window_seconds = max(now - self._window_started, 1e-9)
+        hold_total = sum(r["hold_total_ms"] for r in rows)
+        for r in rows:
+            # Fraction of the window the lock was held by this call
+            r["hold_share"] = round(r["hold_total_ms"] / 1000.0 / window_seconds, 4)
+        top_hold = sorted(rows, key=lambda r: r["hold_total_ms"], reverse=True)[:top_n]
+        top_wait = sorted(rows, key=lambda r: r["wait_total_ms"], reverse=True)[:top_n]
+        summary = {
+            "lock": self.name,
+            "window_seconds": round(window_seconds, 3),
+            "calls": sum(r["count"] for r in rows),
+            "held_ms": round(hold_total, 3),
+            "waited_ms": round(sum(r["wait_total_ms"] for r in rows), 3),
+            "top_hold": top_hold,
+            "top_wait": top_wait,
+        }
+        logger.bind(event="lock_report", **summary).info(
+            "{} lock: held {:.0f}ms over {:.0f}s ({} calls); top holders: {}",
+            self.name,
+            summary["held_ms"],
+            window_seconds,
+            summary["calls"],
+            ", ".join(
+                f"{r['method']}@{r['site']} {r['hold_total_ms']:.0f}ms"
+                for r in top_hold
+            )
+            or "none",
+        )
+        with self._lock:
+            self._window.clear()
+            self._window_started = now
+            self._last_report = now
+        return summary
+
+    def maybe_report(
+        self, interval_seconds: float, top_n: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """``report`` when interval_seconds have passed since the last one (0 disables)."""
+        if interval_seconds <= 0:
+            return None
+        now = self._clock()
+        if now - self._last_report < interval_seconds:
+            return None
+        return self.report(top_n, now=now)
@@ -0,0 +1,672 @@
+"""Streaming, parallel analyzer for ``bot.jsonl`` log archives.
+
+Reads the JSONL sink written by ``logging_conf`` (loguru ``serialize=True``
+records, or flat ``{"event": ...}`` lines) across rotated and compressed
+files (``.gz``, ``.bz2``, ``.xz``, ``.zip``) without loading them whole.
+Plain files are split into newline-aligned byte ranges that are parsed in
+worker processes; compressed files are one task each. Lines are decoded with
+``orjson`` when installed, else the stdlib ``json``.
+
+Events are folded into a mergeable ``Aggregate``:
+- latency sketches per (symbol, metric): ``historical`` (request elapsed),
+  ``cycle``, ``order_fill`` and ``stage:<name>`` from tracing spans;
+- outcome counters per symbol: signals by action, fills, skips by reason,
+  historical successes/failures, cache fallbacks, dry runs, deadlines.
+
+Per-file results are cached (keyed by path, size and mtime). A plain file
+that has only grown since it was cached - the live ``bot.jsonl`` - is
+resumed from the cached offset, so repeat runs only parse new lines.
+
+Usage:
+    python -m src.bot.log_analytics logs/ [--workers 4] [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import math
+import os
+import sys
+import time
+import zipfile
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:  # optional fast decoder
+    import orjson as _orjson  # type: ignore
+
+    _loads: Callable[[bytes], Any] = _orjson.loads
+except ImportError:  # pragma: no cover - depends on environment
+    _loads = json.loads
+
+CACHE_VERSION = 1
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_CACHE_DIR = Path("logs") / ".analytics_cache"
+_COMPRESSED = {".gz", ".bz2", ".xz", ".zip"}
+_HEAD_BYTES = (
+    4096  # prefix hashed to detect a rotated/truncated file behind the same name
+)
+
+
+# ---- mergeable statistics --------------------------------------------------------
+
+
+class Sketch:
+    """Count/sum/min/max plus log-spaced buckets (~5% wide) for quantiles; mergeable."""
+
+    _LOG_BASE = math.log(1.05)
+    _FLOOR = 1e-6  # values below 1us share one bucket
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        key = math.ceil(math.log(max(value, self._FLOOR)) / self._LOG_BASE)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other: "Sketch") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for k, n in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + n
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket edge holding the q-quantile, clamped to [min, max]."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                return min(max(math.exp(key * self._LOG_BASE), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "buckets": {str(k): n for k, n in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Sketch":
+        s = cls()
+        s.count = int(d["count"])
+        s.total = float(d["total"])
+        s.min = math.inf if d["min"] is None else float(d["min"])
+        s.max = -math.inf if d["max"] is None else float(d["max"])
+        s.buckets = {int(k): int(n) for k, n in d["buckets"].items()}
+        return s
+
+
+# Events that are only counted per symbol
+_COUNTED_EVENTS = {
+    "historical_success",
+    "historical_fetch_failed_exhausted",
+    "historical_empty_response",
+    "historical_cache_fallback",
+    "insufficient_bars",
+    "dry_run",
+    "deadline_exceeded",
+    "circuit_breaker_open",
+    "backoff_skip",
+    "exit_trigger",
+}
+
+
+@dataclass
+class Aggregate:
+    lines: int = 0
+    bad_lines: int = 0
+    first_ts: Optional[float] = None
+    last_ts: Optional[float] = None
+    levels: Counter = field(default_factory=Counter)
+    events: Counter = field(default_factory=Counter)
+    # (symbol, metric) -> Sketch of seconds; symbol "*" when not per symbol
+    latency: Dict[Tuple[str, str], Sketch] = field(default_factory=dict)
+    # symbol -> outcome -> count
+    outcomes: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+    def _latency(self, symbol: str, metric: str, seconds: Any) -> None:
+        try:
+            value = float(seconds)
+        except (TypeError, ValueError):
+            return
+        key = (symbol, metric)
+        sketch = self.latency.get(key)
+        if sketch is None:
+            sketch = self.latency[key] = Sketch()
+        sketch.add(value)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Fold in one decoded line (loguru serialized record or flat dict)."""
+        record = entry.get("record")
+        if isinstance(record, dict):
+            extra = record.get("extra") or {}
+            level = (record.get("level") or {}).get("name", "UNKNOWN")
+            ts = (record.get("time") or {}).get("timestamp")
+        else:
+            extra = entry
+            level = entry.get("level", "UNKNOWN")
+            ts = (
+                entry.get("timestamp")
+                if isinstance(entry.get("timestamp"), (int, float))
+                else None
+            )
+        self.lines += 1
+        self.levels[level] += 1
+        if ts is not None:
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+
+        event = extra.get("event")
+        if not event:
+            return
+        self.events[event] += 1
+        symbol = str(extra.get("symbol") or "*")
+        out = self.outcomes[symbol]
+
+        if event == "historical_completed":
+            self._latency(symbol, "historical", extra.get("elapsed_seconds"))
+        elif event == "cycle_complete":
+            self._latency("*", "cycle", extra.get("duration_seconds"))
+            out["cycles"] += 1
+        elif event == "span":
+            ms = extra.get("duration_ms")
+            if ms is not None:
+                self._latency(symbol, f"stage:{extra.get('stage')}", float(ms) / 1000.0)
+        elif event == "order_fill_latency":
+            self._latency(symbol, "order_fill", extra.get("latency_seconds"))
+        elif event == "signal":
+            out[f"signal:{extra.get('action', 'UNKNOWN')}"] += 1
+        elif event == "fill":
+            out["fill"] += 1
+        elif event == "skip":
+            out[f"skip:{extra.get('reason', 'unknown')}"] += 1
+        elif event in _COUNTED_EVENTS:
+            out[event] += 1
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.lines += other.lines
+        self.bad_lines += other.bad_lines
+        for ts in (other.first_ts, other.last_ts):
+            if ts is None:
+                continue
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        self.levels.update(other.levels)
+        self.events.update(other.events)
+        for key, sketch in other.latency.items():
+            if key in self.latency:
+                self.latency[key].merge(sketch)
+            else:
+                self.latency[key] = Sketch.from_dict(sketch.to_dict())
+        for symbol, counts in other.outcomes.items():
+            self.outcomes[symbol].update(counts)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "bad_lines": self.bad_lines,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "levels": dict(self.levels),
+            "events": dict(self.events),
+            "latency": {
+                f"{s}\t{m}": sk.to_dict() for (s, m), sk in self.latency.items()
+            },
+            "outcomes": {s: dict(c) for s, c in self.outcomes.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Aggregate":
+        agg = cls(
+            lines=d["lines"],
+            bad_lines=d["bad_lines"],
+            first_ts=d["first_ts"],
+            last_ts=d["last_ts"],
+            levels=Counter(d["levels"]),
+            events=Counter(d["events"]),
+        )
+        for key, sk in d["latency"].items():
+            symbol, metric = key.split("\t", 1)
+            agg.latency[(symbol, metric)] = Sketch.from_dict(sk)
+        for symbol, counts in d["outcomes"].items():
+            agg.outcomes[symbol] = Counter(counts)
+        return agg
+
+
+# ---- reading ---------------------------------------------------------------------
+
+
+def discover(paths: Iterable[Path]) -> List[Path]:
+    """Expand directories to their JSONL logs (current, rotated, compressed), oldest first."""
+    found: List[Path] = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            found.extend(f for f in p.iterdir() if f.is_file() and ".jsonl" in f.name)
+        elif p.is_file():
+            found.append(p)
+    unique = {f.resolve(): f for f in found}
+    return sorted(unique.values(), key=lambda f: (f.stat().st_mtime, f.name))
+
+
+def _is_compressed(path: Path) -> bool:
+    return path.suffix.lower() in _COMPRESSED
+
+
+def _open_compressed(path: Path) -> io.BufferedIOBase:
+    suffix = path.suffix.lower()
+    if suffix == ".gz":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if suffix == ".bz2":
+        return bz2.open(path, "rb")  # type: ignore[return-value]
+    if suffix == ".xz":
+        return lzma.open(path, "rb")  # type: ignore[return-value]
+    archive = zipfile.ZipFile(path)
+    names = archive.namelist()
+    if not names:
+        raise ValueError(f"empty zip archive: {path}")
+    return archive.open(names[0])  # type: ignore[return-value]
+
+
+def _parse_lines(lines: Iterable[bytes], agg: Aggregate) -> Aggregate:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = _loads(line)
+        except ValueError:
+            agg.bad_lines += 1
+            continue
+        if isinstance(entry, dict):
+            agg.add(entry)
+        else:
+            agg.bad_lines += 1
+    return agg
+
+
+def _range_lines(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Lines of a plain file whose first byte lies in [start, end)."""
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()  # finish the line that straddles start; the previous chunk owns it
+        pos = f.tell()
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def _complete_size(path: Path, size: int) -> int:
+    """Offset just past the last newline, so a line still being written is left for later."""
+    if size == 0:
+        return 0
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            i = block.rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+    return 0
+
+
+@dataclass(frozen=True)
+class _Task:
+    file_index: int
+    path: str
+    start: int = 0
+    end: int = -1  # -1: whole (compressed) file
+
+
+def _run_task(task: _Task) -> Tuple[int, Aggregate]:
+    path = Path(task.path)
+    agg = Aggregate()
+    if task.end < 0:
+        with _open_compressed(path) as f:
+            _parse_lines(f, agg)
+    else:
+        _parse_lines(_range_lines(path, task.start, task.end), agg)
+    return task.file_index, agg
+
+
+# ---- per-file cache --------------------------------------------------------------
+
+
+def _head_digest(path: Path, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(length, _HEAD_BYTES))).hexdigest()
+
+
+def _cache_path(cache_dir: Path, path: Path) -> Path:
+    return cache_dir / (
+        hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest() + ".json"
+    )
+
+
+def _load_cache(cache_dir: Optional[Path], path: Path) -> Optional[Dict[str, Any]]:
+    if cache_dir is None:
+        return None
+    try:
+        doc = json.loads(_cache_path(cache_dir, path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return doc if doc.get("version") == CACHE_VERSION else None
+
+
+def _store_cache(cache_dir: Optional[Path], path: Path, doc: Dict[str, Any]) -> None:
+    if cache_dir is None:
+        return
+    target = _cache_path(cache_dir, path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(doc), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        pass  # a read-only cache only costs the next run a re-parse
+
+
+# ---- driver ----------------------------------------------------------------------
+
+
+@dataclass
+class Result:
+    aggregate: Aggregate
+    files: int
+    cached: int  # files answered entirely from cache
+    resumed: int  # plain files parsed only from their cached offset
+    bytes_parsed: int
+    seconds: float
+
+
+def analyze(
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+) -> Result:
+    """Aggregate every JSONL log under ``paths`` (files or directories).
+
+    Args:
+        workers: Parser processes (default: CPU count; 1 parses in-process).
+        chunk_bytes: Byte range per task for plain files.
+        cache_dir: Per-file result cache; None disables caching.
+    """
+    started = time.perf_counter()
+    files = discover(paths)
+    workers = max(1, workers or os.cpu_count() or 1)
+    total = Aggregate()
+    partial: Dict[int, Aggregate] = {}
+    pending_docs: Dict[int, Dict[str, Any]] = {}
+    tasks: List[_Task] = []
+    cached = resumed = bytes_parsed = 0
+
+    for idx, path in enumerate(files):
+        st = path.stat()
+        compressed = _is_compressed(path)
+        doc = {
+            "version": CACHE_VERSION,
+            "path": str(path.resolve()),
+            "mtime_ns": st.st_mtime_ns,
+        }
+        hit = _load_cache(cache_dir, path)
+        start = 0
+        if (
+            hit is not None
+            and hit["size"] == st.st_size
+            and hit["mtime_ns"] == st.st_mtime_ns
+        ):
+            total.merge(Aggregate.from_dict(hit["aggregate"]))
+            cached += 1
+            continue
+        if compressed:
+            doc["size"] = st.st_size
+            tasks.append(_Task(idx, str(path)))
+            bytes_parsed += st.st_size
+        else:
+            end = _complete_size(path, st.st_size)
+            if (
+                hit is not None
+                and not hit.get("compressed")
+                and hit["parsed"] <= end
+                and hit["parsed"] > 0
+                and hit["head"] == _head_digest(path, hit["parsed"])
+            ):
+                # Same file, only appended to since the cached run
+                start = hit["parsed"]
+                partial[idx] = Aggregate.from_dict(hit["aggregate"])
+                resumed += 1
+            doc["size"] = (
+                st.st_size if end == st.st_size else -1
+            )  # never a full hit while a line is open
+            doc["parsed"] = end
+            doc["head"] = _head_digest(path, end) if end else ""
+            for lo in range(start, end, max(1, chunk_bytes)):
+                tasks.append(_Task(idx, str(path), lo, min(end, lo + chunk_bytes)))
+            bytes_parsed += end - start
+        doc["compressed"] = compressed
+        pending_docs[idx] = doc
+        partial.setdefault(idx, Aggregate())
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        results = [_run_task(t) for t in tasks]
+    for idx, agg in results:
+        partial[idx].merge(agg)
+
+    for idx, agg in partial.items():
+        doc = pending_docs[idx]
+        doc["aggregate"] = agg.to_dict()
+        _store_cache(cache_dir, files[idx], doc)
+        total.merge(agg)
+
+    return Result(
+        total, len(files), cached, resumed, bytes_parsed, time.perf_counter() - started
+    )
+
+
+# ---- report ----------------------------------------------------------------------
+
+
+def latency_table(agg: Aggregate) -> List[Dict[str, Any]]:
+    rows = []
+    for (symbol, metric), sk in sorted(agg.latency.items()):
+        rows.append(
+            {
+                "symbol": symbol,
+                "metric": metric,
+                "count": sk.count,
+                "mean_ms": round(sk.mean * 1000.0, 3),
+                "p50_ms": round(sk.quantile(0.5) * 1000.0, 3),
+                "p95_ms": round(sk.quantile(0.95) * 1000.0, 3),
+                "max_ms": round(sk.max * 1000.0, 3),
+            }
+        )
+    return rows
+
+
+def outcome_table(agg: Aggregate) -> List[Dict[str, Any]]:
+    rows = []
+    for symbol in sorted(agg.outcomes):
+        c = agg.outcomes[symbol]
+        signals = {
+            k.split(":", 1)[1]: n for k, n in c.items() if k.startswith("signal:")
+        }
+        skips = {k.split(":", 1)[1]: n for k, n in c.items() if k.startswith("skip:")}
+        ok = c.get("historical_success", 0)
+        failed = c.get("historical_fetch_failed_exhausted", 0) + c.get(
+            "historical_empty_response", 0
+        )
+        rows.append(
+            {
+                "symbol": symbol,
+                "historical_ok": ok,
+                "historical_failed": failed,
+                "historical_success_rate": (
+                    round(ok / (ok + failed), 4) if ok + failed else None
+                ),
+                "cache_fallbacks": c.get("historical_cache_fallback", 0),
+                "signals": signals,
+                "entries": sum(n for a, n in signals.items() if a != "HOLD"),
+                "fills": c.get("fill", 0),
+                "dry_runs": c.get("dry_run", 0),
+                "skips": skips,
+                "insufficient_bars": c.get("insufficient_bars", 0),
+                "deadline_exceeded": c.get("deadline_exceeded", 0),
+                "cycles": c.get("cycles", 0),
+            }
+        )
+    return rows
+
+
+def summary(result: Result) -> Dict[str, Any]:
+    agg = result.aggregate
+    return {
+        "files": result.files,
+        "cached_files": result.cached,
+        "resumed_files": result.resumed,
+        "bytes_parsed": result.bytes_parsed,
+        "seconds": round(result.seconds, 3),
+        "lines": agg.lines,
+        "bad_lines": agg.bad_lines,
+        "first_ts": agg.first_ts,
+        "last_ts": agg.last_ts,
+        "levels": dict(agg.levels),
+        "events": dict(agg.events.most_common()),
+        "latency": latency_table(agg),
+        "outcomes": outcome_table(agg),
+    }
+
+
+def format_report(doc: Dict[str, Any]) -> str:
+    from datetime import datetime, timezone
+
+    def ts(v):
+        return (
+            datetime.fromtimestamp(v, timezone.utc).isoformat(timespec="seconds")
+            if v
+            else "-"
+        )
+
+    out = [
+        f"Files: {doc['files']} ({doc['cached_files']} cached, {doc['resumed_files']} resumed), "
+        f"{doc['bytes_parsed'] / 1e6:.1f} MB parsed in {doc['seconds']:.2f}s",
+        f"Lines: {doc['lines']} ({doc['bad_lines']} unreadable), {ts(doc['first_ts'])} .. {ts(doc['last_ts'])}",
+        "Levels: " + ", ".join(f"{k} {v}" for k, v in sorted(doc["levels"].items())),
+        "",
+        "Latency (ms)",
+        f"  {'symbol':<8} {'metric':<24} {'count':>7} {'p50':>9} {'p95':>9} {'max':>9}",
+    ]
+    for r in doc["latency"]:
+        out.append(
+            f"  {r['symbol']:<8} {r['metric']:<24} {r['count']:>7} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f}"
+        )
+    out += [
+        "",
+        "Outcomes",
+        f"  {'symbol':<8} {'hist ok':>8} {'failed':>7} {'cached':>7} {'entries':>8} {'fills':>6} {'dry':>5}  skips",
+    ]
+    for r in doc["outcomes"]:
+        skips = ", ".join(f"{k} {v}" for k, v in sorted(r["skips"].items())) or "-"
+        out.append(
+            f"  {r['symbol']:<8} {r['historical_ok']:>8} {r['historical_failed']:>7} {r['cache_fallbacks']:>7} "
+            f"{r['entries']:>8} {r['fills']:>6} {r['dry_runs']:>5}  {skips}"
+        )
+    out += [
+        "",
+        "Top events: "
+        + ", ".join(f"{k} {v}" for k, v in list(doc["events"].items())[:12]),
+    ]
+    return "\n".join(out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Aggregate bot.jsonl logs (rotated and compressed)"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["logs"],
+        help="log files or directories (default: logs)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="parser processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunk-mb", type=float, default=DEFAULT_CHUNK_BYTES / 1024 / 1024
+    )
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse everything, do not read or write the cache",
+    )
+    parser.add_argument("--json", type=Path, help="also write the full summary as JSON")
+    args = parser.parse_args(argv)
+
+    result = analyze(
+        [Path(p) for p in args.paths],
+        workers=args.workers,
+        chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+        cache_dir=None if args.no_cache else args.cache_dir,
+    )
+    if not result.files:
+        print(f"no JSONL logs under {', '.join(args.paths)}", file=sys.stderr)
+        return 1
+    doc = summary(result)
+    print(format_report(doc))
+    if args.json:
+        args.json.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"\nSummary written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Sampling and de-duplication filter shared by the log sinks.
+
+``LogPolicy`` is installed as the loguru ``filter`` of every sink added by
+``logging_conf.configure``. For each record it decides once, and all sinks
+share the decision:
+
+- DEBUG/INFO records whose ``event`` has an entry in ``sample_rates`` are
+  kept at that fraction, at an even stride (0.1 keeps every 10th);
+- WARNING and above are never sampled. An identical message (same level,
+  call site and text) repeated within ``dedup_window_seconds`` is dropped.
+  The first repeat logged after the window gets a
+  ``(repeated N times)`` suffix and ``extra["repeats_suppressed"]``.
+
+Level gating is left to the sinks' ``level`` so that loguru never formats
+messages below the lowest sink level; hot-path calls therefore pass
+``{}`` arguments instead of pre-formatted f-strings.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_WARNING_NO = 30
+_MAX_DEDUP_KEYS = 2048
+
+
+class LogPolicy:
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        dedup_window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sample_rates = dict(sample_rates or {})
+        self.dedup_window_seconds = float(dedup_window_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._event_counts: Dict[str, int] = {}
+        self._sampled_out: Dict[str, int] = {}
+        # (level, name, line, message) -> [window start, repeats dropped]
+        self._seen: Dict[Tuple[str, str, int, str], list] = {}
+        self._deduplicated = 0
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        """loguru filter; the same record reaches every sink's filter in turn."""
+        local = self._local
+        if getattr(local, "record", None) is record:
+            return local.keep
+        keep = self._decide(record)
+        local.record = record  # keeps the record alive, so identity cannot be reused
+        local.keep = keep
+        return keep
+
+    def _decide(self, record: Dict[str, Any]) -> bool:
+        if record["level"].no >= _WARNING_NO:
+            return self._dedup(record) if self.dedup_window_seconds > 0 else True
+        event = record["extra"].get("event")
+        if event is None:
+            return True
+        rate = self.sample_rates.get(event)
+        if rate is None or rate >= 1.0:
+            return True
+        with self._lock:
+            n = self._event_counts.get(event, 0) + 1
+            self._event_counts[event] = n
+            keep = rate > 0.0 and math.floor(n * rate) > math.floor((n - 1) * rate)
+            if not keep:
+                self._sampled_out[event] = self._sampled_out.get(event, 0) + 1
+        return keep
+
+    def _dedup(self, record: Dict[str, Any]) -> bool:
+        key = (
+            record["level"].name,
+            record["name"] or "",
+            record["line"],
+            record["message"],
+        )
+        now = self._clock()
+        window = self.dedup_window_seconds
+        with self._lock:
+            state = self._seen.get(key)
+            if state is not None and now - state[0] < window:
+                state[1] += 1
+                self._deduplicated += 1
+                return False
+            dropped = state[1] if state is not None else 0
+            if len(self._seen) >= _MAX_DEDUP_KEYS:
+                self._seen = {
+                    k: v for k, v in self._seen.items() if now - v[0] < window
+                }
+            self._seen[key] = [now, 0]
+        if dropped:
+            record["message"] += f" (repeated {dropped} times)"
+            record["extra"]["repeats_suppressed"] = dropped
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Records dropped so far, by sampled event and by de-duplication."""
+        with self._lock:
+            return {
+                "sampled_out": dict(self._sampled_out),
+                "deduplicated": self._deduplicated,
+            }
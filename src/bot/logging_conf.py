@@ -1,21 +1,60 @@
+import sys
+from pathlib import Path
+from typing import List, Optional
+
 from . import log as _log
+from .log_policy import LogPolicy
+from .settings import LoggingSettings
 
 logger = _log.logger
-from pathlib import Path
 
-LOG_DIR = Path.cwd() / "logs"
-LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = Path.cwd() / "logs"  # loguru creates it when the file sinks are added
+
+_handler_ids: List[int] = []
+_default_removed = False
+policy: Optional[LogPolicy] = None
+
+
+def configure(
+    cfg: Optional[LoggingSettings] = None, stem: str = "bot"
+) -> Optional[LogPolicy]:
+    """(Re)install stderr, bot.log and bot.jsonl sinks for ``cfg`` (``logging`` in settings.yaml).
 
-try:
-    # These attributes exist on loguru logger; stdlib fallback will raise AttributeError
-    logger.add(LOG_DIR / "bot.log", rotation="10 MB", retention=5, enqueue=True)  # type: ignore[attr-defined]
-    logger.add(  # type: ignore[attr-defined]
-        LOG_DIR / "bot.jsonl",
-        rotation="10 MB",
-        retention=5,
-        serialize=True,  # JSON structure
-        enqueue=True,
-    )
-except (AttributeError, TypeError):  # pragma: no cover
-    # Fallback logger doesn't support .add; ignore advanced sinks
-    pass
+    ``stem`` names the file sinks; each shard of a sharded deployment writes its
+    own ``bot.shard<N>.*`` so processes never rotate each other's files.
+    """
+    global _default_removed, policy
+    cfg = cfg or LoggingSettings()
+    new_policy = LogPolicy(cfg.sample_rates, cfg.dedup_window_seconds)
+    try:
+        # These attributes exist on loguru logger; stdlib fallback will raise AttributeError
+        if not _default_removed:
+            try:
+                logger.remove(0)  # type: ignore[attr-defined]  # loguru's unfiltered DEBUG stderr sink
+            except ValueError:
+                pass
+            _default_removed = True
+        for handler_id in _handler_ids:
+            logger.remove(handler_id)  # type: ignore[attr-defined]
+        _handler_ids.clear()
+        file_opts = dict(
+            level=cfg.level,
+            filter=new_policy,
+            rotation="10 MB",
+            retention=5,
+            compression=cfg.compression,
+            enqueue=True,
+        )
+        _handler_ids.append(
+            logger.add(sys.stderr, level=cfg.console_level or cfg.level, filter=new_policy)  # type: ignore[attr-defined]
+        )
+        if cfg.text_log:
+            _handler_ids.append(logger.add(LOG_DIR / f"{stem}.log", **file_opts))  # type: ignore[attr-defined]
+        _handler_ids.append(
+            logger.add(LOG_DIR / f"{stem}.jsonl", serialize=True, **file_opts)  # type: ignore[attr-defined]  # JSON structure
+        )
+    except (AttributeError, TypeError):  # pragma: no cover
+        # Fallback logger doesn't support .add; ignore advanced sinks
+        return None
+    policy = new_policy
+    return new_policy
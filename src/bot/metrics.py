@@ -0,0 +1,482 @@
+"""In-process metrics registry exposed in the Prometheus text format.
+
+Counters, gauges and histograms are module-level objects updated on the hot
+path (one lock per child, no I/O) and rendered only when scraped. Gauges can
+instead be bound to a callback with ``set_function`` so values such as RSS or
+the circuit-breaker state are computed at scrape time and cost nothing
+between scrapes.
+
+``start_http_server(port)`` serves ``GET /metrics`` from a daemon thread; the
+bot starts it when ``monitoring.metrics_port`` is set. No client library is
+needed - the exposition format (version 0.0.4) is written here.
+
+Usage:
+    from .metrics import GATEWAY_REQUESTS
+    GATEWAY_REQUESTS.labels(type="historical").inc()
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from . import log as _log
+
+logger = _log.logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a fast local call (1ms) up to a slow historical fetch (60s)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _format_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if math.isnan(v):
+        return "NaN"
+    return repr(float(v))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Common parent: a named family of children keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwvalues):
+        """Child for one combination of label values (created on first use)."""
+        if kwvalues:
+            values = tuple(str(kwvalues[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _only_child(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self._children[()]
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("counters only go up")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic total (name should end in ``_total``)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._only_child().inc(amount)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [("", _label_str(self.labelnames, k), c.value) for k, c in items]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the value with fn at scrape time instead of storing it."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        fn = self._fn
+        if fn is None:
+            return self._value
+        try:
+            return float(fn())
+        except Exception:  # pylint: disable=broad-except
+            # A failing callback must not break the whole scrape
+            return math.nan
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._only_child().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._only_child().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._only_child().dec(amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self._only_child().set_function(fn)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [("", _label_str(self.labelnames, k), c.value) for k, c in items]
+
+
+class _HistogramChild:
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self.sum, self.count
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative ``le`` buckets)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._only_child().observe(value)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._children.items())
+        out = []
+        for key, child in items:
+            counts, total, n = child.snapshot()
+            running = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                running += c
+                le = 'le="' + _format_value(bound) + '"'
+                out.append(("_bucket", _label_str(self.labelnames, key, le), running))
+            labels = _label_str(self.labelnames, key)
+            out.append(("_sum", labels, total))
+            out.append(("_count", labels, n))
+        return out
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+
+class SlidingWindowCounter:
+    """Events in the trailing ``window_seconds`` (for pacing budgets)."""
+
+    def __init__(
+        self, window_seconds: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.window = float(window_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._events: Deque[float] = deque()
+
+    def add(self) -> None:
+        with self._lock:
+            self._events.append(self._clock())
+
+    def count(self) -> int:
+        cutoff = self._clock() - self.window
+        with self._lock:
+            while self._events and self._events[0] <= cutoff:
+                self._events.popleft()
+            return len(self._events)
+
+
+def process_rss_bytes() -> float:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return float(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if sys.platform == "darwin" else peak * 1024)
+    except (ImportError, OSError):
+        return math.nan
+
+
+# ---- bot metrics ------------------------------------------------------------------
+
+# IB allows 60 historical requests per 10 minutes before pacing violations (error 162)
+HISTORICAL_PACING_LIMIT = 60
+HISTORICAL_PACING_WINDOW_SECONDS = 600.0
+HISTORICAL_REQUEST_WINDOW = SlidingWindowCounter(HISTORICAL_PACING_WINDOW_SECONDS)
+
+CYCLES = counter("bot_cycles_total", "Scheduler cycles completed")
+CYCLE_DURATION = histogram(
+    "bot_cycle_duration_seconds",
+    "Duration of one scheduler cycle",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 180.0, 300.0),
+)
+LAST_CYCLE = gauge(
+    "bot_last_cycle_timestamp_seconds", "Unix time the last cycle completed"
+)
+STAGE_DURATION = histogram(
+    "bot_stage_duration_seconds",
+    "Per-stage latency of traced cycles (see tracing)",
+    ["stage"],
+)
+JOB_LATENESS = histogram(
+    "bot_job_lateness_seconds", "Event-scheduler job start minus due time", ["job"]
+)
+GATEWAY_REQUESTS = counter(
+    "bot_gateway_requests_total", "Requests sent to IB Gateway by type", ["type"]
+)
+GATEWAY_ERRORS = counter(
+    "bot_gateway_errors_total",
+    "Error messages received from IB Gateway by code",
+    ["code"],
+)
+HISTORICAL_PACING_REMAINING = gauge(
+    "bot_historical_pacing_remaining",
+    "Historical requests left in the trailing 10-minute IB pacing window",
+)
+HISTORICAL_PACING_REMAINING.set_function(
+    lambda: HISTORICAL_PACING_LIMIT - HISTORICAL_REQUEST_WINDOW.count()
+)
+CACHE_LOOKUPS = counter(
+    "bot_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+CIRCUIT_STATE = gauge(
+    "bot_circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half-open, 2=open)",
+    ["breaker"],
+)
+OPEN_POSITIONS = gauge("bot_open_positions", "Open positions reported by the broker")
+ORDER_LATENCY = histogram(
+    "bot_order_latency_seconds",
+    "Order submit-to-ack and submit-to-fill latency",
+    ["kind"],
+)
+BROKER_LOCK_WAIT = histogram(
+    "bot_broker_lock_wait_seconds",
+    "Time waiting for the scheduler's broker lock",
+    ["site", "method"],
+)
+BROKER_LOCK_HOLD = histogram(
+    "bot_broker_lock_hold_seconds",
+    "Time the broker lock was held per call",
+    ["site", "method"],
+)
+ORDER_THROTTLE_TOKENS = gauge(
+    "bot_order_throttle_tokens", "Tokens left in the exit-order rate limiter"
+)
+SETTINGS_RELOADS = counter(
+    "bot_settings_reloads_total",
+    "settings.yaml changes detected, by result (applied/rejected)",
+    ["result"],
+)
+SHARDS_ALIVE = gauge(
+    "bot_shards_alive", "Worker processes currently running (sharded deployment)"
+)
+SHARD_RESTARTS = counter(
+    "bot_shard_restarts_total",
+    "Shard processes restarted by the coordinator",
+    ["shard"],
+)
+PROCESS_RSS = gauge("process_resident_memory_bytes", "Resident memory size in bytes")
+PROCESS_RSS.set_function(process_rss_bytes)
+PROCESS_CPU = gauge(
+    "process_cpu_seconds_total", "User and system CPU time spent in seconds"
+)
+PROCESS_CPU.set_function(time.process_time)
+
+CIRCUIT_STATE_VALUES = {"CLOSED": 0, "HALF_OPEN": 1, "OPEN": 2}
+
+
+# ---- HTTP endpoint -----------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):  # noqa: N802 (http.server naming)
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 - keep scrapes out of the logs
+        return
+
+
+def start_http_server(
+    port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY
+) -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` on host:port from a daemon thread (port 0 picks one).
+
+    Returns:
+        The server; call ``shutdown()`` to stop it. ``server_address[1]`` is the port.
+    """
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    )
+    thread.start()
+    logger.bind(event="metrics_server", host=host, port=server.server_address[1]).info(
+        "Metrics endpoint on http://{}:{}/metrics", host, server.server_address[1]
+    )
+    return server
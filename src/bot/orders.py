@@ -0,0 +1,399 @@
+"""Order state machine driven by IB order-status and execution events.
+
+Every order placed through the broker is tracked as an ``OrderRecord`` moving
+through PendingSubmit -> Submitted -> PartiallyFilled -> Filled / Cancelled /
+Rejected, with a non-terminal Inactive for orders IB parks and may resume.
+State changes come from ib_insync's ``orderStatusEvent`` and
+``execDetailsEvent`` (no polling), which can arrive in either order and
+report the same fills twice; the filled quantity is the larger of the two
+views, not their sum. Each record exposes a fill future, and the
+manager keeps submit-to-ack and submit-to-fill latency samples for monitoring.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from . import log as _log
+from .metrics import ORDER_LATENCY
+
+logger = _log.logger
+
+PENDING_SUBMIT = "PendingSubmit"
+SUBMITTED = "Submitted"
+PARTIALLY_FILLED = "PartiallyFilled"
+FILLED = "Filled"
+CANCELLED = "Cancelled"
+REJECTED = "Rejected"
+# IB parks orders as Inactive transiently (outside RTH, margin checks) and may
+# resume them, so it is not terminal; a dead order ends Cancelled or Rejected
+INACTIVE = "Inactive"
+
+TERMINAL_STATES = frozenset({FILLED, CANCELLED, REJECTED})
+
+# Allowed forward transitions; IB can repeat or reorder statuses, anything
+# else is ignored rather than moving an order backwards.
+_TRANSITIONS: Dict[str, Set[str]] = {
+    PENDING_SUBMIT: {
+        SUBMITTED,
+        PARTIALLY_FILLED,
+        FILLED,
+        CANCELLED,
+        REJECTED,
+        INACTIVE,
+    },
+    SUBMITTED: {PARTIALLY_FILLED, FILLED, CANCELLED, REJECTED, INACTIVE},
+    PARTIALLY_FILLED: {FILLED, CANCELLED, INACTIVE},
+    INACTIVE: {SUBMITTED, PARTIALLY_FILLED, FILLED, CANCELLED, REJECTED},
+}
+
+# IB orderStatus.status -> state machine state
+_IB_STATUS = {
+    "ApiPending": PENDING_SUBMIT,
+    "PendingSubmit": PENDING_SUBMIT,
+    "PreSubmitted": SUBMITTED,
+    "Submitted": SUBMITTED,
+    "PendingCancel": None,  # not final until IB confirms
+    "ApiCancelled": CANCELLED,
+    "Cancelled": CANCELLED,
+    "Filled": FILLED,
+    "Inactive": INACTIVE,
+}
+
+
+class OrderFailed(RuntimeError):
+    """Set on a fill future when the order ends Cancelled or Rejected."""
+
+    def __init__(self, record: "OrderRecord"):
+        self.record = record
+        super().__init__(
+            f"order {record.order_id} {record.state.lower()}"
+            + (f": {record.reason}" if record.reason else "")
+        )
+
+
+@dataclass
+class OrderRecord:
+    order_id: str
+    symbol: str
+    action: str
+    quantity: float
+    parent_id: Optional[str] = None
+    state: str = PENDING_SUBMIT
+    filled: float = 0.0
+    avg_fill_price: float = 0.0
+    reason: str = ""
+    submitted_at: float = 0.0
+    acked_at: Optional[float] = None
+    first_fill_at: Optional[float] = None
+    done_at: Optional[float] = None
+    history: List[Tuple[float, str]] = field(default_factory=list)
+    exec_ids: Set[str] = field(default_factory=set)
+    # Two views of the same fills, never added together: the cumulative count
+    # from orderStatus and the sum of execDetails reports (by exec_id)
+    status_filled: float = 0.0
+    status_avg_price: float = 0.0
+    exec_filled: float = 0.0
+    exec_notional: float = 0.0
+    future: Future = field(default_factory=Future, repr=False)
+
+    @property
+    def is_done(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.quantity - self.filled)
+
+
+class LatencyStats:
+    """Latency samples (seconds) with simple summary statistics."""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        if len(self.samples) > self.max_samples:
+            del self.samples[0]
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "count": len(ordered),
+            "mean_s": round(sum(ordered) / len(ordered), 4),
+            "p50_s": round(pct(0.50), 4),
+            "p95_s": round(pct(0.95), 4),
+            "max_s": round(ordered[-1], 4),
+        }
+
+
+class OrderManager:
+    """Thread-safe registry of order state machines keyed by order id."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._orders: Dict[str, OrderRecord] = {}
+        # Re-entrant: fill-future callbacks run inside state updates and may query us
+        self._lock = RLock()
+        self.ack_latency = LatencyStats()
+        self.fill_latency = LatencyStats()
+
+    # ---- registration -------------------------------------------------
+
+    def attach(self, ib: Any) -> None:
+        """Subscribe to an ib_insync IB instance's order and execution events."""
+        ib.orderStatusEvent += self._on_order_status
+        ib.execDetailsEvent += self._on_exec_details
+
+    def track(
+        self,
+        order_id: Any,
+        symbol: str,
+        action: str,
+        quantity: float,
+        parent_id: Optional[Any] = None,
+    ) -> OrderRecord:
+        """Start tracking an order at the moment it is submitted."""
+        now = self._clock()
+        rec = OrderRecord(
+            order_id=str(order_id),
+            symbol=symbol,
+            action=action,
+            quantity=float(quantity),
+            parent_id=str(parent_id) if parent_id is not None else None,
+            submitted_at=now,
+            history=[(now, PENDING_SUBMIT)],
+        )
+        with self._lock:
+            self._orders[rec.order_id] = rec
+        return rec
+
+    def get(self, order_id: Any) -> Optional[OrderRecord]:
+        with self._lock:
+            return self._orders.get(str(order_id))
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[OrderRecord]:
+        with self._lock:
+            return [
+                r
+                for r in self._orders.values()
+                if not r.is_done and (symbol is None or r.symbol == symbol)
+            ]
+
+    def children(self, parent_id: Any) -> List[OrderRecord]:
+        with self._lock:
+            return [r for r in self._orders.values() if r.parent_id == str(parent_id)]
+
+    def prune(self, older_than_seconds: float = 86400.0) -> int:
+        """Forget terminal orders finished more than older_than_seconds ago."""
+        cutoff = self._clock() - older_than_seconds
+        with self._lock:
+            stale = [
+                k
+                for k, r in self._orders.items()
+                if r.is_done and (r.done_at or 0) < cutoff
+            ]
+            for k in stale:
+                del self._orders[k]
+        return len(stale)
+
+    # ---- fills ---------------------------------------------------------
+
+    def fill_future(self, order_id: Any) -> Future:
+        """Future resolving to the OrderRecord when filled (OrderFailed otherwise).
+
+        Wrap with ``asyncio.wrap_future`` (or use ``await_fill``) to await it.
+        """
+        rec = self.get(order_id)
+        if rec is None:
+            raise KeyError(f"order {order_id} is not tracked")
+        return rec.future
+
+    def wait_for_fill(
+        self,
+        order_id: Any,
+        timeout: Optional[float] = None,
+        wait: Optional[Callable[[float], Any]] = None,
+    ) -> OrderRecord:
+        """Wait until the order fills. Raises OrderFailed or TimeoutError.
+
+        Fills arrive from ib_insync callbacks, which only run while its event
+        loop runs. On the thread that owns the IB connection pass ``wait``
+        (e.g. ``broker.sleep``) so the loop keeps running between checks;
+        blocking that thread on the bare future would never see the fill.
+        Without ``wait`` this blocks the calling thread, which is only safe on
+        a thread other than the IB one. Inside a running event loop (an IB
+        callback or a coroutine) it raises RuntimeError; use ``await_fill``.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "wait_for_fill would block the running event loop; use await_fill"
+            )
+        future = self.fill_future(order_id)
+        if wait is None:
+            return future.result(timeout=timeout)
+        deadline = None if timeout is None else self._clock() + timeout
+        while not future.done():
+            left = None if deadline is None else deadline - self._clock()
+            if left is not None and left <= 0:
+                raise TimeoutError(f"order {order_id} not filled within {timeout}s")
+            wait(0.25 if left is None else min(0.25, left))
+        return future.result()
+
+    async def await_fill(
+        self, order_id: Any, timeout: Optional[float] = None
+    ) -> OrderRecord:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(self.fill_future(order_id)), timeout
+        )
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        return {"ack": self.ack_latency.summary(), "fill": self.fill_latency.summary()}
+
+    # ---- state machine -------------------------------------------------
+
+    def _transition(self, rec: OrderRecord, new_state: str, reason: str = "") -> bool:
+        if new_state == rec.state:
+            return False
+        if new_state not in _TRANSITIONS.get(rec.state, set()):
+            logger.bind(
+                event="order_state_ignored",
+                order_id=rec.order_id,
+                state=rec.state,
+                status=new_state,
+            ).debug(
+                "Ignoring {} -> {} for order {}", rec.state, new_state, rec.order_id
+            )
+            return False
+        now = self._clock()
+        prev = rec.state
+        rec.state = new_state
+        rec.history.append((now, new_state))
+        if reason:
+            rec.reason = reason
+        if rec.acked_at is None and new_state != PENDING_SUBMIT:
+            rec.acked_at = now
+            self.ack_latency.add(now - rec.submitted_at)
+            ORDER_LATENCY.labels(kind="ack").observe(now - rec.submitted_at)
+        if rec.first_fill_at is None and new_state in (PARTIALLY_FILLED, FILLED):
+            rec.first_fill_at = now
+        if new_state in TERMINAL_STATES:
+            rec.done_at = now
+        logger.bind(
+            event="order_state",
+            order_id=rec.order_id,
+            symbol=rec.symbol,
+            parent_id=rec.parent_id,
+            prev=prev,
+            state=new_state,
+            filled=rec.filled,
+            reason=rec.reason or None,
+        ).info("Order {} {} -> {}", rec.order_id, prev, new_state)
+
+        if new_state == FILLED:
+            latency = now - rec.submitted_at
+            self.fill_latency.add(latency)
+            ORDER_LATENCY.labels(kind="fill").observe(latency)
+            logger.bind(
+                event="order_fill_latency",
+                order_id=rec.order_id,
+                symbol=rec.symbol,
+                latency_seconds=round(latency, 4),
+                avg_fill_price=rec.avg_fill_price,
+            ).info("Order {} filled in {:.3f}s", rec.order_id, latency)
+            if not rec.future.done():
+                rec.future.set_result(rec)
+        elif new_state in (CANCELLED, REJECTED) and not rec.future.done():
+            rec.future.set_exception(OrderFailed(rec))
+        return True
+
+    @staticmethod
+    def _update_filled(rec: OrderRecord) -> None:
+        # orderStatus and execDetails report the same fills in either order:
+        # take whichever view has seen more, never their sum
+        if rec.exec_filled > 0 and rec.exec_filled >= rec.status_filled:
+            rec.filled = rec.exec_filled
+            rec.avg_fill_price = rec.exec_notional / rec.exec_filled
+        elif rec.status_filled > 0:
+            rec.filled = rec.status_filled
+            rec.avg_fill_price = rec.status_avg_price or rec.avg_fill_price
+        rec.filled = min(rec.filled, rec.quantity)
+
+    def on_status(
+        self,
+        order_id: Any,
+        status: str,
+        filled: float = 0.0,
+        avg_fill_price: float = 0.0,
+        reason: str = "",
+    ) -> Optional[OrderRecord]:
+        """Apply an IB order status update. Unknown orders are ignored."""
+        with self._lock:
+            rec = self._orders.get(str(order_id))
+            if rec is None:
+                return None
+            state = _IB_STATUS.get(status, None)
+            if filled:
+                rec.status_filled = max(rec.status_filled, float(filled))
+                rec.status_avg_price = float(avg_fill_price or rec.status_avg_price)
+                self._update_filled(rec)
+            if state == SUBMITTED and 0 < rec.filled < rec.quantity:
+                state = PARTIALLY_FILLED
+            if state is not None:
+                self._transition(rec, state, reason)
+            return rec
+
+    def on_execution(
+        self, order_id: Any, exec_id: str, shares: float, price: float
+    ) -> Optional[OrderRecord]:
+        """Apply one execution report (deduplicated by exec_id)."""
+        with self._lock:
+            rec = self._orders.get(str(order_id))
+            if rec is None or exec_id in rec.exec_ids:
+                return rec
+            rec.exec_ids.add(exec_id)
+            rec.exec_filled += float(shares)
+            rec.exec_notional += float(price) * float(shares)
+            self._update_filled(rec)
+            self._transition(
+                rec, FILLED if rec.filled >= rec.quantity else PARTIALLY_FILLED
+            )
+            return rec
+
+    # ---- ib_insync adapters ---------------------------------------------
+
+    def _on_order_status(self, trade: Any) -> None:
+        try:
+            st = trade.orderStatus
+            reason = ""
+            if st.status in ("Inactive", "Cancelled", "ApiCancelled") and trade.log:
+                reason = getattr(trade.log[-1], "message", "") or ""
+            self.on_status(
+                trade.order.orderId, st.status, st.filled, st.avgFillPrice, reason
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("order status handling failed: {}", type(e).__name__)
+
+    def _on_exec_details(self, trade: Any, fill: Any) -> None:
+        try:
+            ex = fill.execution
+            self.on_execution(trade.order.orderId, ex.execId, ex.shares, ex.price)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("execution handling failed: {}", type(e).__name__)
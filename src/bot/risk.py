@@ -9,28 +9,28 @@ def position_size(
     equity: float, max_risk_pct: float, stop_loss_pct: float, option_premium: float
 ) -> int:
     """Calculate option contract size based on account equity and risk parameters.
-    
+
     Uses the Kelly-like formula: size = (account_risk_dollars) / (risk_per_contract)
-    where account_risk_dollars = equity * max_risk_pct and 
+    where account_risk_dollars = equity * max_risk_pct and
     risk_per_contract = option_premium * stop_loss_pct (max loss if SL hits).
-    
+
     Args:
         equity: Current account equity/balance in dollars.
         max_risk_pct: Maximum percentage of equity to risk on this trade (e.g., 0.01 for 1%).
         stop_loss_pct: Stop loss percentage from entry (e.g., 0.50 for 50% loss if triggered).
         option_premium: Current option price in dollars (determines per-contract notional).
-    
+
     Returns:
         Number of option contracts to trade. Minimum 1 if parameters allow trading,
         0 if inputs are invalid (zero or negative values).
-        
+
     Example:
         >>> position_size(equity=100000, max_risk_pct=0.01, stop_loss_pct=0.50, option_premium=2.50)
         4  # Risk $1000, lose $1.25 per share × $2.50 premium × 4 contracts = $1000
     """
     if equity <= 0 or option_premium <= 0 or stop_loss_pct <= 0:
         return 0
-    
+
     # 1. Risk-based sizing (Kelly-like)
     # How many contracts can we handle based on max loss?
     raw_shares = (equity * max_risk_pct) / (option_premium * stop_loss_pct)
@@ -46,7 +46,7 @@ def position_size(
 
     # 3. Final sizing: strict minimum of both
     sz = min(size_risk, size_cash)
-    
+
     return int(sz)
 
 
@@ -54,20 +54,20 @@ def guard_daily_loss(
     equity_start_day: float, equity_now: float, max_daily_loss_pct: float
 ) -> bool:
     """Check if daily loss exceeds the configured maximum threshold.
-    
+
     Calculates loss percentage as (start_equity - current_equity) / start_equity
     and returns True if this percentage meets or exceeds the max_daily_loss_pct threshold.
     Used to halt trading for the remainder of the trading day after loss limit is hit.
-    
+
     Args:
         equity_start_day: Account equity at start of trading day (reference point).
         equity_now: Current account equity.
         max_daily_loss_pct: Maximum acceptable daily loss as percentage (e.g., 0.05 for 5%).
-    
+
     Returns:
         True if loss_percentage >= max_daily_loss_pct (guard should trigger), False otherwise.
         Returns False if start_equity <= 0 (edge case: no reference to measure loss).
-    
+
     Example:
         >>> guard_daily_loss(100000, 95000, 0.10)  # Lost $5k, 5% < 10% limit
         False  # Keep trading
@@ -110,22 +110,27 @@ def stop_target_from_premium(
 DEFAULT_STATE_PATH = Path("logs/daily_state.json")
 
 
-def _today_key() -> str:
-    return datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%d")
+def _today_key(now: Optional[float] = None) -> str:
+    ts = (
+        datetime.now(timezone.utc)
+        if now is None
+        else datetime.fromtimestamp(now, timezone.utc)
+    )
+    return ts.astimezone().strftime("%Y-%m-%d")
 
 
 def load_equity_state(path: Path = DEFAULT_STATE_PATH) -> dict:
     """Load daily equity state from persistent JSON file.
-    
-        File format: {"YYYY-MM-DD": equity_float, ...}
-        Used to persist start-of-day equity across process restarts.
-    
-        Args:
-            path: Path to the JSON state file (default: logs/daily_state.json).
-    
-        Returns:
-            Dictionary mapping date strings to equity values. Empty dict if file missing or corrupted.
-        """
+
+    File format: {"YYYY-MM-DD": equity_float, ...}
+    Used to persist start-of-day equity across process restarts.
+
+    Args:
+        path: Path to the JSON state file (default: logs/daily_state.json).
+
+    Returns:
+        Dictionary mapping date strings to equity values. Empty dict if file missing or corrupted.
+    """
     try:
         if not path.exists():
             return {}
@@ -137,17 +142,17 @@ def load_equity_state(path: Path = DEFAULT_STATE_PATH) -> dict:
 
 def save_equity_state(state: dict, path: Path = DEFAULT_STATE_PATH) -> None:
     """Save daily equity state to persistent JSON file with atomic writes.
-    
-        Uses temp file + rename pattern to avoid data corruption on crashes.
-        Creates parent directories as needed.
-    
-        Args:
-            state: Dictionary mapping date strings to equity float values.
-            path: Path to the JSON state file (default: logs/daily_state.json).
-        """
+
+    Uses temp file + rename pattern to avoid data corruption on crashes.
+    Creates parent directories as needed.
+
+    Args:
+        state: Dictionary mapping date strings to equity float values.
+        path: Path to the JSON state file (default: logs/daily_state.json).
+    """
     import os
     import uuid
-    
+
     path.parent.mkdir(parents=True, exist_ok=True)
     # Use unique temp file to prevent race conditions
     tmp = path.with_suffix(f".tmp.{os.getpid()}.{uuid.uuid4().hex[:8]}")
@@ -161,7 +166,9 @@ def save_equity_state(state: dict, path: Path = DEFAULT_STATE_PATH) -> None:
             tmp.unlink()
 
 
-def get_start_of_day_equity(broker, path: Path = DEFAULT_STATE_PATH) -> Optional[float]:
+def get_start_of_day_equity(
+    broker, path: Path = DEFAULT_STATE_PATH, now: Optional[float] = None
+) -> Optional[float]:
     """Load or initialize start-of-day equity from persistent storage.
 
     Checks if today's date has a recorded start-of-day equity. If missing, queries
@@ -171,13 +178,15 @@ def get_start_of_day_equity(broker, path: Path = DEFAULT_STATE_PATH) -> Optional
     Args:
         broker: Broker instance with pnl() method returning dict with 'net' key.
         path: Path to the JSON state file (default: logs/daily_state.json).
+        now: Epoch seconds that decides "today" (default: wall clock); lets a
+            simulated clock replay several trading days.
 
     Returns:
         Start-of-day equity in dollars. Creates new entry if today missing.
         Returns 0.0 if broker.pnl() fails.
     """
     state = load_equity_state(path)
-    key = _today_key()
+    key = _today_key(now)
     if key in state and isinstance(state[key], (int, float)):
         return float(state[key])
     # initialize
@@ -192,10 +201,10 @@ def get_start_of_day_equity(broker, path: Path = DEFAULT_STATE_PATH) -> Optional
 
 def reset_daily_loss_guard(path: Path = DEFAULT_STATE_PATH) -> None:
     """Clear today's entry from daily loss guard state.
-    
+
     Used for extended dry-run testing across multiple restarts. Should only be
     called when reset_daily_guard_on_start is True in settings.
-    
+
     Args:
         path: Path to the JSON state file (default: logs/daily_state.json).
     """
@@ -207,10 +216,13 @@ def reset_daily_loss_guard(path: Path = DEFAULT_STATE_PATH) -> None:
 
 
 def should_stop_trading_today(
-    broker, max_daily_loss_pct: float, path: Path = DEFAULT_STATE_PATH
+    broker,
+    max_daily_loss_pct: float,
+    path: Path = DEFAULT_STATE_PATH,
+    now: Optional[float] = None,
 ) -> bool:
     """Check if daily loss limit has been exceeded, halting new entries."""
-    sod = get_start_of_day_equity(broker, path)
+    sod = get_start_of_day_equity(broker, path, now)
     try:
         now = float(broker.pnl().get("net", 0.0))
     except Exception:  # pylint: disable=broad-except
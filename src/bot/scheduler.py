@@ -2,69 +2,112 @@ import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date as ddate
-from datetime import datetime
-from datetime import time as dtime
-from datetime import timezone
+from datetime import datetime, timezone
+from pathlib import Path
 from threading import Event, Lock
-from typing import Any, Dict, Optional
-from zoneinfo import ZoneInfo
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from . import log as _log
-
-logger = _log.logger
-
+from .data.archive import BarArchive
 from .data.options import pick_weekly_option
-from .execution import build_bracket, emulate_oco, is_liquid
+from .deadline import CycleBudget, DeadlineExceeded
+from .execution import (
+    ExecutionResult,
+    build_bracket,
+    chase_limit,
+    emulate_oco,
+    is_liquid,
+)
+from .exit_monitor import ExitMonitor
 from .journal import log_trade
+from .lock_profiler import LockProfiler, call_site, method_name
+from .metrics import (
+    CACHE_LOOKUPS,
+    CIRCUIT_STATE,
+    CIRCUIT_STATE_VALUES,
+    CYCLE_DURATION,
+    CYCLES,
+    LAST_CYCLE,
+    OPEN_POSITIONS,
+    ORDER_THROTTLE_TOKENS,
+)
 from .monitoring import alert_all, send_heartbeat, trade_alert
-from .risk import position_size, should_stop_trading_today
-from .strategy.scalp_rules import scalp_signal
-from .strategy.whale_rules import whale_rules
-from .strategy.geo_rules import geo_rules
+from .risk import DEFAULT_STATE_PATH, position_size, should_stop_trading_today
+from .settings_watcher import SettingsSnapshot, SettingsWatcher, derive
 from .strategy.daily_volume_rules import daily_volume_rules
-from .data.options import pick_weekly_option, find_strategic_option
-from ib_insync import Index
+from .throttle import TokenBucket
+from .tracing import CycleTrace
+from .trading_calendar import NY_TZ, get_calendar
+
+logger = _log.logger
+
+# Runs a job every `interval_seconds` during NYSE sessions (09:30-16:00 ET, 13:00 on
+# half-days, closed on exchange holidays; see trading_calendar). Outside a session
+# the loop sleeps until the next open. Signal evaluation only fires once per closed
+# bar (see _signal_due); position management keeps running at the fast interval, but
+# its EMA trend-exit check only refetches 1-hour bars once per closed hourly bar.
+
+# Clock seam: run_cycle and the circuit breaker read time through these so a
+# simulated broker (backtest.sim_broker) can replay sessions faster than real
+# time. Live runs never change them.
+_time_fn: Callable[[], float] = time.time
+_monotonic_fn: Callable[[], float] = time.monotonic
+_sleep_fn: Callable[[float], None] = time.sleep
+
+
+def set_clock(
+    time_fn: Optional[Callable[[], float]] = None,
+    sleep_fn: Optional[Callable[[float], None]] = None,
+) -> None:
+    """Route scheduler time through time_fn/sleep_fn; call with no args to restore."""
+    global _time_fn, _monotonic_fn, _sleep_fn
+    _time_fn = time_fn or time.time
+    _monotonic_fn = time_fn or time.monotonic
+    _sleep_fn = sleep_fn or time.sleep
 
-# Runs a job every `interval_seconds` during regular trading hours (09:30-16:00 ET)
-# Note: consider adding US holiday calendar and pre/post-market handling
+
+def _utcnow() -> datetime:
+    return datetime.fromtimestamp(_time_fn(), timezone.utc)
 
 
 class GatewayCircuitBreaker:
     """Detect and prevent cascading failures from sustained Gateway issues.
-    
+
     After N consecutive failures, opens circuit to prevent overwhelming Gateway
     with retry requests. Allows periodic recovery attempts (half-open state).
     """
-    
+
     def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: int = 300):
         self.failures = 0
         self.threshold = failure_threshold
         self.state = "CLOSED"  # CLOSED=healthy, OPEN=tripped, HALF_OPEN=testing
         self.last_failure_time = 0
         self.reset_timeout = reset_timeout_seconds
-    
+
     def record_failure(self):
         """Record a failure and update circuit state."""
         self.failures += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = _time_fn()
         if self.failures >= self.threshold:
             self.state = "OPEN"
-            logger.warning("GatewayCircuitBreaker OPEN: %d consecutive failures", self.failures)
-    
+            logger.warning(
+                "GatewayCircuitBreaker OPEN: %d consecutive failures", self.failures
+            )
+
     def record_success(self):
         """Record a success and reset circuit."""
         if self.failures > 0:
             logger.info("GatewayCircuitBreaker reset after %d failures", self.failures)
         self.failures = 0
         self.state = "CLOSED"
-    
+
     def should_attempt(self) -> bool:
         """Determine if operation should be attempted based on circuit state."""
         if self.state == "CLOSED":
             return True
         elif self.state == "OPEN":
             # Allow recovery attempt after timeout
-            elapsed = time.time() - self.last_failure_time
+            elapsed = _time_fn() - self.last_failure_time
             if elapsed > self.reset_timeout:
                 self.state = "HALF_OPEN"
                 logger.info("GatewayCircuitBreaker HALF_OPEN: attempting recovery")
@@ -74,7 +117,13 @@ class GatewayCircuitBreaker:
             return True  # Allow recovery attempt
 
 
-_gateway_circuit_breaker = GatewayCircuitBreaker(failure_threshold=3, reset_timeout_seconds=300)
+_gateway_circuit_breaker = GatewayCircuitBreaker(
+    failure_threshold=3, reset_timeout_seconds=300
+)
+# Read at scrape time, so a breaker swapped in by replay/tests is still reported
+CIRCUIT_STATE.labels(breaker="gateway").set_function(
+    lambda: CIRCUIT_STATE_VALUES.get(_gateway_circuit_breaker.state, -1)
+)
 
 # Symbol bar cache for fallback when fetch fails
 # Structure: { symbol: (bars, timestamp) }
@@ -82,10 +131,129 @@ _symbol_bar_cache: Dict[str, tuple] = {}
 
 
 def is_rth(now_utc: datetime) -> bool:
-    ny = now_utc.astimezone(ZoneInfo("America/New_York"))
-    start = dtime(hour=9, minute=30)
-    end = dtime(hour=16, minute=0)
-    return start <= ny.time() <= end
+    """True during an NYSE regular session (holidays and half-days honoured)."""
+    return get_calendar().is_open(now_utc.timestamp())
+
+
+# Bar-close tracking: symbol -> epoch of the bar boundary last evaluated for signals.
+# Trend-exit checks use their own "<symbol>@<bar size>" keys (see _trend_key).
+_last_signal_bar: Dict[str, float] = {}
+
+# Trend exits compare the last closed 1-hour bar against its EMA-20
+_TREND_BAR_SIZE = "1 hour"
+_TREND_BAR_SECONDS = 3600
+
+_BAR_UNIT_SECONDS = {
+    "sec": 1,
+    "secs": 1,
+    "min": 60,
+    "mins": 60,
+    "hour": 3600,
+    "hours": 3600,
+    "day": 86400,
+    "days": 86400,
+}
+
+
+def bar_size_seconds(bar_size: str) -> int:
+    """Parse an IBKR bar size string ('1 min', '5 mins', '1 hour') into seconds.
+
+    Raises:
+        ValueError: If the string is not a recognised IBKR bar size.
+    """
+    try:
+        count_str, unit = bar_size.strip().split()
+        seconds = int(count_str) * _BAR_UNIT_SECONDS[unit.lower()]
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"unsupported bar size: {bar_size!r}") from e
+    if seconds <= 0:
+        raise ValueError(f"unsupported bar size: {bar_size!r}")
+    return seconds
+
+
+_DURATION_UNIT_SECONDS = {
+    "S": 1,
+    "D": 86400,
+    "W": 7 * 86400,
+    "M": 30 * 86400,
+    "Y": 365 * 86400,
+}
+
+
+def duration_seconds(duration: str) -> int:
+    """Approximate length of an IBKR duration string ('3600 S', '2 D') in calendar seconds.
+
+    Raises:
+        ValueError: If the string is not '<count> <S|D|W|M|Y>'.
+    """
+    try:
+        count_str, unit = duration.strip().split()
+        return int(count_str) * _DURATION_UNIT_SECONDS[unit.upper()]
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"unsupported duration: {duration!r}") from e
+
+
+def last_bar_boundary(now_utc: datetime, bar_seconds: int) -> float:
+    """Return the epoch of the most recent bar close at or before now_utc.
+
+    Boundaries are aligned to New York midnight, which matches IBKR's RTH bars
+    (09:30 open is a multiple of every intraday bar size up to 30 mins, and
+    hourly RTH bars close on the hour).
+    """
+    ny = now_utc.astimezone(NY_TZ)
+    midnight = ny.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (ny - midnight).total_seconds()
+    step = min(bar_seconds, 86400)
+    return midnight.timestamp() + (elapsed // step) * step
+
+
+def _signal_due(symbol: str, boundary: float) -> bool:
+    """True when a bar has closed for symbol since its last signal evaluation."""
+    return _last_signal_bar.get(symbol) != boundary
+
+
+def _trend_key(symbol: str) -> str:
+    return f"{symbol}@{_TREND_BAR_SIZE}"
+
+
+# Account-wide inputs (funds, VIX) fetched once per bar and shared by every
+# run_cycle of that bar: the event engine runs one cycle per symbol job plus
+# exit passes in between. (id(broker), name) -> (bar boundary, value)
+_per_bar_cache: Dict[Tuple[int, str], Tuple[float, Any]] = {}
+_per_bar_lock = Lock()
+
+
+def _per_bar(broker, name: str, boundary: float, fetch: Callable[[], Any]) -> Any:
+    """``fetch()`` once per bar boundary; failures are not cached."""
+    key = (id(broker), name)
+    with _per_bar_lock:
+        hit = _per_bar_cache.get(key)
+    if hit is not None and hit[0] == boundary:
+        return hit[1]
+    value = fetch()
+    with _per_bar_lock:
+        _per_bar_cache[key] = (boundary, value)
+    return value
+
+
+def _drop_forming_bar(df, boundary: float):
+    """Drop bars that started at or after the latest boundary (still forming).
+
+    Only applies when the index is a timezone-aware DatetimeIndex; naive or
+    non-time indexes are returned unchanged because their zone is unknown.
+    """
+    index = getattr(df, "index", None)
+    tz = getattr(index, "tz", None)
+    if tz is None or len(df) == 0:
+        return df
+    try:
+        import importlib
+
+        pd = importlib.import_module("pandas")  # type: ignore
+        cutoff = pd.Timestamp(boundary, unit="s", tz="UTC")
+        return df[index < cutoff]
+    except Exception:  # pylint: disable=broad-except
+        return df
 
 
 def _to_df(bars_iter) -> Any:
@@ -126,28 +294,328 @@ _TIMEOUT_BACKOFF_CYCLES = 2  # Skip for M cycles after threshold hit
 
 # Request throttling: add delay between symbol processing to prevent Gateway buffer overflow
 _LAST_REQUEST_TIME: Dict[str, float] = {}  # symbol -> last request timestamp
-_REQUEST_THROTTLE_DELAY = 0.2  # 200ms delay between symbol requests (prevents 1.3MB+ buffers)
+_REQUEST_THROTTLE_DELAY = (
+    0.2  # 200ms delay between symbol requests (prevents 1.3MB+ buffers)
+)
 _throttle_lock = Lock()  # Thread-safe access to _LAST_REQUEST_TIME
 
 
-def run_cycle(broker, settings: Dict[str, Any]):
-    """One scheduler cycle: fetch bars, compute signals, and optionally submit orders."""
-    
+# Single exit monitor shared by all positions when risk.exit_mode == "monitor"
+_exit_monitor: Optional[ExitMonitor] = None
+_exit_monitor_lock = Lock()
+# Limits shared with the other shards of a sharded deployment (see sharding):
+# a global entry-order throttle and a daily halt flag. None in a single process.
+_shared_limits: Optional[Any] = None
+
+
+def set_shared_limits(limits: Optional[Any] = None) -> None:
+    """Make entries consult ``limits`` (a ``sharding.SharedLimits``); no args to clear."""
+    global _shared_limits
+    _shared_limits = limits
+
+
+# Wait/hold times of every _with_broker_lock call, across cycles (see lock_profiler)
+_broker_lock_profiler = LockProfiler("broker")
+ORDER_THROTTLE_TOKENS.set_function(
+    lambda: (
+        _exit_monitor.throttle.available if _exit_monitor is not None else float("nan")
+    )
+)
+
+
+def _monitor_mode(settings: Dict[str, Any]) -> bool:
+    return settings.get("risk", {}).get("exit_mode", "bracket") == "monitor"
+
+
+# Bar archive for historical.archive_dir, built on first use
+_bar_archive: Optional[BarArchive] = None
+_bar_archive_lock = Lock()
+_bar_archive_disabled: set = set()  # roots that failed to open (warned once)
+
+
+def get_bar_archive(settings: Dict[str, Any]) -> Optional[BarArchive]:
+    """Return the process-wide bar archive, or None when unset or unavailable."""
+    global _bar_archive
+    root = settings.get("historical", {}).get("archive_dir")
+    if not root:
+        return None
+    with _bar_archive_lock:
+        if _bar_archive is not None and _bar_archive.root == Path(root):
+            return _bar_archive
+        if root in _bar_archive_disabled:
+            return None
+        try:
+            _bar_archive = BarArchive(root)
+        except RuntimeError as e:
+            _bar_archive_disabled.add(root)
+            logger.bind(event="bar_archive_unavailable", error=str(e)).warning(
+                "Bar archive disabled: {}", e
+            )
+            return None
+        return _bar_archive
+
+
+def _archive_bars(
+    archive: Optional[BarArchive], symbol: str, bar_size: str, bars
+) -> None:
+    """Best-effort append of freshly fetched bars; never fails the cycle."""
+    if archive is None:
+        return
+    try:
+        archive.append(symbol, bar_size, bars)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.bind(
+            event="bar_archive_error", symbol=symbol, error_type=type(e).__name__
+        ).warning("Bar archive append failed: {}", e)
+
+
+def _archive_preload(
+    archive: BarArchive, symbol: str, bar_size: str, count: int, duration: str
+) -> Tuple[Any, str]:
+    """Cold start: the last archived bars, and a request duration covering only the gap since them.
+
+    IBKR caps second-based durations at one day, so a longer gap keeps the
+    configured duration (the archived bars still extend indicator history).
+    """
+    try:
+        tail = archive.tail(symbol, bar_size, count)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.bind(
+            event="bar_archive_error", symbol=symbol, error_type=type(e).__name__
+        ).warning("Bar archive preload failed: {}", e)
+        return None, duration
+    if tail.empty:
+        return None, duration
+    window = int(_time_fn() - tail.index[-1].timestamp()) + bar_size_seconds(bar_size)
+    if window < min(duration_seconds(duration), 86400):
+        duration = f"{window} S"
+    logger.bind(
+        event="bar_archive_preload", symbol=symbol, bars=len(tail), duration=duration
+    ).info(
+        "Preloaded {} archived bars for {}; requesting {}", len(tail), symbol, duration
+    )
+    return tail, duration
+
+
+def _merge_bars(archived, fetched):
+    """Archived bars followed by fetched ones; fetched rows win on equal timestamps."""
+    try:
+        import importlib
+
+        pd = importlib.import_module("pandas")  # type: ignore
+        merged = pd.concat([archived, fetched.loc[:, list(archived.columns)]])
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+    except Exception as e:  # pylint: disable=broad-except
+        # Fetched bars alone are still usable; only the archived history is lost
+        logger.bind(event="bar_merge_failed", error_type=type(e).__name__).warning(
+            "Archived bars not merged ({}); using fetched bars only", e
+        )
+        return fetched
+
+
+def _delta_range(cfg_opts: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(min, max) |delta| filter from options settings, or None when unset."""
+    lo, hi = cfg_opts.get("min_abs_delta"), cfg_opts.get("max_abs_delta")
+    if lo is None and hi is None:
+        return None
+    return (0.0 if lo is None else float(lo), 1.0 if hi is None else float(hi))
+
+
+def get_exit_monitor(broker, settings: Dict[str, Any]) -> ExitMonitor:
+    """Return the process-wide exit monitor, creating it on first use."""
+    global _exit_monitor
+    with _exit_monitor_lock:
+        if _exit_monitor is None or _exit_monitor.broker is not broker:
+            cfg_risk = settings.get("risk", {})
+            _exit_monitor = ExitMonitor(
+                broker,
+                order_throttle=TokenBucket.per_minute(
+                    int(cfg_risk.get("max_orders_per_minute", 20))
+                ),
+                dry_run=bool(settings.get("dry_run")),
+            )
+        return _exit_monitor
+
+
+def check_exits(broker, settings: Dict[str, Any]) -> None:
+    """Evaluate every monitored position against one quote batch.
+
+    Runs in monitor mode, and in bracket mode while the monitor covers fills
+    that lost their bracket children (see ``ExecutionResult.unprotected_filled``).
+    """
+    if not _monitor_mode(settings) and not (
+        _exit_monitor is not None and len(_exit_monitor)
+    ):
+        return
+    monitor = get_exit_monitor(broker, settings)
+    if len(monitor):
+        monitor.check()
+
+
+def seed_exit_monitor(broker, settings: Dict[str, Any]) -> int:
+    """Register exit rules for option positions already open at startup.
+
+    Thresholds are derived from IB's average cost (per contract, so divided by
+    the multiplier) using the configured TP/SL percentages.
+    """
+    if not _monitor_mode(settings):
+        return 0
+    cfg_risk = settings.get("risk", {})
+    monitor = get_exit_monitor(broker, settings)
+    seeded = 0
+    try:
+        positions = broker.positions()
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning(
+            "Could not load positions for exit monitor: {}", type(e).__name__
+        )
+        return 0
+    for p in positions:
+        contract = p.get("contract")
+        qty = p.get("position", 0) or 0
+        if contract is None or getattr(contract, "secType", "") != "OPT" or qty <= 0:
+            continue
+        multiplier = float(getattr(contract, "multiplier", 0) or 100)
+        entry = float(p.get("avgCost") or 0.0) / multiplier
+        if entry <= 0:
+            continue
+        bracket = build_bracket(
+            entry, cfg_risk.get("take_profit_pct"), cfg_risk.get("stop_loss_pct")
+        )
+        monitor.add(
+            contract,
+            side="BUY",
+            quantity=int(qty),
+            take_profit=bracket.get("take_profit"),
+            stop_loss=bracket.get("stop_loss"),
+            trailing_pct=cfg_risk.get("trailing_stop_pct"),
+        )
+        seeded += 1
+    return seeded
+
+
+def _register_exit_rule(
+    broker,
+    settings: Dict[str, Any],
+    contract: Any,
+    side: str,
+    size: int,
+    order_id: Any,
+    execution: Optional[ExecutionResult],
+    **thresholds: Any,
+) -> Optional[str]:
+    """Add the exit-monitor rule for an entry, sized by its confirmed fills.
+
+    Dry runs register ``size``. Live entries register only what the order
+    manager reports filled (growing with later fills); a rule for an unfilled
+    quantity would sell contracts that are not held.
+    """
+    monitor = get_exit_monitor(broker, settings)
+    if settings.get("dry_run"):
+        return monitor.add(
+            contract, side, size, parent_order_id=str(order_id), **thresholds
+        )
+    order_mgr = getattr(broker, "orders", None)
+    # A chase that fell back to market keeps filling on the market order; the
+    # limit order it replaced is final and counts as already filled
+    tracked_id = (
+        execution.market_order_id if execution is not None else None
+    ) or order_id
+    record = order_mgr.get(tracked_id) if order_mgr is not None else None
+    if record is not None:
+        base_filled = 0.0
+        if str(tracked_id) != str(order_id):
+            limit_rec = order_mgr.get(order_id)
+            base_filled = limit_rec.filled if limit_rec is not None else 0.0
+        key = monitor.add_filled(
+            contract, side, record, base_filled=base_filled, **thresholds
+        )
+        if key is None:
+            logger.bind(
+                event="exit_rule_pending", order_id=str(order_id), quantity=size
+            ).info(
+                "Entry {} has no fill yet; its exit rule is added when it fills",
+                order_id,
+            )
+        return key
+    if execution is not None and int(execution.filled) > 0:
+        return monitor.add(
+            contract,
+            side,
+            int(execution.filled),
+            parent_order_id=str(order_id),
+            **thresholds,
+        )
+    logger.bind(
+        event="exit_rule_skipped", order_id=str(order_id), quantity=size
+    ).warning("Entry {} has no confirmed fill; no exit rule registered", order_id)
+    return None
+
+
+def submit_order(
+    broker,
+    ticket,
+    quote,
+    settings: Dict[str, Any],
+    call: Optional[Callable[..., Any]] = None,
+) -> Tuple[str, Optional[ExecutionResult]]:
+    """Send ticket with the configured execution algo ("market" or "chase").
+
+    ``call`` wraps each broker request (``call(fn, *args)``); pass the broker
+    lock wrapper so a chase holds the lock per request, not for its whole run.
+
+    Returns the order id and, for chased orders, the ExecutionResult (fills/slippage).
+    """
+    call = call or (lambda fn, *args: fn(*args))
+    cfg = settings.get("execution", {})
+    if cfg.get("algo", "market") != "chase" or quote is None:
+        return str(call(broker.place_order, ticket)), None
+    res = chase_limit(
+        broker,
+        ticket,
+        quote,
+        tick_size=float(cfg.get("tick_size", 0.01)),
+        step_ticks=int(cfg.get("step_ticks", 1)),
+        step_interval_seconds=float(cfg.get("step_interval_seconds", 2.0)),
+        max_chase_ticks=int(cfg.get("max_chase_ticks", 10)),
+        fallback_to_market=bool(cfg.get("fallback_to_market", True)),
+        call=call,
+    )
+    return str(res.order_id), res
+
+
+def run_cycle(broker, settings: Dict[str, Any], evaluate_signals: bool = True):
+    """One scheduler cycle: fetch bars, compute signals, and optionally submit orders.
+
+    With evaluate_signals=False only position management runs (exit checks):
+    one positions() snapshot is taken and only symbols holding an option
+    position are visited.
+    """
+    cycle_start = _time_fn()
+    symbols = settings.get("symbols", [])
+    # Derived values are computed once per settings snapshot; plain dicts derive them here
+    derived = (
+        settings.derived if isinstance(settings, SettingsSnapshot) else derive(settings)
+    )
+    bar_boundary = last_bar_boundary(_utcnow(), derived.hist_bar_seconds)
+
     # --- FUND SAFETY CHECK ---
     # Proactively check funds before starting the cycle to avoid scanning if we can't trade.
     # This prevents the bot from "waking up", finding a trade, and then failing at the last second.
     try:
-        acct = broker.account()
+        acct = _per_bar(broker, "account", bar_boundary, broker.account)
         # 'AvailableFunds' is the standard tag for cash available for trading
         # 'NetLiquidation' is total account value
         avail = float(acct.get("AvailableFunds", 0.0))
         net_liq = float(acct.get("NetLiquidation", 0.0))
-        
+
         # Threshold: minimal amount to reasonably open an option position (e.g., $500)
         # If funds are critically low, enter maintenance mode immediately.
         if avail < 500.0:
             if not getattr(broker, "insufficient_funds", False):
-                logger.warning(f"LOW FUNDS DETECTED: Available Funds (${avail:.2f}) < $500. Entering Maintenance Mode.")
+                logger.warning(
+                    f"LOW FUNDS DETECTED: Available Funds (${avail:.2f}) < $500. Entering Maintenance Mode."
+                )
                 # We can set the flag on the broker object to persist this state across cycles if desired,
                 # or just rely on the logging here.
                 # Setting the flag ensures consistency with the error-based trigger.
@@ -158,11 +626,19 @@ def run_cycle(broker, settings: Dict[str, Any]):
 
     # Check for maintenance mode triggers (flag set by error 201 OR the check above)
     if getattr(broker, "insufficient_funds", False):
-        logger.warning("MAINTENANCE MODE: Insufficient funds detected. Skipping new trade scan to monitor existing positions.")
+        logger.warning(
+            "MAINTENANCE MODE: Insufficient funds detected. Skipping new trade scan to monitor existing positions."
+        )
         return
 
-    cycle_start = time.time()
-    symbols = settings.get("symbols", [])
+    # Per-cycle time budget so one stuck request cannot overrun the next cycle
+    budget = CycleBudget(
+        derived.cycle_budget_seconds,
+        derived.stage_budget_seconds,
+        clock=_monotonic_fn,
+    )
+    # Per-stage span timings (real time, also under a simulated clock), sampled per cycle
+    trace = CycleTrace(derived.trace_sample_rate)
 
     # Ensure broker access is serialized unless the implementation is known to be thread-safe
     broker_lock = getattr(broker, "_thread_lock", None)
@@ -175,45 +651,91 @@ def run_cycle(broker, settings: Dict[str, Any]):
             asyncio.get_event_loop()
         except RuntimeError:
             asyncio.set_event_loop(asyncio.new_event_loop())
-        
-        with broker_lock:
+
+        requested = time.perf_counter()
+        with trace.span("lock_wait"):
+            broker_lock.acquire()
+        acquired = time.perf_counter()
+        try:
             return fn(*args, **kwargs)
+        finally:
+            broker_lock.release()
+            _broker_lock_profiler.record(
+                call_site(),
+                method_name(fn),
+                acquired - requested,
+                time.perf_counter() - acquired,
+            )
 
-    historical_cfg = settings.get("historical", {})
-    hist_duration = historical_cfg.get("duration", "3600 S")  # Default to 1 hour (was 7200 S)
-    hist_use_rth = bool(historical_cfg.get("use_rth", True))  # Default to RTH (was False)
-    hist_bar_size = historical_cfg.get("bar_size", "1 min")
-    hist_what = historical_cfg.get("what_to_show", "TRADES")
-    # Calculate timeout based on duration: ~1.5 seconds per minute of data requested
-    duration_seconds = int(hist_duration.split()[0])
-    hist_timeout = historical_cfg.get("timeout", max(60, duration_seconds // 40 + 30))
+    hist_duration = derived.hist_duration
+    hist_use_rth = derived.hist_use_rth
+    hist_bar_size = derived.hist_bar_size
+    hist_what = derived.hist_what
+    hist_timeout = derived.hist_timeout
+
+    # --- Bar-close gating: evaluate signals only once per closed bar ---
+    signal_on_bar_close = derived.signal_on_bar_close
+    signals_due = {
+        sym
+        for sym in symbols
+        if evaluate_signals
+        and (not signal_on_bar_close or _signal_due(sym, bar_boundary))
+    }
 
     # --- Geopolitical Strategy: Fetch VIX Snapshot ---
-    vix_value = 20.0 # Default fallback
-    try:
-        # We need a quick snapshot of VIX. 
+    vix_value = 20.0  # Default fallback
+    # Skipped when no bar has closed for any symbol (no signal evaluation due);
+    # fetched once per bar however many cycles (symbol jobs) that bar runs
+    if signals_due:
+        # We need a quick snapshot of VIX.
         # Note: We use _with_broker_lock because we might need to qualify contract.
-        def _get_vix():
-            vix_idx = Index('VIX', 'CBOE')
+        def _get_vix(deadline):
+            from ib_insync import Index  # deferred: only the live VIX snapshot needs it
+
+            vix_idx = Index("VIX", "CBOE")
             broker.ib.qualifyContracts(vix_idx)
             # reqMktData is async generally but if we don't have a ticker, we might need one.
             # Using market_data helper if available or direct reqMktData
             # Assuming broker.market_data handles Index objects:
-            return broker.market_data(vix_idx)
-            
-        vix_ticker = _with_broker_lock(_get_vix)
-        # Use last or close or typical
-        v = getattr(vix_ticker, 'last', 0.0)
-        if not v or v <= 0:
-            v = getattr(vix_ticker, 'close', 0.0)
-        if v > 0:
-            vix_value = float(v)
-            logger.info(f"Market VIX Level: {vix_value:.2f}")
-        else:
+            return broker.market_data(vix_idx, timeout=deadline.clamp(5.0))
+
+        def _fetch_vix() -> float:
+            with budget.stage("quotes") as vix_deadline:
+                vix_ticker = _with_broker_lock(_get_vix, vix_deadline)
+            # Use last or close or typical
+            v = getattr(vix_ticker, "last", 0.0)
+            if not v or v <= 0:
+                v = getattr(vix_ticker, "close", 0.0)
+            if v > 0:
+                logger.info("Market VIX Level: {:.2f}", float(v))
+                return float(v)
             logger.warning("VIX data returned 0.0, using default 20.0")
-            
-    except Exception as e:
-        logger.warning(f"Failed to fetch VIX: {e}. Using default {vix_value}")
+            return vix_value
+
+        try:
+            vix_value = _per_bar(broker, "vix", bar_boundary, _fetch_vix)
+        except Exception as e:
+            logger.warning(f"Failed to fetch VIX: {e}. Using default {vix_value}")
+
+    # Position-only pass (event engine exit job): one positions() snapshot for
+    # every symbol, and symbols without an open option position are not visited
+    positions_snapshot = None
+    if not evaluate_signals:
+        try:
+            positions_snapshot = _with_broker_lock(broker.positions)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                "Position-only pass skipped; positions() failed: {}", type(e).__name__
+            )
+            return
+        held = {
+            getattr(p.get("contract"), "symbol", "")
+            for p in positions_snapshot
+            if isinstance(p, dict)
+            and getattr(p.get("contract"), "secType", "") == "OPT"
+            and (p.get("position", 0) or 0) > 0
+        }
+        symbols = [sym for sym in symbols if sym in held]
 
     def process_symbol(symbol: str):
         try:
@@ -223,17 +745,19 @@ def run_cycle(broker, settings: Dict[str, Any]):
                     symbol=symbol,
                     event="circuit_breaker_open",
                     circuit_state=_gateway_circuit_breaker.state,
-                ).warning("Skipping symbol; circuit breaker is OPEN (Gateway recovery in progress)")
+                ).warning(
+                    "Skipping symbol; circuit breaker is OPEN (Gateway recovery in progress)"
+                )
                 return
-            
+
             # Throttle requests: 200ms delay between symbols to prevent Gateway EBuffer overflow
             # Use lock for thread-safe access when max_concurrent_symbols > 1
             with _throttle_lock:
                 last_req = _LAST_REQUEST_TIME.get(symbol, 0)
-                elapsed = time.time() - last_req
+                elapsed = _time_fn() - last_req
                 if elapsed < _REQUEST_THROTTLE_DELAY:
-                    time.sleep(_REQUEST_THROTTLE_DELAY - elapsed)
-                _LAST_REQUEST_TIME[symbol] = time.time()
+                    _sleep_fn(_REQUEST_THROTTLE_DELAY - elapsed)
+                _LAST_REQUEST_TIME[symbol] = _time_fn()
 
             # Check backoff: skip symbol if it's in timeout backoff period
             if symbol in _timeout_tracker:
@@ -258,9 +782,13 @@ def run_cycle(broker, settings: Dict[str, Any]):
                     return
 
             # Ensure broker is connected before processing
-            if hasattr(broker, "is_connected") and callable(getattr(broker, "is_connected")):
+            if hasattr(broker, "is_connected") and callable(
+                getattr(broker, "is_connected")
+            ):
                 if not broker.is_connected():
-                    logger.warning("Broker disconnected; attempting reconnection for {}", symbol)
+                    logger.warning(
+                        "Broker disconnected; attempting reconnection for {}", symbol
+                    )
                     try:
                         broker.connect()
                         logger.info("Broker reconnected successfully")
@@ -272,17 +800,19 @@ def run_cycle(broker, settings: Dict[str, Any]):
                         )
                         return
             # Check daily loss guard once per cycle; if triggered, skip new entries
+            risk_cfg = settings.get("risk", {})
             loss_guard = should_stop_trading_today(
-                broker, settings.get("risk", {}).get("max_daily_loss_pct", 0.15)
+                broker,
+                risk_cfg.get("max_daily_loss_pct", 0.15),
+                Path(risk_cfg.get("daily_state_path") or DEFAULT_STATE_PATH),
+                now=_time_fn(),
             )
             if loss_guard:
                 logger.warning("Daily loss guard active; skipping new positions")
+                if _shared_limits is not None:
+                    _shared_limits.halt("daily_loss", now=_time_fn())
                 # Alert once per trading day
-                ny = (
-                    datetime.now(timezone.utc)
-                    .replace(tzinfo=ZoneInfo("UTC"))
-                    .astimezone(ZoneInfo("America/New_York"))
-                )
+                ny = _utcnow().astimezone(NY_TZ)
                 with _loss_alert_lock:
                     if _LOSS_ALERTED_DATE["date"] != ny.date():
                         alert_all(
@@ -297,220 +827,390 @@ def run_cycle(broker, settings: Dict[str, Any]):
             # ============================================
             try:
                 # Check if we have an open option position for this symbol
-                current_positions = _with_broker_lock(broker.positions)
-                my_position = None
-                
-                for p in current_positions:
-                    # Start with safety checks for dict keys
-                    if not isinstance(p, dict): continue
-                    c = p.get('contract')
-                    if not c: continue
-                    
-                    # Check if symbol matches and it is an option
-                    c_symbol = getattr(c, 'symbol', '')
-                    c_sectype = getattr(c, 'secType', '')
-                    
-                    if c_symbol == symbol and c_sectype == 'OPT':
-                        if p.get('position', 0) > 0:
-                            my_position = p
-                            break
-                
+                with trace.span("position_check"):
+                    if positions_snapshot is not None:
+                        current_positions = positions_snapshot
+                    else:
+                        current_positions = _with_broker_lock(broker.positions)
+                    OPEN_POSITIONS.set(
+                        sum(
+                            1
+                            for p in current_positions
+                            if isinstance(p, dict) and p.get("position")
+                        )
+                    )
+                    my_position = None
+
+                    for p in current_positions:
+                        # Start with safety checks for dict keys
+                        if not isinstance(p, dict):
+                            continue
+                        c = p.get("contract")
+                        if not c:
+                            continue
+
+                        # Check if symbol matches and it is an option
+                        c_symbol = getattr(c, "symbol", "")
+                        c_sectype = getattr(c, "secType", "")
+
+                        if c_symbol == symbol and c_sectype == "OPT":
+                            if p.get("position", 0) > 0:
+                                my_position = p
+                                break
+
                 if my_position is not None:
-                    pos_contract = my_position['contract']
-                    pos_qty = my_position['position']
-                    logger.bind(symbol=symbol, position=pos_qty).info("Managing existing position - Checking trends...")
-                    
+                    pos_contract = my_position["contract"]
+                    pos_qty = my_position["position"]
+                    # EMA-20 of closed hourly bars only moves when an hourly bar closes;
+                    # until then the verdict cannot change, so skip the 4-day fetch
+                    trend_boundary = last_bar_boundary(_utcnow(), _TREND_BAR_SECONDS)
+                    if signal_on_bar_close and not _signal_due(
+                        _trend_key(symbol), trend_boundary
+                    ):
+                        logger.bind(
+                            symbol=symbol,
+                            event="trend_check_not_due",
+                            bar_boundary=trend_boundary,
+                        ).debug(
+                            "Holding {}: no new {} bar since the last trend check",
+                            symbol,
+                            _TREND_BAR_SIZE,
+                        )
+                        return
+                    logger.bind(symbol=symbol, position=pos_qty).info(
+                        "Managing existing position - Checking trends..."
+                    )
+
                     # Fetch 1-hour bars for EMA calculation (Need ~4 days for 20 EMA warmup in RTH)
                     # 1 day = 6.5 hours. 4 days = 26 hours > 20.
-                    bars_1h = _with_broker_lock(
-                        broker.historical_prices,
-                        symbol,
-                        duration="4 D", 
-                        bar_size="1 hour",
-                        what_to_show="TRADES",
-                        use_rth=True
-                    )
-                    
+                    with budget.stage("bars") as trend_deadline:
+                        bars_1h = _with_broker_lock(
+                            broker.historical_prices,
+                            symbol,
+                            duration="4 D",
+                            bar_size=_TREND_BAR_SIZE,
+                            what_to_show="TRADES",
+                            use_rth=True,
+                            timeout=trend_deadline.clamp(hist_timeout),
+                        )
+
                     df_1h = _to_df(bars_1h)
-                    
-                    if hasattr(df_1h, 'empty') and not df_1h.empty and len(df_1h) > 20:
+                    if signal_on_bar_close:
+                        df_1h = _drop_forming_bar(df_1h, trend_boundary)
+
+                    if hasattr(df_1h, "empty") and not df_1h.empty and len(df_1h) > 20:
                         # Calculate EMA 20
-                        df_1h['ema_20'] = df_1h['close'].ewm(span=20, adjust=False).mean()
-                        
-                        last_close = float(df_1h['close'].iloc[-1])
-                        current_ema = float(df_1h['ema_20'].iloc[-1])
-                        
-                        right = getattr(pos_contract, 'right', '') # 'C' or 'P'
+                        df_1h["ema_20"] = (
+                            df_1h["close"].ewm(span=20, adjust=False).mean()
+                        )
+
+                        last_close = float(df_1h["close"].iloc[-1])
+                        current_ema = float(df_1h["ema_20"].iloc[-1])
+
+                        right = getattr(pos_contract, "right", "")  # 'C' or 'P'
                         should_close = False
                         reason_msg = ""
-                        
+
                         # Dynamic Trailing Logic
-                        if right == 'C':
+                        if right == "C":
                             if last_close < current_ema:
                                 should_close = True
                                 reason_msg = f"Trend Broken (Call): Price {last_close:.2f} < EMA {current_ema:.2f}"
-                        elif right == 'P':
+                        elif right == "P":
                             if last_close > current_ema:
                                 should_close = True
                                 reason_msg = f"Trend Broken (Put): Price {last_close:.2f} > EMA {current_ema:.2f}"
-                        
+
                         if should_close:
                             logger.info(f"EXIT TRIGGER: {reason_msg}")
-                            
+
                             # Close Position
-                            from .broker.base import OrderTicket
+                            from .broker.base import OrderTicket, contract_key
+
                             close_ticket = OrderTicket(
                                 contract=pos_contract,
                                 action="SELL",
                                 quantity=pos_qty,
-                                order_type="MKT"
+                                order_type="MKT",
                             )
-                            
+
+                            if _monitor_mode(settings) or _exit_monitor is not None:
+                                get_exit_monitor(broker, settings).remove(
+                                    contract_key(pos_contract)
+                                )
                             if settings.get("dry_run"):
                                 logger.info("Dry Run: Would SELL to Close position.")
                             else:
-                                close_id = _with_broker_lock(broker.place_order, close_ticket)
-                                trade_alert(settings, stage="Exit", symbol=symbol, action="SELL", 
-                                          quantity=pos_qty, price=0.0, order_id=str(close_id), pnl="DYNAMIC")
+                                close_quote = None
+                                if settings.get("execution", {}).get("algo") == "chase":
+                                    close_quote = _with_broker_lock(
+                                        broker.market_data, pos_contract
+                                    )
+                                close_id, _ = submit_order(
+                                    broker,
+                                    close_ticket,
+                                    close_quote,
+                                    settings,
+                                    call=_with_broker_lock,
+                                )
+                                trade_alert(
+                                    settings,
+                                    stage="Exit",
+                                    symbol=symbol,
+                                    action="SELL",
+                                    quantity=pos_qty,
+                                    price=0.0,
+                                    order_id=str(close_id),
+                                    pnl="DYNAMIC",
+                                )
                         else:
-                            logger.info(f"HOLDING: Trend intact. Price {last_close:.2f} vs EMA {current_ema:.2f}")
-                            
+                            logger.info(
+                                "HOLDING: Trend intact. Price {:.2f} vs EMA {:.2f}",
+                                last_close,
+                                current_ema,
+                            )
+                        if signal_on_bar_close:
+                            # Evaluated (and any close submitted): next check after the next hourly close
+                            _last_signal_bar[_trend_key(symbol)] = trend_boundary
+
                     # Start of cycle with existing position -> Skip new entry scan
                     return
 
+            except DeadlineExceeded:
+                raise
             except Exception as e_pos:
                 logger.error(f"Error in position management: {e_pos}")
                 # Continue to allow data fetch if this fails, or return to be safe?
                 # Safer to continue, but maybe log heavy error.
 
+            # An entry still working at IB (not yet filled/cancelled) is not in
+            # positions() yet; don't stack a second entry on top of it
+            order_mgr = getattr(broker, "orders", None)
+            if order_mgr is not None:
+                pending = [
+                    o for o in order_mgr.open_orders(symbol) if o.parent_id is None
+                ]
+                if pending:
+                    logger.bind(
+                        event="skip",
+                        symbol=symbol,
+                        reason="order_pending",
+                        orders={o.order_id: o.state for o in pending},
+                    ).info("Skipping: entry order still working")
+                    return
+
+            # Another shard's daily loss guard fired: no new entries anywhere today.
+            # Checked after position management so held positions still get their exits
+            if _shared_limits is not None:
+                halt_reason = _shared_limits.halted(now=_time_fn())
+                if halt_reason:
+                    logger.bind(
+                        event="skip",
+                        symbol=symbol,
+                        reason="global_halt",
+                        halt_reason=halt_reason,
+                    ).info(
+                        "Skipping {}: entries halted by another shard ({})",
+                        symbol,
+                        halt_reason,
+                    )
+                    return
+
+            # ============================================
+            # BAR-CLOSE GATE: skip signal work until a new bar closes
+            # ============================================
+            if symbol not in signals_due:
+                logger.bind(
+                    symbol=symbol, event="signal_not_due", bar_boundary=bar_boundary
+                ).debug(
+                    "No new {} bar closed; skipping signal evaluation", hist_bar_size
+                )
+                return
+
             # ============================================
             # HISTORICAL DATA FETCH WITH EXPONENTIAL BACKOFF
             # ============================================
             retry_delays = [0, 5, 15]  # Retry at: immediately, then 5s, then 15s
             bars = None
+
+            # Cold start: seed from the on-disk archive and fetch only the gap
+            archive = get_bar_archive(settings)
+            request_duration = hist_duration
+            preloaded = None
+            preload_count = derived.archive_preload_bars
+            if (
+                archive is not None
+                and preload_count > 0
+                and symbol not in _symbol_bar_cache
+            ):
+                preloaded, request_duration = _archive_preload(
+                    archive, symbol, hist_bar_size, preload_count, hist_duration
+                )
+                CACHE_LOOKUPS.labels(
+                    cache="bar_archive", result="miss" if preloaded is None else "hit"
+                ).inc()
             data_fetch_failed = False
             last_error = None
 
-            for retry_idx, delay in enumerate(retry_delays):
-                # Sleep before retry (except first attempt)
-                if delay > 0:
-                    logger.bind(
-                        symbol=symbol,
-                        retry_number=retry_idx,
-                        delay_seconds=delay,
-                        event="historical_retry_sleep"
-                    ).info("Historical data retry: waiting {}s before attempt {}", delay, retry_idx + 1)
-                    time.sleep(delay)
-                
-                try:
-                    if not hasattr(broker, "historical_prices"):
-                        logger.warning("Broker does not support historical_prices method")
-                        break
-                    
-                    logger.bind(
-                        symbol=symbol,
-                        attempt=retry_idx + 1,
-                        duration=hist_duration,
-                        use_rth=hist_use_rth,
-                        timeout=hist_timeout,
-                        event="historical_request"
-                    ).debug(
-                        "Requesting historical data: duration={}, use_rth={}, timeout={}, attempt={}",
-                        hist_duration, hist_use_rth, hist_timeout, retry_idx + 1
-                    )
-                    
-                    # Attempt to fetch bars
-                    bars = _with_broker_lock(
-                        broker.historical_prices,
-                        symbol,
-                        duration=hist_duration,
-                        bar_size=hist_bar_size,
-                        what_to_show=hist_what,
-                        use_rth=hist_use_rth,
-                        timeout=hist_timeout,
-                    )
-                    
-                    # Validate that we got meaningful data
-                    if bars is not None and hasattr(bars, '__len__') and len(bars) > 0:
+            with budget.stage("bars") as bars_deadline, trace.span("historical"):
+                for retry_idx, delay in enumerate(retry_delays):
+                    # Sleep before retry (except first attempt)
+                    if delay > 0:
+                        if delay >= bars_deadline.remaining():
+                            # Not enough budget left to wait and retry; drop the fetch
+                            raise DeadlineExceeded(
+                                "bars",
+                                bars_deadline.budget_seconds,
+                                bars_deadline.elapsed(),
+                            )
+                        logger.bind(
+                            symbol=symbol,
+                            retry_number=retry_idx,
+                            delay_seconds=delay,
+                            event="historical_retry_sleep",
+                        ).info(
+                            "Historical data retry: waiting {}s before attempt {}",
+                            delay,
+                            retry_idx + 1,
+                        )
+                        _sleep_fn(delay)
+
+                    try:
+                        if not hasattr(broker, "historical_prices"):
+                            logger.warning(
+                                "Broker does not support historical_prices method"
+                            )
+                            break
+
                         logger.bind(
                             symbol=symbol,
-                            bars_retrieved=len(bars),
                             attempt=retry_idx + 1,
-                            event="historical_success"
-                        ).info("Historical data success on attempt {}: {} bars", retry_idx + 1, len(bars))
-                        
-                        # Cache successful data for fallback in next cycle
-                        _symbol_bar_cache[symbol] = (bars, time.time())
-                        data_fetch_failed = False
-                        break  # Exit retry loop - success
-                    else:
-                        # Bars is None or empty - treat as fetch failure
-                        bars = None
-                        if retry_idx == len(retry_delays) - 1:
-                            data_fetch_failed = True
+                            duration=request_duration,
+                            use_rth=hist_use_rth,
+                            timeout=hist_timeout,
+                            event="historical_request",
+                        ).debug(
+                            "Requesting historical data: duration={}, use_rth={}, timeout={}, attempt={}",
+                            request_duration,
+                            hist_use_rth,
+                            hist_timeout,
+                            retry_idx + 1,
+                        )
+
+                        # Attempt to fetch bars
+                        bars = _with_broker_lock(
+                            broker.historical_prices,
+                            symbol,
+                            duration=request_duration,
+                            bar_size=hist_bar_size,
+                            what_to_show=hist_what,
+                            use_rth=hist_use_rth,
+                            timeout=bars_deadline.clamp(hist_timeout),
+                        )
+
+                        # Validate that we got meaningful data
+                        if (
+                            bars is not None
+                            and hasattr(bars, "__len__")
+                            and len(bars) > 0
+                        ):
                             logger.bind(
                                 symbol=symbol,
+                                bars_retrieved=len(bars),
                                 attempt=retry_idx + 1,
-                                event="historical_empty_response"
-                            ).warning("Historical data returned empty response")
-                    
-                except (TimeoutError, ConnectionError, Exception) as fetch_err:
-                    last_error = fetch_err
-                    logger.bind(
-                        symbol=symbol,
-                        attempt=retry_idx + 1,
-                        error_type=type(fetch_err).__name__,
-                        error_msg=str(fetch_err)[:100],
-                        event="historical_fetch_error"
-                    ).debug(
-                        "Historical data fetch error (attempt {}): {}",
-                        retry_idx + 1,
-                        type(fetch_err).__name__
-                    )
-                    
-                    if retry_idx == len(retry_delays) - 1:
-                        # All retries exhausted
-                        data_fetch_failed = True
+                                event="historical_success",
+                            ).info(
+                                "Historical data success on attempt {}: {} bars",
+                                retry_idx + 1,
+                                len(bars),
+                            )
+
+                            _archive_bars(archive, symbol, hist_bar_size, bars)
+                            if preloaded is not None:
+                                bars = _merge_bars(preloaded, bars)
+                            # Cache successful data for fallback in next cycle
+                            _symbol_bar_cache[symbol] = (bars, _time_fn())
+                            data_fetch_failed = False
+                            break  # Exit retry loop - success
+                        else:
+                            # Bars is None or empty - treat as fetch failure
+                            bars = None
+                            if retry_idx == len(retry_delays) - 1:
+                                data_fetch_failed = True
+                                logger.bind(
+                                    symbol=symbol,
+                                    attempt=retry_idx + 1,
+                                    event="historical_empty_response",
+                                ).warning("Historical data returned empty response")
+
+                    except DeadlineExceeded:
+                        raise
+                    except (TimeoutError, ConnectionError, Exception) as fetch_err:
+                        last_error = fetch_err
                         logger.bind(
                             symbol=symbol,
-                            total_attempts=len(retry_delays),
+                            attempt=retry_idx + 1,
                             error_type=type(fetch_err).__name__,
-                            event="historical_fetch_failed_exhausted"
-                        ).warning(
-                            "Historical data fetch failed after {} attempts: {}",
-                            len(retry_delays),
-                            type(fetch_err).__name__
+                            error_msg=str(fetch_err)[:100],
+                            event="historical_fetch_error",
+                        ).debug(
+                            "Historical data fetch error (attempt {}): {}",
+                            retry_idx + 1,
+                            type(fetch_err).__name__,
                         )
-                        # Record failure to circuit breaker only after all retries
-                        _gateway_circuit_breaker.record_failure()
+
+                        if retry_idx == len(retry_delays) - 1:
+                            # All retries exhausted
+                            data_fetch_failed = True
+                            logger.bind(
+                                symbol=symbol,
+                                total_attempts=len(retry_delays),
+                                error_type=type(fetch_err).__name__,
+                                event="historical_fetch_failed_exhausted",
+                            ).warning(
+                                "Historical data fetch failed after {} attempts: {}",
+                                len(retry_delays),
+                                type(fetch_err).__name__,
+                            )
+                            # Record failure to circuit breaker only after all retries
+                            _gateway_circuit_breaker.record_failure()
 
             # ============================================
             # FALLBACK TO CACHED BARS IF FETCH FAILED
             # ============================================
-            if (bars is None or (hasattr(bars, '__len__') and len(bars) == 0)) and symbol in _symbol_bar_cache:
+            fetch_empty = bars is None or (hasattr(bars, "__len__") and len(bars) == 0)
+            if fetch_empty and symbol not in _symbol_bar_cache:
+                CACHE_LOOKUPS.labels(cache="bar_fallback", result="miss").inc()
+            elif fetch_empty:
                 cached_bars, cache_time = _symbol_bar_cache[symbol]
-                age_seconds = time.time() - cache_time
-                
+                age_seconds = _time_fn() - cache_time
+
                 if age_seconds < 300:  # Cache valid for 5 minutes
+                    CACHE_LOOKUPS.labels(cache="bar_fallback", result="hit").inc()
                     logger.bind(
                         symbol=symbol,
                         cache_age_seconds=age_seconds,
-                        cached_bars=len(cached_bars) if hasattr(cached_bars, '__len__') else 0,
-                        event="historical_cache_fallback"
+                        cached_bars=(
+                            len(cached_bars) if hasattr(cached_bars, "__len__") else 0
+                        ),
+                        event="historical_cache_fallback",
                     ).info(
                         "Using cached bars for {} (age: {:.1f}s, bars: {})",
-                        symbol, age_seconds, len(cached_bars) if hasattr(cached_bars, '__len__') else 0
+                        symbol,
+                        age_seconds,
+                        len(cached_bars) if hasattr(cached_bars, "__len__") else 0,
                     )
                     bars = cached_bars
                 else:
+                    CACHE_LOOKUPS.labels(cache="bar_fallback", result="miss").inc()
                     logger.bind(
                         symbol=symbol,
                         cache_age_seconds=age_seconds,
-                        event="historical_cache_stale"
+                        event="historical_cache_stale",
                     ).debug("Cached bars too old ({}s), skipping", age_seconds)
 
-
-            df1 = _to_df(bars) if bars is not None else []
+            with trace.span("dataframe"):
+                df1 = _to_df(bars) if bars is not None else []
             # Proceed only if we have a pandas DataFrame; else skip this symbol gracefully
             is_df = False
             try:
@@ -522,11 +1222,11 @@ def run_cycle(broker, settings: Dict[str, Any]):
                 logger.debug("pandas import failed: %s", type(e).__name__)
                 is_df = False
 
-            logger.bind(symbol=symbol, event="data_check").info(
-                "[DEBUG] After fetch: bars type={}, is_df={}, df_shape={}",
+            logger.bind(symbol=symbol, event="data_check").debug(
+                "After fetch: bars type={}, is_df={}, df_shape={}",
                 type(df1).__name__ if df1 is not None else "None",
                 is_df,
-                df1.shape if is_df else "N/A"
+                df1.shape if is_df else "N/A",
             )
 
             if not is_df:
@@ -546,7 +1246,9 @@ def run_cycle(broker, settings: Dict[str, Any]):
                             _timeout_tracker[symbol],
                             _TIMEOUT_BACKOFF_CYCLES,
                         )
-                        if settings.get("risk", {}).get("data_loss_exit_on_backoff", True):
+                        if settings.get("risk", {}).get(
+                            "data_loss_exit_on_backoff", True
+                        ):
                             try:
                                 open_positions = _with_broker_lock(broker.positions)
                             except Exception:  # pylint: disable=broad-except
@@ -588,17 +1290,22 @@ def run_cycle(broker, settings: Dict[str, Any]):
             # --- DAILY VOLUME STRATEGY EXECUTION ---
             # Using dataframe (df1) which must be 60-min bars (configured in settings)
             # Replaces Whale Strategy with aggressive daily volume logic
-            dv_res = daily_volume_rules(df1, symbol)
+            with trace.span("signal"):
+                if signal_on_bar_close:
+                    # Evaluate closed bars only; the in-progress bar has partial volume
+                    df1 = _drop_forming_bar(df1, bar_boundary)
+                    _last_signal_bar[symbol] = bar_boundary
+                dv_res = daily_volume_rules(df1, symbol)
             action = dv_res.get("signal", "HOLD")
             confidence = dv_res.get("confidence", 0.0)
-            
+
             logger.bind(
                 event="signal",
                 symbol=symbol,
                 strategy="daily_volume",
                 action=action,
                 confidence=confidence,
-                reason=dv_res.get("reason")
+                reason=dv_res.get("reason"),
             ).info(f"Daily Volume Strategy: {action} ({dv_res.get('reason')})")
 
             if action in ("BUY", "SELL", "BUY_CALL", "BUY_PUT"):
@@ -608,31 +1315,37 @@ def run_cycle(broker, settings: Dict[str, Any]):
                 # "SELL" or "BUY_PUT" -> Put (Bearish)
                 is_bullish = action in ("BUY", "BUY_CALL")
                 direction = "C" if is_bullish else "P"
-                
-                last_under_q = _with_broker_lock(broker.market_data, symbol)
+
+                with budget.stage("quotes"), trace.span("quotes"):
+                    last_under_q = _with_broker_lock(broker.market_data, symbol)
                 last_under = getattr(last_under_q, "last", 0.0)
                 if not last_under:
-                     last_under = getattr(last_under_q, "close", 0.0)
-                     
+                    last_under = getattr(last_under_q, "close", 0.0)
+
                 cfg_opts = settings.get("options", {})
-                
+
                 # Use Strategic Finder if params are provided (Geopolitical Mode)
                 # Whale strategy uses standard selection
                 if False:
                     pass
-                else: 
+                else:
                     # Fallback to standard (Unused in Geo Strategy usually)
-                    opt = pick_weekly_option(
-                        broker,
-                        underlying=symbol,
-                        right=direction,
-                        last_price=last_under,
-                        moneyness=cfg_opts.get("moneyness", "atm"),
-                        min_volume=cfg_opts.get("min_volume", 100),
-                        max_spread_pct=cfg_opts.get("max_spread_pct", 2.0),
-                        strike_count=cfg_opts.get("strike_count", 3),
-                    )
-                    
+                    with budget.stage("chain"), trace.span("chain"):
+                        opt = pick_weekly_option(
+                            broker,
+                            underlying=symbol,
+                            right=direction,
+                            last_price=last_under,
+                            moneyness=cfg_opts.get("moneyness", "atm"),
+                            min_volume=cfg_opts.get("min_volume", 100),
+                            max_spread_pct=cfg_opts.get("max_spread_pct", 2.0),
+                            strike_count=cfg_opts.get("strike_count", 3),
+                            delta_range=_delta_range(cfg_opts),
+                            max_iv=cfg_opts.get("max_iv"),
+                            rate=cfg_opts.get("risk_free_rate", 0.0),
+                            now=_time_fn(),
+                        )
+
                 if not opt:
                     logger.bind(
                         event="skip", symbol=symbol, reason="no_viable_option"
@@ -642,54 +1355,66 @@ def run_cycle(broker, settings: Dict[str, Any]):
                 # get option premium
                 q = None
                 try:
-                    # FIX: Pass contract object directly, do not resolve to symbol string (which is underlying)
-                    q = _with_broker_lock(
-                        broker.market_data, opt
-                    )
-                    premium = getattr(q, "last", 0.0)
-                    # FIX: Fallback to mid-price if last is zero (common in illiquid hours/secondary exchanges)
-                    if premium == 0.0:
-                        bid = getattr(q, "bid", 0.0)
-                        ask = getattr(q, "ask", 0.0)
-                        if bid > 0 and ask > 0:
-                            premium = (bid + ask) / 2.0
-                            logger.debug("Using mid-price for premium: {}", premium)
-                        elif getattr(q, "close", 0.0) > 0:
-                            premium = getattr(q, "close", 0.0)
-                    
-                    # FINAL FALLBACK: Historical Data (Slow but sure)
-                    if premium == 0.0:
-                        try:
-                            logger.info("Premium is 0.0, attempting historical data fallback...")
-                            # Use opt directly as it might be a Contract object
-                            hist_df = _with_broker_lock(
-                                broker.historical_prices, 
-                                opt, 
-                                duration="2 D", 
-                                bar_size="1 day"
-                            )
-                            if hist_df is not None and not hist_df.empty:
-                                premium = float(hist_df.iloc[-1]["close"])
-                                logger.warning("Used historical close for premium: {}", premium)
-                        except Exception as eh:
-                            logger.error("Historical premium fallback failed: {}", eh)
-
+                    with budget.stage("quotes"), trace.span("quotes"):
+                        # FIX: Pass contract object directly, do not resolve to symbol string (which is underlying)
+                        q = _with_broker_lock(broker.market_data, opt)
+                        premium = getattr(q, "last", 0.0)
+                        # FIX: Fallback to mid-price if last is zero (common in illiquid hours/secondary exchanges)
+                        if premium == 0.0:
+                            bid = getattr(q, "bid", 0.0)
+                            ask = getattr(q, "ask", 0.0)
+                            if bid > 0 and ask > 0:
+                                premium = (bid + ask) / 2.0
+                                logger.debug("Using mid-price for premium: {}", premium)
+                            elif getattr(q, "close", 0.0) > 0:
+                                premium = getattr(q, "close", 0.0)
+
+                        # FINAL FALLBACK: Historical Data (Slow but sure)
+                        if premium == 0.0:
+                            try:
+                                logger.info(
+                                    "Premium is 0.0, attempting historical data fallback..."
+                                )
+                                # Use opt directly as it might be a Contract object
+                                hist_df = _with_broker_lock(
+                                    broker.historical_prices,
+                                    opt,
+                                    duration="2 D",
+                                    bar_size="1 day",
+                                )
+                                if hist_df is not None and not hist_df.empty:
+                                    premium = float(hist_df.iloc[-1]["close"])
+                                    logger.warning(
+                                        "Used historical close for premium: {}", premium
+                                    )
+                            except Exception as eh:
+                                logger.error(
+                                    "Historical premium fallback failed: {}", eh
+                                )
+
+                except DeadlineExceeded:
+                    raise
                 except (ConnectionError, TimeoutError, AttributeError, ValueError) as e:
                     logger.debug("market_data failed for option: %s", type(e).__name__)
                     premium = 0.0
 
                 cfg_risk = settings.get("risk", {})
-                equity = _with_broker_lock(broker.pnl).get("net", 100000.0)
-                
-                # DEBUG: Log values for sizing diagnosis
-                logger.info(f"DEBUG CALCULATING SIZE: Equity={equity}, Premium={premium}, StopLoss={cfg_risk.get('stop_loss_pct')}")
-
-                size = position_size(
-                    equity,
-                    cfg_risk.get("max_risk_pct_per_trade", 0.01),
-                    cfg_risk.get("stop_loss_pct", 0.2),
-                    premium or 0.0,
-                )
+                with trace.span("sizing"):
+                    equity = _with_broker_lock(broker.pnl).get("net", 100000.0)
+
+                    logger.debug(
+                        "Sizing inputs: equity={}, premium={}, stop_loss_pct={}",
+                        equity,
+                        premium,
+                        cfg_risk.get("stop_loss_pct"),
+                    )
+
+                    size = position_size(
+                        equity,
+                        cfg_risk.get("max_risk_pct_per_trade", 0.01),
+                        cfg_risk.get("stop_loss_pct", 0.2),
+                        premium or 0.0,
+                    )
                 if size <= 0:
                     logger.bind(event="skip", symbol=symbol, reason="size_zero").info(
                         "Skipping: size zero"
@@ -719,43 +1444,97 @@ def run_cycle(broker, settings: Dict[str, Any]):
                 from .broker.base import OrderTicket
 
                 # We always BUY to open (Long Call or Long Put)
+                # In monitor mode exits are owned by the exit monitor, not child orders
+                monitor_exits = _monitor_mode(settings)
                 ticket = OrderTicket(
                     contract=opt,
                     action="BUY",
                     quantity=size,
                     order_type="MKT",
-                    take_profit_pct=cfg_risk.get("take_profit_pct"),
-                    stop_loss_pct=cfg_risk.get("stop_loss_pct"),
+                    take_profit_pct=(
+                        None if monitor_exits else cfg_risk.get("take_profit_pct")
+                    ),
+                    stop_loss_pct=(
+                        None if monitor_exits else cfg_risk.get("stop_loss_pct")
+                    ),
+                    # Children priced from the option quote above; no refetch at submit
+                    entry_price=float(premium or 0.0) or None,
+                    take_profit_price=(
+                        None if monitor_exits else bracket.get("take_profit")
+                    ),
+                    stop_loss_price=None if monitor_exits else bracket.get("stop_loss"),
                 )
+                execution: Optional[ExecutionResult] = None
                 if settings.get("dry_run"):
                     logger.bind(
                         event="dry_run", symbol=symbol, ticket=ticket.__dict__
                     ).info("Dry-run: would place order")
                     order_id = "DRYRUN"
                 else:
-                    order_id = _with_broker_lock(broker.place_order, ticket)
+                    if (
+                        _shared_limits is not None
+                        and not _shared_limits.acquire_order()
+                    ):
+                        logger.bind(
+                            event="skip", symbol=symbol, reason="order_throttle"
+                        ).warning(
+                            "Skipping {}: global order throttle exhausted", symbol
+                        )
+                        return
+                    with budget.stage("order"), trace.span("order"):
+                        order_id, execution = submit_order(
+                            broker, ticket, q, settings, call=_with_broker_lock
+                        )
 
                 # Send entry alert with P/L placeholder for both live and dry-run
-                trade_alert(
-                    settings,
-                    stage="Entry",
-                    symbol=getattr(opt, "symbol", symbol),
-                    action=ticket.action,
-                    quantity=size,
-                    price=float(premium or 0.0),
-                    order_id=str(order_id) if order_id is not None else None,
-                    pnl=None,
-                )
+                with trace.span("alert"):
+                    trade_alert(
+                        settings,
+                        stage="Entry",
+                        symbol=getattr(opt, "symbol", symbol),
+                        action=ticket.action,
+                        quantity=size,
+                        price=float(premium or 0.0),
+                        order_id=str(order_id) if order_id is not None else None,
+                        pnl=None,
+                    )
 
-                # LEGACY: OCO thread disabled in favor of server-side brackets.
-                # The 'executionDetails' listener in IBKRBroker now handles exit logging/alerts.
-                if not settings.get("dry_run"):
-                    logger.info("Order %s submitted with server-side bracket protection", order_id)
+                # LEGACY: per-position OCO threads are replaced by server-side brackets
+                # or, in monitor mode, by one shared ExitMonitor table.
+                if monitor_exits:
+                    _register_exit_rule(
+                        broker,
+                        settings,
+                        opt,
+                        ticket.action,
+                        size,
+                        order_id,
+                        execution,
+                        take_profit=bracket.get("take_profit"),
+                        stop_loss=bracket.get("stop_loss"),
+                        trailing_pct=cfg_risk.get("trailing_stop_pct"),
+                    )
+                elif execution is not None and execution.unprotected_filled > 0:
+                    # A partially filled chase lost its bracket children; the exit
+                    # monitor covers the filled contracts instead
+                    get_exit_monitor(broker, settings).add(
+                        opt,
+                        side=ticket.action,
+                        quantity=int(execution.unprotected_filled),
+                        take_profit=bracket.get("take_profit"),
+                        stop_loss=bracket.get("stop_loss"),
+                        parent_order_id=str(order_id),
+                    )
+                elif not settings.get("dry_run"):
+                    logger.info(
+                        "Order %s submitted with server-side bracket protection",
+                        order_id,
+                    )
 
                 # log trade
                 if not settings.get("dry_run"):
                     trade = {
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "timestamp": _utcnow().isoformat(),
                         "symbol": symbol,
                         "action": ticket.action,
                         "quantity": size,
@@ -764,16 +1543,30 @@ def run_cycle(broker, settings: Dict[str, Any]):
                         "target": bracket.get("take_profit"),
                         "contract": getattr(opt, "symbol", None),
                     }
+                    if execution is not None:
+                        trade["fill_price"] = execution.avg_fill_price
+                        trade["slippage"] = execution.slippage
                     log_trade(trade)
                     # Record successful cycle to circuit breaker
                     _gateway_circuit_breaker.record_success()
 
+        except DeadlineExceeded as e:
+            # Budget overrun is not a Gateway failure; drop the work and move on
+            logger.bind(
+                event="deadline_exceeded",
+                symbol=symbol,
+                stage=e.stage,
+                budget_seconds=round(e.budget_seconds, 3),
+                elapsed_seconds=round(e.elapsed_seconds, 3),
+            ).warning("Dropped {} work for {}: {}", e.stage, symbol, e)
         except (ConnectionError, TimeoutError, ValueError, RuntimeError) as e:
             logger.exception("symbol processing failed: %s", type(e).__name__)
             # Record error to circuit breaker
             _gateway_circuit_breaker.record_failure()
         except Exception as e:
-            logger.exception("unexpected error during symbol processing: %s", type(e).__name__)
+            logger.exception(
+                "unexpected error during symbol processing: %s", type(e).__name__
+            )
             # Record unexpected error to circuit breaker
             _gateway_circuit_breaker.record_failure()
             try:
@@ -784,12 +1577,30 @@ def run_cycle(broker, settings: Dict[str, Any]):
     # concurrency: process symbols sequentially to ensure thread safety with IBKR connection
     # ThreadPoolExecutor was causing issues with asyncio event loop management in ib_insync
     # Since we typically trade 1-5 symbols, sequential processing is acceptable for stability
-    for sym in symbols:
-        process_symbol(sym)
-
+    for i, sym in enumerate(symbols):
+        if budget.expired():
+            skipped = symbols[i:]
+            logger.bind(
+                event="deadline_exceeded",
+                stage="cycle",
+                budget_seconds=budget.cycle.budget_seconds,
+                skipped_symbols=skipped,
+            ).warning("Cycle budget exhausted; skipping {} symbols", len(skipped))
+            break
+        with trace.span("symbol", sym):
+            process_symbol(sym)
 
     # Emit end-of-cycle event for monitoring/analytics
-    duration = round(time.time() - cycle_start, 3)
+    trace.finish()
+    mon_cfg = settings.get("monitoring", {})
+    _broker_lock_profiler.maybe_report(
+        float(mon_cfg.get("lock_report_interval_seconds", 900)),
+        int(mon_cfg.get("lock_report_top_n", 5)),
+    )
+    duration = round(_time_fn() - cycle_start, 3)
+    CYCLES.inc()
+    CYCLE_DURATION.observe(duration)
+    LAST_CYCLE.set(_time_fn())
     try:
         logger.bind(
             event="cycle_complete",
@@ -802,25 +1613,72 @@ def run_cycle(broker, settings: Dict[str, Any]):
         logger.debug("cycle_complete logging failed")
 
 
-def run_scheduler(broker, settings: Dict[str, Any], stop_event: Optional[Event] = None):
+def _order_latency(broker) -> Optional[Dict[str, Dict[str, float]]]:
+    """Submit-to-ack and submit-to-fill latency summary, when the broker tracks orders."""
+    order_mgr = getattr(broker, "orders", None)
+    return order_mgr.latency_summary() if order_mgr is not None else None
+
+
+def _prune_orders(broker) -> None:
+    """Forget order records finished more than a day ago (housekeeping)."""
+    order_mgr = getattr(broker, "orders", None)
+    if order_mgr is None:
+        return
+    pruned = order_mgr.prune()
+    if pruned:
+        logger.bind(event="orders_pruned", count=pruned).debug(
+            "Pruned {} finished orders", pruned
+        )
+
+
+def run_scheduler(
+    broker,
+    settings: Dict[str, Any],
+    stop_event: Optional[Event] = None,
+    watcher: Optional[SettingsWatcher] = None,
+):
+    """Run cycles until stop_event is set.
+
+    With a watcher, edits to the settings file are picked up between cycles
+    (see settings_watcher); otherwise settings are fixed for the whole run.
+    """
+    settings = (
+        watcher.current
+        if watcher is not None
+        else SettingsSnapshot.from_settings(settings)
+    )
+
     # Reset circuit breaker on start to ensure clean state
     logger.info("GatewayCircuitBreaker state reset to CLOSED")
     _gateway_circuit_breaker.failures = 0
     _gateway_circuit_breaker.state = "CLOSED"
 
-    interval_seconds = settings.get("schedule", {}).get("interval_seconds", 180)
+    _last_signal_bar.clear()
+    seed_exit_monitor(broker, settings)
+
+    if settings.get("schedule", {}).get("engine", "interval") == "event":
+        run_event_scheduler(broker, settings, stop_event=stop_event, watcher=watcher)
+        return
+
     last_day = None
     while True:
         if stop_event and stop_event.is_set():
             logger.info("Stop requested; exiting scheduler loop")
             break
 
-        now = datetime.now(timezone.utc).replace(tzinfo=ZoneInfo("UTC"))
+        # Cycle boundary: swap in an edited settings file, if any
+        if watcher is not None:
+            settings = watcher.poll() or settings
+        interval_seconds = settings.get("schedule", {}).get("interval_seconds", 180)
+
+        now = datetime.now(timezone.utc)
+        sleep_seconds = interval_seconds
         if is_rth(now):
             try:
                 # Heartbeat at start of each active cycle
                 hb = settings.get("monitoring", {}).get("heartbeat_url")
                 send_heartbeat(hb)
+                check_exits(broker, settings)
                 run_cycle(broker, settings)
             except (ConnectionError, TimeoutError, ValueError, RuntimeError) as e:
                 logger.exception("scheduler cycle failed: %s", type(e).__name__)
@@ -828,19 +1686,195 @@ def run_scheduler(broker, settings: Dict[str, Any], stop_event: Optional[Event]
                 logger.exception("unexpected scheduler error: %s", type(e).__name__)
             last_day = now.date()
         else:
-            # if we just ended a trading day, emit a simple summary placeholder
-            if last_day is not None and now.date() != last_day:
-                logger.bind(event="eod_summary").info(
-                    "End of day summary emitted (stub)"
-                )
+            # if we just ended a trading session, emit a simple summary placeholder
+            if last_day is not None:
+                logger.bind(
+                    event="eod_summary", order_latency=_order_latency(broker)
+                ).info("End of day summary emitted (stub)")
                 # Reset daily loss alert flag for the new day
                 _LOSS_ALERTED_DATE["date"] = None
+                _prune_orders(broker)
                 last_day = None
+            # Market closed (night, weekend, holiday): sleep until the next open
+            next_open = get_calendar().next_open(now.timestamp())
+            sleep_seconds = max(interval_seconds, next_open - now.timestamp())
+            logger.bind(
+                event="market_closed_sleep",
+                next_open=datetime.fromtimestamp(next_open, NY_TZ).isoformat(),
+                sleep_seconds=round(sleep_seconds, 1),
+            ).info("Market closed; sleeping until next session")
 
         if stop_event:
             # Wait with interruptible sleep so signals are honored promptly
-            if stop_event.wait(interval_seconds):
+            if stop_event.wait(sleep_seconds):
                 logger.info("Stop requested during sleep; exiting scheduler loop")
                 break
         else:
-            time.sleep(interval_seconds)
+            time.sleep(sleep_seconds)
+
+
+def run_event_scheduler(
+    broker,
+    settings: Dict[str, Any],
+    stop_event: Optional[Event] = None,
+    watcher: Optional[SettingsWatcher] = None,
+):
+    """Event-driven scheduler: per-symbol jobs at bar closes, fast exit checks,
+    housekeeping on its own cadence, and immediate reaction to fills/disconnects.
+
+    Job cadences are fixed at start. With a watcher, each job runs on the
+    latest settings snapshot and symbol jobs are added or cancelled when
+    ``symbols`` changes.
+    """
+    from .event_scheduler import EventScheduler
+
+    settings = SettingsSnapshot.from_settings(settings)
+    sched_cfg = settings.get("schedule", {})
+    interval_seconds = sched_cfg.get("interval_seconds", 180)
+    exit_interval = sched_cfg.get("exit_interval_seconds") or interval_seconds
+    housekeeping_interval = sched_cfg.get("housekeeping_interval_seconds", 300)
+    bar_delay = float(sched_cfg.get("bar_close_delay_seconds", 2.0))
+    bar_seconds = bar_size_seconds(
+        settings.get("historical", {}).get("bar_size", "1 min")
+    )
+
+    # Idle waits run the broker's event loop so fill/disconnect callbacks wake jobs
+    # as they arrive, not during the next broker call
+    sched = EventScheduler(
+        late_warn_seconds=float(sched_cfg.get("late_warn_seconds", 5.0)),
+        wait_fn=getattr(broker, "wait_on_update", None)
+        or getattr(broker, "sleep", None),
+    )
+    state: Dict[str, Any] = {"last_day": None, "settings": settings}
+    symbol_jobs: Dict[str, Any] = {}
+
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    calendar = get_calendar()
+
+    def _in_session(ts: float) -> float:
+        # Push due times that land outside a session to the next open
+        return ts if calendar.is_open(ts) else calendar.next_open(ts)
+
+    def _next_bar_due(due: float) -> float:
+        # Next bar boundary strictly after `due`, plus settle delay for IB to finalise the bar
+        nxt = last_bar_boundary(
+            datetime.fromtimestamp(due - bar_delay + bar_seconds, timezone.utc),
+            bar_seconds,
+        )
+        if not calendar.is_open(nxt):
+            # First bar of the next session closes one bar after the open
+            nxt = calendar.next_open(nxt) + bar_seconds
+        return nxt + bar_delay
+
+    def _guarded(name: str, fn, *args, **kwargs) -> None:
+        try:
+            fn(*args, **kwargs)
+        except (ConnectionError, TimeoutError, ValueError, RuntimeError) as e:
+            logger.exception("scheduler job {} failed: {}", name, type(e).__name__)
+
+    def signal_job(symbol: str):
+        def _run():
+            now = _now()
+            if not is_rth(now):
+                return
+            state["last_day"] = now.date()
+            _guarded(
+                f"signals:{symbol}",
+                run_cycle,
+                broker,
+                state["settings"].for_symbols([symbol]),
+            )
+
+        return _run
+
+    def exit_job():
+        if not is_rth(_now()):
+            return
+        _guarded("exits", check_exits, broker, state["settings"])
+        _guarded("exits", run_cycle, broker, state["settings"], evaluate_signals=False)
+
+    def housekeeping_job():
+        now = _now()
+        _prune_orders(broker)
+        if is_rth(now):
+            send_heartbeat(state["settings"].get("monitoring", {}).get("heartbeat_url"))
+            state["last_day"] = now.date()
+        elif state["last_day"] is not None:
+            logger.bind(
+                event="eod_summary",
+                job_lateness={
+                    name: {
+                        "runs": st.runs,
+                        "mean_s": round(st.mean_lateness, 3),
+                        "max_s": round(st.max_lateness, 3),
+                    }
+                    for name, st in sched.lateness.items()
+                },
+                order_latency=_order_latency(broker),
+            ).info("End of day summary emitted (stub)")
+            _LOSS_ALERTED_DATE["date"] = None
+            state["last_day"] = None
+
+    def reconnect_job():
+        if hasattr(broker, "is_connected") and not broker.is_connected():
+            logger.warning("Broker disconnect event; attempting reconnection")
+            _guarded("reconnect", broker.connect)
+
+    def add_symbol_job(sym: str) -> None:
+        first_bar_due = last_bar_boundary(_now(), bar_seconds) + bar_delay
+        symbol_jobs[sym] = sched.add_job(
+            f"signals:{sym}",
+            signal_job(sym),
+            # Evaluate once when added, then on every bar close
+            first_due=_in_session(min(time.time(), first_bar_due)),
+            next_due=_next_bar_due,
+        )
+
+    def settings_job():
+        # Jobs are the cycle boundaries here: every job started after this sees the new snapshot
+        new = watcher.poll()
+        if new is None:
+            return
+        state["settings"] = new
+        symbols = list(new.get("symbols", []))
+        for sym in [s for s in symbol_jobs if s not in symbols]:
+            sched.cancel(symbol_jobs.pop(sym))
+        for sym in symbols:
+            if sym not in symbol_jobs:
+                add_symbol_job(sym)
+
+    now_ts = time.time()
+    for sym in settings.get("symbols", []):
+        add_symbol_job(sym)
+    sched.add_job(
+        "exits",
+        exit_job,
+        first_due=_in_session(now_ts),
+        next_due=lambda due: _in_session(due + exit_interval),
+        events=("fill",),
+    )
+    sched.every("housekeeping", housekeeping_job, housekeeping_interval)
+    if watcher is not None:
+        # Cadences are fixed once jobs are scheduled; only the interval engine re-reads them
+        sched.every(
+            "settings", settings_job, float(sched_cfg.get("reload_check_seconds", 10.0))
+        )
+    sched.add_job("reconnect", reconnect_job, events=("disconnect",))
+
+    # Broker events wake the loop immediately instead of waiting for the next slot
+    if hasattr(broker, "add_listener"):
+        broker.add_listener("fill", lambda **info: sched.trigger("fill", **info))
+        broker.add_listener(
+            "disconnect", lambda **info: sched.trigger("disconnect", **info)
+        )
+
+    logger.bind(
+        event="scheduler_start",
+        engine="event",
+        bar_seconds=bar_seconds,
+        exit_interval_seconds=exit_interval,
+    ).info("Event scheduler started for {} symbols", len(settings.get("symbols", [])))
+    sched.run(stop_event)
+    logger.info("Stop requested; exiting event scheduler")
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import yaml  # type: ignore
 from pydantic import BaseModel, Field, field_validator, model_validator  # type: ignore
@@ -22,11 +22,137 @@ class RiskSettings(BaseModel):
     stop_loss_pct: float = Field(default=0.20, ge=0.0, le=1.0)
     whale_alloc_pct: float = Field(default=0.15, ge=0.0, le=1.0)
     reset_daily_guard_on_start: bool = Field(default=False)
+    exit_mode: str = Field(
+        default="bracket",
+        description="'bracket' = server-side TP/SL child orders; 'monitor' = one in-process "
+        "exit monitor evaluates TP/SL/trailing rules for all positions",
+    )
+    trailing_stop_pct: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    max_orders_per_minute: int = Field(default=20, ge=1)
+    daily_state_path: Optional[str] = Field(
+        default=None,
+        description="Start-of-day equity file for the daily loss guard "
+        "(default logs/daily_state.json); replays point it elsewhere",
+    )
+
+    @field_validator("exit_mode")
+    @classmethod
+    def _validate_exit_mode(cls, v: str) -> str:
+        allowed = {"bracket", "monitor"}
+        if v not in allowed:
+            raise ValueError(f"exit_mode must be one of {sorted(allowed)}")
+        return v
 
 
 class ScheduleSettings(BaseModel):
+    engine: str = Field(
+        default="interval",
+        description="'interval' = fixed-sleep loop; 'event' = priority-queue scheduler "
+        "with per-symbol bar-close jobs, exit checks and fill/disconnect events.",
+    )
     interval_seconds: int = Field(default=180, ge=10, le=3600)
     max_concurrent_symbols: int = Field(default=2, ge=1, le=32)
+    signal_on_bar_close: bool = Field(
+        default=True,
+        description="Evaluate entry signals only when a new bar (historical.bar_size) "
+        "has closed. Position management still runs every interval.",
+    )
+    exit_interval_seconds: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=3600,
+        description="Event engine: exit-check cadence. Defaults to interval_seconds.",
+    )
+    housekeeping_interval_seconds: int = Field(default=300, ge=10, le=3600)
+    bar_close_delay_seconds: float = Field(
+        default=2.0,
+        ge=0.0,
+        le=60.0,
+        description="Event engine: wait after a bar boundary before fetching, so IB has finalised the bar.",
+    )
+    late_warn_seconds: float = Field(default=5.0, ge=0.0)
+    cycle_budget_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Upper bound on one run_cycle; defaults to interval_seconds so a cycle "
+        "never overruns the next one.",
+    )
+    stage_budget_seconds: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "bars": 30.0,
+            "chain": 20.0,
+            "quotes": 10.0,
+            "order": 10.0,
+        },
+        description="Per-stage deadlines (bars, chain, quotes, order), each also capped by "
+        "what is left of the cycle budget.",
+    )
+    reload_check_seconds: float = Field(
+        default=10.0,
+        ge=0.0,
+        description="Hot reload: check configs/settings.yaml for edits every cycle (interval "
+        "engine) or this often (event engine). 0 disables reloading.",
+    )
+
+    @field_validator("engine")
+    @classmethod
+    def _validate_engine(cls, v: str) -> str:
+        allowed = {"interval", "event"}
+        if v not in allowed:
+            raise ValueError(f"engine must be one of {sorted(allowed)}")
+        return v
+
+
+class ShardingSettings(BaseModel):
+    shards: int = Field(
+        default=1,
+        ge=1,
+        le=32,
+        description="Worker processes, each with its own Gateway connection and a slice of "
+        "symbols. 1 = single process (no coordinator).",
+    )
+    client_id_stride: int = Field(
+        default=10,
+        ge=1,
+        description="Shard i connects as broker.client_id + i * stride; keep it above the "
+        "clientId retries in IBKRBroker.connect so shards never collide.",
+    )
+    order_wait_seconds: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="How long an entry waits for the global order throttle "
+        "(risk.max_orders_per_minute across all shards) before it is skipped.",
+    )
+    restart_delay_seconds: float = Field(
+        default=30.0,
+        ge=0.0,
+        description="Coordinator waits this long before restarting a shard that exited.",
+    )
+
+
+class ExecutionSettings(BaseModel):
+    algo: str = Field(
+        default="market",
+        description="'market' = MarketOrder; 'chase' = limit at mid walked toward the touch",
+    )
+    tick_size: float = Field(default=0.01, gt=0.0)
+    step_ticks: int = Field(default=1, ge=1, description="Ticks added per chase step")
+    step_interval_seconds: float = Field(default=2.0, gt=0.0)
+    max_chase_ticks: int = Field(
+        default=10, ge=0, description="Never price more than this many ticks beyond mid"
+    )
+    fallback_to_market: bool = Field(
+        default=True,
+        description="Send the unfilled remainder at market once the chase ends",
+    )
+
+    @field_validator("algo")
+    @classmethod
+    def _validate_algo(cls, v: str) -> str:
+        allowed = {"market", "chase"}
+        if v not in allowed:
+            raise ValueError(f"algo must be one of {sorted(allowed)}")
+        return v
 
 
 class OptionsSettings(BaseModel):
@@ -38,8 +164,13 @@ class OptionsSettings(BaseModel):
         default=3,
         ge=1,
         le=10,
-        description="Number of near-ATM strikes to evaluate. Higher values increase Gateway load."
+        description="Number of near-ATM strikes to evaluate. Higher values increase Gateway load.",
     )
+    # Local Black-Scholes filters (data.greeks); None disables each check
+    min_abs_delta: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    max_abs_delta: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    max_iv: Optional[float] = Field(default=None, gt=0.0)
+    risk_free_rate: float = Field(default=0.0, ge=0.0, le=0.25)
 
     @field_validator("moneyness")
     @classmethod
@@ -49,6 +180,13 @@ class OptionsSettings(BaseModel):
             raise ValueError(f"moneyness must be one of {sorted(allowed)}")
         return v
 
+    @model_validator(mode="after")
+    def _check_delta_range(self) -> "OptionsSettings":
+        lo, hi = self.min_abs_delta, self.max_abs_delta
+        if lo is not None and hi is not None and lo > hi:
+            raise ValueError("min_abs_delta must not exceed max_abs_delta")
+        return self
+
 
 class MonitoringSettings(BaseModel):
     alerts_enabled: bool = Field(default=True)
@@ -58,42 +196,125 @@ class MonitoringSettings(BaseModel):
     slack_webhook_url: Optional[str] = Field(default=None)
     telegram_bot_token: Optional[str] = Field(default=None)
     telegram_chat_id: Optional[str] = Field(default=None)
+    trace_sample_rate: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of scheduler cycles traced with per-stage spans (event=span/"
+        "cycle_trace log records). 0 disables tracing; 0.25 traces every 4th cycle.",
+    )
+    metrics_port: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=65535,
+        description="Serve Prometheus-format metrics on http://<metrics_host>:<port>/metrics. "
+        "None disables the endpoint.",
+    )
+    metrics_host: str = Field(
+        default="127.0.0.1", description="Bind address for the metrics endpoint"
+    )
+    lock_report_interval_seconds: int = Field(
+        default=900,
+        ge=0,
+        description="Log the broker-lock top-N wait/hold report (event=lock_report) this often; 0 disables.",
+    )
+    lock_report_top_n: int = Field(default=5, ge=1, le=50)
 
 
 class HistoricalSettings(BaseModel):
     """Settings for historical data requests to IBKR API."""
-    
+
     duration: str = Field(
         default="3600 S",
         description="IBKR duration string. Format: '<number> <unit>' where unit is S/D/W/M/Y. "
-                    "3600 S = 1 hour of bars. Smaller durations = faster fetches."
+        "3600 S = 1 hour of bars. Smaller durations = faster fetches.",
     )
-    
+
     use_rth: bool = Field(
         default=True,
         description="Use Regular Trading Hours only (9:30-16:00 ET). "
-                    "True = faster requests, less data. False = includes pre/after hours."
+        "True = faster requests, less data. False = includes pre/after hours.",
     )
-    
+
     bar_size: str = Field(
         default="1 min",
-        description="Bar size: '1 min', '5 mins', '15 mins', '30 mins', '1 hour', etc."
+        description="Bar size: '1 min', '5 mins', '15 mins', '30 mins', '1 hour', etc.",
     )
-    
+
     what_to_show: str = Field(
         default="TRADES",
-        description="Data type: 'TRADES', 'ADJUSTED_LAST', 'BID', 'ASK', 'BID_ASK', 'HISTORICAL_VOLATILITY', 'OPTION_IMPLIED_VOL'"
+        description="Data type: 'TRADES', 'ADJUSTED_LAST', 'BID', 'ASK', 'BID_ASK', 'HISTORICAL_VOLATILITY', 'OPTION_IMPLIED_VOL'",
     )
-    
+
     timeout: int = Field(
         default=90,
         ge=30,
         le=300,
         description="Max seconds to wait for historical data request. "
-                    "IBKR library has ~60s hardcoded limit, but asyncio wrapper may extend this. "
-                    "Recommended: 90-120 seconds for robustness."
+        "IBKR library has ~60s hardcoded limit, but asyncio wrapper may extend this. "
+        "Recommended: 90-120 seconds for robustness.",
     )
 
+    archive_dir: Optional[str] = Field(
+        default=None,
+        description="Append every fetched bar to a partitioned Parquet archive under this "
+        "directory (needs pyarrow). None disables archiving.",
+    )
+
+    archive_preload_bars: int = Field(
+        default=0,
+        ge=0,
+        description="On cold start, seed each symbol with this many archived bars and only "
+        "request the gap since the newest one from IBKR. 0 disables preloading.",
+    )
+
+
+class LoggingSettings(BaseModel):
+    level: str = Field(
+        default="INFO", description="Minimum level for the bot.log/bot.jsonl file sinks"
+    )
+    console_level: Optional[str] = Field(
+        default=None, description="Minimum level for stderr; None uses `level`"
+    )
+    text_log: bool = Field(
+        default=True,
+        description="Also write logs/bot.log. bot.jsonl carries the same records, so "
+        "disabling this halves log writes on slow storage.",
+    )
+    compression: Optional[str] = Field(
+        default=None,
+        description="Compress rotated files, e.g. 'gz' (log_analytics reads them)",
+    )
+    sample_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-event fraction of DEBUG/INFO records kept, e.g. {span: 0.1}. "
+        "WARNING and above are never sampled.",
+    )
+    dedup_window_seconds: float = Field(
+        default=60.0,
+        ge=0.0,
+        description="Drop repeats of an identical WARNING+ message within this window; the next "
+        "one logged after it reports how many were dropped. 0 disables.",
+    )
+
+    @field_validator("level", "console_level")
+    @classmethod
+    def _validate_level(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        allowed = {"TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"}
+        v = v.upper()
+        if v not in allowed:
+            raise ValueError(f"level must be one of {sorted(allowed)}")
+        return v
+
+    @field_validator("sample_rates")
+    @classmethod
+    def _validate_sample_rates(cls, v: Dict[str, float]) -> Dict[str, float]:
+        for event, rate in v.items():
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"sample rate for {event!r} must be within [0, 1]")
+        return v
 
 
 class Settings(BaseSettings):
@@ -108,17 +329,22 @@ class Settings(BaseSettings):
     symbols: List[str] = ["SPY", "QQQ"]
     mode: str = "growth"  # growth | hybrid
     dry_run: bool = False
-    
+
     # Backwards compatibility for flat webhook URL from .env
-    discord_webhook_url: Optional[str] = Field(default=None, description="Legacy support for DISCORD_WEBHOOK_URL")
+    discord_webhook_url: Optional[str] = Field(
+        default=None, description="Legacy support for DISCORD_WEBHOOK_URL"
+    )
 
     # nested
     broker: BrokerSettings = BrokerSettings()
     risk: RiskSettings = RiskSettings()
     schedule: ScheduleSettings = ScheduleSettings()
+    sharding: ShardingSettings = ShardingSettings()
     options: OptionsSettings = OptionsSettings()
+    execution: ExecutionSettings = ExecutionSettings()
     historical: HistoricalSettings = HistoricalSettings()
     monitoring: MonitoringSettings = MonitoringSettings()
+    logging: LoggingSettings = LoggingSettings()
 
     @model_validator(mode="after")
     def _merge_legacy_webhook(self) -> "Settings":
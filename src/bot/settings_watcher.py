@@ -0,0 +1,319 @@
+"""Immutable settings snapshots and hot reload of ``configs/settings.yaml``.
+
+The scheduler runs on a ``SettingsSnapshot``: a read-only view of the
+validated settings (nested dicts become mappingproxies, lists become tuples)
+plus a ``CycleConfig`` of values derived once per snapshot instead of once
+per cycle (parsed historical duration and bar size, request timeout, cycle
+budget). A snapshot behaves like the settings dict it replaces (``.get``,
+``[]``, iteration), so code downstream of ``run_cycle`` is unchanged.
+
+``SettingsWatcher.poll`` is called by the scheduler at cycle boundaries. When
+the file's stat and content hash change, it validates the file through
+``Settings.load`` and returns a new snapshot; an invalid file is logged
+(``event="settings_reload_rejected"``) and the current snapshot stays in use.
+Fields that only take effect on restart (the Gateway connection, ``dry_run``,
+the scheduler engine, plus anything the caller pins) keep their running
+values in the new snapshot and are reported as ``restart_required``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import yaml  # type: ignore
+from pydantic import ValidationError  # type: ignore
+
+from . import log as _log
+from .metrics import SETTINGS_RELOADS
+from .settings import Settings
+
+logger = _log.logger
+
+# Dotted paths that a running process cannot switch: a new clientId/host needs a
+# reconnect, paper<->live needs the startup checks, the engine owns the main loop.
+RESTART_ONLY: Tuple[str, ...] = ("broker", "dry_run", "schedule.engine")
+# The event engine fixes job cadences when it schedules them
+EVENT_ENGINE_PINNED: Tuple[str, ...] = RESTART_ONLY + (
+    "schedule.interval_seconds",
+    "schedule.exit_interval_seconds",
+    "schedule.housekeeping_interval_seconds",
+    "schedule.bar_close_delay_seconds",
+    "schedule.late_warn_seconds",
+    "schedule.reload_check_seconds",
+    "historical.bar_size",
+)
+
+
+def freeze(value: Any) -> Any:
+    """Deep read-only copy: dicts -> mappingproxy, lists/tuples -> tuple."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of ``freeze``: a mutable deep copy with plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class CycleConfig:
+    """Per-cycle values derived from settings, computed once per snapshot."""
+
+    hist_duration: str
+    hist_duration_seconds: int
+    hist_use_rth: bool
+    hist_bar_size: str
+    hist_bar_seconds: int
+    hist_what: str
+    hist_timeout: float
+    archive_preload_bars: int
+    cycle_budget_seconds: float
+    stage_budget_seconds: Optional[Mapping[str, float]]
+    signal_on_bar_close: bool
+    trace_sample_rate: float
+
+
+def derive(settings: Mapping[str, Any]) -> CycleConfig:
+    """Compute ``CycleConfig`` from a settings mapping (a dict or a snapshot).
+
+    Raises:
+        ValueError: If the historical duration or bar size is not a valid IBKR string.
+    """
+    from .scheduler import bar_size_seconds, duration_seconds
+
+    historical_cfg = settings.get("historical", {})
+    sched_cfg = settings.get("schedule", {})
+    hist_duration = historical_cfg.get("duration", "3600 S")
+    hist_bar_size = historical_cfg.get("bar_size", "1 min")
+    hist_duration_seconds = duration_seconds(hist_duration)
+    timeout = historical_cfg.get("timeout")
+    if timeout is None:
+        # ~1.5 seconds per minute of data requested
+        timeout = max(60, hist_duration_seconds // 40 + 30)
+    return CycleConfig(
+        hist_duration=hist_duration,
+        hist_duration_seconds=hist_duration_seconds,
+        hist_use_rth=bool(historical_cfg.get("use_rth", True)),
+        hist_bar_size=hist_bar_size,
+        hist_bar_seconds=bar_size_seconds(hist_bar_size),
+        hist_what=historical_cfg.get("what_to_show", "TRADES"),
+        hist_timeout=timeout,
+        archive_preload_bars=int(historical_cfg.get("archive_preload_bars", 0) or 0),
+        cycle_budget_seconds=sched_cfg.get("cycle_budget_seconds")
+        or sched_cfg.get("interval_seconds", 180),
+        stage_budget_seconds=sched_cfg.get("stage_budget_seconds"),
+        signal_on_bar_close=bool(sched_cfg.get("signal_on_bar_close", True)),
+        trace_sample_rate=settings.get("monitoring", {}).get("trace_sample_rate", 1.0),
+    )
+
+
+class SettingsSnapshot(Mapping):
+    """Read-only settings mapping with its derived ``CycleConfig`` and a version number."""
+
+    def __init__(self, data: Mapping[str, Any], version: int = 0, digest: str = ""):
+        self._data = data if isinstance(data, MappingProxyType) else freeze(data)
+        self.version = version
+        self.digest = digest
+        self.derived = derive(self._data)
+
+    @classmethod
+    def from_settings(
+        cls, settings: Any, version: int = 0, digest: str = ""
+    ) -> "SettingsSnapshot":
+        """Snapshot a ``Settings`` model or a plain settings dict."""
+        if isinstance(settings, SettingsSnapshot):
+            return settings
+        data = settings.model_dump() if hasattr(settings, "model_dump") else settings
+        return cls(data, version=version, digest=digest)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"SettingsSnapshot(version={self.version}, symbols={self._data.get('symbols')})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return thaw(self._data)
+
+    def for_symbols(self, symbols: Iterable[str]) -> "SettingsSnapshot":
+        """Same snapshot restricted to ``symbols`` (the event engine's per-symbol jobs)."""
+        data = dict(self._data)
+        data["symbols"] = tuple(symbols)
+        return SettingsSnapshot(
+            MappingProxyType(data), version=self.version, digest=self.digest
+        )
+
+
+def _flatten(value: Any, prefix: str = "") -> Dict[str, Any]:
+    if isinstance(value, Mapping) and value:
+        out: Dict[str, Any] = {}
+        for k, v in value.items():
+            out.update(_flatten(v, f"{prefix}.{k}" if prefix else str(k)))
+        return out
+    return {prefix: value}
+
+
+def changed_paths(old: Mapping[str, Any], new: Mapping[str, Any]) -> List[str]:
+    """Dotted paths whose value differs between two settings mappings."""
+    a, b = _flatten(thaw(old)), _flatten(thaw(new))
+    return sorted(k for k in a.keys() | b.keys() if a.get(k) != b.get(k))
+
+
+def _get_path(data: Mapping[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(data, Mapping) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+
+def _set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        data = data.setdefault(part, {})
+    data[parts[-1]] = value
+
+
+class SettingsWatcher:
+    """Detect edits to a settings YAML file and turn valid ones into new snapshots."""
+
+    def __init__(
+        self,
+        path: str | Path = "configs/settings.yaml",
+        current: Optional[SettingsSnapshot] = None,
+        pinned: Iterable[str] = RESTART_ONLY,
+        loader: Callable[[Path], Settings] = Settings.load,
+    ):
+        self.path = Path(path)
+        self.pinned = tuple(pinned)
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[SettingsSnapshot], None]] = []
+        self._stat = self._stat_key()
+        self._seen_digest = self._digest(self._read()) if self._stat else ""
+        if current is None:
+            current = SettingsSnapshot.from_settings(
+                loader(self.path), digest=self._seen_digest
+            )
+        self._current = current
+
+    @property
+    def current(self) -> SettingsSnapshot:
+        with self._lock:
+            return self._current
+
+    def add_listener(self, fn: Callable[[SettingsSnapshot], None]) -> None:
+        """Call ``fn(snapshot)`` after each accepted reload (on the polling thread)."""
+        self._listeners.append(fn)
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> bytes:
+        try:
+            return self.path.read_bytes()
+        except OSError:
+            return b""
+
+    @staticmethod
+    def _digest(raw: bytes) -> str:
+        return hashlib.sha1(raw).hexdigest()
+
+    def poll(self) -> Optional[SettingsSnapshot]:
+        """Return a new snapshot if the file changed to a valid, different config; else None."""
+        stat = self._stat_key()
+        if stat is None or stat == self._stat:
+            return None
+        self._stat = stat
+        digest = self._digest(self._read())
+        if digest == self._seen_digest:
+            return None  # touched, or rewritten with the same bytes
+        self._seen_digest = digest
+
+        try:
+            model = self._loader(self.path)
+            SettingsSnapshot.from_settings(model)  # derived values must parse too
+        except (ValidationError, ValueError, yaml.YAMLError) as e:
+            SETTINGS_RELOADS.labels(result="rejected").inc()
+            logger.bind(
+                event="settings_reload_rejected", path=str(self.path), error=str(e)
+            ).error(
+                "Settings change in {} rejected; keeping version {}: {}",
+                self.path,
+                self.current.version,
+                e,
+            )
+            return None
+
+        current = self.current
+        data = model.model_dump()
+        restart_required = []
+        for path in self.pinned:
+            running = _get_path(current, path)
+            if thaw(running) != _get_path(data, path):
+                restart_required.append(path)
+                _set_path(data, path, thaw(running))
+        changed = changed_paths(current, data)
+        if not changed:
+            if restart_required:
+                self._log_restart_required(restart_required)
+            return None
+
+        snapshot = SettingsSnapshot(data, version=current.version + 1, digest=digest)
+        with self._lock:
+            self._current = snapshot
+        SETTINGS_RELOADS.labels(result="applied").inc()
+        logger.bind(
+            event="settings_reloaded",
+            version=snapshot.version,
+            changed=changed,
+            restart_required=restart_required,
+        ).info(
+            "Settings reloaded (version {}): {}", snapshot.version, ", ".join(changed)
+        )
+        if restart_required:
+            self._log_restart_required(restart_required)
+        for fn in list(self._listeners):
+            try:
+                fn(snapshot)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Settings reload listener failed: {}", e)
+        return snapshot
+
+    def _log_restart_required(self, paths: List[str]) -> None:
+        logger.bind(event="settings_restart_required", paths=paths).warning(
+            "Settings changed that only apply after a restart: {}", ", ".join(paths)
+        )
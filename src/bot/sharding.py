@@ -0,0 +1,314 @@
+"""Sharded deployment: one coordinator, N worker processes, one Gateway connection each.
+
+A single process shares one ``IB()`` connection and one broker lock, so it
+has at most one Gateway request in flight. With ``sharding.shards > 1``,
+``app.main`` runs ``run_sharded`` instead of the scheduler. The coordinator
+splits ``symbols`` across worker processes with ``partition``. Shard ``i``
+connects as ``broker.client_id + i * sharding.client_id_stride``. The stride
+leaves room for the clientId retries in ``IBKRBroker.connect``, so one
+shard's retry never takes another shard's id.
+
+Limits that apply to the whole account live in ``SharedLimits``, which sits in
+shared memory and is handed to every worker:
+
+- a global entry-order token bucket (``risk.max_orders_per_minute`` across
+  all shards; each shard's exit monitor keeps its own throttle for exits);
+- a daily halt flag: the first shard whose daily loss guard fires halts new
+  entries on every shard until the next New York trading day.
+
+The coordinator owns no Gateway connection. It starts the workers, restarts
+any that exit unexpectedly after ``sharding.restart_delay_seconds``, and stops
+them all when its ``stop_event`` is set. Each worker writes its own
+``logs/bot.shard<N>.{log,jsonl}`` and tags records with ``shard``;
+``log_analytics`` reads them together.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from . import log as _log
+from . import logging_conf as _logging_conf
+from .metrics import SHARD_RESTARTS, SHARDS_ALIVE
+from .settings import LoggingSettings, Settings, get_settings
+from .throttle import SharedTokenBucket
+from .trading_calendar import NY_TZ
+
+logger = _log.logger
+
+# A shard's slice of symbols and its sharding layout come from the coordinator,
+# not from settings.yaml; hot reload must not overwrite them
+SHARD_PINNED = ("symbols", "sharding")
+_HALT_REASON_BYTES = 32
+
+
+def partition(symbols: Sequence[str], shards: int) -> List[List[str]]:
+    """Split ``symbols`` round-robin into at most ``shards`` non-empty lists.
+
+    Round-robin keeps each shard's share of the list order, so symbols listed
+    first (usually the most liquid) are spread across shards rather than
+    packed into shard 0.
+    """
+    if shards < 1:
+        raise ValueError("shards must be >= 1")
+    unique = list(dict.fromkeys(symbols))
+    parts = [unique[i::shards] for i in range(shards)]
+    return [p for p in parts if p]
+
+
+def shard_client_id(base: int, index: int, stride: int) -> int:
+    return base + index * stride
+
+
+def shard_settings(settings: Settings, index: int, symbols: Sequence[str]) -> Settings:
+    """``settings`` for shard ``index``: its symbols and its own clientId."""
+    client_id = shard_client_id(
+        settings.broker.client_id, index, settings.sharding.client_id_stride
+    )
+    return settings.model_copy(
+        update={
+            "symbols": list(symbols),
+            "broker": settings.broker.model_copy(update={"client_id": client_id}),
+        }
+    )
+
+
+class SharedLimits:
+    """Account-wide entry limits shared by every shard process.
+
+    Create it in the coordinator from a ``multiprocessing`` context and pass it
+    to workers as a ``Process`` argument. Workers install it with
+    ``scheduler.set_shared_limits``.
+    """
+
+    def __init__(
+        self, orders_per_minute: int, order_wait_seconds: float = 5.0, ctx=None
+    ):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.orders = SharedTokenBucket.per_minute(orders_per_minute, ctx=ctx)
+        self.order_wait_seconds = order_wait_seconds
+        self._lock = ctx.Lock()
+        self._halt_day = ctx.Value("i", 0, lock=False)
+        self._halt_reason = ctx.Array("c", _HALT_REASON_BYTES, lock=False)
+
+    @staticmethod
+    def _day(now: Optional[float]) -> int:
+        ny = datetime.fromtimestamp(time.time() if now is None else now, NY_TZ)
+        return ny.year * 10000 + ny.month * 100 + ny.day
+
+    def acquire_order(self) -> bool:
+        """Take one entry-order token, waiting up to ``order_wait_seconds``."""
+        return self.orders.acquire(timeout=self.order_wait_seconds)
+
+    def halt(self, reason: str, now: Optional[float] = None) -> bool:
+        """Halt new entries on all shards for the rest of the trading day.
+
+        Returns:
+            True if this call set the halt, False if it was already set today.
+        """
+        day = self._day(now)
+        with self._lock:
+            if self._halt_day.value == day:
+                return False
+            self._halt_day.value = day
+            self._halt_reason.value = reason.encode("utf-8")[: _HALT_REASON_BYTES - 1]
+            return True
+
+    def halted(self, now: Optional[float] = None) -> Optional[str]:
+        """Reason entries are halted today, or None."""
+        with self._lock:
+            if self._halt_day.value != self._day(now):
+                return None
+            return self._halt_reason.value.decode("utf-8", "replace") or "halted"
+
+
+def _shard_main(
+    index: int, symbols: List[str], yaml_path: str, limits: SharedLimits, stop_event
+) -> None:
+    """Worker process: connect as this shard's clientId and run the scheduler on its symbols."""
+    # Ctrl+C reaches the whole process group; the coordinator decides when shards stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    settings = shard_settings(get_settings(yaml_path), index, symbols)
+    stem = f"bot.shard{index}"
+    _logging_conf.configure(settings.logging, stem=stem)
+    try:
+        logger.configure(extra={"shard": index})  # type: ignore[attr-defined]
+    except AttributeError:  # pragma: no cover - stdlib fallback logger
+        pass
+
+    mon = settings.monitoring
+    if mon.metrics_port is not None:
+        from .metrics import start_http_server
+
+        try:
+            start_http_server(mon.metrics_port + 1 + index, host=mon.metrics_host)
+        except OSError as metrics_err:
+            logger.warning(
+                "Shard {} metrics endpoint not started: {}", index, metrics_err
+            )
+
+    from .broker.ibkr import IBKRBroker
+    from .scheduler import run_scheduler, set_shared_limits
+    from .settings_watcher import (
+        EVENT_ENGINE_PINNED,
+        RESTART_ONLY,
+        SettingsSnapshot,
+        SettingsWatcher,
+    )
+
+    set_shared_limits(limits)
+    broker = IBKRBroker(
+        host=settings.broker.host,
+        port=settings.broker.port,
+        client_id=settings.broker.client_id,
+        paper=not settings.broker.read_only,
+    )
+    try:
+        broker.connect()
+    except Exception as conn_err:  # pylint: disable=broad-except
+        logger.bind(
+            event="shard_connect_failed",
+            shard=index,
+            client_id=settings.broker.client_id,
+        ).error("Shard {} failed to connect to Gateway: {}", index, conn_err)
+        sys.exit(1)
+    logger.bind(
+        event="shard_connected",
+        shard=index,
+        client_id=broker.client_id,
+        symbols=symbols,
+    ).info(
+        "Shard {} connected as clientId {} for {}",
+        index,
+        broker.client_id,
+        ", ".join(symbols),
+    )
+
+    snapshot = SettingsSnapshot.from_settings(settings)
+    watcher = None
+    if settings.schedule.reload_check_seconds > 0:
+        pinned = (
+            EVENT_ENGINE_PINNED if settings.schedule.engine == "event" else RESTART_ONLY
+        )
+        watcher = SettingsWatcher(yaml_path, snapshot, pinned=pinned + SHARD_PINNED)
+        watcher.add_listener(
+            lambda snap: _logging_conf.configure(
+                LoggingSettings(**snap.to_dict()["logging"]), stem=stem
+            )
+        )
+    try:
+        run_scheduler(broker, snapshot, stop_event=stop_event, watcher=watcher)
+    finally:
+        try:
+            broker.disconnect()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+
+def run_sharded(
+    settings: Settings,
+    stop_event,
+    yaml_path: str | Path = "configs/settings.yaml",
+    target: Optional[Callable[..., None]] = None,
+    poll_seconds: float = 1.0,
+) -> None:
+    """Coordinator: start one worker per symbol shard and supervise them until ``stop_event``.
+
+    Args:
+        settings: Validated settings; ``sharding.shards`` sets the worker count.
+        stop_event: Set (e.g. by a signal handler) to stop all shards.
+        yaml_path: Settings file each worker loads and watches.
+        target: Worker entry point, called as ``target(index, symbols,
+            yaml_path, limits, shard_stop)`` in a spawned process. Defaults to
+            ``_shard_main``.
+        poll_seconds: How often the coordinator checks worker liveness.
+    """
+    ctx = multiprocessing.get_context(
+        "spawn"
+    )  # fresh interpreters: no inherited event loop or locks
+    target = target or _shard_main
+    parts = partition(settings.symbols, settings.sharding.shards)
+    cfg = settings.sharding
+    limits = SharedLimits(
+        settings.risk.max_orders_per_minute, cfg.order_wait_seconds, ctx=ctx
+    )
+    shard_stop = ctx.Event()
+    procs: Dict[int, multiprocessing.process.BaseProcess] = {}
+    restart_at: Dict[int, float] = {}
+
+    def start(index: int) -> None:
+        proc = ctx.Process(
+            target=target,
+            args=(index, parts[index], str(yaml_path), limits, shard_stop),
+            name=f"shard-{index}",
+        )
+        proc.start()
+        procs[index] = proc
+        logger.bind(
+            event="shard_started",
+            shard=index,
+            pid=proc.pid,
+            client_id=shard_client_id(
+                settings.broker.client_id, index, cfg.client_id_stride
+            ),
+            symbols=parts[index],
+        ).info(
+            "Shard {} started (pid {}): {}", index, proc.pid, ", ".join(parts[index])
+        )
+
+    logger.info(
+        "Sharded mode: {} shards for {} symbols, {} entry orders/min across all shards",
+        len(parts),
+        sum(len(p) for p in parts),
+        settings.risk.max_orders_per_minute,
+    )
+    for index in range(len(parts)):
+        start(index)
+
+    halt_logged: Optional[str] = None
+    try:
+        while not stop_event.wait(poll_seconds):
+            now = time.monotonic()
+            for index, proc in list(procs.items()):
+                if proc.is_alive() or index in restart_at:
+                    continue
+                restart_at[index] = now + cfg.restart_delay_seconds
+                logger.bind(
+                    event="shard_exited", shard=index, exitcode=proc.exitcode
+                ).error(
+                    "Shard {} exited (code {}); restarting in {:.0f}s",
+                    index,
+                    proc.exitcode,
+                    cfg.restart_delay_seconds,
+                )
+            for index, due in list(restart_at.items()):
+                if now >= due:
+                    del restart_at[index]
+                    SHARD_RESTARTS.labels(shard=str(index)).inc()
+                    start(index)
+            SHARDS_ALIVE.set(sum(1 for p in procs.values() if p.is_alive()))
+
+            reason = limits.halted()
+            if reason and reason != halt_logged:
+                logger.bind(event="global_halt", reason=reason).warning(
+                    "New entries halted on all shards for today: {}", reason
+                )
+            halt_logged = reason
+    finally:
+        shard_stop.set()
+        for index, proc in procs.items():
+            proc.join(timeout=30)
+            if proc.is_alive():
+                logger.warning("Shard {} did not stop within 30s; terminating", index)
+                proc.terminate()
+                proc.join(timeout=5)
+        SHARDS_ALIVE.set(0)
+        logger.info("All shards stopped")
@@ -0,0 +1,147 @@
+"""Cold-start profiling: import costs (``-X importtime``) and startup phase timings.
+
+``profile_imports`` imports the bot's startup modules in a fresh interpreter
+with ``-X importtime`` and parses the per-module self/cumulative times, so
+the report reflects a cold process rather than this one's module cache.
+``python -m src.bot.app --profile-startup`` prints it and exits.
+
+``StartupTimer`` marks phases of ``app.main`` (settings, logging, broker
+import, Gateway connect, scheduler import) and logs them once as
+``event="startup_timing"``.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from . import log as _log
+
+logger = _log.logger
+
+# What app.main imports before the first cycle
+STARTUP_MODULES = ("src.bot.app", "src.bot.broker.ibkr", "src.bot.scheduler")
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int  # 0 = imported directly by the profiled statement
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` stderr lines (``import time: self | cumulative | name``)."""
+    records = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip(" ")
+        # Each nesting level adds two spaces after the single separator space
+        records.append(
+            ImportRecord(
+                stripped, self_us, cumulative_us, (len(name) - len(stripped) - 1) // 2
+            )
+        )
+    return records
+
+
+def profile_imports(
+    modules: Sequence[str] = STARTUP_MODULES, python: str = sys.executable
+) -> List[ImportRecord]:
+    """Import ``modules`` in a fresh interpreter and return its import timings.
+
+    Raises:
+        RuntimeError: If the import fails in the child interpreter.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(_ROOT), env.get("PYTHONPATH")])
+    )
+    stmt = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", stmt],
+        cwd=str(_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"import of {', '.join(modules)} failed:\n{proc.stderr[-2000:]}"
+        )
+    return parse_importtime(proc.stderr)
+
+
+def format_report(records: List[ImportRecord], top: int = 20) -> str:
+    total_us = sum(r.cumulative_us for r in records if r.depth == 0)
+    project = sorted(
+        (r for r in records if r.name.startswith("src.")),
+        key=lambda r: -r.cumulative_us,
+    )
+    external = {}
+    for r in records:
+        root = r.name.split(".")[0]
+        if not r.name.startswith("src.") and r.name == root:
+            external[root] = max(external.get(root, 0), r.cumulative_us)
+    heaviest = sorted(records, key=lambda r: -r.self_us)
+
+    out = [
+        f"Startup imports: {total_us / 1e3:.0f} ms total, {len(records)} modules",
+        "",
+    ]
+    out.append("Bot modules by cumulative time (includes what they import)")
+    out += [f"  {r.cumulative_us / 1e3:8.1f} ms  {r.name}" for r in project[:top]]
+    out += ["", "Top-level packages by cumulative time"]
+    out += [
+        f"  {us / 1e3:8.1f} ms  {name}"
+        for name, us in sorted(external.items(), key=lambda kv: -kv[1])[:top]
+    ]
+    out += ["", "Modules by self time"]
+    out += [f"  {r.self_us / 1e3:8.1f} ms  {r.name}" for r in heaviest[:top]]
+    return "\n".join(out)
+
+
+class StartupTimer:
+    """Wall time of named startup phases, from ``started`` (default: construction)."""
+
+    def __init__(self, started: Optional[float] = None, clock=time.perf_counter):
+        self._clock = clock
+        self._started = clock() if started is None else started
+        self._last = self._started
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> float:
+        """Close ``phase`` (time since the previous mark) and return its seconds."""
+        now = self._clock()
+        self.phases[phase] = now - self._last
+        self._last = now
+        return self.phases[phase]
+
+    def log(self) -> Dict[str, float]:
+        phases_ms = {k: round(v * 1000.0, 1) for k, v in self.phases.items()}
+        total_ms = round((self._last - self._started) * 1000.0, 1)
+        logger.bind(
+            event="startup_timing", total_ms=total_ms, phases_ms=phases_ms
+        ).info(
+            "Startup: {:.0f}ms ({})",
+            total_ms,
+            ", ".join(f"{k} {v:.0f}ms" for k, v in phases_ms.items()),
+        )
+        return phases_ms
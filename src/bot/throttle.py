@@ -0,0 +1,147 @@
+"""Token-bucket rate limiter for Gateway-facing request paths (orders, pacing)."""
+
+from __future__ import annotations
+
+import time
+from threading import Condition
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate_per_second`` up to ``burst``. Each
+    request consumes one token; callers either fail fast (``try_acquire``) or
+    block up to a timeout (``acquire``).
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        self.rate = float(rate_per_second)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._cond = Condition()
+
+    @classmethod
+    def per_minute(cls, count: int, burst: Optional[int] = None) -> "TokenBucket":
+        return cls(
+            count / 60.0, burst=burst if burst is not None else max(1, count // 6)
+        )
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        with self._cond:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available or timeout elapses. Returns success."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+                if deadline is not None:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        return False
+                    wait = min(wait, left)
+                self._cond.wait(wait)
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in shared memory, for use across processes.
+
+    Same refill rule and ``try_acquire``/``acquire`` API as ``TokenBucket``.
+    Build it in the parent from a ``multiprocessing`` context and hand it to
+    child processes as a ``Process`` argument; every holder draws from one
+    budget. Uses ``time.monotonic``, which is system-wide on Linux.
+    """
+
+    _POLL_SECONDS = 0.05
+
+    def __init__(self, rate_per_second: float, burst: int = 1, ctx=None):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be > 0")
+        if ctx is None:
+            import multiprocessing
+
+            ctx = multiprocessing.get_context("spawn")
+        self.rate = float(rate_per_second)
+        self.burst = max(1, int(burst))
+        self._lock = ctx.Lock()
+        self._tokens = ctx.Value("d", float(self.burst), lock=False)
+        self._updated = ctx.Value("d", time.monotonic(), lock=False)
+
+    @classmethod
+    def per_minute(
+        cls, count: int, burst: Optional[int] = None, ctx=None
+    ) -> "SharedTokenBucket":
+        return cls(
+            count / 60.0,
+            burst=burst if burst is not None else max(1, count // 6),
+            ctx=ctx,
+        )
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens.value = min(
+            self.burst, self._tokens.value + (now - self._updated.value) * self.rate
+        )
+        self._updated.value = now
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens.value
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens.value >= 1.0:
+                self._tokens.value -= 1.0
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Poll until a token is available or timeout elapses. Returns success."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens.value >= 1.0:
+                    self._tokens.value -= 1.0
+                    return True
+                wait = (1.0 - self._tokens.value) / self.rate
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                wait = min(wait, left)
+            # No cross-process condition variable; short sleeps bound the wake-up lag
+            time.sleep(min(wait, self._POLL_SECONDS))
@@ -0,0 +1,181 @@
+"""Per-stage tracing spans for scheduler cycles.
+
+A ``CycleTrace`` is created at the start of each ``run_cycle``. Each stage of
+symbol processing (lock wait, position check, historical fetch, DataFrame
+build, signal, chain, quotes, sizing, order, alert) runs inside
+``trace.span(stage)``. A closed span is logged as a structured
+``event="span"`` record at DEBUG and folded into the cycle's breakdown, which
+``finish()`` logs once as ``event="cycle_trace"`` and keeps in a small
+in-process history (``recent_traces``). Span durations also feed the
+``bot_stage_duration_seconds`` histogram (see metrics).
+
+Spans nest: a span without an explicit symbol takes it from the innermost open
+span on the same thread, so ``lock_wait`` inside ``historical`` is attributed
+to the symbol being processed. Nested time is counted in both spans.
+
+Sampling is per cycle, so a traced cycle is always complete. Cycles are picked
+at an even stride (rate 0.25 traces every 4th cycle); in an untraced cycle
+``span`` returns a shared no-op context manager.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from . import log as _log
+from .metrics import STAGE_DURATION
+
+logger = _log.logger
+
+_NULL_SPAN = nullcontext()
+
+_cycle_lock = threading.Lock()
+_cycle_count = 0
+
+_HISTORY_SIZE = 50
+_history: Deque[Dict[str, Any]] = deque(maxlen=_HISTORY_SIZE)
+_history_lock = threading.Lock()
+
+
+def _next_cycle(sample_rate: float) -> tuple:
+    """Number the next cycle and decide whether it is traced."""
+    global _cycle_count
+    with _cycle_lock:
+        _cycle_count += 1
+        n = _cycle_count
+    if sample_rate >= 1.0:
+        return n, True
+    if sample_rate <= 0.0:
+        return n, False
+    return n, math.floor(n * sample_rate) > math.floor((n - 1) * sample_rate)
+
+
+class CycleTrace:
+    """Span timings of one scheduler cycle, aggregated per stage and per symbol."""
+
+    def __init__(
+        self, sample_rate: float = 1.0, clock: Callable[[], float] = time.perf_counter
+    ):
+        self.cycle_id, self.sampled = _next_cycle(float(sample_rate))
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # stage -> [count, total seconds, max seconds]
+        self._stages: Dict[str, List[float]] = {}
+        self._symbols: Dict[str, float] = {}
+        self._errors: Dict[str, int] = {}
+
+    def _stack(self) -> List[Optional[str]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, stage: str, symbol: Optional[str] = None):
+        """Context manager timing ``stage``; a no-op when the cycle is not sampled."""
+        if not self.sampled:
+            return _NULL_SPAN
+        return self._span(stage, symbol)
+
+    @contextmanager
+    def _span(self, stage: str, symbol: Optional[str]) -> Iterator[None]:
+        stack = self._stack()
+        if symbol is None and stack:
+            symbol = stack[-1]
+        stack.append(symbol)
+        error = None
+        start = self._clock()
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = self._clock() - start
+            stack.pop()
+            self.record(stage, seconds, symbol=symbol, error=error)
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        symbol: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Add an already measured span (used by ``span``; callable directly)."""
+        if not self.sampled:
+            return
+        with self._lock:
+            agg = self._stages.get(stage)
+            if agg is None:
+                self._stages[stage] = [1, seconds, seconds]
+            else:
+                agg[0] += 1
+                agg[1] += seconds
+                agg[2] = max(agg[2], seconds)
+            if stage == "symbol" and symbol is not None:
+                self._symbols[symbol] = self._symbols.get(symbol, 0.0) + seconds
+            if error is not None:
+                self._errors[stage] = self._errors.get(stage, 0) + 1
+        STAGE_DURATION.labels(stage=stage).observe(seconds)
+        logger.bind(
+            event="span",
+            cycle_id=self.cycle_id,
+            stage=stage,
+            symbol=symbol,
+            duration_ms=round(seconds * 1000.0, 3),
+            error=error,
+        ).debug("span {} {} {:.1f}ms", stage, symbol or "-", seconds * 1000.0)
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Per-stage count/total/max (ms), per-symbol totals (ms) and errors so far."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": int(count),
+                    "total_ms": round(total * 1000.0, 3),
+                    "max_ms": round(peak * 1000.0, 3),
+                }
+                for stage, (count, total, peak) in self._stages.items()
+            }
+            symbols = {sym: round(s * 1000.0, 3) for sym, s in self._symbols.items()}
+            errors = dict(self._errors)
+        return {
+            "cycle_id": self.cycle_id,
+            "cycle_ms": round((self._clock() - self._started) * 1000.0, 3),
+            "stages": stages,
+            "symbols": symbols,
+            "errors": errors,
+        }
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Log and store the cycle breakdown; None when the cycle was not sampled."""
+        if not self.sampled:
+            return None
+        summary = self.breakdown()
+        with _history_lock:
+            _history.append(summary)
+        slowest = sorted(
+            ((s, v["total_ms"]) for s, v in summary["stages"].items() if s != "symbol"),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        logger.bind(event="cycle_trace", **summary).info(
+            "Cycle trace: {:.1f}ms; {}",
+            summary["cycle_ms"],
+            ", ".join(f"{s} {ms:.1f}ms" for s, ms in slowest[:5]) or "no spans",
+        )
+        return summary
+
+
+def recent_traces(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Breakdowns of the most recent sampled cycles, oldest first."""
+    with _history_lock:
+        items = list(_history)
+    return items[-limit:] if limit else items
@@ -0,0 +1,176 @@
+"""NYSE trading calendar with a precomputed session table.
+
+Sessions (open/close epochs) are generated per calendar year from the NYSE
+holiday and early-close rules and kept in two sorted arrays, so lookups are a
+single ``bisect`` (O(log n)) with no timezone work on the hot path.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from threading import Lock
+from typing import List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+NY_TZ = ZoneInfo("America/New_York")
+
+REGULAR_OPEN = dtime(hour=9, minute=30)
+REGULAR_CLOSE = dtime(hour=16, minute=0)
+EARLY_CLOSE = dtime(hour=13, minute=0)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    wd = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * wd) // 451
+    month, day = divmod(h + wd - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    nxt = date(year + (month // 12), month % 12 + 1, 1)
+    last = nxt - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def nyse_holidays(year: int) -> Set[date]:
+    """Full-day NYSE closures for year."""
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day: a Saturday holiday is NOT moved back into the prior year
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        days.add(new_year + timedelta(days=1))
+    elif new_year.weekday() < 5:
+        days.add(new_year)
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def nyse_early_closes(year: int) -> Set[date]:
+    """13:00 ET early closes: July 3, day after Thanksgiving, Christmas Eve."""
+    holidays = nyse_holidays(year)
+    candidates = {
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    }
+    return {d for d in candidates if d.weekday() < 5 and d not in holidays}
+
+
+class TradingCalendar:
+    """Sorted session table with O(log n) open/close lookups.
+
+    Years are generated lazily the first time a timestamp in (or adjacent to)
+    them is queried, so a long-running process never falls off the table.
+    """
+
+    def __init__(self, years: Optional[List[int]] = None):
+        self._opens: List[float] = []
+        self._closes: List[float] = []
+        self._years: Set[int] = set()
+        self._lock = Lock()
+        for y in years or [datetime.now(NY_TZ).year]:
+            self._ensure_year(y)
+
+    def _ensure_year(self, year: int) -> None:
+        if year in self._years:
+            return
+        with self._lock:
+            if year in self._years:
+                return
+            holidays = nyse_holidays(year)
+            early = nyse_early_closes(year)
+            sessions = list(zip(self._opens, self._closes))
+            d = date(year, 1, 1)
+            while d.year == year:
+                if d.weekday() < 5 and d not in holidays:
+                    close_t = EARLY_CLOSE if d in early else REGULAR_CLOSE
+                    sessions.append(
+                        (
+                            datetime.combine(d, REGULAR_OPEN, NY_TZ).timestamp(),
+                            datetime.combine(d, close_t, NY_TZ).timestamp(),
+                        )
+                    )
+                d += timedelta(days=1)
+            sessions.sort()
+            self._opens = [o for o, _ in sessions]
+            self._closes = [c for _, c in sessions]
+            self._years.add(year)
+
+    def _cover(self, ts: float) -> None:
+        year = datetime.fromtimestamp(ts, NY_TZ).year
+        # Neighbouring years keep next_open valid across New Year
+        for y in (year, year + 1):
+            if y not in self._years:
+                self._ensure_year(y)
+
+    def session_at(self, ts: float) -> Optional[Tuple[float, float]]:
+        """Return (open, close) epochs of the session containing ts, else None."""
+        self._cover(ts)
+        i = bisect_right(self._opens, ts) - 1
+        if i >= 0 and ts <= self._closes[i]:
+            return self._opens[i], self._closes[i]
+        return None
+
+    def is_open(self, ts: float) -> bool:
+        return self.session_at(ts) is not None
+
+    def next_open(self, ts: float) -> float:
+        """Epoch of the first session open strictly after ts."""
+        self._cover(ts)
+        i = bisect_right(self._opens, ts)
+        if i >= len(self._opens):
+            self._ensure_year(max(self._years) + 1)
+            i = bisect_right(self._opens, ts)
+        return self._opens[i]
+
+    def seconds_until_open(self, ts: float) -> float:
+        """0 when the market is open at ts, else seconds until the next open."""
+        if self.is_open(ts):
+            return 0.0
+        return self.next_open(ts) - ts
+
+
+_default_calendar: Optional[TradingCalendar] = None
+
+
+def get_calendar() -> TradingCalendar:
+    """Process-wide calendar instance (built on first use)."""
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = TradingCalendar()
+    return _default_calendar
@@ -0,0 +1,155 @@
+"""Unit tests for data/archive.py - partitioned Parquet bar archive and cold-start preload."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.bot import scheduler
+from src.bot.backtest import SimBroker, load_bar_archive, run_replay
+from src.bot.data.archive import BarArchive
+
+
+def _sessions(days=3, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for day in pd.bdate_range("2024-01-02", periods=days):
+        idx = pd.date_range(f"{day:%Y-%m-%d} 14:30", periods=78, freq="5min", tz="UTC")
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 78)))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "open": closes,
+                    "high": closes * 1.001,
+                    "low": closes * 0.999,
+                    "close": closes,
+                    "volume": rng.lognormal(8, 0.5, 78),
+                },
+                index=idx,
+            )
+        )
+    return pd.concat(frames)
+
+
+def test_overlapping_appends_roundtrip_and_partition_by_session(tmp_path):
+    df = _sessions()
+    archive = BarArchive(tmp_path, compact_after=4)
+    # Sliding one-hour windows, as the scheduler fetches them
+    written = sum(
+        archive.append("spy", "5 mins", df.iloc[max(0, i - 12) : i + 1])
+        for i in range(len(df))
+    )
+    assert written < 2 * len(df)  # only the new tail of each window is rewritten
+
+    assert [d.isoformat() for d in archive.dates("SPY", "5 mins")] == [
+        "2024-01-02",
+        "2024-01-03",
+        "2024-01-04",
+    ]
+    assert (tmp_path / "symbol=SPY" / "bar_size=5mins" / "date=2024-01-02").is_dir()
+    pd.testing.assert_frame_equal(
+        archive.read("SPY", "5 mins"),
+        df,
+        check_names=False,
+        check_freq=False,
+        check_index_type=False,
+    )
+
+
+def test_latest_write_wins_and_compaction_keeps_it(tmp_path):
+    df = _sessions(days=1)
+    BarArchive(tmp_path).append("SPY", "5 mins", df)
+    revised = df.iloc[[10]].copy()
+    revised["close"] = 1.0
+    archive = BarArchive(tmp_path)  # fresh process view: no high-water mark
+    archive.append("SPY", "5 mins", revised)
+
+    assert archive.read("SPY", "5 mins")["close"].iloc[10] == 1.0
+    assert archive.compact() == 1
+    partition = tmp_path / "symbol=SPY" / "bar_size=5mins" / "date=2024-01-02"
+    assert [p.name for p in partition.iterdir()] == ["data.parquet"]
+    out = archive.read("SPY", "5 mins")
+    assert len(out) == len(df) and out["close"].iloc[10] == 1.0
+    assert archive.compact() == 0
+
+
+def test_range_reads_arrays_and_tail(tmp_path):
+    df = _sessions()
+    archive = BarArchive(tmp_path)
+    archive.append("SPY", "5 mins", df)
+
+    arrays = archive.read_arrays(
+        "SPY", "5 mins", start="2024-01-03 15:00", end="2024-01-03 16:00"
+    )
+    assert len(arrays["ts"]) == 13
+    assert arrays["ts"][0] == pd.Timestamp("2024-01-03 15:00", tz="UTC").timestamp()
+    assert np.array_equal(
+        arrays["close"],
+        df.loc["2024-01-03 15:00":"2024-01-03 16:00", "close"].to_numpy(),
+    )
+
+    tail = archive.tail("SPY", "5 mins", 100)
+    pd.testing.assert_frame_equal(
+        tail,
+        df.iloc[-100:],
+        check_names=False,
+        check_freq=False,
+        check_index_type=False,
+    )
+    assert archive.read("QQQ", "5 mins").empty
+    assert len(archive.read_arrays("QQQ", "5 mins")["close"]) == 0
+    assert list(load_bar_archive(tmp_path, ["SPY", "QQQ"], "5 mins")) == ["SPY"]
+
+
+def test_cold_start_requests_only_the_gap(tmp_path):
+    df = _sessions(days=2)
+    archive = BarArchive(tmp_path)
+    archive.append("SPY", "5 mins", df.iloc[:78])  # day one only
+
+    now = df.index[78 + 6].timestamp()  # half an hour into day two
+    scheduler.set_clock(lambda: now)
+    try:
+        tail, duration = scheduler._archive_preload(archive, "SPY", "5 mins", 50, "2 D")
+    finally:
+        scheduler.set_clock()
+    assert len(tail) == 50 and tail.index[-1] == df.index[77]
+    expected = int(now - df.index[77].timestamp()) + 300
+    assert duration == f"{expected} S"
+    merged = scheduler._merge_bars(tail, df.iloc[70:90])
+    assert len(merged) == 50 + 12 and merged.index.is_monotonic_increasing
+
+
+def test_merge_failure_is_logged_and_falls_back_to_fetched():
+    from loguru import logger
+
+    events = []
+    sink = logger.add(
+        lambda msg: events.append(msg.record["extra"].get("event")), level="WARNING"
+    )
+    try:
+        fetched = _sessions(days=1)
+        # Fetched bars missing an archived column cannot be merged
+        assert scheduler._merge_bars(fetched.assign(vwap=1.0), fetched) is fetched
+    finally:
+        logger.remove(sink)
+    assert events == ["bar_merge_failed"]
+
+
+def test_replay_archives_fetched_bars(tmp_path):
+    bars = _sessions(days=1)
+    settings = {
+        "symbols": ["SPY"],
+        "schedule": {"interval_seconds": 300},
+        "historical": {
+            "duration": "1 D",
+            "bar_size": "5 mins",
+            "archive_dir": str(tmp_path / "bars"),
+        },
+        "risk": {"take_profit_pct": 0.3, "stop_loss_pct": 0.2},
+        "options": {"max_spread_pct": 5.0},
+    }
+    run_replay(SimBroker({"SPY": bars}), settings, state_dir=tmp_path)
+    archived = BarArchive(tmp_path / "bars").read("SPY", "5 mins")
+    assert len(archived) >= 60
+    assert np.allclose(archived["close"], bars["close"].iloc[: len(archived)])
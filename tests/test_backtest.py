@@ -0,0 +1,110 @@
+"""Unit tests for the backtest package - bar replay, brackets and prefilters."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot.backtest import (
+    STRATEGIES,
+    BacktestConfig,
+    DeltaPremiumModel,
+    normalize_bars,
+    run_backtest,
+)
+from src.bot.strategy.daily_volume_rules import daily_volume_rules
+
+
+def _bars(closes, volumes=None, start="2024-01-02 14:30"):
+    closes = np.asarray(closes, dtype=float)
+    opens = np.r_[closes[0], closes[:-1]]
+    idx = pd.date_range(start, periods=len(closes), freq="5min", tz="UTC")
+    return pd.DataFrame(
+        {
+            "open": opens,
+            "high": np.maximum(opens, closes),
+            "low": np.minimum(opens, closes),
+            "close": closes,
+            "volume": volumes if volumes is not None else np.full(len(closes), 1000.0),
+        },
+        index=idx,
+    )
+
+
+def _random_bars(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return _bars(closes, rng.lognormal(7, 0.6, n))
+
+
+def test_dv_prefilter_is_superset_of_live_signals():
+    df = _random_bars()
+    mask = STRATEGIES["daily_volume"].prefilter(df)
+    w = STRATEGIES["daily_volume"].window
+    for i in range(len(df)):
+        res = daily_volume_rules(df.iloc[max(0, i - w + 1) : i + 1], "SPY")
+        if res["signal"] != "HOLD":
+            assert mask[i], f"prefilter rejected live signal at bar {i}"
+
+
+def test_breakout_hits_take_profit_next_bars():
+    # Flat, then a high-volume breakout bar, then a rally
+    closes = [100.0] * 12 + [101.0] + [101.0, 104.0, 106.0]
+    df = _bars(closes)
+    cfg = BacktestConfig(
+        take_profit_pct=0.5,
+        stop_loss_pct=0.5,
+        premium_model=DeltaPremiumModel(premium_pct=0.02, delta=0.5),
+        commission_per_contract=0.0,
+    )
+    result = run_backtest({"SPY": df}, cfg)
+
+    trade = result.trades[0]
+    assert trade.right == "C"
+    assert trade.entry_ts == df.index[13].timestamp()  # next bar's open
+    assert trade.exit_reason == "target"
+    assert trade.exit_premium == pytest.approx(trade.entry_premium * 1.5)
+    assert result.equity.iloc[-1] == pytest.approx(cfg.initial_equity + trade.pnl)
+
+
+def test_gap_through_stop_fills_at_open():
+    closes = [100.0] * 12 + [101.0] + [101.0, 101.0]
+    df = _bars(closes)
+    df.iloc[14, df.columns.get_loc("open")] = 95.0  # gap down after entry
+    df.iloc[14, df.columns.get_loc("low")] = 95.0
+    cfg = BacktestConfig(take_profit_pct=0.5, stop_loss_pct=0.2)
+    trade = run_backtest({"SPY": df}, cfg).trades[0]
+    assert trade.exit_reason == "stop_gap"
+    assert trade.exit_premium < trade.entry_premium * 0.8
+
+
+def test_multi_symbol_run_and_stats():
+    bars = {"SPY": _random_bars(seed=2), "QQQ": _random_bars(seed=3)}
+    result = run_backtest(
+        bars, BacktestConfig(take_profit_pct=0.3, stop_loss_pct=0.2, max_hold_bars=12)
+    )
+    stats = result.stats()
+    assert stats["trades"] == len(result.trades) > 0
+    assert {t.symbol for t in result.trades} == {"SPY", "QQQ"}
+    assert all(t.bars_held <= 12 for t in result.trades)
+    assert result.equity.index.is_monotonic_increasing
+    assert result.equity.iloc[-1] == pytest.approx(
+        100_000 + sum(t.pnl for t in result.trades)
+    )
+
+
+def test_normalize_bars_from_csv_layout():
+    raw = pd.DataFrame(
+        {
+            "Timestamp": ["2024-01-02 14:35", "2024-01-02 14:30", "2024-01-02 14:35"],
+            "Open": [1, 2, 3],
+            "High": [1, 2, 3],
+            "Low": [1, 2, 3],
+            "Close": [1, 2, 3],
+            "Volume": [10, 20, 30],
+        }
+    )
+    df = normalize_bars(raw)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert len(df) == 2 and df["close"].iloc[-1] == 3.0
+    with pytest.raises(ValueError):
+        normalize_bars(raw.drop(columns=["Volume"]))
@@ -0,0 +1,149 @@
+"""Unit tests for deadline.py - cycle budgets and stage deadlines."""
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot.deadline import (
+    CycleBudget,
+    Deadline,
+    DeadlineExceeded,
+    clamp_timeout,
+    current_deadline,
+    deadline_scope,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_remaining_and_check():
+    clock = FakeClock()
+    dl = Deadline(10, stage="bars", clock=clock)
+    clock.now = 4.0
+    assert dl.remaining() == 6.0
+    assert dl.clamp(90) == 6.0
+    clock.now = 10.0
+    with pytest.raises(DeadlineExceeded) as exc:
+        dl.check()
+    assert exc.value.stage == "bars"
+    assert isinstance(exc.value, TimeoutError)
+
+
+def test_clamp_timeout_without_deadline_is_noop():
+    assert current_deadline() is None
+    assert clamp_timeout(90) == 90.0
+
+
+def test_scopes_nest_and_unwind():
+    clock = FakeClock()
+    outer = Deadline(30, stage="outer", clock=clock)
+    inner = Deadline(5, stage="inner", clock=clock)
+    with deadline_scope(outer):
+        with deadline_scope(inner):
+            assert current_deadline() is inner
+            assert clamp_timeout(60) == 5.0
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_stage_capped_by_cycle_remaining():
+    clock = FakeClock()
+    budget = CycleBudget(15, {"bars": 30}, clock=clock)
+    clock.now = 12.0
+    with budget.stage("bars") as dl:
+        assert dl.budget_seconds == pytest.approx(3.0)
+    clock.now = 15.0
+    with pytest.raises(DeadlineExceeded):
+        with budget.stage("quotes"):
+            pass
+
+
+class SlowBroker:
+    """Broker whose historical fetch burns the whole cycle budget."""
+
+    def __init__(self):
+        self.calls = []
+
+    def historical_prices(self, symbol, timeout=60, **_):
+        self.calls.append((symbol, timeout))
+        time.sleep(0.3)
+        return None
+
+    def pnl(self):
+        return {"net": 100000.0}
+
+
+def test_run_cycle_drops_symbols_after_budget_exhausted():
+    from src.bot import scheduler
+
+    scheduler._last_signal_bar.clear()
+    broker = SlowBroker()
+    settings = {
+        "symbols": ["SPY", "QQQ"],
+        "schedule": {"cycle_budget_seconds": 0.2, "signal_on_bar_close": False},
+        "historical": {"timeout": 90},
+        "monitoring": {"alerts_enabled": False},
+    }
+    scheduler.run_cycle(broker, settings)
+    # First fetch got a clamped timeout; QQQ was skipped once the budget ran out
+    assert [c[0] for c in broker.calls] == ["SPY"]
+    assert broker.calls[0][1] <= 0.2
+    scheduler._timeout_tracker.clear()
+
+
+def test_option_pickers_propagate_deadline_exceeded():
+    from src.bot.data.options import find_strategic_option, pick_weekly_option
+
+    class OutOfTimeBroker:
+        def __init__(self, fail_chain):
+            self.fail_chain = fail_chain
+
+        def option_chain(self, symbol, expiry_hint="weekly"):
+            if self.fail_chain:
+                raise DeadlineExceeded("chain", 20.0, 20.5)
+            expiry = (datetime.now() + timedelta(days=40)).strftime("%Y%m%d")
+            return [
+                SimpleNamespace(symbol=symbol, right="C", strike=105.0, expiry=expiry)
+            ]
+
+        def market_data(self, contract):
+            raise DeadlineExceeded("quotes", 10.0, 10.5)
+
+    for fail_chain in (True, False):
+        with pytest.raises(DeadlineExceeded):
+            pick_weekly_option(OutOfTimeBroker(fail_chain), "SPY", "C", 100.0)
+        with pytest.raises(DeadlineExceeded):
+            find_strategic_option(OutOfTimeBroker(fail_chain), "SPY", "C", 100.0)
+
+
+def test_trend_exit_fetch_runs_under_the_bars_deadline(tmp_path):
+    from src.bot import scheduler
+
+    class HeldBroker(SlowBroker):
+        def positions(self):
+            held = SimpleNamespace(symbol="SPY", secType="OPT", right="C")
+            return [{"contract": held, "position": 1}]
+
+    scheduler._last_signal_bar.clear()
+    broker = HeldBroker()
+    settings = {
+        "symbols": ["SPY", "QQQ"],
+        "schedule": {"cycle_budget_seconds": 0.2},
+        "historical": {"timeout": 90},
+        "risk": {"daily_state_path": str(tmp_path / "daily_state.json")},
+        "monitoring": {"alerts_enabled": False},
+    }
+    scheduler.run_cycle(broker, settings)
+    # The hourly fetch got a clamped timeout; QQQ was dropped, not run past the budget
+    assert [c[0] for c in broker.calls] == ["SPY"]
+    assert broker.calls[0][1] <= 0.2
+    scheduler._timeout_tracker.clear()
+    scheduler._last_signal_bar.clear()
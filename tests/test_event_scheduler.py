@@ -0,0 +1,155 @@
+"""Unit tests for event_scheduler.py - priority-queue jobs and event triggers."""
+
+import threading
+
+from src.bot import metrics
+from src.bot.event_scheduler import EventScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_jobs_run_in_due_order():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    ran = []
+    sched.add_job("late", lambda: ran.append("late"), first_due=1005.0)
+    sched.add_job("early", lambda: ran.append("early"), first_due=1001.0)
+
+    assert sched.run_pending() == 0
+    clock.now = 1010.0
+    assert sched.run_pending() == 2
+    assert ran == ["early", "late"]
+
+
+def test_repeating_job_records_lateness_and_skips_missed_slots():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    ran = []
+    sched.every("exits", lambda: ran.append(clock.now), 10.0, start=1000.0)
+
+    clock.now = 1002.5
+    sched.run_pending()
+    stats = sched.lateness["exits"]
+    assert stats.runs == 1
+    assert stats.last_lateness == 2.5
+
+    # Fall 35s behind: one catch-up run, then realigned to the next future slot
+    clock.now = 1037.0
+    sched.run_pending()
+    assert len(ran) == 2
+    assert sched.next_due() == 1040.0
+
+
+def test_lateness_is_exported_per_job():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    before = metrics.JOB_LATENESS.labels(job="lateness-probe").snapshot()
+    sched.add_job("lateness-probe", lambda: None, first_due=1000.0)
+
+    clock.now = 1000.3
+    sched.run_pending()
+    _, total, n = metrics.JOB_LATENESS.labels(job="lateness-probe").snapshot()
+    assert n == before[2] + 1
+    assert abs(total - before[1] - 0.3) < 1e-9
+    assert (
+        'bot_job_lateness_seconds_count{job="lateness-probe"}'
+        in metrics.REGISTRY.render()
+    )
+
+
+def test_trigger_runs_subscribed_job_immediately_once():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    ran = []
+    sched.every(
+        "exits", lambda: ran.append("exits"), 60.0, start=2000.0, events=("fill",)
+    )
+
+    sched.trigger("fill")
+    sched.trigger("fill")
+    assert sched.run_pending() == 1  # coalesced
+    assert ran == ["exits"]
+    assert sched.next_due() == 2000.0  # timed slot unaffected
+
+
+def test_cancelled_job_does_not_run():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    ran = []
+    job = sched.add_job("x", lambda: ran.append(1), first_due=999.0, events=("fill",))
+    sched.cancel(job)
+    sched.trigger("fill")
+    assert sched.run_pending() == 0
+    assert ran == []
+
+
+def test_failing_job_does_not_stop_loop():
+    clock = FakeClock()
+    sched = EventScheduler(clock=clock)
+    ran = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    sched.add_job("boom", boom, first_due=999.0)
+    sched.add_job("ok", lambda: ran.append(1), first_due=999.5)
+    assert sched.run_pending() == 2
+    assert ran == [1]
+
+
+def test_run_exits_on_stop_event():
+    sched = EventScheduler()
+    stop = threading.Event()
+    sched.add_job("stopper", stop.set, events=("disconnect",))
+    sched.trigger("disconnect")
+    t = threading.Thread(target=sched.run, args=(stop,))
+    t.start()
+    t.join(timeout=5)
+    assert not t.is_alive()
+
+
+def test_fill_during_idle_wait_triggers_exits_job():
+    class PumpedBroker:
+        """Callbacks only fire while the event loop is pumped, as with ib_insync."""
+
+        def __init__(self):
+            self.listeners = {}
+            self.queued = []
+            self.pumped = 0
+
+        def add_listener(self, event, cb):
+            self.listeners.setdefault(event, []).append(cb)
+
+        def wait_on_update(self, timeout):
+            self.pumped += 1
+            while self.queued:
+                event, info = self.queued.pop(0)
+                for cb in self.listeners.get(event, []):
+                    cb(**info)
+            return False
+
+    broker = PumpedBroker()
+    sched = EventScheduler(wait_fn=broker.wait_on_update)
+    stop = threading.Event()
+    ran = []
+
+    def exits():
+        ran.append("exits")
+        stop.set()
+
+    # Next timed slot is far away: only the fill can run the job
+    sched.every("exits", exits, 3600.0, start=sched._clock() + 3600.0, events=("fill",))
+    broker.add_listener("fill", lambda **info: sched.trigger("fill", **info))
+    broker.queued.append(("fill", {"symbol": "SPY", "qty": 1}))
+
+    t = threading.Thread(target=sched.run, args=(stop,))
+    t.start()
+    t.join(timeout=5)
+    assert not t.is_alive()
+    assert ran == ["exits"] and broker.pumped >= 1
@@ -6,7 +6,14 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 
 from src.bot.broker.base import OptionContract, OrderTicket, Quote
-from src.bot.execution import build_bracket, emulate_oco, is_liquid
+from src.bot.execution import (
+    build_bracket,
+    chase_limit,
+    chase_prices,
+    emulate_oco,
+    is_liquid,
+)
+from src.bot.orders import OrderManager
 
 
 class TestBuildBracket:
@@ -146,7 +153,7 @@ class TestEmulateOCO:
         """Emulation triggers take-profit order when price hits TP level."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         # Simulate price rising to TP level
         quotes = [
             Mock(last=2.45),  # Below TP
@@ -156,7 +163,7 @@ class TestEmulateOCO:
         broker.market_data = Mock(side_effect=quotes)
         broker.place_order = Mock(return_value="CLOSE_ORDER_123")
 
-        with patch('src.bot.execution.logger') as mock_logger:
+        with patch("src.bot.execution.logger") as mock_logger:
             emulate_oco(
                 broker,
                 contract,
@@ -179,7 +186,7 @@ class TestEmulateOCO:
         """Emulation triggers stop-loss order when price hits SL level."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         # Simulate price falling to SL level
         quotes = [
             Mock(last=1.95),  # Above SL
@@ -188,7 +195,7 @@ class TestEmulateOCO:
         broker.market_data = Mock(side_effect=quotes)
         broker.place_order = Mock(return_value="CLOSE_ORDER_456")
 
-        with patch('src.bot.execution.logger'):
+        with patch("src.bot.execution.logger"):
             emulate_oco(
                 broker,
                 contract,
@@ -210,7 +217,7 @@ class TestEmulateOCO:
         """Emulation continues polling if neither TP nor SL are hit."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         # Price stays between TP and SL
         quotes = [
             Mock(last=2.48),
@@ -218,7 +225,7 @@ class TestEmulateOCO:
         ]
         broker.market_data = Mock(side_effect=quotes)
 
-        with patch('src.bot.execution.logger'):
+        with patch("src.bot.execution.logger"):
             # This will exhaust the quotes and eventually stop
             with pytest.raises(StopIteration):
                 emulate_oco(
@@ -236,13 +243,13 @@ class TestEmulateOCO:
         """Emulation handles KeyboardInterrupt gracefully."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         def raise_interrupt(*args, **kwargs):
             raise KeyboardInterrupt("User interrupted")
-        
+
         broker.market_data = Mock(side_effect=raise_interrupt)
 
-        with patch('src.bot.execution.logger') as mock_logger:
+        with patch("src.bot.execution.logger") as mock_logger:
             emulate_oco(
                 broker,
                 contract,
@@ -261,12 +268,12 @@ class TestEmulateOCO:
         """Emulation reverses action for SELL side (closing action becomes BUY)."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         quotes = [Mock(last=2.50), Mock(last=3.00)]  # Hits TP
         broker.market_data = Mock(side_effect=quotes)
         broker.place_order = Mock(return_value="BUY_CLOSE_123")
 
-        with patch('src.bot.execution.logger'):
+        with patch("src.bot.execution.logger"):
             emulate_oco(
                 broker,
                 contract,
@@ -287,13 +294,15 @@ class TestEmulateOCO:
         """Emulation exits when max_duration_seconds is exceeded."""
         broker = Mock()
         contract = Mock(symbol="SPY")
-        
+
         # Price never hits TP or SL
         broker.market_data = Mock(return_value=Mock(last=2.50))
 
         # Mock time progression to avoid timing flakiness
-        with patch('src.bot.execution.time') as mock_time_module, \
-             patch('src.bot.execution.logger') as mock_logger:
+        with (
+            patch("src.bot.execution.time") as mock_time_module,
+            patch("src.bot.execution.logger") as mock_logger,
+        ):
             mock_time_module.sleep = Mock()
             # Simulate time advancing past max_duration on 4th call
             mock_time_module.time = Mock(side_effect=[0, 1, 2, 1000])
@@ -311,4 +320,177 @@ class TestEmulateOCO:
             )
 
         # Verify warning was logged about max duration
-        assert any("max duration" in str(call).lower() for call in mock_logger.warning.call_args_list)
+        assert any(
+            "max duration" in str(call).lower()
+            for call in mock_logger.warning.call_args_list
+        )
+
+
+class ChaseBroker:
+    """Fake broker whose limit orders fill once the price reaches fill_at."""
+
+    def __init__(self, fill_at=None, market_fill=None):
+        self.orders = OrderManager()
+        self.fill_at = fill_at
+        self.market_fill = market_fill
+        self.placed = []
+        self.modified = []
+        self.cancelled = []
+        self._prices = {}
+
+    def _maybe_fill(self, oid, price):
+        if self.fill_at is not None and price >= self.fill_at:
+            rec = self.orders.get(oid)
+            self.orders.on_execution(oid, f"x{oid}", rec.quantity, price)
+
+    def place_order(self, ticket):
+        oid = str(len(self.placed) + 1)
+        self.placed.append(ticket)
+        self.orders.track(oid, "SPY", ticket.action, ticket.quantity)
+        self.orders.on_status(oid, "Submitted")
+        if ticket.order_type == "MKT" and self.market_fill is not None:
+            self.orders.on_execution(oid, f"m{oid}", ticket.quantity, self.market_fill)
+        elif ticket.order_type == "LMT":
+            self._maybe_fill(oid, ticket.limit_price)
+        return oid
+
+    def modify_order(self, oid, price):
+        if self.orders.get(oid).is_done:
+            return False
+        self.modified.append(price)
+        self._maybe_fill(oid, price)
+        return True
+
+    def cancel_order(self, oid):
+        self.cancelled.append(oid)
+        self.orders.on_status(oid, "Cancelled")
+
+
+class TestChaseLimit:
+    """Test the marketable-limit chase algorithm."""
+
+    def _ticket(self, qty=2):
+        return OrderTicket(
+            OptionContract("SPY", "C", 450.0, "20240119", 100), "BUY", qty, "MKT"
+        )
+
+    def test_chase_prices_walks_from_mid_to_touch(self):
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        assert chase_prices(q, "BUY", 0.01, 1, 10) == [1.02, 1.03, 1.04, 1.05]
+        assert chase_prices(q, "SELL", 0.01, 1, 2) == [1.03, 1.02, 1.01]
+        assert chase_prices(Quote("SPY", 0, 0, 1.0, 0, 0.0), "BUY", 0.01, 1, 10) == []
+
+    def test_fills_mid_way_and_records_slippage(self):
+        broker = ChaseBroker(fill_at=1.04)
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        res = chase_limit(
+            broker, self._ticket(), q, step_interval_seconds=0.5, sleep=lambda s: None
+        )
+        assert broker.modified == [1.03, 1.04]
+        assert res.filled == 2 and res.avg_fill_price == pytest.approx(1.04)
+        assert res.slippage == pytest.approx(0.015)
+        assert not res.fell_back_to_market and broker.cancelled == []
+
+    def test_exhausted_chase_cancels_and_falls_back_to_market(self):
+        broker = ChaseBroker(fill_at=None, market_fill=1.05)
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        res = chase_limit(
+            broker,
+            self._ticket(),
+            q,
+            max_chase_ticks=1,
+            step_interval_seconds=0.5,
+            sleep=lambda s: None,
+        )
+        assert broker.modified == [1.03]
+        assert broker.cancelled == ["1"]
+        assert res.fell_back_to_market and broker.placed[-1].order_type == "MKT"
+        assert res.avg_fill_price == pytest.approx(1.05)
+
+    def test_no_fallback_leaves_remainder_unfilled(self):
+        broker = ChaseBroker(fill_at=None)
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        res = chase_limit(
+            broker,
+            self._ticket(),
+            q,
+            max_chase_ticks=0,
+            fallback_to_market=False,
+            step_interval_seconds=0.5,
+            sleep=lambda s: None,
+        )
+        assert len(broker.placed) == 1 and res.filled == 0 and res.slippage is None
+
+    def test_broker_without_modify_sends_market(self):
+        broker = Mock(spec=["place_order"])
+        broker.place_order.return_value = "9"
+        res = chase_limit(broker, self._ticket(), Quote("SPY", 1.0, 1.0, 1.1, 1, 0.0))
+        assert res.order_id == "9" and res.fell_back_to_market
+        assert broker.place_order.call_args[0][0].order_type == "MKT"
+
+    def test_broker_requests_go_through_call_one_at_a_time(self):
+        broker = ChaseBroker(fill_at=None, market_fill=1.05)
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        calls = []
+
+        def call(fn, *args):
+            calls.append(getattr(fn, "__name__", "wait"))
+            return fn(*args)
+
+        chase_limit(
+            broker,
+            self._ticket(),
+            q,
+            max_chase_ticks=1,
+            step_interval_seconds=0.5,
+            sleep=lambda s: None,
+            call=call,
+        )
+        # Every request (and each wait slice) is its own call: a caller's lock is
+        # released between them instead of being held for the whole chase
+        assert (
+            calls[0] == "place_order"
+            and "modify_order" in calls
+            and "cancel_order" in calls
+        )
+        assert calls.count("<lambda>") >= 4
+
+    def test_partial_fill_of_bracketed_limit_cancels_children_and_reports_unprotected(
+        self,
+    ):
+        class BracketChaseBroker(ChaseBroker):
+            def place_order(self, ticket):
+                oid = super().place_order(ticket)
+                if ticket.take_profit_price:
+                    for i in (1, 2):
+                        self.orders.track(
+                            f"{oid}.{i}", "SPY", "SELL", ticket.quantity, oid
+                        )
+                return oid
+
+        broker = BracketChaseBroker(fill_at=None, market_fill=1.05)
+        ticket = self._ticket(qty=3)
+        ticket.take_profit_price, ticket.stop_loss_price = 1.5, 0.8
+        q = Quote("SPY", 1.02, 1.00, 1.05, 100, 0.0)
+        orig_modify = broker.modify_order
+
+        def modify_with_partial_fill(oid, price):
+            broker.orders.on_execution(
+                oid, "p1", 1, price
+            )  # one of three fills, then no more
+            return orig_modify(oid, price)
+
+        broker.modify_order = modify_with_partial_fill
+        res = chase_limit(
+            broker,
+            ticket,
+            q,
+            max_chase_ticks=1,
+            step_interval_seconds=0.5,
+            sleep=lambda s: None,
+        )
+        assert broker.cancelled == ["1", "1.1", "1.2"]  # parent, then its children
+        assert res.unprotected_filled == 1
+        mkt = broker.placed[-1]
+        assert (mkt.order_type, mkt.quantity, mkt.take_profit_price) == ("MKT", 2, 1.5)
+        assert res.filled == 3
@@ -0,0 +1,174 @@
+"""Unit tests for exit_monitor.py and throttle.py - shared exit table and order rate limit."""
+
+from src.bot.broker.base import OptionContract, Quote, contract_key
+from src.bot.exit_monitor import ExitMonitor
+from src.bot.orders import OrderManager
+from src.bot.throttle import TokenBucket
+
+
+class StreamBroker:
+    """Fake broker exposing the batched stream_quotes path."""
+
+    def __init__(self):
+        self.prices = {}
+        self.stream_calls = 0
+        self.orders = []
+        self.cancelled = []
+
+    def stream_quotes(self, contracts):
+        self.stream_calls += 1
+        out = {}
+        for c in contracts:
+            key = contract_key(c)
+            if key in self.prices:
+                out[key] = Quote(key, self.prices[key], 0.0, 0.0, 0, 0.0)
+        return out
+
+    def cancel_stream(self, contract):
+        self.cancelled.append(contract_key(contract))
+
+    def place_order(self, ticket):
+        self.orders.append(ticket)
+        return f"ID{len(self.orders)}"
+
+
+def _opt(strike: float) -> OptionContract:
+    return OptionContract("SPY", "C", strike, "20240119", 100)
+
+
+def test_one_quote_batch_for_all_positions():
+    broker = StreamBroker()
+    mon = ExitMonitor(broker)
+    for strike in (400.0, 401.0, 402.0):
+        key = mon.add(_opt(strike), "BUY", 1, take_profit=3.0, stop_loss=1.0)
+        broker.prices[key] = 2.0
+
+    assert mon.check() == []
+    assert broker.stream_calls == 1
+    assert broker.orders == []
+
+
+def test_take_profit_and_stop_loss_submit_closes():
+    broker = StreamBroker()
+    mon = ExitMonitor(broker)
+    tp_key = mon.add(_opt(400.0), "BUY", 2, take_profit=3.0, stop_loss=1.0)
+    sl_key = mon.add(_opt(401.0), "BUY", 1, take_profit=3.0, stop_loss=1.0)
+    broker.prices[tp_key] = 3.1
+    broker.prices[sl_key] = 0.9
+
+    closed = mon.check()
+    assert set(closed) == {tp_key, sl_key}
+    tp, sl = broker.orders
+    # Both leave at market: the rule is gone once the close is sent
+    assert (tp.action, tp.order_type, tp.limit_price, tp.quantity) == (
+        "SELL",
+        "MKT",
+        None,
+        2,
+    )
+    assert (sl.action, sl.order_type) == ("SELL", "MKT")
+    assert len(mon) == 0
+    assert set(broker.cancelled) == {tp_key, sl_key}
+
+
+def test_trailing_stop_follows_high_water():
+    broker = StreamBroker()
+    mon = ExitMonitor(broker)
+    key = mon.add(_opt(400.0), "BUY", 1, stop_loss=1.0, trailing_pct=0.10)
+
+    for price in (2.0, 2.5, 3.0, 2.8):
+        broker.prices[key] = price
+        assert mon.check() == []
+    broker.prices[key] = 2.69  # below 3.0 * 0.9
+    assert mon.check() == [key]
+    assert broker.orders[0].order_type == "MKT"
+
+
+def test_throttled_exit_is_retried_next_check():
+    broker = StreamBroker()
+    clock = [0.0]
+    bucket = TokenBucket(1.0, burst=1, clock=lambda: clock[0])
+    mon = ExitMonitor(broker, order_throttle=bucket)
+    a = mon.add(_opt(400.0), "BUY", 1, stop_loss=1.0)
+    b = mon.add(_opt(401.0), "BUY", 1, stop_loss=1.0)
+    broker.prices[a] = broker.prices[b] = 0.5
+
+    assert len(mon.check()) == 1
+    assert len(mon) == 1  # second exit deferred, rule kept
+    clock[0] = 1.0
+    assert len(mon.check()) == 1
+    assert len(broker.orders) == 2
+
+
+def test_rule_tracks_confirmed_fills_only():
+    broker = StreamBroker()
+    mon = ExitMonitor(broker)
+    orders = OrderManager(clock=lambda: 0.0)
+    rec = orders.track("7", "SPY", "BUY", 3)
+
+    assert mon.add_filled(_opt(400.0), "BUY", rec, stop_loss=1.0) is None
+    assert len(mon) == 0  # nothing filled, nothing to close
+    orders.on_execution("7", "e1", 1, 2.0)
+    orders.on_status("7", "Cancelled")  # remainder cancelled after a partial fill
+    (rule,) = mon.rules()
+    assert (rule.quantity, rule.parent_order_id, rule.stop_loss) == (1, "7", 1.0)
+
+    # A later fill only adds what is new, even after the first rule was closed
+    mkt = orders.track("8", "SPY", "BUY", 2)
+    orders.on_execution("8", "e2", 1, 2.1)
+    key = mon.add_filled(_opt(401.0), "BUY", mkt, base_filled=1.0, stop_loss=1.0)
+    assert mon.remove(key).quantity == 2
+    orders.on_execution("8", "e3", 1, 2.1)
+    assert [r.quantity for r in mon.rules() if r.key == key] == [1]
+
+
+def test_rule_from_status_first_partial_fill_matches_contracts_held():
+    broker = StreamBroker()
+    mon = ExitMonitor(broker)
+    orders = OrderManager(clock=lambda: 0.0)
+    rec = orders.track("9", "SPY", "BUY", 5)
+    # IB often sends orderStatus with the cumulative count before execDetails
+    orders.on_status("9", "Submitted", filled=2, avg_fill_price=2.0)
+    key = mon.add_filled(_opt(400.0), "BUY", rec, stop_loss=1.0)
+    orders.on_execution("9", "e1", 2, 2.0)
+    orders.on_status("9", "Cancelled", filled=2, avg_fill_price=2.0)
+
+    (rule,) = mon.rules()
+    assert rule.quantity == 2
+    broker.prices[key] = 0.9
+    assert mon.check() == [key]
+    assert broker.orders[0].quantity == 2  # closes only what was bought
+
+
+def test_snapshot_fallback_without_stream_quotes():
+    class SnapshotBroker:
+        def __init__(self):
+            self.calls = 0
+            self.orders = []
+
+        def market_data(self, contract):
+            self.calls += 1
+            return Quote("SPY", 5.0, 0.0, 0.0, 0, 0.0)
+
+        def place_order(self, ticket):
+            self.orders.append(ticket)
+            return "1"
+
+    broker = SnapshotBroker()
+    mon = ExitMonitor(broker, dry_run=True)
+    mon.add(_opt(400.0), "BUY", 1, take_profit=4.0)
+    assert len(mon.check()) == 1
+    assert broker.calls == 1
+    assert broker.orders == []  # dry run only logs
+
+
+def test_token_bucket_refills_at_rate():
+    clock = [0.0]
+    bucket = TokenBucket.per_minute(60, burst=2)
+    bucket._clock = lambda: clock[0]
+    bucket._updated = 0.0
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock[0] = 1.0
+    assert bucket.try_acquire()
+    assert not bucket.acquire(timeout=0.0)
@@ -0,0 +1,157 @@
+"""Tests for backtest.gateway - the unmodified IBKRBroker against a local fake IB Gateway."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("ib_insync")
+
+from src.bot.backtest import FakeGateway, GatewayScript
+from src.bot.broker.base import OptionContract, OrderTicket
+from src.bot.broker.ibkr import IBKRBroker
+from src.bot.orders import CANCELLED, FILLED
+
+
+@pytest.fixture
+def gateway_factory():
+    started = []
+
+    def make(script=None, **kw):
+        gw = FakeGateway(script=script, **kw)
+        gw.start()
+        started.append(gw)
+        return gw
+
+    yield make
+    for gw in started:
+        gw.stop()
+
+
+def _broker(gw, client_id=1):
+    broker = IBKRBroker(port=gw.port, client_id=client_id)
+    broker.connect(timeout=2)
+    return broker
+
+
+def test_data_requests_round_trip(gateway_factory):
+    idx = pd.date_range("2024-01-02 14:30", periods=30, freq="5min", tz="UTC")
+    closes = np.linspace(400.0, 402.9, 30)
+    stored = pd.DataFrame(
+        {
+            "open": closes,
+            "high": closes + 0.1,
+            "low": closes - 0.1,
+            "close": closes,
+            "volume": 500.0,
+        },
+        index=idx,
+    )
+    gw = gateway_factory(bars={"SPY": stored})
+    broker = _broker(gw)
+    try:
+        quote = broker.market_data("SPY")
+        assert (quote.bid, quote.last, quote.ask) == (
+            pytest.approx(402.89),
+            402.9,
+            pytest.approx(402.91),
+        )
+
+        df = broker.historical_prices("SPY", duration="3600 S", bar_size="5 mins")
+        assert len(df) == 12
+        assert np.allclose(df["close"], closes[-12:])
+        assert df.index[-1] == idx[-1]
+
+        chain = broker.option_chain("SPY")
+        assert {c.right for c in chain} == {"C", "P"}
+        strikes = sorted({c.strike for c in chain})
+        assert len(strikes) == 21 and strikes[10] == 403.0
+        opt = broker.market_data(chain[0])
+        assert 0 < opt.bid < opt.ask
+        assert broker.account()["NetLiquidation"] == "100000.00"
+    finally:
+        broker.disconnect()
+    assert gw.stats["connections"] == 1 and gw.stats["requests_historical"] == 1
+
+
+def test_orders_fill_rest_cancel_and_brackets(gateway_factory):
+    gw = gateway_factory()
+    broker = _broker(gw)
+    fills = []
+    broker.add_listener("fill", lambda **kw: fills.append(kw))
+    try:
+        call = OptionContract("SPY", "C", 100.0, gw.expirations()[0], 100)
+        ask = broker.market_data(call).ask
+        filled = broker.place_order(OrderTicket(call, "BUY", 2, "LMT", limit_price=ask))
+        resting = broker.place_order(
+            OrderTicket(call, "BUY", 1, "LMT", limit_price=0.01)
+        )
+        broker.sleep(0.2)
+        assert broker.orders.get(filled).state == FILLED
+        assert fills == [{"symbol": "SPY", "side": "BOT", "qty": 2.0, "price": ask}]
+        assert broker.positions()[0]["position"] == 2.0
+
+        broker.cancel_order(resting)
+        broker.sleep(0.2)
+        assert broker.orders.get(resting).state == CANCELLED
+
+        parent = broker.place_order(
+            OrderTicket(
+                call,
+                "BUY",
+                1,
+                "LMT",
+                limit_price=ask,
+                take_profit_price=ask * 2,
+                stop_loss_price=ask / 2,
+            )
+        )
+        broker.sleep(0.2)
+        statuses = {
+            t.order.orderId: (t.order.parentId, t.orderStatus.status)
+            for t in broker.ib.trades()
+        }
+        assert statuses[int(parent)] == (0, "Filled")
+        children = [s for p, s in statuses.values() if p == int(parent)]
+        assert children == ["Submitted", "Submitted"]
+    finally:
+        broker.disconnect()
+    assert gw.stats["fills"] == 2
+
+
+def test_pacing_violation_is_retried(gateway_factory):
+    gw = gateway_factory(GatewayScript(pacing_limit=1, pacing_window_seconds=60))
+    broker = _broker(gw)
+    try:
+        assert (
+            len(broker.historical_prices("SPY", duration="1800 S", bar_size="1 min"))
+            == 30
+        )
+        # Second request inside the window breaks pacing; the broker's own retry also does
+        assert broker.historical_prices(
+            "SPY", duration="1800 S", bar_size="1 min"
+        ).empty
+    finally:
+        broker.disconnect()
+    assert gw.stats["pacing_violations"] == 2
+
+
+def test_disconnects_large_payloads_and_client_id_collisions(gateway_factory):
+    gw = gateway_factory(
+        GatewayScript(disconnect_after=12, history_bars=50_000, client_ids_in_use=[5])
+    )
+    broker = _broker(gw, client_id=5)
+    assert broker.client_id == 6 and gw.stats["refused"] == 1
+    try:
+        df = broker.historical_prices("SPY", duration="1 D", bar_size="1 min")
+        assert len(df) == 50_000 and df.index.is_monotonic_increasing
+        assert gw.stats["bytes_sent"] > 50_000 * 40
+
+        for _ in range(6):
+            broker.market_data("SPY", timeout=1)
+        assert gw.stats["dropped"] >= 1
+        # Every call reconnects on demand after a drop
+        assert broker.market_data("SPY").last > 0
+        assert broker.is_connected()
+    finally:
+        broker.disconnect()
+    assert gw.stats["connections"] >= 2
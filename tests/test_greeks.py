@@ -0,0 +1,167 @@
+"""Unit tests for data/greeks.py - vectorized pricing, Greeks, IV and delta-filtered selection."""
+
+import math
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.bot.broker.base import OptionContract, Quote
+from src.bot.data.greeks import (
+    black76_price,
+    bs_greeks,
+    bs_price,
+    implied_vol,
+    norm_cdf,
+    price_chain,
+    year_fraction,
+)
+from src.bot.data.options import pick_weekly_option
+from src.bot.trading_calendar import NY_TZ
+
+
+def test_norm_cdf_matches_erfc():
+    x = np.linspace(-38, 38, 20001)
+    ref = np.array([0.5 * math.erfc(-v / math.sqrt(2)) for v in x])
+    assert np.max(np.abs(norm_cdf(x) - ref)) < 1e-14
+
+
+def test_prices_and_parity():
+    assert float(bs_price(100, 100, 1.0, 0.2, "C", rate=0.05)) == pytest.approx(
+        10.450584, abs=1e-6
+    )
+    strikes = np.linspace(50, 150, 101)
+    c = bs_price(100.0, strikes, 0.25, 0.3, "C", 0.05, 0.01)
+    p = bs_price(100.0, strikes, 0.25, 0.3, "P", 0.05, 0.01)
+    parity = 100 * np.exp(-0.01 * 0.25) - strikes * np.exp(-0.05 * 0.25)
+    assert np.allclose(c - p, parity, atol=1e-12)
+    # Black-76 on the forward equals BSM on the spot
+    fwd = 100 * np.exp(0.04 * 0.25)
+    assert np.allclose(black76_price(fwd, strikes, 0.25, 0.3, "c", 0.05), c)
+    # Expired options are worth intrinsic
+    assert bs_price([105.0, 95.0], 100, 0.0, 0.3, ["C", "P"]).tolist() == [5.0, 5.0]
+
+
+@pytest.mark.parametrize("right", ["C", "P"])
+def test_greeks_match_finite_differences(right):
+    S, K, T, v, r, q, h = 100.0, np.linspace(70, 130, 13), 0.3, 0.25, 0.04, 0.01, 1e-3
+    g = bs_greeks(S, K, T, v, right, r, q)
+
+    def px(**kw):
+        args = dict(spot=S, strike=K, years=T, vol=v, right=right, rate=r, dividend=q)
+        args.update(kw)
+        return bs_price(**args)
+
+    assert np.allclose(
+        g["delta"], (px(spot=S + h) - px(spot=S - h)) / (2 * h), atol=1e-8
+    )
+    assert np.allclose(
+        g["gamma"], (px(spot=S + h) - 2 * px() + px(spot=S - h)) / h**2, atol=1e-5
+    )
+    assert np.allclose(
+        g["vega"], (px(vol=v + h) - px(vol=v - h)) / (2 * h) / 100, atol=1e-6
+    )
+    assert np.allclose(
+        g["theta"], -(px(years=T + h) - px(years=T - h)) / (2 * h) / 365, atol=1e-6
+    )
+
+
+def test_implied_vol_roundtrips_a_grid():
+    rng = np.random.default_rng(0)
+    strikes = np.repeat(np.linspace(60, 140, 41), 10)
+    years = np.tile(np.linspace(2 / 365, 1.5, 10), 41)
+    vols = rng.uniform(0.05, 1.5, strikes.size)
+    rights = np.where(np.arange(strikes.size) % 2, "C", "P")
+    prices = bs_price(100.0, strikes, years, vols, rights, 0.05, 0.01)
+
+    iv = implied_vol(prices, 100.0, strikes, years, rights, 0.05, 0.01)
+    # Only strikes carrying measurable time value pin down a vol
+    fwd = 100 * np.exp(0.04 * years)
+    intrinsic = np.where(
+        rights == "C", np.maximum(fwd - strikes, 0), np.maximum(strikes - fwd, 0)
+    )
+    measurable = prices - intrinsic * np.exp(-0.05 * years) > 1e-3
+    assert measurable.sum() > 300
+    assert np.max(np.abs(iv - vols)[measurable]) < 1e-5
+
+    # Below intrinsic, above the forward, or already expired: no vol
+    assert np.isnan(
+        implied_vol([4.0, 120.0, 5.0], 105.0, 100.0, [0.1, 0.1, 0.0], "C")
+    ).all()
+
+
+def test_year_fraction_uses_close_on_expiry():
+    now = datetime(2024, 1, 2, 16, 0, tzinfo=NY_TZ).timestamp()
+    assert year_fraction("20240105", now) == pytest.approx(3 / 365)
+    assert year_fraction(date(2024, 1, 1), now) == 0.0
+
+
+def _weekly_broker(spot, vol, expiry, now=None):
+    years = year_fraction(expiry, now)
+
+    def quote(contract):
+        mid = float(bs_price(spot, contract.strike, years, vol, contract.right))
+        return Quote(
+            contract.symbol, mid, round(mid - 0.02, 2), round(mid + 0.02, 2), 5000, 0.0
+        )
+
+    chain = [
+        OptionContract(f"SPY{k}C", "C", float(k), expiry, 100)
+        for k in range(440, 471, 5)
+    ]
+    broker = Mock()
+    broker.option_chain = Mock(return_value=chain)
+    broker.market_data = Mock(side_effect=quote)
+    return broker
+
+
+def test_price_chain_recovers_iv_and_delta():
+    expiry = (date.today() + timedelta(days=10)).strftime("%Y%m%d")
+    broker = _weekly_broker(450.0, 0.25, expiry)
+    chain = broker.option_chain("SPY")
+    quotes = [broker.market_data(c) for c in chain]
+    frame = price_chain(450.0, chain, quotes)
+    assert list(frame.columns[-5:]) == ["iv", "delta", "gamma", "vega", "theta"]
+    near = frame[(frame["strike"] >= 445) & (frame["strike"] <= 455)]
+    assert near["iv"].to_numpy() == pytest.approx(0.25, abs=0.01)
+    assert frame["delta"].is_monotonic_decreasing
+
+
+def test_pick_weekly_option_filters_by_delta():
+    expiry = (date.today() + timedelta(days=10)).strftime("%Y%m%d")
+    broker = _weekly_broker(450.0, 0.25, expiry)
+    kwargs = dict(
+        underlying="SPY",
+        right="C",
+        last_price=450.0,
+        min_volume=10,
+        max_spread_pct=50.0,
+        strike_count=7,
+    )
+
+    # Flat $0.04 spreads: the deepest ITM strike has the lowest spread percent
+    assert pick_weekly_option(broker, **kwargs).strike == 440.0
+    # A 0.15-0.35 delta band leaves only OTM strikes
+    otm = pick_weekly_option(broker, delta_range=(0.15, 0.35), **kwargs)
+    assert otm.strike > 450.0
+    assert pick_weekly_option(broker, max_iv=0.10, **kwargs) is None
+
+
+def test_pick_weekly_option_values_greeks_at_the_given_time():
+    # A replayed (simulated) clock: the expiry is in the past by the wall clock
+    now = datetime(2024, 1, 2, 10, 0, tzinfo=NY_TZ).timestamp()
+    broker = _weekly_broker(450.0, 0.25, "20240112", now=now)
+    kwargs = dict(
+        underlying="SPY",
+        right="C",
+        last_price=450.0,
+        min_volume=10,
+        max_spread_pct=50.0,
+        strike_count=7,
+    )
+
+    otm = pick_weekly_option(broker, delta_range=(0.15, 0.35), now=now, **kwargs)
+    assert otm is not None and otm.strike > 450.0
+    # Valued at the wall clock the contract has expired: no IV, nothing selected
+    assert pick_weekly_option(broker, delta_range=(0.15, 0.35), **kwargs) is None
@@ -0,0 +1,115 @@
+"""Tests for lock_profiler - broker lock wait/hold statistics and top-N reports."""
+
+import threading
+import time
+
+import pytest
+
+from src.bot.lock_profiler import LockProfiler, call_site, method_name
+from src.bot.metrics import BROKER_LOCK_HOLD
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def records():
+    from loguru import logger
+
+    out = []
+    sink = logger.add(lambda msg: out.append(msg.record["extra"]), level="INFO")
+    yield out
+    logger.remove(sink)
+
+
+def test_report_ranks_holders_and_waiters_then_clears_window(records):
+    clock = FakeClock()
+    prof = LockProfiler("broker", clock=clock)
+    prof.record("process_symbol:10", "historical_prices", 0.001, 2.0)
+    prof.record("process_symbol:10", "historical_prices", 0.003, 1.0)
+    prof.record("run_cycle:5", "_get_vix", 0.5, 0.2)
+    prof.record("process_symbol:20", "positions", 0.0, 0.01)
+    clock.now = 10.0
+
+    summary = prof.report(top_n=2)
+    assert summary["calls"] == 4 and summary["window_seconds"] == 10.0
+    assert [(r["method"], r["hold_total_ms"]) for r in summary["top_hold"]] == [
+        ("historical_prices", 3000.0),
+        ("_get_vix", 200.0),
+    ]
+    hist = summary["top_hold"][0]
+    assert (
+        hist["count"] == 2
+        and hist["hold_max_ms"] == 2000.0
+        and hist["hold_share"] == 0.3
+    )
+    assert summary["top_wait"][0]["method"] == "_get_vix"
+    assert [r["event"] for r in records] == ["lock_report"]
+    assert prof.snapshot() == []
+    assert (
+        BROKER_LOCK_HOLD.labels(
+            site="process_symbol:10", method="historical_prices"
+        ).count
+        >= 2
+    )
+
+
+def test_maybe_report_waits_for_interval(records):
+    clock = FakeClock()
+    prof = LockProfiler(clock=clock)
+    prof.record("a:1", "m", 0.0, 0.1)
+    clock.now = 100.0
+    assert prof.maybe_report(300) is None
+    assert prof.maybe_report(0) is None
+    clock.now = 301.0
+    assert prof.maybe_report(300)["calls"] == 1
+    assert prof.maybe_report(300) is None
+
+
+def test_call_site_and_method_name():
+    def caller():
+        return call_site(depth=1)
+
+    assert caller().startswith("caller:")
+    assert method_name(time.sleep) == "sleep"
+    assert method_name(threading.Lock().acquire) == "acquire"
+
+
+def test_run_cycle_records_broker_calls_per_site():
+    from src.bot import scheduler
+
+    class Broker:
+        def pnl(self):
+            return {"net": 100000.0}
+
+        def positions(self):
+            time.sleep(0.01)
+            return []
+
+        def historical_prices(self, *_a, **_kw):
+            return None
+
+    prof = scheduler._broker_lock_profiler
+    prof.report()  # start from an empty window
+    settings = {
+        "symbols": ["SPY"],
+        "schedule": {"signal_on_bar_close": False},
+        "monitoring": {"alerts_enabled": False, "lock_report_interval_seconds": 0},
+    }
+    scheduler._last_signal_bar.clear()
+    scheduler.set_clock(sleep_fn=lambda _s: None)  # skip the historical retry back-off
+    try:
+        scheduler.run_cycle(Broker(), settings)
+    finally:
+        scheduler.set_clock()
+        scheduler._timeout_tracker.clear()
+        scheduler._LAST_REQUEST_TIME.clear()
+    rows = {r["method"]: r for r in prof.snapshot()}
+    assert rows["positions"]["site"].startswith("process_symbol:")
+    assert rows["positions"]["hold_total_ms"] >= 10.0
+    assert rows["historical_prices"]["count"] >= 1
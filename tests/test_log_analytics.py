@@ -0,0 +1,133 @@
+"""Tests for log_analytics - rotated/compressed JSONL aggregation and its cache."""
+
+import gzip
+import json
+
+from src.bot import log_analytics
+from src.bot.log_analytics import Sketch, analyze, summary
+
+
+def _record(event, ts, level="INFO", **extra):
+    """A loguru ``serialize=True`` line."""
+    return json.dumps(
+        {
+            "text": "x\n",
+            "record": {
+                "extra": {"event": event, **extra},
+                "level": {"name": level},
+                "message": event,
+                "time": {"repr": "", "timestamp": ts},
+            },
+        }
+    )
+
+
+def _session(start_ts, symbol="SPY"):
+    return [
+        _record(
+            "historical_completed",
+            start_ts,
+            symbol=symbol,
+            elapsed_seconds=0.2,
+            bars=100,
+            retry=False,
+        ),
+        _record("historical_success", start_ts + 1, symbol=symbol, attempt=1),
+        _record("signal", start_ts + 2, symbol=symbol, action="BUY_CALL"),
+        _record(
+            "span",
+            start_ts + 3,
+            level="DEBUG",
+            symbol=symbol,
+            stage="chain",
+            duration_ms=40.0,
+        ),
+        _record(
+            "skip", start_ts + 4, level="WARNING", symbol=symbol, reason="max_positions"
+        ),
+        _record("cycle_complete", start_ts + 5, symbols=1, duration_seconds=1.5),
+    ]
+
+
+def _write_archive(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "bot.2026-01-05_10-00-00_000000.jsonl").write_text(
+        "\n".join(_session(100.0)) + "\n"
+    )
+    with gzip.open(logs / "bot.2026-01-06_10-00-00_000000.jsonl.gz", "wt") as f:
+        f.write("\n".join(_session(200.0, "QQQ")) + "\n")
+    live = logs / "bot.jsonl"
+    live.write_text("\n".join(_session(300.0)) + "\nnot json\n")
+    (logs / "bot_20260107.log").write_text("text log, ignored\n")
+    return logs, live
+
+
+def test_aggregates_rotated_compressed_and_live_files(tmp_path):
+    logs, _ = _write_archive(tmp_path)
+    result = analyze([logs], workers=1, cache_dir=None)
+    doc = summary(result)
+
+    assert result.files == 3
+    assert doc["lines"] == 18 and doc["bad_lines"] == 1
+    assert doc["first_ts"] == 100.0 and doc["last_ts"] == 305.0
+    latency = {(r["symbol"], r["metric"]): r for r in doc["latency"]}
+    assert latency[("SPY", "historical")]["count"] == 2
+    assert latency[("QQQ", "stage:chain")]["max_ms"] == 40.0
+    assert latency[("*", "cycle")]["count"] == 3
+    outcomes = {r["symbol"]: r for r in doc["outcomes"]}
+    assert outcomes["SPY"]["historical_ok"] == 2
+    assert outcomes["SPY"]["signals"] == {"BUY_CALL": 2}
+    assert outcomes["QQQ"]["skips"] == {"max_positions": 1}
+
+
+def test_parallel_chunks_match_serial(tmp_path):
+    logs, _ = _write_archive(tmp_path)
+    serial = summary(analyze([logs], workers=1, cache_dir=None))
+    # Tiny chunks force many byte ranges that start mid-line
+    parallel = summary(analyze([logs], workers=2, chunk_bytes=97, cache_dir=None))
+    for key in ("lines", "bad_lines", "events", "latency", "outcomes"):
+        assert parallel[key] == serial[key]
+
+
+def test_cache_is_incremental_for_appended_live_file(tmp_path):
+    logs, live = _write_archive(tmp_path)
+    cache = tmp_path / "cache"
+    first = analyze([logs], workers=1, cache_dir=cache)
+    assert first.cached == 0
+
+    again = analyze([logs], workers=1, cache_dir=cache)
+    assert again.cached == 3 and again.bytes_parsed == 0
+    assert summary(again)["events"] == summary(first)["events"]
+
+    # Append one full line and a partial one still being written
+    with live.open("a") as f:
+        f.write(_record("fill", 400.0, symbol="SPY", qty=1) + "\n" + '{"partial": ')
+    grown = analyze([logs], workers=1, cache_dir=cache)
+    assert grown.cached == 2 and grown.resumed == 1
+    assert 0 < grown.bytes_parsed < 400
+    assert grown.aggregate.lines == first.aggregate.lines + 1
+    assert grown.aggregate.bad_lines == 1  # partial line is left for the next run
+
+    with live.open("a") as f:
+        f.write('"done"}\n')
+    finished = analyze([logs], workers=1, cache_dir=cache)
+    assert finished.aggregate.lines == first.aggregate.lines + 2
+    assert finished.aggregate.outcomes["SPY"]["fill"] == 1
+
+
+def test_sketch_quantiles_are_within_bucket_error():
+    sk = Sketch()
+    for i in range(1, 1001):
+        sk.add(i / 1000.0)
+    other = Sketch.from_dict(json.loads(json.dumps(sk.to_dict())))
+    sk.merge(other)
+    assert sk.count == 2000
+    assert abs(sk.quantile(0.5) - 0.5) / 0.5 < 0.06
+    assert abs(sk.quantile(0.95) - 0.95) / 0.95 < 0.06
+    assert sk.quantile(1.0) == 1.0
+
+
+def test_cli_reports_missing_logs(tmp_path, capsys):
+    assert log_analytics.main([str(tmp_path / "missing"), "--no-cache"]) == 1
+    assert "no JSONL logs" in capsys.readouterr().err
@@ -0,0 +1,85 @@
+"""Tests for log_policy - per-event sampling and warning de-duplication."""
+
+import pytest
+from loguru import logger
+
+from src.bot.log_policy import LogPolicy
+from src.bot.settings import LoggingSettings
+
+
+def _capture(policy, level="DEBUG"):
+    out = []
+    ids = [
+        # Two sinks share one policy, like bot.log and bot.jsonl
+        logger.add(
+            lambda msg: out.append(("a", msg.record["message"], msg.record["extra"])),
+            level=level,
+            filter=policy,
+        ),
+        logger.add(
+            lambda msg: out.append(("b", msg.record["message"], msg.record["extra"])),
+            level=level,
+            filter=policy,
+        ),
+    ]
+    return out, ids
+
+
+def test_events_are_sampled_at_an_even_stride_across_sinks():
+    policy = LogPolicy(sample_rates={"span": 0.25}, dedup_window_seconds=0)
+    out, ids = _capture(policy)
+    try:
+        for i in range(8):
+            logger.bind(event="span", i=i).debug("span {}", i)
+        logger.bind(event="cycle_complete").info("cycle")
+        logger.bind(event="span").warning("never sampled")
+    finally:
+        for h in ids:
+            logger.remove(h)
+
+    kept = [extra["i"] for sink, _, extra in out if sink == "a" and "i" in extra]
+    assert kept == [3, 7]
+    assert [m for s, m, _ in out if s == "b"] == [
+        "span 3",
+        "span 7",
+        "cycle",
+        "never sampled",
+    ]
+    assert policy.stats()["sampled_out"] == {"span": 6}
+
+
+def test_repeated_warnings_are_dropped_within_the_window():
+    now = [0.0]
+    policy = LogPolicy(dedup_window_seconds=60, clock=lambda: now[0])
+    out, ids = _capture(policy, level="WARNING")
+    try:
+        for t, symbol in (
+            (0.0, "SPY"),
+            (10.0, "SPY"),
+            (20.0, "QQQ"),
+            (30.0, "SPY"),
+            (61.0, "SPY"),
+        ):
+            now[0] = t
+            logger.warning("Gateway timeout for {}", symbol)
+    finally:
+        for h in ids:
+            logger.remove(h)
+
+    messages = [m for s, m, _ in out if s == "a"]
+    assert messages == [
+        "Gateway timeout for SPY",
+        "Gateway timeout for QQQ",
+        "Gateway timeout for SPY (repeated 2 times)",
+    ]
+    assert out[-1][2]["repeats_suppressed"] == 2
+    assert policy.stats()["deduplicated"] == 2
+
+
+def test_logging_settings_validate_levels_and_rates():
+    cfg = LoggingSettings(level="debug", sample_rates={"span": 0.1})
+    assert cfg.level == "DEBUG" and cfg.console_level is None
+    with pytest.raises(ValueError):
+        LoggingSettings(level="LOUD")
+    with pytest.raises(ValueError):
+        LoggingSettings(sample_rates={"span": 2.0})
@@ -0,0 +1,93 @@
+"""Tests for metrics - registry, Prometheus text format and the HTTP endpoint."""
+
+import math
+import urllib.request
+
+import pytest
+
+from src.bot import metrics
+from src.bot.metrics import Counter, Gauge, Histogram, Registry, SlidingWindowCounter
+
+
+def _registry():
+    reg = Registry()
+    c = reg.register(Counter("requests_total", "Requests", ["type"]))
+    g = reg.register(Gauge("temperature", "Temp"))
+    h = reg.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    return reg, c, g, h
+
+
+def test_render_counters_gauges_and_cumulative_buckets():
+    reg, c, g, h = _registry()
+    c.labels(type="historical").inc()
+    c.labels(type="historical").inc(2)
+    c.labels(type='quo"te').inc()
+    g.set(3.5)
+    g.dec()
+    for v in (0.05, 0.1, 0.5, 7.0):
+        h.observe(v)
+
+    text = reg.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{type="historical"} 3.0' in text
+    assert 'requests_total{type="quo\\"te"} 1.0' in text
+    assert "temperature 2.5" in text
+    # le is inclusive and buckets are cumulative
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert "latency_seconds_sum 7.65" in text
+
+
+def test_label_and_value_misuse_is_rejected():
+    _, c, g, _ = _registry()
+    with pytest.raises(ValueError):
+        c.inc()  # labelled metric needs .labels()
+    with pytest.raises(ValueError):
+        c.labels(type="x").inc(-1)
+    with pytest.raises(ValueError):
+        metrics.REGISTRY.register(Gauge("bot_cycles_total", "duplicate name"))
+
+
+def test_callback_gauges_are_read_at_scrape_time():
+    _, _, g, _ = _registry()
+    box = {"v": 1.0}
+    g.set_function(lambda: box["v"])
+    box["v"] = 4.0
+    assert g._only_child().value == 4.0
+    g.set_function(lambda: 1 / 0)
+    assert math.isnan(g._only_child().value)
+    assert metrics.process_rss_bytes() > 0
+
+
+def test_sliding_window_counts_trailing_events():
+    now = [0.0]
+    win = SlidingWindowCounter(600, clock=lambda: now[0])
+    for t in (0.0, 100.0, 599.0):
+        now[0] = t
+        win.add()
+    now[0] = 650.0
+    assert win.count() == 2
+
+
+def test_http_endpoint_serves_bot_metrics():
+    from src.bot import scheduler  # registers the circuit-breaker callback
+
+    server = metrics.start_http_server(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(
+            f"http://127.0.0.1:{port}/metrics", timeout=5
+        ) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = resp.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/nope", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "# TYPE bot_cycle_duration_seconds histogram" in body
+    assert 'bot_circuit_breaker_state{breaker="gateway"} ' in body
+    assert "process_resident_memory_bytes " in body
+    assert scheduler._gateway_circuit_breaker is not None
@@ -0,0 +1,214 @@
+"""Unit tests for orders.py - order state machine, fill futures and latency."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.bot.orders import (
+    CANCELLED,
+    FILLED,
+    INACTIVE,
+    PARTIALLY_FILLED,
+    SUBMITTED,
+    OrderFailed,
+    OrderManager,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lifecycle_with_partial_fills_and_latency():
+    clock = FakeClock()
+    mgr = OrderManager(clock=clock)
+    mgr.track(1, "SPY", "BUY", 3)
+
+    clock.now = 100.2
+    mgr.on_status(1, "PreSubmitted")
+    assert mgr.get(1).state == SUBMITTED
+
+    clock.now = 100.5
+    mgr.on_execution(1, "e1", 1, 2.00)
+    mgr.on_execution(1, "e1", 1, 2.00)  # duplicate report ignored
+    rec = mgr.get(1)
+    assert rec.state == PARTIALLY_FILLED and rec.filled == 1
+
+    clock.now = 101.0
+    mgr.on_execution(1, "e2", 2, 2.30)
+    assert rec.state == FILLED
+    assert rec.avg_fill_price == pytest.approx(2.20)
+    assert mgr.wait_for_fill(1, timeout=0) is rec
+    assert [s for _, s in rec.history] == [
+        "PendingSubmit",
+        SUBMITTED,
+        PARTIALLY_FILLED,
+        FILLED,
+    ]
+
+    summary = mgr.latency_summary()
+    assert summary["ack"]["max_s"] == pytest.approx(0.2)
+    assert summary["fill"]["max_s"] == pytest.approx(1.0)
+
+
+def test_out_of_order_status_does_not_move_backwards():
+    mgr = OrderManager()
+    mgr.track(2, "SPY", "BUY", 1)
+    mgr.on_status(2, "Filled", filled=1, avg_fill_price=1.5)
+    mgr.on_status(2, "Submitted")
+    rec = mgr.get(2)
+    assert rec.state == FILLED
+    assert mgr.open_orders() == []
+
+
+def test_inactive_is_not_terminal_and_cancel_fails_future_with_reason():
+    mgr = OrderManager()
+    mgr.track(3, "QQQ", "BUY", 1)
+    mgr.on_status(3, "Inactive", reason="Order held until the open")
+    rec = mgr.get(3)
+    assert rec.state == INACTIVE and not rec.future.done()
+    assert mgr.open_orders() == [rec]
+    mgr.on_status(3, "Submitted")  # IB resumed it
+    assert rec.state == SUBMITTED
+
+    mgr.on_status(3, "Cancelled", reason="Insufficient funds")
+    with pytest.raises(OrderFailed, match="Insufficient funds"):
+        mgr.wait_for_fill(3, timeout=0)
+
+
+def test_status_before_execution_does_not_double_count():
+    mgr = OrderManager()
+    rec = mgr.track(9, "SPY", "BUY", 5)
+    mgr.on_status(9, "Submitted", filled=2, avg_fill_price=2.0)
+    mgr.on_execution(9, "e1", 2, 2.0)
+    assert rec.filled == 2 and rec.state == PARTIALLY_FILLED
+
+    mgr.on_status(9, "Submitted", filled=4, avg_fill_price=2.05)
+    assert rec.filled == 4  # status ran ahead of its execution report
+    mgr.on_execution(9, "e2", 2, 2.1)
+    assert rec.filled == 4 and rec.state == PARTIALLY_FILLED
+    assert rec.avg_fill_price == pytest.approx(2.05)
+    assert not rec.future.done()
+
+
+def test_ib_events_drive_state_and_await_fill():
+    mgr = OrderManager()
+    mgr.track(4, "SPY", "SELL", 1, parent_id=3)
+    trade = SimpleNamespace(
+        order=SimpleNamespace(orderId=4),
+        orderStatus=SimpleNamespace(status="Submitted", filled=0, avgFillPrice=0.0),
+        log=[],
+    )
+    mgr._on_order_status(trade)
+    fill = SimpleNamespace(execution=SimpleNamespace(execId="x1", shares=1, price=3.1))
+    mgr._on_exec_details(trade, fill)
+
+    rec = asyncio.run(mgr.await_fill(4, timeout=1))
+    assert rec.state == FILLED
+    assert mgr.children(3) == [rec]
+
+
+def test_cancel_and_prune():
+    clock = FakeClock()
+    mgr = OrderManager(clock=clock)
+    mgr.track(5, "IWM", "BUY", 1)
+    mgr.on_status(5, "Cancelled")
+    assert mgr.get(5).state == CANCELLED
+    clock.now += 10
+    assert mgr.prune(older_than_seconds=5) == 1
+    assert mgr.get(5) is None
+
+
+class FakeIB:
+    """Records placeOrder calls and assigns ids like ib_insync."""
+
+    def __init__(self):
+        self.placed = []
+        self._next_id = 100
+
+    def isConnected(self):
+        return True
+
+    def placeOrder(self, contract, order):
+        if not order.orderId:
+            order.orderId = self._next_id
+            self._next_id += 1
+        self.placed.append(order)
+
+
+def test_bracket_uses_ticket_prices_and_transmits_atomically(monkeypatch):
+    from src.bot.broker.base import OptionContract, OrderTicket
+    from src.bot.broker.ibkr import IBKRBroker
+
+    broker = IBKRBroker()
+    broker.ib = FakeIB()
+    monkeypatch.setattr(
+        broker,
+        "market_data",
+        lambda *a, **k: pytest.fail("bracket must not fetch quotes"),
+    )
+    ticket = OrderTicket(
+        contract=OptionContract("SPY", "C", 450.0, "20240119", 100),
+        action="BUY",
+        quantity=2,
+        order_type="MKT",
+        take_profit_pct=0.5,
+        stop_loss_pct=0.2,
+        entry_price=2.0,
+        take_profit_price=3.0,
+        stop_loss_price=1.6,
+    )
+
+    parent_id = broker.place_order(ticket)
+
+    parent, tp, sl = broker.ib.placed
+    assert parent_id == "100"
+    assert [o.transmit for o in (parent, tp, sl)] == [False, False, True]
+    assert (tp.orderType, tp.lmtPrice, tp.action) == ("LMT", 3.0, "SELL")
+    assert (sl.orderType, sl.auxPrice, sl.action) == ("STP", 1.6, "SELL")
+    assert tp.parentId == sl.parentId == 100
+    assert [r.order_id for r in broker.orders.children(100)] == ["101", "102"]
+
+
+def test_bracket_prices_fall_back_to_entry_price():
+    from src.bot.broker.base import OrderTicket
+
+    ticket = OrderTicket(
+        "SPY", "BUY", 1, "MKT", take_profit_pct=0.5, stop_loss_pct=0.25, entry_price=2.0
+    )
+    assert ticket.bracket_prices() == (3.0, 1.5)
+    assert OrderTicket(
+        "SPY", "BUY", 1, "MKT", take_profit_pct=0.5
+    ).bracket_prices() == (None, None)
+
+
+def test_wait_for_fill_pumps_the_event_loop_and_refuses_to_block_it():
+    clock = FakeClock()
+    mgr = OrderManager(clock=clock)
+    mgr.track(6, "SPY", "BUY", 1)
+    waits = []
+
+    def pump(seconds):
+        # Stands in for ib.sleep: the fill callback runs while the loop is pumped
+        waits.append(seconds)
+        clock.now += seconds
+        if len(waits) == 2:
+            mgr.on_execution(6, "x6", 1, 2.0)
+
+    assert mgr.wait_for_fill(6, timeout=5, wait=pump).state == FILLED
+    assert waits == [0.25, 0.25]
+
+    mgr.track(7, "SPY", "BUY", 1)
+    with pytest.raises(TimeoutError):
+        mgr.wait_for_fill(7, timeout=1, wait=pump)
+
+    async def inside_loop():
+        mgr.wait_for_fill(7, timeout=0)
+
+    with pytest.raises(RuntimeError, match="await_fill"):
+        asyncio.run(inside_loop())
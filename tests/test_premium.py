@@ -0,0 +1,141 @@
+"""Unit tests for backtest.premium - synthetic Black-Scholes option quotes."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot.backtest import (
+    BacktestConfig,
+    BlackScholesPremiumModel,
+    IVSurface,
+    SimBroker,
+    SpreadModel,
+    run_backtest,
+)
+from src.bot.data.greeks import bs_price_one
+from src.bot.trading_calendar import NY_TZ
+
+
+def _ny(*args):
+    return datetime(*args, tzinfo=NY_TZ).timestamp()
+
+
+def _bars(closes, start="2024-01-02 14:30", volumes=None):
+    closes = np.asarray(closes, dtype=float)
+    opens = np.r_[closes[0], closes[:-1]]
+    return pd.DataFrame(
+        {
+            "open": opens,
+            "high": np.maximum(opens, closes),
+            "low": np.minimum(opens, closes),
+            "close": closes,
+            "volume": volumes if volumes is not None else np.full(len(closes), 1000.0),
+        },
+        index=pd.date_range(start, periods=len(closes), freq="5min", tz="UTC"),
+    )
+
+
+def test_surface_skew_and_atm_series():
+    surface = IVSurface(atm_vol=0.2, skew=-0.5)
+    assert surface.vol(100.0, 100.0, 0.1) == pytest.approx(
+        0.2 + surface.term_slope * (0.1 - 30 / 365)
+    )
+    assert surface.vol(100.0, 90.0, 0.1) > surface.vol(100.0, 110.0, 0.1)
+
+    vix = pd.Series(
+        [0.15, 0.30],
+        index=pd.to_datetime(["2024-01-02 14:30", "2024-01-03 14:30"], utc=True),
+    )
+    regime = IVSurface(atm_series=vix, skew=0.0)
+    assert regime.atm(_ny(2024, 1, 2, 8, 0)) == 0.15  # before the series: first value
+    assert regime.atm(_ny(2024, 1, 3, 12, 0)) == 0.30
+    assert regime.atm(None) == regime.atm_vol
+
+
+def test_spread_model_brackets_mid_on_tick_grid():
+    spread = SpreadModel(spread_pct=0.04, min_spread=0.02)
+    for mid in (0.013, 0.5, 2.345, 17.0):
+        bid, ask = spread.bid_ask(mid)
+        assert 0 < bid < mid < ask or (bid == 0.01 and ask > mid)
+        assert round(bid * 100) == pytest.approx(bid * 100) and round(
+            ask * 100
+        ) == pytest.approx(ask * 100)
+    bids, asks = spread.bid_ask_array(np.array([0.5, 17.0]))
+    assert (bids, asks) == (pytest.approx([0.49, 16.66]), pytest.approx([0.51, 17.34]))
+
+
+def test_expiry_rolls_weekly_and_skips_holidays():
+    model = BlackScholesPremiumModel()
+    assert model.expiry_for(_ny(2024, 1, 2, 10, 0)) == _ny(2024, 1, 5, 16, 0)
+    # Friday after the close rolls to next week
+    assert model.expiry_for(_ny(2024, 1, 5, 16, 5)) == _ny(2024, 1, 12, 16, 0)
+    # Good Friday 2024: weeklies expire Thursday
+    assert model.expiry_for(_ny(2024, 3, 26, 10, 0)) == _ny(2024, 3, 28, 16, 0)
+    assert BlackScholesPremiumModel(dte=30).expiry_for(_ny(2024, 1, 2, 10, 0)) == _ny(
+        2024, 2, 2, 16, 0
+    )
+
+
+def test_marks_decay_and_pay_the_spread():
+    model = BlackScholesPremiumModel(surface=IVSurface(atm_vol=0.25))
+    t0 = _ny(2024, 1, 2, 10, 0)
+    entry = model.entry(100.0, "C", t0)
+    now = model.mark(100.0, "C", t0, 100.0, entry, t0)
+    later = model.mark(100.0, "C", t0 + 2 * 86400, 100.0, entry, t0)
+    assert now < entry  # sold at the bid, bought at the ask
+    assert later < now  # theta
+    assert model.mark(103.0, "C", t0, 100.0, entry, t0) > now
+    assert model.mark(103.0, "P", t0, 100.0, entry, t0) < model.mark(
+        100.0, "P", t0, 100.0, entry, t0
+    )
+
+
+def test_option_path_is_vectorized_twin_of_scalar_quotes():
+    rng = np.random.default_rng(3)
+    df = _bars(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.001, 1200)))
+    )  # ~4 days of 5-min bars from Tue
+    model = BlackScholesPremiumModel()
+    path = model.option_path(df, "P")
+
+    expiry = model.expiry_for(df.index[0].timestamp())
+    assert path.index[-1].timestamp() <= expiry < df.index[-1].timestamp()
+    assert (path["strike"] == round(df["close"].iloc[0])).all()
+    assert (
+        (path["bid"] < path["mid"]) | (path["bid"] == 0.01)
+    ).all()  # bids floor at one tick
+    assert (path["mid"] < path["ask"]).all()
+    assert path["delta"].between(-1, 0).all()
+    i = 100
+    ts = df.index[i].timestamp()
+    scalar = model.mid(df["close"].iloc[i], path["strike"].iloc[i], "P", ts, expiry)
+    assert path["mid"].iloc[i] == pytest.approx(scalar, rel=1e-10)
+
+
+def test_backtest_and_sim_broker_accept_the_model():
+    closes = [100.0] * 12 + [101.0] + [101.0, 104.0, 106.0]
+    volumes = np.full(len(closes), 1000.0)
+    volumes[12] = 5000.0
+    model = BlackScholesPremiumModel(surface=IVSurface(atm_vol=0.2))
+    cfg = BacktestConfig(
+        take_profit_pct=0.5,
+        stop_loss_pct=0.5,
+        premium_model=model,
+        commission_per_contract=0.0,
+    )
+    result = run_backtest({"SPY": _bars(closes, volumes=volumes)}, cfg)
+    trade = result.trades[0]
+    assert trade.right == "C" and trade.exit_reason == "target"
+
+    broker = SimBroker({"SPY": _bars([100.0] * 6)}, pricer=model)
+    broker.connect()
+    call = [
+        c for c in broker.option_chain("SPY") if c.right == "C" and c.strike == 100.0
+    ][0]
+    years = (broker._expiry_ts(call.expiry) - broker.clock()) / (365 * 86400)
+    q = broker.market_data(call)
+    assert q.last == pytest.approx(
+        bs_price_one(100.0, 100.0, years, 0.2, "C"), abs=1e-4
+    )
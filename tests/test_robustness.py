@@ -0,0 +1,105 @@
+"""Unit tests for backtest.robustness - block bootstraps and walk-forward folds."""
+
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot.backtest import BacktestConfig
+from src.bot.backtest.robustness import (
+    bootstrap_bars,
+    bootstrap_trades,
+    resample_bars,
+    summarize,
+    walk_forward,
+)
+
+
+def _random_bars(n=2000, seed=1):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    opens = np.r_[closes[0], closes[:-1]]
+    return pd.DataFrame(
+        {
+            "open": opens,
+            "high": np.maximum(opens, closes) * 1.0005,
+            "low": np.minimum(opens, closes) * 0.9995,
+            "close": closes,
+            "volume": rng.lognormal(7, 0.6, n),
+        },
+        index=pd.date_range("2024-01-02 14:30", periods=n, freq="5min", tz="UTC"),
+    )
+
+
+def test_trade_bootstrap_distribution():
+    pnl = [500.0, -200.0, 300.0, -400.0, 100.0]
+    # Whole-sequence blocks are rotations: same total, different drawdowns
+    rotations = bootstrap_trades(pnl, 10_000, n_samples=200, block_size=len(pnl))
+    assert rotations["total_return"].to_numpy() == pytest.approx(np.full(200, 0.03))
+    assert rotations["max_drawdown"].nunique() > 1
+
+    samples = bootstrap_trades(pnl, 10_000, n_samples=5000, block_size=1, seed=1)
+    assert len(samples) == 5000
+    assert samples["total_return"].mean() == pytest.approx(0.03, abs=0.01)
+    assert (samples["max_drawdown"] >= 0).all()
+
+    summary = summarize(samples)
+    assert summary.loc["total_return", "p5"] < summary.loc["total_return", "p95"]
+    assert 0 < summary.loc["total_return", "prob_negative"] < 1
+
+
+def test_resampled_bars_are_valid_ohlc():
+    df = _random_bars(500)
+    path = resample_bars(df, 20, np.random.default_rng(3))
+    assert path.index.equals(df.index)
+    assert path["close"].iloc[0] == pytest.approx(df["close"].iloc[0])
+    assert (path["high"] >= path[["open", "close"]].max(axis=1)).all()
+    assert (path["low"] <= path[["open", "close"]].min(axis=1)).all()
+    assert not np.allclose(path["close"], df["close"])
+
+
+def test_bar_bootstrap_pool_matches_inline():
+    bars = {"SPY": _random_bars(600)}
+    cfg = BacktestConfig(take_profit_pct=0.3, max_hold_bars=24)
+    inline = bootstrap_bars(bars, cfg, n_paths=4, workers=1, seed=5)
+    pooled = bootstrap_bars(
+        bars,
+        cfg,
+        n_paths=4,
+        workers=2,
+        seed=5,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    assert list(inline["seed"]) == [5, 6, 7, 8]
+    pd.testing.assert_frame_equal(inline, pooled)
+
+
+def test_walk_forward_folds_trade_only_out_of_sample():
+    bars = {"SPY": _random_bars(2000)}
+    result = walk_forward(
+        bars,
+        {"DV_VOLUME_THRESHOLD": [0.8, 1.4], "DV_LOOKBACK_BARS": [10, 20]},
+        BacktestConfig(take_profit_pct=0.3, max_hold_bars=24),
+        train="3D",
+        test="1D",
+        workers=1,
+    )
+    folds = result.folds
+    assert (
+        len(folds) == 4
+    )  # ~6.9 days of bars: a 3-day train, then 1-day tests (the last one partial)
+    assert folds["DV_LOOKBACK_BARS"].map(type).eq(int).all()
+    assert (folds["test_end"] - folds["train_end"]).max() <= pd.Timedelta("1D")
+    for _, fold in folds.iterrows():
+        lo, hi = fold["train_end"].timestamp(), fold["test_end"].timestamp()
+        fold_trades = [t for t in result.trades if lo <= t.entry_ts < hi]
+        assert len(fold_trades) == fold["oos_trades"]
+    assert sum(folds["oos_trades"]) == len(result.trades)
+    assert result.equity.index.is_monotonic_increasing
+
+    summary = result.summary()
+    assert summary["folds"] == 4
+    assert summary["oos_total_return"] == pytest.approx(
+        float(np.prod(1 + folds["oos_total_return"]) - 1)
+    )
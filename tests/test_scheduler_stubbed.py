@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List
 
 import pandas as pd
+import pytest
 
 from src.bot.scheduler import run_cycle
 
@@ -32,7 +33,7 @@ class StubBroker:
         self._equity = 100000.0
         self._orders: List[Dict[str, Any]] = []
 
-    def market_data(self, symbol_or_contract):
+    def market_data(self, symbol_or_contract, **_):
         # Return stable quotes
         if isinstance(symbol_or_contract, str):
             return StubQuote(
@@ -95,3 +96,283 @@ def test_run_cycle_with_stubbed_broker_no_errors(tmp_path, monkeypatch):
     }
     # Run one cycle; expect no exceptions
     run_cycle(broker, settings)
+
+
+def _settings():
+    return {
+        "symbols": ["SPY"],
+        "risk": {"max_risk_pct_per_trade": 0.01, "stop_loss_pct": 0.2},
+        "options": {"moneyness": "atm", "min_volume": 100, "max_spread_pct": 5.0},
+        "historical": {"bar_size": "5 mins"},
+        "monitoring": {"alerts_enabled": False},
+        "dry_run": True,
+    }
+
+
+def test_signal_evaluated_once_per_closed_bar(monkeypatch):
+    from src.bot import scheduler
+
+    broker = StubBroker()
+    calls = []
+    orig = broker.historical_prices
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return orig(*args, **kwargs)
+
+    broker.historical_prices = counting
+    scheduler._last_signal_bar.clear()
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: 1_000.0)
+
+    run_cycle(broker, _settings())
+    run_cycle(broker, _settings())
+    assert len(calls) == 1  # second cycle falls inside the same bar
+
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: 1_300.0)
+    run_cycle(broker, _settings())
+    assert len(calls) == 2  # new bar closed -> re-evaluate
+
+
+def test_signal_gate_disabled_evaluates_every_cycle(monkeypatch):
+    from src.bot import scheduler
+
+    broker = StubBroker()
+    calls = []
+    orig = broker.historical_prices
+    broker.historical_prices = lambda *a, **k: calls.append(a) or orig(*a, **k)
+    scheduler._last_signal_bar.clear()
+    settings = _settings()
+    settings["schedule"] = {"signal_on_bar_close": False}
+
+    run_cycle(broker, settings)
+    run_cycle(broker, settings)
+    assert len(calls) == 2
+
+
+def test_bar_size_seconds_and_boundary():
+    from src.bot.scheduler import bar_size_seconds, last_bar_boundary
+
+    assert bar_size_seconds("1 min") == 60
+    assert bar_size_seconds("5 mins") == 300
+    assert bar_size_seconds("1 hour") == 3600
+    with pytest.raises(ValueError):
+        bar_size_seconds("fortnight")
+
+    # 10:07:30 ET (EST, UTC-5) -> last 5-min close at 10:05 ET
+    now = datetime(2026, 1, 14, 15, 7, 30, tzinfo=timezone.utc)
+    boundary = last_bar_boundary(now, 300)
+    assert boundary == datetime(2026, 1, 14, 15, 5, tzinfo=timezone.utc).timestamp()
+
+
+@dataclass
+class StubHeldOption(StubOption):
+    secType: str = "OPT"
+
+
+def test_trend_exit_check_refetches_hourly_bars_once_per_hourly_close(
+    tmp_path, monkeypatch
+):
+    from src.bot import scheduler
+
+    class HeldBroker(StubBroker):
+        def __init__(self):
+            super().__init__()
+            self.hourly_calls = 0
+
+        def positions(self):
+            held = StubHeldOption(
+                symbol="SPY", right="C", strike=100, expiry="20250117"
+            )
+            return [{"contract": held, "position": 1}]
+
+        def historical_prices(self, symbol, duration="60 M", bar_size="1 min", **_):
+            self.hourly_calls += bar_size == "1 hour"
+            # Closed hourly bars in an uptrend: the call's trend stays intact
+            idx = pd.date_range(end="2026-01-14 14:00", periods=30, freq="1h", tz="UTC")
+            close = pd.Series([100 + i * 0.1 for i in range(30)], index=idx)
+            return pd.DataFrame(
+                {
+                    "open": close,
+                    "high": close,
+                    "low": close,
+                    "close": close,
+                    "volume": 1000,
+                }
+            )
+
+    broker = HeldBroker()
+    settings = _settings()
+    settings["risk"]["daily_state_path"] = str(tmp_path / "daily_state.json")
+    scheduler._last_signal_bar.clear()
+    hour = datetime(2026, 1, 14, 15, 0, tzinfo=timezone.utc).timestamp()
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: hour)
+
+    run_cycle(broker, settings)
+    run_cycle(broker, settings, evaluate_signals=False)
+    assert broker.hourly_calls == 1  # same hourly bar: EMA verdict cannot have changed
+
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: hour + 3600)
+    run_cycle(broker, settings)
+    assert broker.hourly_calls == 2
+    assert broker._orders == []
+
+
+def test_symbol_jobs_share_per_bar_account_and_vix_and_exit_pass_is_position_only(
+    tmp_path, monkeypatch
+):
+    from src.bot import scheduler
+    from src.bot.settings_watcher import SettingsSnapshot
+
+    class CountingBroker(StubBroker):
+        def __init__(self):
+            super().__init__()
+            self.ib = self  # _get_vix qualifies the index through broker.ib
+            self.calls = {"account": 0, "vix": 0, "positions": 0, "history": 0}
+
+        def qualifyContracts(self, *contracts):
+            self.calls["vix"] += 1
+            return list(contracts)
+
+        def account(self):
+            self.calls["account"] += 1
+            return {"AvailableFunds": 50_000.0, "NetLiquidation": 100_000.0}
+
+        def positions(self):
+            self.calls["positions"] += 1
+            return []
+
+        def historical_prices(self, *args, **kwargs):
+            self.calls["history"] += 1
+            return super().historical_prices(*args, **kwargs)
+
+    broker = CountingBroker()
+    settings = _settings()
+    settings["symbols"] = ["SPY", "QQQ"]
+    settings["risk"]["daily_state_path"] = str(tmp_path / "daily_state.json")
+    snap = SettingsSnapshot.from_settings(settings)
+    scheduler._last_signal_bar.clear()
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: 1_000.0)
+
+    # Event engine: one cycle per symbol job at the bar close, then an exit pass
+    for sym in ("SPY", "QQQ"):
+        run_cycle(broker, snap.for_symbols([sym]))
+    assert broker.calls["account"] == 1 and broker.calls["vix"] == 1
+    assert broker.calls["history"] == 2
+
+    run_cycle(broker, snap, evaluate_signals=False)
+    assert broker.calls["account"] == 1
+    assert (
+        broker.calls["positions"] == 3
+    )  # one per symbol job + one snapshot for the exit pass
+    assert broker.calls["history"] == 2  # nothing held: no symbol visited
+
+
+def test_monitor_rule_is_sized_by_confirmed_entry_fills(monkeypatch):
+    from src.bot import scheduler
+    from src.bot.execution import ExecutionResult
+    from src.bot.orders import OrderManager
+
+    class TrackedBroker(StubBroker):
+        def __init__(self):
+            super().__init__()
+            self.orders = OrderManager(clock=lambda: 0.0)
+
+    broker = TrackedBroker()
+    settings = {"risk": {"exit_mode": "monitor"}, "dry_run": False}
+    monkeypatch.setattr(scheduler, "_exit_monitor", None)
+    opt = StubOption(symbol="SPY", right="C", strike=100, expiry="20250117")
+
+    # Market entry still working: no rule until it fills, then only the fill
+    broker.orders.track("1", "SPY", "BUY", 3)
+    assert (
+        scheduler._register_exit_rule(
+            broker, settings, opt, "BUY", 3, "1", None, stop_loss=1.0
+        )
+        is None
+    )
+    monitor = scheduler.get_exit_monitor(broker, settings)
+    assert len(monitor) == 0
+    broker.orders.on_execution("1", "e1", 2, 2.5)
+    broker.orders.on_status("1", "Cancelled")
+    assert [r.quantity for r in monitor.rules()] == [2]
+
+    # Chase that filled nothing and was not sent to market: nothing to protect
+    monitor.remove(monitor.rules()[0].key)
+    broker.orders.track("2", "SPY", "BUY", 3)
+    broker.orders.on_status("2", "Cancelled")
+    chase = ExecutionResult(order_id="2", action="BUY", quantity=3, filled=0.0)
+    assert (
+        scheduler._register_exit_rule(broker, settings, opt, "BUY", 3, "2", chase)
+        is None
+    )
+    assert len(monitor) == 0
+
+
+def test_global_halt_still_runs_trend_exits(tmp_path, monkeypatch):
+    from src.bot import scheduler
+    from src.bot.sharding import SharedLimits
+
+    class HeldBroker(StubBroker):
+        def positions(self):
+            held = StubHeldOption(
+                symbol="SPY", right="C", strike=100, expiry="20250117"
+            )
+            return [{"contract": held, "position": 1}]
+
+        def historical_prices(self, symbol, duration="60 M", bar_size="1 min", **_):
+            # Closed hourly bars turning down: the call's trend is broken
+            idx = pd.date_range(end="2026-01-14 14:00", periods=30, freq="1h", tz="UTC")
+            close = pd.Series([100 + i * 0.1 for i in range(29)] + [90.0], index=idx)
+            return pd.DataFrame(
+                {
+                    "open": close,
+                    "high": close,
+                    "low": close,
+                    "close": close,
+                    "volume": 1000,
+                }
+            )
+
+    broker = HeldBroker()
+    settings = _settings()
+    settings["dry_run"] = False
+    settings["risk"]["daily_state_path"] = str(tmp_path / "daily_state.json")
+    scheduler._last_signal_bar.clear()
+    hour = datetime(2026, 1, 14, 15, 0, tzinfo=timezone.utc).timestamp()
+    monkeypatch.setattr(scheduler, "last_bar_boundary", lambda now, secs: hour)
+    limits = SharedLimits(orders_per_minute=10, order_wait_seconds=0.0)
+    limits.halt("daily_loss")
+    scheduler.set_shared_limits(limits)
+    try:
+        run_cycle(broker, settings)
+    finally:
+        scheduler.set_shared_limits()
+        scheduler._last_signal_bar.clear()
+    assert broker._orders == [
+        {"action": "SELL", "qty": 1}
+    ]  # halt blocks entries, not exits
+
+
+def test_bracket_mode_checks_exits_only_for_unprotected_fills(monkeypatch):
+    from src.bot import scheduler
+
+    class QuoteBroker(StubBroker):
+        def __init__(self):
+            super().__init__()
+            self.quotes = 0
+
+        def market_data(self, symbol_or_contract, **_):
+            self.quotes += 1
+            return super().market_data(symbol_or_contract)
+
+    broker = QuoteBroker()
+    settings = {"risk": {"exit_mode": "bracket"}, "dry_run": False}
+    monkeypatch.setattr(scheduler, "_exit_monitor", None)
+    scheduler.check_exits(broker, settings)
+    assert broker.quotes == 0  # server-side brackets protect everything
+
+    # A chase cancelled after a partial fill left contracts without bracket children
+    opt = StubOption(symbol="SPY", right="C", strike=100, expiry="20250117")
+    scheduler.get_exit_monitor(broker, settings).add(opt, "BUY", 1, stop_loss=1.0)
+    scheduler.check_exits(broker, settings)
+    assert broker.quotes == 1
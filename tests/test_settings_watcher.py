@@ -0,0 +1,162 @@
+"""Tests for settings_watcher - immutable snapshots and hot reload of settings.yaml."""
+
+import os
+
+import pytest
+import yaml
+
+from src.bot.settings import Settings
+from src.bot.settings_watcher import SettingsSnapshot, SettingsWatcher, derive
+
+
+def _write(path, doc, bump=1):
+    path.write_text(yaml.safe_dump(doc))
+    # Make sure the mtime moves even on coarse-grained filesystems
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+
+
+def _base():
+    return {
+        "symbols": ["SPY"],
+        "dry_run": True,
+        "broker": {"client_id": 101},
+        "options": {"max_spread_pct": 10.0},
+        "historical": {"duration": "3600 S", "bar_size": "1 min"},
+    }
+
+
+@pytest.fixture
+def events():
+    from loguru import logger
+
+    out = []
+    sink = logger.add(lambda msg: out.append(msg.record["extra"]), level="INFO")
+    yield out
+    logger.remove(sink)
+
+
+def test_snapshot_is_read_only_and_precomputes_cycle_values():
+    snap = SettingsSnapshot.from_settings(Settings(**_base()))
+    assert snap["symbols"] == ("SPY",) and snap.get("missing", 1) == 1
+    with pytest.raises(TypeError):
+        snap["options"]["max_spread_pct"] = 50.0
+    assert (
+        snap.derived.hist_duration_seconds == 3600
+        and snap.derived.hist_bar_seconds == 60
+    )
+    assert snap.derived == derive(snap.to_dict())
+    one = snap.for_symbols(["QQQ"])
+    assert one["symbols"] == ("QQQ",) and one["options"] is snap["options"]
+    assert snap.to_dict()["symbols"] == ["SPY"]
+
+
+def test_valid_edit_is_swapped_in_and_restart_only_fields_are_pinned(tmp_path, events):
+    path = tmp_path / "settings.yaml"
+    _write(path, _base())
+    watcher = SettingsWatcher(path)
+    seen = []
+    watcher.add_listener(seen.append)
+    assert watcher.poll() is None  # unchanged
+
+    doc = _base()
+    doc["symbols"] = ["SPY", "QQQ"]
+    doc["options"]["max_spread_pct"] = 5.0
+    doc["historical"]["bar_size"] = "5 mins"
+    doc["broker"]["client_id"] = 7
+    doc["dry_run"] = False
+    _write(path, doc)
+
+    snap = watcher.poll()
+    assert snap is not None and snap is watcher.current and seen == [snap]
+    assert snap.version == 1
+    assert (
+        snap["symbols"] == ("SPY", "QQQ") and snap["options"]["max_spread_pct"] == 5.0
+    )
+    assert snap.derived.hist_bar_seconds == 300
+    # Connection and paper/live keep their running values until a restart
+    assert snap["broker"]["client_id"] == 101 and snap["dry_run"] is True
+    reloaded = next(e for e in events if e.get("event") == "settings_reloaded")
+    assert reloaded["changed"] == [
+        "historical.bar_size",
+        "options.max_spread_pct",
+        "symbols",
+    ]
+    assert reloaded["restart_required"] == ["broker", "dry_run"]
+
+
+def test_invalid_edit_is_rejected_once_and_current_kept(tmp_path, events):
+    path = tmp_path / "settings.yaml"
+    _write(path, _base())
+    watcher = SettingsWatcher(path)
+    before = watcher.current
+
+    doc = _base()
+    doc["options"]["max_spread_pct"] = "wide"
+    _write(path, doc)
+    assert watcher.poll() is None
+    path.write_text("symbols: [SPY\n")  # YAML syntax error
+    os.utime(path, ns=(0, 5_000_000_000))
+    assert watcher.poll() is None
+    assert watcher.poll() is None  # same bad file is not re-validated
+    assert watcher.current is before
+    assert [e["event"] for e in events if e.get("event")] == [
+        "settings_reload_rejected"
+    ] * 2
+
+    _write(path, _base(), bump=9)  # back to the running config: nothing changed
+    assert watcher.poll() is None
+
+
+def test_run_cycle_runs_on_a_frozen_snapshot(tmp_path):
+    from loguru import logger
+
+    from benchmarks.fixtures import trending_bars
+    from src.bot import scheduler
+    from src.bot.backtest import LatencyModel, SimBroker
+
+    broker = SimBroker(
+        {"SPY": trending_bars(400, freq="60min", seed=0)},
+        latency=LatencyModel(request_seconds=0.0, order_ack_seconds=0.0),
+        strike_step=1.0,
+    )
+    broker.connect()
+    broker.clock.set(broker.last_ts)
+    snap = SettingsSnapshot.from_settings(
+        {
+            "symbols": ["SPY"],
+            "dry_run": True,
+            "historical": {
+                "duration": "864000 S",
+                "bar_size": "1 hour",
+                "use_rth": False,
+            },
+            "options": {"expiry": "weekly", "moneyness": "atm", "max_spread_pct": 5.0},
+            "risk": {
+                "max_risk_pct_per_trade": 0.01,
+                "max_daily_loss_pct": 0.5,
+                "stop_loss_pct": 0.5,
+                "take_profit_pct": 0.3,
+                "daily_state_path": str(tmp_path / "daily_state.json"),
+            },
+            "monitoring": {"alerts_enabled": False},
+        }
+    )
+    events = []
+    sink = logger.add(
+        lambda msg: events.append(msg.record["extra"].get("event")), level="INFO"
+    )
+    saved = scheduler._gateway_circuit_breaker
+    scheduler._gateway_circuit_breaker = scheduler.GatewayCircuitBreaker(3, 300)
+    scheduler._last_signal_bar.clear()
+    scheduler._symbol_bar_cache.clear()
+    scheduler.set_clock(broker.clock, lambda _s: None)
+    try:
+        scheduler.run_cycle(broker, snap)
+    finally:
+        scheduler.set_clock()
+        scheduler._gateway_circuit_breaker = saved
+        scheduler._timeout_tracker.clear()
+        scheduler._LAST_REQUEST_TIME.clear()
+        logger.remove(sink)
+    assert "dry_run" in events
@@ -0,0 +1,164 @@
+"""Tests for sharding - symbol partitioning, shared limits and the shard coordinator."""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from src.bot.settings import Settings
+from src.bot.sharding import SharedLimits, partition, run_sharded, shard_settings
+
+
+def test_partition_and_shard_client_ids():
+    assert partition(["SPY", "QQQ", "IWM", "SPY", "AMD"], 2) == [
+        ["SPY", "IWM"],
+        ["QQQ", "AMD"],
+    ]
+    assert partition(["SPY"], 3) == [["SPY"]]  # no empty shards
+    with pytest.raises(ValueError):
+        partition(["SPY"], 0)
+
+    settings = Settings(
+        symbols=["SPY", "QQQ"], broker={"client_id": 275}, sharding={"shards": 2}
+    )
+    shard = shard_settings(settings, 1, ["QQQ"])
+    assert shard.symbols == ["QQQ"] and shard.broker.client_id == 285
+    assert settings.broker.client_id == 275  # original untouched
+
+
+def test_shared_limits_are_seen_across_processes():
+    ctx = multiprocessing.get_context("spawn")
+    limits = SharedLimits(
+        orders_per_minute=6, order_wait_seconds=0.0, ctx=ctx
+    )  # burst of 1
+    now = time.time()
+    proc = ctx.Process(target=limits.halt, args=("daily_loss", now))
+    proc.start()
+    proc.join(30)
+    assert proc.exitcode == 0
+    assert limits.halted(now) == "daily_loss"
+    assert limits.halted(now + 86400) is None  # next trading day
+    assert limits.halt("daily_loss", now) is False
+
+    proc = ctx.Process(target=limits.orders.try_acquire)
+    proc.start()
+    proc.join(30)
+    assert limits.orders.available < 1.0
+    assert limits.acquire_order() is False
+
+
+def _record_shard(index, symbols, yaml_path, limits, stop_event):
+    out = os.path.dirname(yaml_path)
+    first = not any(f.startswith(f"shard{index}-") for f in os.listdir(out))
+    with open(
+        os.path.join(out, f"shard{index}-{os.getpid()}.json"), "w", encoding="utf-8"
+    ) as f:
+        json.dump(symbols, f)
+    if index == 0 and first:
+        os._exit(3)  # crash once; the coordinator must restart it
+    stop_event.wait(30)
+
+
+def test_coordinator_starts_restarts_and_stops_shards(tmp_path):
+    settings = Settings(
+        symbols=["SPY", "QQQ", "IWM"],
+        sharding={"shards": 2, "restart_delay_seconds": 0.0},
+    )
+    stop = threading.Event()
+    yaml_path = tmp_path / "settings.yaml"
+    coordinator = threading.Thread(
+        target=run_sharded,
+        args=(settings, stop, yaml_path),
+        kwargs={"target": _record_shard, "poll_seconds": 0.05},
+    )
+    coordinator.start()
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            names = os.listdir(tmp_path)
+            if sum(n.startswith("shard0-") for n in names) == 2 and any(
+                n.startswith("shard1-") for n in names
+            ):
+                break
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        coordinator.join(60)
+    assert not coordinator.is_alive()
+    runs = {}
+    for name in os.listdir(tmp_path):
+        runs.setdefault(name.split("-")[0], []).append(
+            json.loads((tmp_path / name).read_text())
+        )
+    assert runs == {"shard0": [["SPY", "IWM"], ["SPY", "IWM"]], "shard1": [["QQQ"]]}
+
+
+@pytest.mark.parametrize("blocked", ["halt", "throttle"])
+def test_entries_respect_shared_limits(tmp_path, blocked):
+    from loguru import logger
+
+    from benchmarks.fixtures import trending_bars
+    from src.bot import scheduler
+    from src.bot.backtest import LatencyModel, SimBroker
+    from src.bot.settings_watcher import SettingsSnapshot
+
+    broker = SimBroker(
+        {"SPY": trending_bars(400, freq="60min", seed=0)},
+        latency=LatencyModel(request_seconds=0.0, order_ack_seconds=0.0),
+        strike_step=1.0,
+    )
+    broker.connect()
+    broker.clock.set(broker.last_ts)
+    snap = SettingsSnapshot.from_settings(
+        {
+            "symbols": ["SPY"],
+            "dry_run": False,
+            "historical": {
+                "duration": "864000 S",
+                "bar_size": "1 hour",
+                "use_rth": False,
+            },
+            "options": {"expiry": "weekly", "moneyness": "atm", "max_spread_pct": 5.0},
+            "risk": {
+                "max_risk_pct_per_trade": 0.01,
+                "max_daily_loss_pct": 0.5,
+                "stop_loss_pct": 0.5,
+                "take_profit_pct": 0.3,
+                "daily_state_path": str(tmp_path / "daily_state.json"),
+            },
+            "monitoring": {"alerts_enabled": False},
+        }
+    )
+    limits = SharedLimits(orders_per_minute=1, order_wait_seconds=0.0)
+    if blocked == "halt":
+        limits.halt("daily_loss", now=broker.clock())
+    else:
+        assert limits.orders.try_acquire()  # another shard used the only token
+    skips = []
+    sink = logger.add(
+        lambda msg: (
+            skips.append(msg.record["extra"].get("reason"))
+            if msg.record["extra"].get("event") == "skip"
+            else None
+        ),
+        level="INFO",
+    )
+    saved = scheduler._gateway_circuit_breaker
+    scheduler._gateway_circuit_breaker = scheduler.GatewayCircuitBreaker(3, 300)
+    scheduler._last_signal_bar.clear()
+    scheduler._symbol_bar_cache.clear()
+    scheduler.set_clock(broker.clock, lambda _s: None)
+    scheduler.set_shared_limits(limits)
+    try:
+        scheduler.run_cycle(broker, snap)
+    finally:
+        scheduler.set_shared_limits()
+        scheduler.set_clock()
+        scheduler._gateway_circuit_breaker = saved
+        scheduler._timeout_tracker.clear()
+        scheduler._LAST_REQUEST_TIME.clear()
+        logger.remove(sink)
+    assert skips == ["global_halt" if blocked == "halt" else "order_throttle"]
@@ -0,0 +1,183 @@
+"""Unit tests for backtest.sim_broker - simulated fills, data and full scheduler replay."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot import scheduler
+from src.bot.backtest import (
+    FillModel,
+    LatencyModel,
+    SimBroker,
+    SimOptionContract,
+    run_replay,
+)
+from src.bot.broker.base import OrderTicket
+from src.bot.orders import CANCELLED, FILLED
+
+
+def _session_bars(closes, day="2024-01-02", lows=None):
+    closes = np.asarray(closes, dtype=float)
+    opens = np.r_[closes[0], closes[:-1]]
+    idx = pd.date_range(f"{day} 14:30", periods=len(closes), freq="5min", tz="UTC")
+    return pd.DataFrame(
+        {
+            "open": opens,
+            "high": np.maximum(opens, closes),
+            "low": np.minimum(opens, closes) if lows is None else lows,
+            "close": closes,
+            "volume": np.full(len(closes), 1000.0),
+        },
+        index=idx,
+    )
+
+
+def _broker(df, **kw):
+    broker = SimBroker(
+        {"SPY": df}, fill_model=FillModel(commission_per_contract=0.0), **kw
+    )
+    broker.connect()
+    return broker
+
+
+def _call(broker):
+    return [
+        c for c in broker.option_chain("SPY") if c.right == "C" and c.strike == 100.0
+    ][0]
+
+
+def test_market_bracket_fills_and_oca_cancels_sibling():
+    broker = _broker(_session_bars([100.0] * 3 + [102.0, 104.0, 106.0]))
+    opt = _call(broker)
+    q = broker.market_data(opt)
+    ticket = OrderTicket(
+        opt,
+        "BUY",
+        2,
+        "MKT",
+        entry_price=q.ask,
+        take_profit_price=q.ask * 1.3,
+        stop_loss_price=q.ask * 0.8,
+    )
+
+    parent = broker.place_order(ticket)
+    broker.sleep(1)
+    assert broker.orders.get(parent).state == FILLED
+    assert broker.orders.get(parent).avg_fill_price == pytest.approx(q.ask)
+    assert broker.positions()[0]["position"] == 2
+
+    broker.advance_to(broker.first_ts + 6 * 300)
+    tp, sl = broker.orders.children(parent)
+    assert tp.state == FILLED and sl.state == CANCELLED
+    assert broker.positions() == []
+    assert broker.cash == pytest.approx(100_000 + 2 * 100 * (tp.avg_fill_price - q.ask))
+
+
+def test_stop_child_triggers_on_bar_low():
+    lows = np.array([100.0, 100.0, 95.0, 100.0])
+    broker = _broker(_session_bars([100.0, 100.0, 100.0, 100.0], lows=lows))
+    opt = _call(broker)
+    q = broker.market_data(opt)
+    stop = q.ask * 0.8
+    parent = broker.place_order(OrderTicket(opt, "BUY", 1, "MKT", stop_loss_price=stop))
+
+    broker.advance_to(broker.first_ts + 3 * 300)  # third bar (low 95) has closed
+    (sl,) = broker.orders.children(parent)
+    assert sl.state == FILLED
+    assert sl.avg_fill_price == pytest.approx(stop)
+
+
+def test_historical_prices_stop_at_clock_and_resample():
+    broker = _broker(_session_bars(np.linspace(100, 101, 24)))
+    broker.clock.set(broker.first_ts + 3600 + 10)
+
+    df = broker.historical_prices("SPY", duration="1 D", bar_size="5 mins")
+    assert len(df) == 13  # 12 closed bars plus the forming one
+    hourly = broker.historical_prices("SPY", duration="1 D", bar_size="1 hour")
+    assert hourly["volume"].sum() == pytest.approx(13 * 1000.0)
+    assert hourly.index[0] == pd.Timestamp("2024-01-02 14:00", tz="UTC")
+
+
+def test_outage_times_out_and_costs_sim_time():
+    df = _session_bars([100.0] * 6)
+    first = df.index[0].timestamp()
+    broker = _broker(
+        df, latency=LatencyModel(request_seconds=0.5, outages=[(first, first + 60)])
+    )
+    with pytest.raises(TimeoutError):
+        broker.historical_prices("SPY", duration="1 D", bar_size="5 mins")
+    assert broker.clock() == pytest.approx(first + 0.5)
+    broker.clock.set(first + 61)
+    assert len(broker.historical_prices("SPY", duration="1 D", bar_size="5 mins")) == 1
+
+
+def test_chase_limit_inside_spread_fills_passively():
+    broker = _broker(_session_bars([100.0] * 6))
+    broker.fill_model.passive_fill_rate = 1.0
+    opt = _call(broker)
+    q = broker.market_data(opt)
+    oid = broker.place_order(
+        OrderTicket(opt, "BUY", 1, "LMT", limit_price=round((q.bid + q.ask) / 2, 2))
+    )
+    broker.sleep(30)
+    assert broker.orders.get(oid).state == FILLED
+    assert broker.orders.get(oid).avg_fill_price < q.ask
+
+
+def test_run_replay_drives_live_scheduler(tmp_path):
+    rng = np.random.default_rng(7)
+    frames = []
+    for day in ("2024-01-02", "2024-01-03"):
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 78)))
+        df = _session_bars(closes, day=day)
+        df["volume"] = rng.lognormal(8, 0.8, 78)
+        frames.append(df)
+    broker = SimBroker({"SPY": pd.concat(frames)})
+    settings = {
+        "symbols": ["SPY"],
+        "schedule": {"interval_seconds": 300},
+        "historical": {"duration": "2 D", "bar_size": "5 mins"},
+        "risk": {"take_profit_pct": 0.3, "stop_loss_pct": 0.2},
+        "options": {"max_spread_pct": 5.0},
+    }
+
+    live_breaker, live_monitor = (
+        scheduler._gateway_circuit_breaker,
+        scheduler._exit_monitor,
+    )
+    for state in (
+        scheduler._last_signal_bar,
+        scheduler._per_bar_cache,
+        scheduler._symbol_bar_cache,
+    ):
+        state.clear()
+    scheduler._last_signal_bar["LIVE"] = 1.0
+    scheduler._per_bar_cache[(0, "vix")] = (1.0, 30.0)
+
+    start = time.perf_counter()
+    result = run_replay(broker, settings, state_dir=tmp_path)
+
+    # Every 5 minutes from each open through the (inclusive) close; the replay stops at day two's close
+    assert result.cycles == 2 * 78 + 1
+    assert result.speedup > 100
+    assert time.perf_counter() - start < 30
+    assert any(f.action == "BUY" for f in result.fills)
+    assert broker.orders.get(result.fills[0].order_id).state == FILLED
+    assert (tmp_path / "daily_state.json").exists()
+    assert scheduler._time_fn is time.time  # live clock restored
+    # Live scheduler state is back; nothing from the replay leaked into it
+    assert scheduler._last_signal_bar == {"LIVE": 1.0}
+    assert scheduler._per_bar_cache == {(0, "vix"): (1.0, 30.0)}
+    assert scheduler._symbol_bar_cache == {}
+    assert scheduler._gateway_circuit_breaker is live_breaker
+    assert scheduler._exit_monitor is live_monitor
+    scheduler._last_signal_bar.clear()
+    scheduler._per_bar_cache.clear()
+    assert len(result.equity) == result.cycles
+
+
+def test_sim_contract_is_an_option():
+    c = SimOptionContract("SPY", "C", 100.0, "20240105", 100)
+    assert c.secType == "OPT"
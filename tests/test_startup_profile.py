@@ -0,0 +1,66 @@
+"""Tests for startup_profile and the import-time behaviour of startup modules."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from src.bot.startup_profile import StartupTimer, parse_importtime
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   numpy.core
+import time:      1500 |       1920 | numpy
+import time:        50 |         50 | src.bot.risk
+"""
+
+
+def test_parse_importtime_reads_times_and_depth():
+    records = parse_importtime(SAMPLE)
+    assert [(r.name, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+        ("_io", 120, 120, 2),
+        ("numpy.core", 300, 420, 1),
+        ("numpy", 1500, 1920, 0),
+        ("src.bot.risk", 50, 50, 0),
+    ]
+
+
+def test_startup_timer_phases():
+    now = [10.0]
+    timer = StartupTimer(started=9.5, clock=lambda: now[0])
+    timer.mark("app_imports")
+    now[0] = 12.0
+    timer.mark("connect")
+    assert timer.phases == {"app_imports": 0.5, "connect": 2.0}
+    assert timer.log() == {"app_imports": 500.0, "connect": 2000.0}
+
+
+def test_startup_imports_are_lazy_and_side_effect_free(tmp_path):
+    # Fresh interpreter in an empty directory: importing must not create logs/
+    # and the scheduler must not drag in ib_insync or unused strategies
+    code = (
+        "import sys, src.bot.app, src.bot.journal, src.bot.scheduler\n"
+        "print(sorted(m for m in ('ib_insync', 'src.bot.strategy.whale_rules', "
+        "'src.bot.strategy.scalp_rules', 'src.bot.strategy.geo_rules') if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(ROOT), "PATH": ""},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert proc.stdout.strip() == "[]"
+    assert not (tmp_path / "logs").exists()
+
+
+def test_profile_startup_flag_prints_report(capsys):
+    from src.bot import app
+
+    app.main(["--profile-startup", "--top", "3"])
+    out = capsys.readouterr().out
+    assert out.startswith("Startup imports:")
+    assert "src.bot.scheduler" in out
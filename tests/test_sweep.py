@@ -0,0 +1,132 @@
+"""Unit tests for backtest.sweep - search spaces, shared bars and ranked parallel sweeps."""
+
+import multiprocessing
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot.backtest import STRATEGIES, strategy_params
+from src.bot.backtest.sweep import (
+    IntRange,
+    SharedBars,
+    Uniform,
+    attach_bars,
+    grid_trials,
+    random_trials,
+    run_sweep,
+    tpe_suggest,
+)
+from src.bot.strategy import daily_volume_rules as dv_mod
+
+
+def _random_bars(n=800, seed=1):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    opens = np.r_[closes[0], closes[:-1]]
+    return pd.DataFrame(
+        {
+            "open": opens,
+            "high": np.maximum(opens, closes),
+            "low": np.minimum(opens, closes),
+            "close": closes,
+            "volume": rng.lognormal(7, 0.6, n),
+        },
+        index=pd.date_range("2024-01-02 14:30", periods=n, freq="5min", tz="UTC"),
+    )
+
+
+def test_strategy_params_override_and_restore():
+    before = dv_mod.DV_LOOKBACK_BARS
+    with strategy_params({"DV_LOOKBACK_BARS": before + 5}):
+        assert dv_mod.DV_LOOKBACK_BARS == before + 5
+        assert STRATEGIES["daily_volume"].window == before + 6
+    assert dv_mod.DV_LOOKBACK_BARS == before
+    assert STRATEGIES["daily_volume"].window == before + 1
+    with pytest.raises(KeyError):
+        with strategy_params({"NOT_A_PARAM": 1}):
+            pass
+
+
+def test_search_spaces():
+    grid = grid_trials({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6 and {"a": 2, "b": "z"} in grid
+    with pytest.raises(ValueError):
+        grid_trials({"a": Uniform(0, 1)})
+
+    space = {"u": Uniform(0.1, 10.0, log=True), "i": IntRange(3, 5), "c": [None, 0.5]}
+    trials = random_trials(space, 50, seed=3)
+    assert trials == random_trials(space, 50, seed=3)
+    assert all(
+        0.1 <= t["u"] <= 10 and t["i"] in (3, 4, 5) and t["c"] in (None, 0.5)
+        for t in trials
+    )
+
+
+def test_tpe_concentrates_near_best_scores():
+    space = {"x": Uniform(0.0, 1.0)}
+    rng = random.Random(0)
+    history = [({"x": x}, -abs(x - 0.8)) for x in np.linspace(0, 1, 21)]
+    suggestions = tpe_suggest(space, history, 20, rng)
+    assert np.mean([abs(s["x"] - 0.8) for s in suggestions]) < 0.2
+
+
+def test_shared_bars_roundtrip():
+    bars = {"SPY": _random_bars(50, seed=1), "QQQ": _random_bars(30, seed=2)}
+    with SharedBars(bars) as shared:
+        shm, frames = attach_bars(shared.layout)
+        try:
+            for sym, df in bars.items():
+                pd.testing.assert_frame_equal(frames[sym], df, check_freq=False)
+        finally:
+            del frames
+            shm.close()
+
+
+def test_sweep_ranks_grid_and_reports_bad_trials():
+    bars = {"SPY": _random_bars()}
+    result = run_sweep(
+        bars,
+        {
+            "DV_VOLUME_THRESHOLD": [0.8, 1.5],
+            "DV_LOOKBACK_BARS": [10, 10.5],
+            "stop_loss_pct": [0.2],
+        },
+        objectives=("total_return",),
+        workers=1,
+    )
+    assert len(result) == 4
+    ok = result[result["error"].isna()]
+    assert len(ok) == 2 and ok["total_return"].is_monotonic_decreasing
+    assert (
+        result["error"].notna().sum() == 2
+    )  # a fractional lookback raises; the sweep continues
+    assert dv_mod.DV_LOOKBACK_BARS == 10
+
+    with pytest.raises(KeyError):
+        run_sweep(bars, {"typo_pct": [1]}, workers=1)
+
+
+def test_process_pool_matches_inline_results():
+    bars = {"SPY": _random_bars(seed=4), "QQQ": _random_bars(seed=5)}
+    space = {"DV_VOLUME_THRESHOLD": [0.8, 1.2, 1.6]}
+    inline = run_sweep(bars, space, workers=1)
+    pooled = run_sweep(
+        bars, space, workers=2, mp_context=multiprocessing.get_context("spawn")
+    )
+    cols = ["DV_VOLUME_THRESHOLD", "trades", "total_return"]
+    pd.testing.assert_frame_equal(inline[cols], pooled[cols])
+
+
+def test_tpe_sweep_runs_requested_trials():
+    result = run_sweep(
+        {"SPY": _random_bars(400)},
+        {"DV_VOLUME_THRESHOLD": Uniform(0.5, 2.0), "max_hold_bars": IntRange(5, 40)},
+        method="tpe",
+        n_trials=12,
+        objectives=("total_return", "-max_drawdown"),
+        workers=1,
+    )
+    assert len(result) == 12
+    assert result["total_return"].iloc[0] == result["total_return"].max()
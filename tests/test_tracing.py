@@ -0,0 +1,137 @@
+"""Tests for tracing - per-stage cycle spans, sampling and breakdowns."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bot import tracing
+from src.bot.tracing import CycleTrace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def records():
+    from loguru import logger
+
+    out = []
+    sink = logger.add(lambda msg: out.append(msg.record["extra"]), level="DEBUG")
+    yield out
+    logger.remove(sink)
+
+
+def test_spans_aggregate_per_stage_and_inherit_symbol(records):
+    clock = FakeClock()
+    trace = CycleTrace(clock=clock)
+    with trace.span("symbol", "SPY"):
+        with trace.span("lock_wait"):
+            clock.now += 0.002
+        with trace.span("historical"):
+            clock.now += 0.100
+        with trace.span("lock_wait"):
+            clock.now += 0.004
+    with pytest.raises(TimeoutError):
+        with trace.span("symbol", "QQQ"), trace.span("chain"):
+            clock.now += 0.010
+            raise TimeoutError("slow chain")
+
+    summary = trace.finish()
+    assert summary["stages"]["lock_wait"] == {
+        "count": 2,
+        "total_ms": 6.0,
+        "max_ms": 4.0,
+    }
+    assert summary["stages"]["historical"]["total_ms"] == pytest.approx(100.0)
+    assert summary["symbols"] == {
+        "SPY": pytest.approx(106.0),
+        "QQQ": pytest.approx(10.0),
+    }
+    assert summary["errors"] == {"chain": 1, "symbol": 1}
+    assert summary["cycle_ms"] == pytest.approx(116.0)
+
+    spans = [r for r in records if r.get("event") == "span"]
+    assert [(r["stage"], r["symbol"]) for r in spans[:3]] == [
+        ("lock_wait", "SPY"),
+        ("historical", "SPY"),
+        ("lock_wait", "SPY"),
+    ]
+    assert all(r["cycle_id"] == trace.cycle_id for r in spans)
+    (cycle,) = [r for r in records if r.get("event") == "cycle_trace"]
+    assert cycle["stages"] == summary["stages"]
+    assert tracing.recent_traces(1) == [summary]
+
+
+def test_sampling_picks_an_even_stride_of_cycles(records):
+    traces = [CycleTrace(sample_rate=0.25) for _ in range(8)]
+    assert sum(t.sampled for t in traces) == 2
+    skipped = next(t for t in traces if not t.sampled)
+    with skipped.span("historical", "SPY"):
+        pass
+    assert skipped.finish() is None
+    assert not any(r.get("cycle_id") == skipped.cycle_id for r in records)
+    assert not any(t.sampled for t in (CycleTrace(sample_rate=0.0) for _ in range(4)))
+
+
+def test_run_cycle_emits_stage_breakdown(records, tmp_path):
+    from src.bot import scheduler
+    from src.bot.backtest import LatencyModel, SimBroker
+
+    n = 120
+    closes = 100.0 * np.exp(np.cumsum(np.full(n, 0.002)))
+    opens = np.r_[closes[0], closes[:-1]]
+    bars = pd.DataFrame(
+        {
+            "open": opens,
+            "high": closes * 1.001,
+            "low": opens * 0.999,
+            "close": closes,
+            "volume": 1000.0,
+        },
+        index=pd.date_range("2024-01-02 14:30", periods=n, freq="60min", tz="UTC"),
+    )
+    broker = SimBroker(
+        {"SPY": bars}, latency=LatencyModel(request_seconds=0.0, order_ack_seconds=0.0)
+    )
+    broker.connect()
+    broker.clock.set(broker.last_ts)
+    settings = {
+        "symbols": ["SPY"],
+        "dry_run": True,
+        "historical": {"duration": "432000 S", "bar_size": "1 hour", "use_rth": False},
+        "options": {"max_spread_pct": 5.0},
+        "risk": {"daily_state_path": str(tmp_path / "daily_state.json")},
+        "monitoring": {"alerts_enabled": False, "trace_sample_rate": 1.0},
+    }
+    scheduler._last_signal_bar.clear()
+    scheduler.set_clock(broker.clock, lambda _s: None)
+    try:
+        scheduler.run_cycle(broker, settings)
+    finally:
+        scheduler.set_clock()
+        scheduler._last_signal_bar.clear()
+        scheduler._symbol_bar_cache.clear()
+        scheduler._LAST_REQUEST_TIME.clear()
+
+    (cycle,) = [r for r in records if r.get("event") == "cycle_trace"]
+    assert {
+        "symbol",
+        "lock_wait",
+        "position_check",
+        "historical",
+        "dataframe",
+        "signal",
+        "quotes",
+        "chain",
+        "sizing",
+        "alert",
+    } <= set(cycle["stages"])
+    assert set(cycle["symbols"]) == {"SPY"}
+    assert (
+        cycle["stages"]["quotes"]["count"] == 2
+    )  # underlying, then the option premium
@@ -0,0 +1,75 @@
+"""Unit tests for trading_calendar.py - NYSE holidays, half-days, session lookup."""
+
+from datetime import date, datetime, timezone
+
+from src.bot.trading_calendar import (
+    NY_TZ,
+    TradingCalendar,
+    nyse_early_closes,
+    nyse_holidays,
+)
+
+
+def _ny(y, m, d, hh, mm=0):
+    return datetime(y, m, d, hh, mm, tzinfo=NY_TZ).timestamp()
+
+
+def test_nyse_holidays_2026():
+    assert nyse_holidays(2026) == {
+        date(2026, 1, 1),
+        date(2026, 1, 19),
+        date(2026, 2, 16),
+        date(2026, 4, 3),
+        date(2026, 5, 25),
+        date(2026, 6, 19),
+        date(2026, 7, 3),  # July 4 is a Saturday
+        date(2026, 9, 7),
+        date(2026, 11, 26),
+        date(2026, 12, 25),
+    }
+
+
+def test_observed_rules_2027():
+    hol = nyse_holidays(2027)
+    assert date(2027, 6, 18) in hol  # Juneteenth Saturday -> Friday
+    assert date(2027, 7, 5) in hol  # July 4 Sunday -> Monday
+    assert date(2027, 12, 24) in hol  # Christmas Saturday -> Friday
+    # New Year's Day 2028 is a Saturday: no holiday moved back into 2027
+    assert date(2027, 12, 31) not in hol
+
+
+def test_early_closes():
+    assert nyse_early_closes(2025) == {
+        date(2025, 7, 3),
+        date(2025, 11, 28),
+        date(2025, 12, 24),
+    }
+    # 2026: July 3 is the observed holiday, so no July early close
+    assert nyse_early_closes(2026) == {date(2026, 11, 27), date(2026, 12, 24)}
+
+
+def test_session_lookup():
+    cal = TradingCalendar(years=[2026])
+    assert cal.is_open(_ny(2026, 1, 14, 10))
+    assert cal.is_open(_ny(2026, 1, 14, 16))  # close is inclusive
+    assert not cal.is_open(_ny(2026, 1, 14, 16, 1))
+    assert not cal.is_open(_ny(2026, 1, 19, 11))  # MLK day
+    assert not cal.is_open(_ny(2026, 1, 17, 11))  # Saturday
+    assert cal.is_open(_ny(2026, 11, 27, 12, 59))
+    assert not cal.is_open(_ny(2026, 11, 27, 13, 30))  # half-day
+
+
+def test_next_open_skips_weekend_holiday_and_year_end():
+    cal = TradingCalendar(years=[2026])
+    # Friday evening before MLK weekend -> Tuesday open
+    assert cal.next_open(_ny(2026, 1, 16, 17)) == _ny(2026, 1, 20, 9, 30)
+    # New Year's Eve 2026 evening -> first session of 2027 (Jan 1 is a holiday)
+    assert cal.next_open(_ny(2026, 12, 31, 17)) == _ny(2027, 1, 4, 9, 30)
+    assert cal.seconds_until_open(_ny(2026, 1, 14, 10)) == 0.0
+
+
+def test_is_rth_uses_calendar():
+    from src.bot.scheduler import is_rth
+
+    assert not is_rth(datetime(2026, 12, 25, 15, 0, tzinfo=timezone.utc))  # Christmas
+    assert is_rth(datetime(2026, 12, 23, 15, 0, tzinfo=timezone.utc))  # 10:00 ET